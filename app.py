@@ -1,43 +1,102 @@
 # app.py
 
-from flask import Flask, render_template, request, redirect, url_for, jsonify, flash
+import json
+from flask import (Flask, Response, render_template, request, redirect, url_for, jsonify, flash,
+                   stream_template, stream_with_context)
+from src.api import metrics
+from src.api.conditional import conditional
+from src.api.v1 import api_v1
+from src.database.db_connection import DatabaseConnection
 from src.services.product_service import ProductService, AdvancedProductSearch
+from src.services.cache import get_cache
 from src.services.category_service import CategoryService
+from src.services.category_stats import CategoryStatsService
+from src.services.product_export import ENCODERS
+from src.services.reservations import init_reservation_sweeper
+from src.utils.logger import configure_logging, init_request_logging
+from src.utils.pagination import DEFAULT_PAGE_SIZE
+from src.utils.validators import CATEGORY_SCHEMA, NEW_PRODUCT_SCHEMA
 
 app = Flask(__name__)
 app.secret_key = 'your_secret_key_here'  # needed for flash messages
 
+# JSON-lines logs written off the request thread, tagged with a per-request id
+configure_logging()
+init_request_logging(app)
+
+# Request latency per route, and the Prometheus scrape endpoint at /metrics
+metrics.init_app(app)
+
+# One unit of work (session checkout + commit) per request
+DatabaseConnection().init_app(app)
+
+# Versioned JSON API under /api/v1
+app.register_blueprint(api_v1)
+
+# Expire overdue stock reservations in the background (RESERVATION_SWEEP_INTERVAL),
+# started once the app serves its first request rather than on import
+init_reservation_sweeper(app)
+
 # Initialize services
 product_service = ProductService()
 category_service = CategoryService()
+category_stats = CategoryStatsService()
 advanced_search = AdvancedProductSearch()
 
+def ndjson_stream(products):
+    # One JSON document per line, so neither side has to buffer the whole list
+    for product in products:
+        yield json.dumps(product.to_dict()) + '\n'
+
 # Home page: a dashboard with links to different operations
 @app.route('/')
 def index():
     return render_template('index.html')
 
-# Display all products
+# Display products one keyset page at a time; ?stream=html|json streams the whole catalog
 @app.route('/products')
+@conditional('products', 'categories')
 def list_products():
+    cursor = request.args.get('cursor')
+    page_size = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    stream = request.args.get('stream')
     try:
-        products = product_service.get_all_products()
-        return render_template('products.html', products=products)
+        if stream == 'json':
+            return Response(stream_with_context(ndjson_stream(product_service.iter_products())),
+                            mimetype='application/x-ndjson')
+        if stream == 'html':
+            return Response(stream_template('products.html',
+                                            products=product_service.iter_products(),
+                                            streaming=True))
+        page = product_service.get_products_page(cursor, page_size)
+        return render_template('products.html', products=page.items,
+                               next_cursor=page.next_cursor, page_size=page.page_size)
     except Exception as e:
         flash(str(e), 'danger')
         return redirect(url_for('index'))
 
+# Streamed catalog download: /products/export?format=csv|jsonl|columnar&gzip=1
+@app.route('/products/export')
+def export_products():
+    fmt = request.args.get('format', 'csv')
+    compress = request.args.get('gzip', type=int, default=0) == 1
+    encoder = ENCODERS.get(fmt)
+    if encoder is None:
+        return jsonify({'status': 'error', 'message': f"Unsupported export format '{fmt}'"}), 400
+    filename = 'products' + encoder.extension + ('.gz' if compress else '')
+    mimetype = 'application/gzip' if compress else encoder.mimetype
+    return Response(stream_with_context(product_service.stream_export(fmt, compress)),
+                    mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
 # Form for creating a new product
 @app.route('/products/new', methods=['GET', 'POST'])
 def new_product():
     if request.method == 'POST':
         try:
-            name = request.form['name']
-            price = float(request.form['price'])
-            category_id = int(request.form['category_id'])
-            description = request.form.get('description', '')
-            stock_quantity = int(request.form.get('stock_quantity', 0))
-            product_service.create_product(name, price, category_id, description, stock_quantity)
+            values = NEW_PRODUCT_SCHEMA.check(request.form)
+            product_service.create_product(values['name'], values['price'], values['category_id'],
+                                           values['description'], values['stock_quantity'])
             flash("Product created successfully!", "success")
             return redirect(url_for('list_products'))
         except Exception as e:
@@ -48,12 +107,15 @@ def new_product():
         categories = category_service.get_all_categories()
         return render_template('new_product.html', categories=categories)
 
-# Display all categories
+# Display all categories with their product totals
 @app.route('/categories')
+@conditional('categories', 'products')
 def list_categories():
     try:
         categories = category_service.get_all_categories()
-        return render_template('categories.html', categories=categories)
+        return render_template('categories.html', categories=categories,
+                               paths=category_service.get_category_paths(),
+                               stats=category_stats.get_all_stats(include_descendants=True))
     except Exception as e:
         flash(str(e), 'danger')
         return redirect(url_for('index'))
@@ -63,41 +125,74 @@ def list_categories():
 def new_category():
     if request.method == 'POST':
         try:
-            name = request.form['name']
-            description = request.form.get('description', '')
-            category_service.create_category(name, description)
+            values = CATEGORY_SCHEMA.check(request.form)
+            category_service.create_category(values['name'], values['description'],
+                                             parent_id=values['parent_id'])
             flash("Category created successfully!", "success")
             return redirect(url_for('list_categories'))
         except Exception as e:
             flash(f"Error creating category: {e}", "danger")
             return redirect(url_for('new_category'))
     else:
-        return render_template('new_category.html')
+        return render_template('new_category.html', paths=category_service.get_category_paths())
 
 # API endpoint for advanced product search
 @app.route('/api/products/search', methods=['GET'])
+@conditional('products', 'categories')
 def search_products():
     name = request.args.get('name')
+    q = request.args.get('q')
     min_price = request.args.get('min_price', type=float)
     max_price = request.args.get('max_price', type=float)
     category_id = request.args.get('category_id', type=int)
     min_stock = request.args.get('min_stock', type=int)
     max_stock = request.args.get('max_stock', type=int)
+    include_descendants = request.args.get('include_descendants', '').lower() in ('1', 'true', 'yes', 'on')
+    cursor = request.args.get('cursor')
+    page_size = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    filters = dict(
+        name=name,
+        q=q,
+        min_price=min_price,
+        max_price=max_price,
+        category_id=category_id,
+        min_stock=min_stock,
+        max_stock=max_stock,
+        include_descendants=include_descendants
+    )
     
     try:
-        products = advanced_search.search_products(
-            name=name,
-            min_price=min_price,
-            max_price=max_price,
-            category_id=category_id,
-            min_stock=min_stock,
-            max_stock=max_stock
-        )
-        # Convert products to dicts assuming your Product model has a to_dict() method
-        products_list = [product.to_dict() for product in products]
-        return jsonify({'status': 'success', 'data': products_list})
+        if request.args.get('stream'):
+            products = advanced_search.iter_search_products(**filters)
+            return Response(stream_with_context(ndjson_stream(products)),
+                            mimetype='application/x-ndjson')
+        page = advanced_search.search_products_page(cursor=cursor, page_size=page_size, **filters)
+        products_list = [product.to_dict() for product in page.items]
+        return jsonify({'status': 'success', 'data': products_list,
+                        'next_cursor': page.next_cursor})
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+# Cache hit/miss/eviction counters
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify({'status': 'success', 'data': get_cache().stats.snapshot()})
+
+# Per-statement latency histograms, most expensive first: ?order_by=total_ms|max_ms|calls&limit=20&reset=1
+@app.route('/api/db/queries', methods=['GET'])
+def query_stats():
+    stats = DatabaseConnection().query_stats
+    if stats is None:
+        return jsonify({'status': 'error', 'message': "Query instrumentation is off (DB_INSTRUMENT)"}), 404
+    order_by = request.args.get('order_by', 'total_ms')
+    if order_by not in ('total_ms', 'max_ms', 'avg_ms', 'calls', 'errors', 'slow'):
+        return jsonify({'status': 'error', 'message': f"Cannot order by '{order_by}'"}), 400
+    report = stats.report(order_by, request.args.get('limit', 20, type=int))
+    if request.args.get('reset', type=int) == 1:
+        stats.reset()
+    return jsonify({'status': 'success', 'data': report, 'pool': DatabaseConnection().pool_status()})
+
 if __name__ == '__main__':
     app.run(debug=True)
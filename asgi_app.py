@@ -0,0 +1,118 @@
+# asgi_app.py
+# Async JSON API served by an ASGI server, e.g.:
+#   uvicorn asgi_app:app --workers 1
+#   hypercorn asgi_app:app
+
+from quart import Quart, jsonify, request
+from src.database.async_db import AsyncDatabaseConnection
+from src.services.async_product_service import AsyncProductService, AsyncAdvancedProductSearch
+from src.services.concurrency import ConcurrentUpdateError
+from src.utils.pagination import DEFAULT_PAGE_SIZE
+from src.utils.validators import NEW_PRODUCT_SCHEMA, ValidationErrors
+
+app = Quart(__name__)
+
+# Initialize services
+product_service = AsyncProductService()
+advanced_search = AsyncAdvancedProductSearch()
+
+@app.after_serving
+async def close_database():
+    await AsyncDatabaseConnection().dispose()
+
+def error(message: str, status: int = 400):
+    return jsonify({'status': 'error', 'message': message}), status
+
+# Keyset-paginated product listing
+@app.route('/api/products', methods=['GET'])
+async def list_products():
+    try:
+        page = await product_service.get_products_page(
+            request.args.get('cursor'),
+            request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+        )
+    except ValueError as e:
+        return error(str(e))
+    return jsonify({'status': 'success', 'data': [product.to_dict() for product in page.items],
+                    'next_cursor': page.next_cursor})
+
+@app.route('/api/products', methods=['POST'])
+async def create_product():
+    payload = await request.get_json(silent=True) or {}
+    try:
+        values = NEW_PRODUCT_SCHEMA.check(payload)
+        product = await product_service.create_product(
+            values['name'],
+            values['price'],
+            values['category_id'],
+            values['description'],
+            values['stock_quantity']
+        )
+    except ValidationErrors as e:
+        return jsonify({'status': 'error', 'message': str(e),
+                        'errors': [field_error.to_dict() for field_error in e.errors]}), 400
+    except (TypeError, ValueError) as e:
+        return error(str(e))
+    return jsonify({'status': 'success', 'data': product.to_dict()}), 201
+
+@app.route('/api/products/<int:product_id>', methods=['GET'])
+async def get_product(product_id: int):
+    product = await product_service.find_product_by_id(product_id)
+    if product is None:
+        return error(f"Product with id {product_id} not found", 404)
+    return jsonify({'status': 'success', 'data': product.to_dict()})
+
+@app.route('/api/products/<int:product_id>', methods=['DELETE'])
+async def delete_product(product_id: int):
+    try:
+        await product_service.delete_product(product_id)
+    except ConcurrentUpdateError as e:
+        return error(str(e), 409)
+    except ValueError as e:
+        return error(str(e), 404 if 'not found' in str(e) else 400)
+    return jsonify({'status': 'success'})
+
+# Body: {"quantity_change": -3, "warehouse_id": 2}   (warehouse_id optional: default warehouse)
+@app.route('/api/products/<int:product_id>/stock', methods=['POST'])
+async def update_stock(product_id: int):
+    payload = await request.get_json(silent=True) or {}
+    try:
+        warehouse_id = payload.get('warehouse_id')
+        product = await product_service.update_stock(
+            product_id, int(payload['quantity_change']),
+            warehouse_id=int(warehouse_id) if warehouse_id is not None else None
+        )
+    except KeyError:
+        return error("Missing field: quantity_change")
+    except ConcurrentUpdateError as e:
+        return error(str(e), 409)
+    except (TypeError, ValueError) as e:
+        return error(str(e), 404 if 'not found' in str(e) else 400)
+    return jsonify({'status': 'success', 'data': product.to_dict()})
+
+@app.route('/api/products/low-stock', methods=['GET'])
+async def low_stock_products():
+    products = await product_service.get_low_stock_products(request.args.get('threshold', type=int))
+    return jsonify({'status': 'success', 'data': [product.to_dict() for product in products]})
+
+# Same parameters as the Flask /api/products/search endpoint
+@app.route('/api/products/search', methods=['GET'])
+async def search_products():
+    try:
+        page = await advanced_search.search_products_page(
+            name=request.args.get('name'),
+            q=request.args.get('q'),
+            min_price=request.args.get('min_price', type=float),
+            max_price=request.args.get('max_price', type=float),
+            category_id=request.args.get('category_id', type=int),
+            min_stock=request.args.get('min_stock', type=int),
+            max_stock=request.args.get('max_stock', type=int),
+            cursor=request.args.get('cursor'),
+            page_size=request.args.get('limit', DEFAULT_PAGE_SIZE, type=int),
+            include_descendants=request.args.get('include_descendants', '').lower() in ('1', 'true', 'yes',
+                                                                                        'on')
+        )
+    except ValueError as e:
+        return error(str(e))
+    return jsonify({'status': 'success', 'data': [product.to_dict() for product in page.items],
+                    'next_cursor': page.next_cursor})
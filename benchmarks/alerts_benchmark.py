@@ -0,0 +1,81 @@
+# benchmarks/alerts_benchmark.py
+"""
+Low-stock alert reads from the maintained alert set versus a scan with
+per-product reorder points, and what keeping the set current adds to writes.
+
+    python -m benchmarks.alerts_benchmark --rows 1000000
+"""
+import argparse
+import json
+import os
+import random
+import time
+from benchmarks.common import load_baseline_catalog, measure, temp_database_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--updates', type=int, default=2000, help="Single stock updates to time")
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args()
+
+    path = temp_database_path()
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    # Imported late so the connection singleton picks up DATABASE_URL
+    from src.database.db_connection import DatabaseConnection
+    from src.services.product_service import ProductService
+    from src.services.stock_alerts import StockAlertService, below_reorder_point, refresh_alerts
+
+    try:
+        print(f"Loading {args.rows:,} products into {path} ...")
+        load_baseline_catalog(path, args.rows)
+        db = DatabaseConnection()
+        started = time.perf_counter()
+        db.create_tables()
+        results = {'migrate_and_build_alerts_s': time.perf_counter() - started}
+        alerts = StockAlertService()
+        products = ProductService()
+
+        def scan():
+            with db.engine.connect() as conn:
+                return conn.execute(below_reorder_point()).all()
+
+        results['open_alerts'] = alerts.count_alerts()
+        results['scan_low_stock'] = measure(scan, repeat=args.repeat)
+        results['read_alert_set'] = measure(lambda: alerts.get_alerts_page(page_size=500),
+                                            repeat=args.repeat)
+        results['low_stock_products'] = measure(lambda: products.get_low_stock_products(),
+                                                repeat=args.repeat)
+
+        rng = random.Random(3)
+        ids = [rng.randint(1, args.rows) for _ in range(args.updates)]
+        started = time.perf_counter()
+        for product_id in ids:
+            products.update_stock(product_id, 1)
+        results['update_stock_per_second'] = args.updates / (time.perf_counter() - started)
+        started = time.perf_counter()
+        with db.engine.begin() as conn:
+            refresh_alerts(conn, ids)
+        results['refresh_alerts_per_product_us'] = (time.perf_counter() - started) / len(ids) * 1e6
+        db.engine.dispose()
+
+        print(f"\n{results['open_alerts']:,} open alerts (built in {results['migrate_and_build_alerts_s']:.2f}s "
+              f"with the migration)")
+        for label in ('scan_low_stock', 'read_alert_set', 'low_stock_products'):
+            print(f"{label}: {results[label]['median_ms']:.2f} ms median, {results[label]['p95_ms']:.2f} ms p95")
+        print(f"update_stock incl. alert refresh: {results['update_stock_per_second']:,.0f}/s; "
+              f"refresh alone {results['refresh_alerts_per_product_us']:.1f} us per product")
+
+        if args.json:
+            with open(args.json, 'w') as handle:
+                json.dump({'rows': args.rows, **results}, handle, indent=2)
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+if __name__ == '__main__':
+    main()
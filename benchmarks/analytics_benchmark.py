@@ -0,0 +1,90 @@
+# benchmarks/analytics_benchmark.py
+"""
+Inventory analytics on column arrays versus a loop over ORM Product objects.
+
+    python -m benchmarks.analytics_benchmark --rows 1000000
+"""
+import argparse
+import json
+import os
+import time
+from collections import defaultdict
+from benchmarks.common import load_baseline_catalog, temp_database_path
+
+
+def naive_report(session, product_model):
+    """
+    What the analytics used to cost: load every Product and aggregate in Python
+    """
+    value_by_category = defaultdict(float)
+    values = []
+    for product in session.query(product_model).yield_per(10000):
+        value = product.price * (product.stock_quantity or 0)
+        value_by_category[product.category_id] += value
+        values.append(value)
+    values.sort(reverse=True)
+    total = sum(values)
+    running, classes = 0.0, {'A': 0, 'B': 0, 'C': 0}
+    for value in values:
+        share_before = running / total if total else 1.0
+        classes['A' if share_before < 0.8 else 'B' if share_before < 0.95 else 'C'] += 1
+        running += value
+    return value_by_category, classes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--skip-naive', action='store_true', help="Only time the vectorized path")
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args()
+
+    path = temp_database_path()
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    # Imported late so the connection singleton picks up DATABASE_URL
+    from src.database.db_connection import DatabaseConnection
+    from src.models.product import Product
+    from src.services.analytics import InventoryAnalytics
+
+    try:
+        print(f"Loading {args.rows:,} products into {path} ...")
+        load_baseline_catalog(path, args.rows)
+        db = DatabaseConnection()
+        db.create_tables()
+        analytics = InventoryAnalytics()
+
+        results = {}
+        started = time.perf_counter()
+        columns = analytics.load_columns()
+        results['load_columns_s'] = time.perf_counter() - started
+        started = time.perf_counter()
+        report = analytics.report(columns=columns)
+        results['compute_s'] = time.perf_counter() - started
+        results['vectorized_total_s'] = results['load_columns_s'] + results['compute_s']
+
+        if not args.skip_naive:
+            started = time.perf_counter()
+            with db.get_session() as session:
+                naive_report(session, Product)
+            results['naive_orm_s'] = time.perf_counter() - started
+        db.engine.dispose()
+
+        print(f"\nvectorized: load {results['load_columns_s']:.2f}s + compute {results['compute_s']:.3f}s "
+              f"= {results['vectorized_total_s']:.2f}s")
+        if 'naive_orm_s' in results:
+            print(f"ORM loop (valuation + ABC only): {results['naive_orm_s']:.2f}s "
+                  f"({results['naive_orm_s'] / results['vectorized_total_s']:.1f}x slower)")
+        print(f"total value ${report['total_value']:,.2f}, "
+              f"A/B/C = {'/'.join(str(item['products']) for item in report['abc']['classes'].values())}")
+
+        if args.json:
+            with open(args.json, 'w') as handle:
+                json.dump({'rows': args.rows, **results}, handle, indent=2)
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+if __name__ == '__main__':
+    main()
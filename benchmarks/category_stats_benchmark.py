@@ -0,0 +1,90 @@
+# benchmarks/category_stats_benchmark.py
+"""
+Category dashboard totals from the trigger-maintained category_stats table
+versus a GROUP BY over products, and what the triggers cost on writes.
+
+    python -m benchmarks.category_stats_benchmark --rows 1000000
+"""
+import argparse
+import json
+import os
+import random
+import time
+from sqlalchemy import text
+from benchmarks.common import load_baseline_catalog, measure, temp_database_path
+
+
+def time_movements(service, rows: int, batches: int, batch_size: int) -> float:
+    """Stock movements per second through apply_stock_movements"""
+    rng = random.Random(5)
+    work = [[(rng.randint(1, rows), rng.choice((-1, 1))) for _ in range(batch_size)]
+            for _ in range(batches)]
+    started = time.perf_counter()
+    for batch in work:
+        service.apply_stock_movements(batch)
+    return batches * batch_size / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--batches', type=int, default=20, help="apply_stock_movements calls per write run")
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args()
+
+    path = temp_database_path()
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    # Imported late so the connection singleton picks up DATABASE_URL
+    from src.database.db_connection import DatabaseConnection
+    from src.services.category_stats import STATS_TRIGGERS, CategoryStatsService, install_stats_triggers
+    from src.services.product_service import ProductService
+
+    try:
+        print(f"Loading {args.rows:,} products into {path} ...")
+        load_baseline_catalog(path, args.rows)
+        db = DatabaseConnection()
+        db.create_tables()
+        stats = CategoryStatsService()
+        products = ProductService()
+
+        def group_by():
+            with db.engine.connect() as conn:
+                return conn.execute(text(
+                    "SELECT category_id, COUNT(*), SUM(stock_quantity), SUM(price * stock_quantity), "
+                    "MIN(price), MAX(price) FROM products GROUP BY category_id")).all()
+
+        # Warm the page cache so the first timed run isn't penalised
+        time_movements(products, args.rows, 2, args.batch_size)
+        results = {
+            'group_by_products': measure(group_by, repeat=max(3, args.repeat // 4)),
+            'read_category_stats': measure(stats.get_all_stats, repeat=args.repeat),
+            'movements_per_second_with_triggers': time_movements(products, args.rows, args.batches,
+                                                                 args.batch_size),
+        }
+        with db.engine.begin() as conn:
+            for name in STATS_TRIGGERS:
+                conn.execute(text(f"DROP TRIGGER {name}"))
+        results['movements_per_second_without_triggers'] = time_movements(products, args.rows, args.batches,
+                                                                          args.batch_size)
+        with db.engine.begin() as conn:
+            install_stats_triggers(conn)
+        db.engine.dispose()
+
+        for label in ('group_by_products', 'read_category_stats'):
+            print(f"{label}: {results[label]['median_ms']:.2f} ms median, {results[label]['p95_ms']:.2f} ms p95")
+        print(f"stock movements: {results['movements_per_second_with_triggers']:,.0f}/s with triggers, "
+              f"{results['movements_per_second_without_triggers']:,.0f}/s without")
+
+        if args.json:
+            with open(args.json, 'w') as handle:
+                json.dump({'rows': args.rows, **results}, handle, indent=2)
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+if __name__ == '__main__':
+    main()
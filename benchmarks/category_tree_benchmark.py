@@ -0,0 +1,102 @@
+# benchmarks/category_tree_benchmark.py
+"""
+Subtree product queries through the category_closure table versus walking
+parent_id with a recursive CTE, on a tree that is both deep (one long
+chain) and wide (thousands of children under the root).
+
+    python -m benchmarks.category_tree_benchmark --rows 1000000 --categories 5000 --depth 1000
+"""
+import argparse
+import json
+import os
+import time
+from sqlalchemy import func, literal, select, text
+from benchmarks.common import load_baseline_catalog, measure, temp_database_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--categories', type=int, default=5000)
+    parser.add_argument('--depth', type=int, default=1000, help="Length of the chain hanging off the root")
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args()
+
+    path = temp_database_path()
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    # Imported late so the connection singleton picks up DATABASE_URL
+    from src.database.db_connection import DatabaseConnection
+    from src.models.category import Category
+    from src.models.product import Product
+    from src.services.category_service import CategoryService
+    from src.services.category_tree import rebuild_closure, subtree_ids
+    from src.services.product_service import AdvancedProductSearch
+
+    try:
+        print(f"Loading {args.rows:,} products in {args.categories:,} categories into {path} ...")
+        load_baseline_catalog(path, args.rows, categories=args.categories)
+        db = DatabaseConnection()
+        db.create_tables()
+        # Categories 2..depth form a chain under 1; the rest are direct children of 1
+        with db.engine.begin() as conn:
+            conn.execute(text("UPDATE categories SET parent_id = CASE WHEN id <= :depth THEN id - 1 ELSE 1 END "
+                              "WHERE id > 1"), {'depth': args.depth})
+            started = time.perf_counter()
+            closure_rows = rebuild_closure(conn)
+        results = {'closure_rows': closure_rows, 'rebuild_closure_s': time.perf_counter() - started}
+
+        categories = Category.__table__
+        products = Product.__table__
+        middle = max(1, args.depth // 2)
+
+        def closure_count(category_id):
+            with db.engine.connect() as conn:
+                return conn.scalar(select(func.count()).select_from(products)
+                                   .where(products.c.category_id.in_(subtree_ids(category_id))))
+
+        def recursive_count(category_id):
+            tree = select(literal(category_id).label('id')).cte('tree', recursive=True)
+            tree = tree.union_all(select(categories.c.id).where(categories.c.parent_id == tree.c.id))
+            with db.engine.connect() as conn:
+                return conn.scalar(select(func.count()).select_from(products)
+                                   .where(products.c.category_id.in_(select(tree.c.id))))
+
+        search = AdvancedProductSearch()
+        for label, category_id in (('root', 1), ('chain_middle', middle)):
+            assert closure_count(category_id) == recursive_count(category_id)
+            results[f'{label}_closure_count'] = measure(lambda: closure_count(category_id), repeat=args.repeat)
+            results[f'{label}_recursive_count'] = measure(lambda: recursive_count(category_id),
+                                                          repeat=args.repeat)
+            results[f'{label}_search_page'] = measure(
+                lambda: search.search_products_page(category_id=category_id, include_descendants=True,
+                                                    max_price=20),
+                repeat=args.repeat)
+
+        # Re-hang the lower half of the chain under a leaf of the wide level and back
+        service = CategoryService()
+        started = time.perf_counter()
+        service.move_category(middle, args.categories)
+        service.move_category(middle, middle - 1 if middle > 1 else None)
+        results['move_subtree_ms'] = (time.perf_counter() - started) * 1000 / 2
+        db.engine.dispose()
+
+        print(f"\n{closure_rows:,} closure rows, rebuilt in {results['rebuild_closure_s']:.2f}s")
+        for label in ('root', 'chain_middle'):
+            for kind in ('closure_count', 'recursive_count', 'search_page'):
+                stats = results[f'{label}_{kind}']
+                print(f"{label} {kind}: {stats['median_ms']:.2f} ms median, {stats['p95_ms']:.2f} ms p95")
+        print(f"move of a {args.depth - middle + 1:,}-deep subtree: {results['move_subtree_ms']:.1f} ms")
+
+        if args.json:
+            with open(args.json, 'w') as handle:
+                json.dump({'rows': args.rows, 'categories': args.categories, 'depth': args.depth, **results},
+                          handle, indent=2)
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+if __name__ == '__main__':
+    main()
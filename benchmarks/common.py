@@ -0,0 +1,83 @@
+# benchmarks/common.py
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+# Schema of inventory.db before any migration ran
+BASELINE_DDL = [
+    "CREATE TABLE categories (id INTEGER NOT NULL, name VARCHAR(100) NOT NULL, "
+    "description VARCHAR(255), PRIMARY KEY (id), UNIQUE (name))",
+    "CREATE TABLE products (id INTEGER NOT NULL, name VARCHAR(100) NOT NULL, "
+    "description VARCHAR(255), price FLOAT NOT NULL, stock_quantity INTEGER, "
+    "category_id INTEGER NOT NULL, PRIMARY KEY (id), "
+    "FOREIGN KEY(category_id) REFERENCES categories (id))",
+]
+
+WORDS = ['Alpha', 'Bolt', 'Cable', 'Drill', 'Eagle', 'Fuse', 'Gear', 'Hinge', 'Iron', 'Jack',
+         'Knob', 'Lamp', 'Motor', 'Nut', 'Omega', 'Pump', 'Quartz', 'Rivet', 'Saw', 'Tape',
+         'Valve', 'Wire', 'Xenon', 'Yoke', 'Zinc']
+DESCRIPTION_WORDS = WORDS + ['steel', 'compact', 'heavy', 'duty', 'wireless', 'spare', 'industrial',
+                             'kit', 'replacement', 'premium', 'outdoor', 'portable', 'classic']
+
+
+def temp_database_path(prefix: str = 'inventory-bench-') -> str:
+    handle, path = tempfile.mkstemp(prefix=prefix, suffix='.db')
+    os.close(handle)
+    os.remove(path)
+    return path
+
+
+def load_baseline_catalog(path: str, products: int, categories: int = 50, seed: int = 42):
+    """
+    Create the un-migrated schema and fill it with a random catalog
+    """
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=OFF")
+        for ddl in BASELINE_DDL:
+            conn.execute(ddl)
+        conn.executemany("INSERT INTO categories (id, name, description) VALUES (?, ?, ?)",
+                         [(i, f'Category {i}', None) for i in range(1, categories + 1)])
+        batch = []
+        for product_id in range(1, products + 1):
+            batch.append((
+                product_id,
+                f'{rng.choice(WORDS)} {rng.choice(WORDS)} {product_id}',
+                ' '.join(rng.choice(DESCRIPTION_WORDS) for _ in range(8)).capitalize(),
+                round(rng.lognormvariate(3, 1), 2),
+                rng.randint(0, 500),
+                rng.randint(1, categories),
+            ))
+            if len(batch) == 50000:
+                conn.executemany("INSERT INTO products VALUES (?, ?, ?, ?, ?, ?)", batch)
+                batch = []
+        if batch:
+            conn.executemany("INSERT INTO products VALUES (?, ?, ?, ?, ?, ?)", batch)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def measure(fn: Callable[[], object], repeat: int = 20, warmup: int = 2) -> Dict[str, float]:
+    """
+    Run fn repeatedly and return latency statistics in milliseconds
+    """
+    for _ in range(warmup):
+        fn()
+    samples: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        'median_ms': statistics.median(samples),
+        'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        'min_ms': samples[0],
+    }
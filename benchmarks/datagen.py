@@ -0,0 +1,214 @@
+# benchmarks/datagen.py
+"""
+Synthetic catalogs with realistic shapes, bulk-loaded into a fully
+migrated SQLite database:
+
+- categories form a two-level tree (departments and their subcategories);
+  product counts per subcategory follow a Zipf law, so a few are huge and
+  most are small
+- names are brand + adjective + noun + a letters-only model code (the
+  validators reject digits), so name and full-text searches hit a
+  realistic share of rows
+- prices are log-normal around a per-subcategory median, mostly ending in .99
+- stock: ~6% out of stock, most items below 100, a tail of bulk items in the
+  thousands
+- reorder points on most subcategories and on some products, so the
+  low-stock alert set is non-trivial
+
+    python -m benchmarks.datagen --products 100000 --categories 500 --out catalog.db
+"""
+import argparse
+import math
+import os
+import random
+import sqlite3
+import time
+from typing import Dict, List, NamedTuple
+from sqlalchemy import create_engine, event, text
+from benchmarks.common import BASELINE_DDL
+
+DEPARTMENTS = ['Tools', 'Electrical', 'Plumbing', 'Garden', 'Automotive', 'Hardware', 'Lighting',
+               'Paint', 'Safety', 'Storage', 'Heating', 'Outdoor', 'Office', 'Cleaning', 'Kitchen']
+NOUNS = ['Drill', 'Saw', 'Hammer', 'Wrench', 'Cable', 'Switch', 'Valve', 'Pipe', 'Hose', 'Lamp',
+         'Bulb', 'Fuse', 'Pump', 'Motor', 'Ladder', 'Brush', 'Roller', 'Glove', 'Helmet', 'Bin',
+         'Shelf', 'Heater', 'Fan', 'Filter', 'Battery', 'Charger', 'Clamp', 'Hinge', 'Lock', 'Tape']
+BRANDS = ['Acme', 'Bolton', 'Craftline', 'Dura', 'Everforge', 'Fixwell', 'Gridmaster', 'Hexa',
+          'Ironclad', 'Jetstream', 'Kestrel', 'Lumen', 'Maxtork', 'Northway', 'Optima', 'ProSeries',
+          'Quickset', 'Rigid', 'Summit', 'Titan', 'Ultra', 'Vortex', 'Westfield', 'Zenith']
+ADJECTIVES = ['Compact', 'Heavy-Duty', 'Cordless', 'Industrial', 'Portable', 'Premium', 'Classic',
+              'Outdoor', 'Wireless', 'Stainless', 'Adjustable', 'Universal', 'Professional', 'Mini']
+DESCRIPTION_WORDS = ['steel', 'aluminium', 'durable', 'lightweight', 'ergonomic', 'grip', 'kit',
+                     'replacement', 'spare', 'weatherproof', 'rechargeable', 'warranty', 'pack',
+                     'set', 'heavy', 'duty', 'compact', 'indoor', 'outdoor', 'quick', 'release']
+
+BATCH_SIZE = 50000
+
+
+class CatalogSummary(NamedTuple):
+    products: int
+    categories: int
+    departments: int
+    out_of_stock: int
+    generate_s: float
+    migrate_s: float
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+
+def _category_rows(categories: int, rng: random.Random) -> List[tuple]:
+    """(id, name, parent_id) with departments first; every other category hangs off one"""
+    departments = max(1, min(len(DEPARTMENTS) * 4, round(math.sqrt(categories))))
+    departments = min(departments, categories)
+    rows = []
+    for index in range(departments):
+        name = DEPARTMENTS[index % len(DEPARTMENTS)]
+        rows.append((index + 1, name if index < len(DEPARTMENTS) else f'{name} {index // len(DEPARTMENTS) + 1}',
+                     None))
+    for category_id in range(departments + 1, categories + 1):
+        parent = rng.randint(1, departments)
+        rows.append((category_id, f'{rows[parent - 1][1]} {rng.choice(NOUNS)}s {category_id}', parent))
+    return rows
+
+
+def model_code(number: int) -> str:
+    """Letters-only model code unique per number (product names may not contain digits)"""
+    letters = ''
+    while True:
+        number, digit = divmod(number, 26)
+        letters = chr(ord('A') + digit) + letters
+        if not number:
+            return letters
+
+
+def _stock(rng: random.Random) -> int:
+    draw = rng.random()
+    if draw < 0.06:
+        return 0
+    if draw < 0.92:
+        return int(rng.expovariate(1 / 35)) + 1
+    return int(rng.expovariate(1 / 1500)) + 200
+
+
+def _price(rng: random.Random, median: float) -> float:
+    price = max(0.5, rng.lognormvariate(math.log(median), 0.6))
+    if price > 5 and rng.random() < 0.7:
+        return math.floor(price) + 0.99
+    return round(price, 2)
+
+
+def write_baseline(path: str, products: int, categories: int, seed: int) -> Dict[int, int]:
+    """
+    Fill the un-migrated schema; returns {category_id: parent_id} for the
+    tree, which only exists once migrations have added parent_id
+    """
+    rng = random.Random(seed)
+    category_rows = _category_rows(categories, rng)
+    leaves = [row[0] for row in category_rows if row[2] is not None] or [row[0] for row in category_rows]
+    # Zipf: the k-th largest subcategory gets weight 1/k
+    rng.shuffle(leaves)
+    cumulative, total = [], 0.0
+    for rank in range(1, len(leaves) + 1):
+        total += 1 / rank
+        cumulative.append(total)
+    medians = {category_id: math.exp(rng.uniform(1, 6)) for category_id in leaves}
+
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=OFF")
+        for ddl in BASELINE_DDL:
+            conn.execute(ddl)
+        conn.executemany("INSERT INTO categories (id, name, description) VALUES (?, ?, ?)",
+                         [(category_id, name, f'{name} and accessories') for category_id, name, _ in category_rows])
+        batch = []
+        for product_id in range(1, products + 1):
+            category_id = rng.choices(leaves, cum_weights=cumulative)[0]
+            noun = rng.choice(NOUNS)
+            batch.append((
+                product_id,
+                f'{rng.choice(BRANDS)} {rng.choice(ADJECTIVES)} {noun} {rng.choice("KMRSTX")}-{model_code(product_id)}',
+                f'{noun.lower()} ' + ' '.join(rng.choice(DESCRIPTION_WORDS) for _ in range(rng.randint(6, 14))),
+                _price(rng, medians[category_id]),
+                _stock(rng),
+                category_id,
+            ))
+            if len(batch) == BATCH_SIZE:
+                conn.executemany("INSERT INTO products VALUES (?, ?, ?, ?, ?, ?)", batch)
+                batch = []
+        if batch:
+            conn.executemany("INSERT INTO products VALUES (?, ?, ?, ?, ?, ?)", batch)
+        conn.commit()
+    finally:
+        conn.close()
+    return {category_id: parent for category_id, _, parent in category_rows if parent is not None}
+
+
+def migrate_catalog(path: str, parents: Dict[int, int], products: int, seed: int):
+    """
+    Bring the file to the current schema, then add what the baseline schema
+    cannot hold: the category tree and reorder points
+    """
+    from src.database.db_connection import Base, sqlite_pragma_listener
+    from src.database.migrations import migrate
+    from src.models import (category, product, stock_alert, stock_movement,  # noqa: F401
+                            stock_reservation, warehouse)
+    from src.services.category_tree import rebuild_closure
+    from src.services.stock_alerts import rebuild_alerts
+
+    rng = random.Random(seed + 1)
+    engine = create_engine(f'sqlite:///{path}')
+    event.listen(engine, 'connect', sqlite_pragma_listener({'journal_mode': 'WAL', 'synchronous': 'OFF'}))
+    try:
+        Base.metadata.create_all(engine)
+        migrate(engine)
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE categories SET parent_id = :parent WHERE id = :id"),
+                         [{'id': category_id, 'parent': parent} for category_id, parent in parents.items()])
+            rebuild_closure(conn)
+            conn.execute(text("UPDATE categories SET reorder_point = :point, reorder_quantity = :quantity "
+                              "WHERE id = :id"),
+                         [{'id': category_id, 'point': point, 'quantity': point * 4}
+                          for category_id in parents if rng.random() < 0.6
+                          for point in [rng.randint(3, 12)]])
+            conn.execute(text("UPDATE products SET reorder_point = :point WHERE id = :id"),
+                         [{'id': product_id, 'point': rng.randint(2, 20)}
+                          for product_id in rng.sample(range(1, products + 1), products // 10)])
+            rebuild_alerts(conn)
+            conn.execute(text("ANALYZE"))
+    finally:
+        engine.dispose()
+
+
+def generate_catalog(path: str, products: int, categories: int = 200, seed: int = 42) -> CatalogSummary:
+    """Write a migrated synthetic catalog to a new SQLite file at `path`"""
+    if os.path.exists(path):
+        raise ValueError(f"{path} already exists")
+    categories = max(1, min(categories, products or 1))
+    started = time.perf_counter()
+    parents = write_baseline(path, products, categories, seed)
+    generated = time.perf_counter()
+    migrate_catalog(path, parents, products, seed)
+    migrated = time.perf_counter()
+    with sqlite3.connect(path) as conn:
+        out_of_stock = conn.execute("SELECT COUNT(*) FROM products WHERE stock_quantity = 0").fetchone()[0]
+    return CatalogSummary(products, categories, categories - len(parents), out_of_stock,
+                          generated - started, migrated - generated)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--categories', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', required=True, help="SQLite file to create")
+    args = parser.parse_args()
+
+    summary = generate_catalog(args.out, args.products, args.categories, args.seed)
+    print(f"{summary.products:,} products in {summary.categories:,} categories "
+          f"({summary.departments} departments), {summary.out_of_stock:,} out of stock")
+    print(f"generated in {summary.generate_s:.1f}s, migrated in {summary.migrate_s:.1f}s -> {args.out}")
+
+
+if __name__ == '__main__':
+    main()
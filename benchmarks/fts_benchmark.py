@@ -0,0 +1,67 @@
+# benchmarks/fts_benchmark.py
+"""
+Compare AdvancedProductSearch's LIKE path with the FTS5 index.
+
+LIKE '%term%' always scans; it only looks fast for very common terms
+because LIMIT stops the scan early (and it can't rank). FTS5 cost grows
+with the number of matches it has to rank instead.
+
+    python -m benchmarks.fts_benchmark --rows 1000000
+"""
+import argparse
+import os
+from sqlalchemy import create_engine, text
+from benchmarks.common import load_baseline_catalog, measure, temp_database_path
+from src.database.migrations import migrate
+from src.services.full_text_search import build_match_query
+
+# (label, user query, equivalent LIKE pattern)
+SEARCHES = [
+    ('rare term', '4242', '%4242%'),
+    ('rare prefix', 'xenon yoke 99*', None),
+    ('common word', 'valve', '%valve%'),
+    ('prefix', 'quar*', '%quar%'),
+    ('two words', 'wireless pump', None),
+    ('phrase', '"heavy duty"', '%heavy duty%'),
+]
+
+LIKE_SQL = ("SELECT id FROM products WHERE name LIKE :pattern OR description LIKE :pattern "
+            "ORDER BY id LIMIT 50")
+FTS_SQL = ("SELECT rowid FROM products_fts WHERE products_fts MATCH :query "
+           "ORDER BY bm25(products_fts, 10.0, 1.0) LIMIT 50")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    path = temp_database_path()
+    try:
+        print(f"Loading {args.rows:,} products into {path} ...")
+        load_baseline_catalog(path, args.rows)
+        engine = create_engine(f'sqlite:///{path}')
+        migrate(engine)
+        with engine.connect() as conn:
+            for label, user_query, pattern in SEARCHES:
+                match = build_match_query(user_query)
+                fts = measure(lambda: conn.execute(text(FTS_SQL), {'query': match}).fetchall(),
+                              repeat=args.repeat)
+                print(f"\n{label}: {user_query!r}  ->  MATCH {match}")
+                print(f"  fts5 + bm25: {fts['median_ms']:9.3f} ms")
+                if pattern is None:
+                    print("  like:        n/a (no single-pattern equivalent)")
+                    continue
+                like = measure(lambda: conn.execute(text(LIKE_SQL), {'pattern': pattern}).fetchall(),
+                               repeat=args.repeat)
+                print(f"  like:        {like['median_ms']:9.3f} ms  (unranked, stops after 50 hits)")
+        engine.dispose()
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# benchmarks/index_benchmark.py
+"""
+Query plans and latencies for the hot product queries, before and after
+the index migration.
+
+    python -m benchmarks.index_benchmark --rows 1000000
+"""
+import argparse
+import json
+import os
+from sqlalchemy import create_engine, text
+from benchmarks.common import load_baseline_catalog, measure, temp_database_path
+from src.database.migrations import migrate
+
+QUERIES = {
+    'find_product_by_name': ("SELECT * FROM products WHERE name = :name LIMIT 1",
+                             {'name': 'Bolt Cable 4242'}),
+    'get_products_by_category': ("SELECT * FROM products WHERE category_id = :category_id",
+                                 {'category_id': 7}),
+    'get_low_stock_products': ("SELECT * FROM products WHERE stock_quantity <= :threshold",
+                               {'threshold': 10}),
+    'search_category_price': ("SELECT * FROM products WHERE category_id = :category_id "
+                              "AND price BETWEEN :min_price AND :max_price",
+                              {'category_id': 7, 'min_price': 10, 'max_price': 20}),
+    'search_price_range': ("SELECT * FROM products WHERE price BETWEEN :min_price AND :max_price",
+                           {'min_price': 500, 'max_price': 600}),
+    'search_stock_range': ("SELECT * FROM products WHERE stock_quantity BETWEEN :min_stock AND :max_stock",
+                           {'min_stock': 100, 'max_stock': 102}),
+}
+
+
+def run_queries(engine, repeat: int):
+    results = {}
+    with engine.connect() as conn:
+        for label, (sql, params) in QUERIES.items():
+            plan = [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params)]
+            stats = measure(lambda: conn.execute(text(sql), params).fetchall(), repeat=repeat)
+            results[label] = {'plan': plan, **stats}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args()
+
+    path = temp_database_path()
+    try:
+        print(f"Loading {args.rows:,} products into {path} ...")
+        load_baseline_catalog(path, args.rows)
+        engine = create_engine(f'sqlite:///{path}')
+        before = run_queries(engine, args.repeat)
+        migrate(engine)
+        after = run_queries(engine, args.repeat)
+        engine.dispose()
+
+        for label in QUERIES:
+            print(f"\n{label}")
+            print(f"  before: {before[label]['median_ms']:9.3f} ms  {' | '.join(before[label]['plan'])}")
+            print(f"  after:  {after[label]['median_ms']:9.3f} ms  {' | '.join(after[label]['plan'])}")
+            speedup = before[label]['median_ms'] / max(after[label]['median_ms'], 1e-9)
+            print(f"  speedup: {speedup:.1f}x")
+
+        if args.json:
+            with open(args.json, 'w') as handle:
+                json.dump({'rows': args.rows, 'before': before, 'after': after}, handle, indent=2)
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+if __name__ == '__main__':
+    main()
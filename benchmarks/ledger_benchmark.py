@@ -0,0 +1,109 @@
+# benchmarks/ledger_benchmark.py
+"""
+Stock ledger write throughput and "as of" latency with and without a
+recent snapshot.
+
+    python -m benchmarks.ledger_benchmark --products 100000 --movements 5000000
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+from benchmarks.common import load_baseline_catalog, measure, temp_database_path
+
+
+def load_movements(path: str, products: int, movements: int, start: datetime, seed: int = 7):
+    """
+    Append random movements straight through sqlite3, one second apart
+    """
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA synchronous=OFF")
+        batch = []
+        for offset in range(movements):
+            batch.append((rng.randint(1, products), rng.randint(-5, 5) or 1, 'adjustment', None,
+                          (start + timedelta(seconds=offset)).isoformat(sep=' ')))
+            if len(batch) == 100000:
+                conn.executemany("INSERT INTO stock_movements (product_id, quantity_change, reason, "
+                                 "actor, created_at) VALUES (?, ?, ?, ?, ?)", batch)
+                batch = []
+        if batch:
+            conn.executemany("INSERT INTO stock_movements (product_id, quantity_change, reason, "
+                             "actor, created_at) VALUES (?, ?, ?, ?, ?)", batch)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--movements', type=int, default=1000000)
+    parser.add_argument('--batch', type=int, default=1000, help="Movements per record_movements call")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args()
+
+    path = temp_database_path()
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    # Imported late so the connection singleton picks up DATABASE_URL
+    from src.database.db_connection import DatabaseConnection
+    from src.services.stock_ledger import StockLedgerService, record_movements
+
+    try:
+        print(f"Loading {args.products:,} products into {path} ...")
+        load_baseline_catalog(path, args.products)
+        db = DatabaseConnection()
+        db.create_tables()
+        ledger = StockLedgerService()
+
+        start = datetime.now(timezone.utc).replace(tzinfo=None)
+        print(f"Appending {args.movements:,} movements ...")
+        load_movements(path, args.products, args.movements, start)
+        end = start + timedelta(seconds=args.movements)
+        late = end - timedelta(seconds=10)
+        product_id = args.products // 2
+
+        rng = random.Random(1)
+        batches = [[(rng.randint(1, args.products), 1) for _ in range(args.batch)] for _ in range(20)]
+        started = time.perf_counter()
+        for batch in batches:
+            with db.engine.begin() as conn:
+                record_movements(conn, batch)
+        write_rate = len(batches) * args.batch / (time.perf_counter() - started)
+
+        results = {'record_movements_per_second': write_rate}
+        results['as_of_one_product_baseline_only'] = measure(
+            lambda: ledger.stock_as_of(product_id, late), repeat=args.repeat)
+        started = time.perf_counter()
+        ledger.take_snapshot()
+        results['take_snapshot_ms'] = (time.perf_counter() - started) * 1000
+        # The new snapshot is later than `late`, so query just after it instead
+        after_snapshot = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=1)
+        results['as_of_one_product_recent_snapshot'] = measure(
+            lambda: ledger.stock_as_of(product_id, after_snapshot), repeat=args.repeat)
+        results['as_of_catalog_recent_snapshot'] = measure(
+            lambda: ledger.stock_levels_as_of(after_snapshot), repeat=max(3, args.repeat // 5))
+        db.engine.dispose()
+
+        print(f"\nrecord_movements: {write_rate:,.0f} movements/s (batches of {args.batch:,})")
+        print(f"take_snapshot: {results['take_snapshot_ms']:.1f} ms")
+        for label in ('as_of_one_product_baseline_only', 'as_of_one_product_recent_snapshot',
+                      'as_of_catalog_recent_snapshot'):
+            print(f"{label}: {results[label]['median_ms']:.3f} ms median, {results[label]['p95_ms']:.3f} ms p95")
+
+        if args.json:
+            with open(args.json, 'w') as handle:
+                json.dump({'products': args.products, 'movements': args.movements, **results}, handle, indent=2)
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+if __name__ == '__main__':
+    main()
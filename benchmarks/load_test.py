@@ -0,0 +1,184 @@
+# benchmarks/load_test.py
+"""
+HTTP load test comparing the sync Flask app with the async ASGI app.
+
+Start both servers yourself and pass their base URLs, or let the script
+spawn them against the current DATABASE_URL with --spawn:
+
+    python -m benchmarks.load_test --spawn --concurrency 1 8 32 128
+    python -m benchmarks.load_test --sync-url http://127.0.0.1:5000 \\
+        --async-url http://127.0.0.1:8000 --path "/api/products/search?q=bolt&limit=20"
+
+Reports requests/s and p50/p99 latency for every concurrency level.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class HttpClient:
+    """Minimal keep-alive HTTP/1.1 GET client on asyncio streams"""
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def get(self, path: str) -> int:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(f"GET {path} HTTP/1.1\r\nHost: {self.host}\r\n\r\n".encode())
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            await self.close()
+            raise ConnectionError("Server closed the connection")
+        version, status = status_line.split()[:2]
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            key, _, value = line.decode('latin-1').partition(':')
+            headers[key.strip().lower()] = value.strip()
+
+        if 'content-length' in headers:
+            await self.reader.readexactly(int(headers['content-length']))
+        else:
+            await self.reader.read()
+            headers['connection'] = 'close'
+        if headers.get('connection', '').lower() == 'close' or version == b'HTTP/1.0':
+            await self.close()
+        return int(status)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+        self.reader = self.writer = None
+
+
+async def run_level(base_url: str, path: str, concurrency: int, duration: float) -> Dict[str, float]:
+    parts = urlsplit(base_url)
+    deadline = time.perf_counter() + duration
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        client = HttpClient(parts.hostname, parts.port or 80)
+        try:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    status = await client.get(path)
+                except (ConnectionError, OSError, asyncio.IncompleteReadError):
+                    errors += 1
+                    await client.close()
+                    continue
+                if status >= 500:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+        finally:
+            await client.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    def percentile(fraction: float) -> float:
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000
+
+    return {
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': errors,
+        'requests_per_second': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(0.50),
+        'p99_ms': percentile(0.99),
+    }
+
+
+async def wait_for_port(host: str, port: int, timeout: float = 20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server on {host}:{port} did not start")
+
+
+def spawn_servers(sync_port: int, async_port: int) -> List[subprocess.Popen]:
+    quiet = {'stdout': subprocess.DEVNULL, 'stderr': subprocess.DEVNULL, 'cwd': ROOT}
+    subprocess.run([sys.executable, 'run.py', 'migrate'], check=True, **quiet)
+    return [
+        subprocess.Popen([sys.executable, '-m', 'flask', '--app', 'app', 'run',
+                          '--port', str(sync_port), '--no-reload', '--with-threads'], **quiet),
+        subprocess.Popen([sys.executable, '-m', 'uvicorn', 'asgi_app:app',
+                          '--port', str(async_port), '--no-access-log', '--log-level', 'warning'], **quiet),
+    ]
+
+
+async def main_async(args) -> List[Tuple[str, Dict[str, float]]]:
+    targets = [('sync (Flask/WSGI)', args.sync_url), ('async (Quart/ASGI)', args.async_url)]
+    for _, url in targets:
+        parts = urlsplit(url)
+        await wait_for_port(parts.hostname, parts.port or 80)
+
+    results = []
+    for label, url in targets:
+        print(f"\n{label}  {url}{args.path}")
+        print(f"  {'conc':>5} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+        for concurrency in args.concurrency:
+            stats = await run_level(url, args.path, concurrency, args.duration)
+            results.append((label, stats))
+            print(f"  {concurrency:>5} {stats['requests_per_second']:>10.1f} {stats['p50_ms']:>9.2f} "
+                  f"{stats['p99_ms']:>9.2f} {stats['errors']:>7}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sync-url', default='http://127.0.0.1:5001')
+    parser.add_argument('--async-url', default='http://127.0.0.1:8001')
+    parser.add_argument('--path', default='/api/products/search?min_price=10&max_price=50&limit=20')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 128])
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds per concurrency level")
+    parser.add_argument('--spawn', action='store_true', help="Start both servers on the default ports")
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args()
+
+    servers = []
+    if args.spawn:
+        servers = spawn_servers(urlsplit(args.sync_url).port, urlsplit(args.async_url).port)
+    try:
+        results = asyncio.run(main_async(args))
+    finally:
+        for server in servers:
+            server.terminate()
+            server.wait()
+    if args.json:
+        with open(args.json, 'w') as handle:
+            json.dump([{'app': label, **stats} for label, stats in results], handle, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+# benchmarks/logging_benchmark.py
+"""
+Request latency with the previous synchronous logger setup (a
+RotatingFileHandler and a console handler on the request thread) against
+the queue-based JSON pipeline in src.utils.logger.
+
+Each setup runs in a fresh process with a small Flask app whose route logs
+--info and --debug records per request. Console output goes to /dev/null
+in both setups so the terminal does not skew the numbers. --fsync makes
+the file handler sync every record, standing in for a slow or network disk.
+--sample-every 1 turns debug sampling off so both setups write every record.
+
+    python -m benchmarks.logging_benchmark --requests 2000 --info 5 --debug 20
+    python -m benchmarks.logging_benchmark --fsync
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+from logging.handlers import RotatingFileHandler
+from benchmarks.common import measure
+
+
+def legacy_logger(name: str, log_dir: str) -> logging.Logger:
+    """setup_logger as it was: synchronous file and console handlers on the logger itself"""
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.DEBUG)
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.INFO)
+    console_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s: %(message)s'))
+    file_handler = RotatingFileHandler(os.path.join(log_dir, f'{name}.log'), maxBytes=10 * 1024 * 1024,
+                                       backupCount=5)
+    file_handler.setLevel(logging.DEBUG)
+    file_handler.setFormatter(logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s'))
+    logger.addHandler(console_handler)
+    logger.addHandler(file_handler)
+    return logger
+
+
+def sync_every_record(handler: logging.Handler):
+    flush = handler.flush
+
+    def flush_and_sync():
+        flush()
+        if getattr(handler, 'stream', None) is not None:
+            os.fsync(handler.stream.fileno())
+    handler.flush = flush_and_sync
+
+
+def run_setup(setup: str, requests: int, info: int, debug: int, fsync: bool, sample_every: int) -> dict:
+    sys.stderr = open(os.devnull, 'w')
+    log_dir = tempfile.mkdtemp(prefix='inventory-logs-')
+    os.environ.update(LOG_DIR=log_dir, LOG_LEVEL='DEBUG', LOG_DEBUG_SAMPLE_EVERY=str(sample_every))
+    from flask import Flask
+    from src.utils.logger import get_log_pipeline, init_request_logging, setup_logger
+
+    if setup == 'legacy':
+        logger = legacy_logger('bench', log_dir)
+        file_handlers = [handler for handler in logger.handlers if isinstance(handler, RotatingFileHandler)]
+        pipeline = None
+    else:
+        logger = setup_logger('bench', log_dir)
+        pipeline = get_log_pipeline()
+        file_handlers = [handler for handler in pipeline.listener.handlers
+                         if isinstance(handler, RotatingFileHandler)]
+    if fsync:
+        for handler in file_handlers:
+            sync_every_record(handler)
+
+    app = Flask(__name__)
+    init_request_logging(app)
+
+    @app.route('/products/<int:product_id>')
+    def product(product_id: int):
+        for index in range(info):
+            logger.info("Looked up product %d (step %d)", product_id, index)
+        for index in range(debug):
+            logger.debug("Cache probe for product %d (step %d)", product_id, index)
+        return {'id': product_id}
+
+    client = app.test_client()
+    counter = iter(range(10 ** 9))
+    stats = measure(lambda: client.get(f'/products/{next(counter)}'), repeat=requests)
+    dropped = 0
+    if pipeline is not None:
+        pipeline.stop()
+        dropped = pipeline.handler.dropped
+    for handler in file_handlers:
+        handler.flush()
+    lines = 0
+    for filename in os.listdir(log_dir):
+        with open(os.path.join(log_dir, filename)) as handle:
+            lines += sum(1 for _ in handle)
+    return {**stats, 'lines': lines, 'dropped': dropped}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--info', type=int, default=5, help="INFO records per request")
+    parser.add_argument('--debug', type=int, default=20, help="DEBUG records per request")
+    parser.add_argument('--fsync', action='store_true', help="Sync the log file after every record")
+    parser.add_argument('--sample-every', type=int, default=10, help="Keep one in N debug records (queue setup)")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context('spawn')
+    print(f"{args.requests:,} requests, {args.info} info + {args.debug} debug records each"
+          f"{', fsync per record' if args.fsync else ''}")
+    results = {}
+    for setup in ('legacy', 'queue'):
+        with context.Pool(1) as pool:
+            results[setup] = pool.apply(run_setup, (setup, args.requests, args.info, args.debug, args.fsync,
+                                                       args.sample_every))
+        result = results[setup]
+        print(f"  {setup:<7} median {result['median_ms']:7.3f} ms  p95 {result['p95_ms']:7.3f} ms  "
+              f"({result['lines']:,} lines written, {result['dropped']:,} dropped)")
+    legacy, queued = results['legacy'], results['queue']
+    print(f"  median latency {queued['median_ms'] / legacy['median_ms']:.2f}x, "
+          f"p95 {queued['p95_ms'] / legacy['p95_ms']:.2f}x of the synchronous setup")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+# benchmarks/metrics_overhead.py
+"""
+Hot-path cost of src.utils.metrics: per-thread counters and histograms
+against a lock-protected counter, timed service methods against plain
+ones, and throughput with several threads writing the same series.
+
+    python -m benchmarks.metrics_overhead --iterations 200000 --threads 8
+"""
+import argparse
+import threading
+import time
+from typing import Callable, Dict
+from src.utils.metrics import MetricsRegistry, timed_methods
+
+
+class LockedCounter:
+    """What a metric costs with one lock shared by every writer"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class Service:
+    def lookup(self, product_id: int) -> int:
+        return product_id
+
+
+@timed_methods('BenchmarkService')
+class TimedService(Service):
+    def lookup(self, product_id: int) -> int:
+        return product_id
+
+
+def per_call_ns(operation: Callable[[], object], iterations: int, rounds: int = 5) -> float:
+    """Best-of-`rounds` nanoseconds per call"""
+    best = float('inf')
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            operation()
+        best = min(best, time.perf_counter() - started)
+    return best / iterations * 1e9
+
+
+def threaded_ops_per_second(operation: Callable[[], object], threads: int, iterations: int) -> float:
+    def work():
+        for _ in range(iterations):
+            operation()
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return threads * iterations / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=200000)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    registry = MetricsRegistry()
+    counter = registry.counter('bench_events_total', "Events")
+    labelled = registry.counter('bench_labelled_total', "Events", ('route',))
+    histogram = registry.histogram('bench_latency_seconds', "Latency")
+    locked = LockedCounter()
+    plain, timed = Service(), TimedService()
+    series = labelled.labels('/products')
+
+    single: Dict[str, Callable[[], object]] = {
+        'empty call': lambda: None,
+        'locked counter inc': locked.inc,
+        'counter inc': counter.inc,
+        'labelled counter inc (child kept)': series.inc,
+        'labelled counter inc (labels lookup)': lambda: labelled.labels('/products').inc(),
+        'histogram observe': lambda: histogram.observe(0.003),
+        'plain service method': lambda: plain.lookup(7),
+        'timed service method': lambda: timed.lookup(7),
+    }
+    print(f"Single thread, best of 5 x {args.iterations:,} calls")
+    width = max(len(name) for name in single)
+    for name, operation in single.items():
+        print(f"  {name:<{width}}  {per_call_ns(operation, args.iterations):8.1f} ns/call")
+    overhead = per_call_ns(single['timed service method'], args.iterations) - \
+        per_call_ns(single['plain service method'], args.iterations)
+    print(f"  timing overhead per service call: {overhead:.0f} ns")
+
+    per_thread = args.iterations // args.threads
+    print(f"\n{args.threads} threads on one series, {per_thread:,} calls each")
+    for name, operation in (('locked counter inc', locked.inc), ('counter inc', counter.inc),
+                            ('histogram observe', lambda: histogram.observe(0.003))):
+        rate = threaded_ops_per_second(operation, args.threads, per_thread)
+        print(f"  {name:<{width}}  {rate / 1e6:8.2f} M ops/s")
+
+    # Every write must be accounted for once the writer threads are gone
+    expected = args.iterations * 5 + args.threads * per_thread
+    rendered = registry.render()
+    total = counter.labels().value()
+    status = 'OK' if total == expected else f'MISMATCH (expected {expected:,.0f})'
+    print(f"\ncounter total after all threads exited: {total:,.0f} {status}; scrape is {len(rendered):,} bytes")
+    raise SystemExit(0 if total == expected else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,277 @@
+# benchmarks/service_benchmark.py
+"""
+Service-layer benchmark suite: times ProductService, AdvancedProductSearch
+and DatabaseConnection paths on synthetic catalogs (see benchmarks.datagen)
+of several sizes, and compares the run with a stored baseline.
+
+    python -m benchmarks.service_benchmark --sizes 10000 100000 1000000 --json run.json
+    python -m benchmarks.service_benchmark --sizes 10000 100000 \\
+        --baseline benchmarks/baselines/service_benchmark.json --threshold 0.3
+
+Every size runs in a fresh process against its own copy of the catalog,
+with the product cache off so lookups measure the database path
+(--cache keeps the configured cache). Catalogs are regenerated each run
+unless --data-dir keeps them between runs. With --baseline, an operation
+regresses when its median is more than --threshold slower than the
+baseline's (--statistic min_ms compares best cases instead) and also
+slower by at least --min-delta-ms; any regression makes the script exit
+with status 1. Baselines are machine-specific:
+record one with --json on the machine that will compare against it.
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from benchmarks.common import measure, temp_database_path
+from benchmarks.datagen import generate_catalog, model_code
+
+SEARCH_FILTERS = ('name', 'min_price', 'max_price', 'category_id')
+
+
+def copy_database(source: str, target: str):
+    source_conn, target_conn = sqlite3.connect(source), sqlite3.connect(target)
+    try:
+        source_conn.backup(target_conn)
+    finally:
+        source_conn.close()
+        target_conn.close()
+
+
+def prepare_catalog(size: int, categories: int, seed: int, data_dir: Optional[str]) -> Tuple[str, float]:
+    """A private copy of the catalog for one run, and the seconds spent generating it"""
+    path = temp_database_path('inventory-service-bench-')
+    if not data_dir:
+        started = time.perf_counter()
+        generate_catalog(path, size, categories, seed)
+        return path, time.perf_counter() - started
+    os.makedirs(data_dir, exist_ok=True)
+    cached = os.path.join(data_dir, f'catalog-{size}-{categories}-{seed}.db')
+    started = time.perf_counter()
+    if not os.path.exists(cached):
+        generate_catalog(cached + '.tmp', size, categories, seed)
+        for suffix in ('-wal', '-shm'):
+            if os.path.exists(cached + '.tmp' + suffix):
+                os.remove(cached + '.tmp' + suffix)
+        os.replace(cached + '.tmp', cached)
+    copy_database(cached, path)
+    return path, time.perf_counter() - started
+
+
+def service_operations(seed: int) -> Dict[str, Callable[[], object]]:
+    """Name -> zero-argument callable for every timed operation"""
+    from sqlalchemy import func, select
+    from src.database.db_connection import DatabaseConnection
+    from src.models.product import Product
+    from src.services.product_service import AdvancedProductSearch, ProductService
+    from src.utils.pagination import encode_cursor
+
+    rng = random.Random(seed)
+    db = DatabaseConnection()
+    products, search = ProductService(), AdvancedProductSearch()
+    with db.engine.connect() as conn:
+        max_id = conn.scalar(select(func.max(Product.id)))
+        names = list(conn.execute(select(Product.name).where(
+            Product.id.in_([rng.randint(1, max_id) for _ in range(500)]))).scalars())
+        # A mid-sized category, so category filters are neither trivial nor the whole catalog
+        sizes = conn.execute(select(Product.category_id, func.count())
+                             .group_by(Product.category_id).order_by(func.count().desc())).all()
+        category_id = sizes[len(sizes) // 4][0]
+        first_category = sizes[0][0]
+    counter = itertools.count()
+    filter_values = {'name': 'Drill', 'min_price': 10.0, 'max_price': 50.0, 'category_id': category_id}
+
+    def create_product():
+        number = next(counter)
+        products.create_product(f'Benchmark Item {model_code(number)}', 9.99, first_category, stock_quantity=10)
+
+    def bulk_create():
+        start = next(counter) * 1000
+        products.bulk_create_products([
+            {'name': f'Benchmark Bulk {model_code(start + index)}', 'price': 4.99, 'category_id': first_category,
+             'stock_quantity': 5} for index in range(100)])
+
+    def update_stock():
+        products.update_stock(rng.randint(1, max_id), 1)
+
+    def apply_movements():
+        products.apply_stock_movements([(rng.randint(1, max_id), rng.choice((-1, 1, 2))) for _ in range(50)])
+
+    operations: Dict[str, Callable[[], object]] = {
+        'create_product': create_product,
+        'bulk_create_100': bulk_create,
+        'lookup_by_id': lambda: products.find_product_by_id(rng.randint(1, max_id)),
+        'lookup_by_name': lambda: products.find_product_by_name(rng.choice(names)),
+        'list_first_page': lambda: products.get_products_page(None, 50),
+        'list_middle_page': lambda: products.get_products_page(encode_cursor(max_id // 2), 50),
+        'low_stock_alerts_top20': lambda: search.get_products_low_in_stock(limit=20),
+        'low_stock_threshold_top20': lambda: search.get_products_low_in_stock(threshold=3, limit=20),
+        'low_stock_all': lambda: products.get_low_stock_products(),
+        'update_stock': update_stock,
+        'apply_stock_movements_50': apply_movements,
+        'search_fulltext': lambda: search.search_products_page(q='cordless drill', page_size=50),
+        'search_fulltext+category_id': lambda: search.search_products_page(
+            q='cordless drill', category_id=category_id, page_size=50),
+    }
+    # Every combination of the classic filters, including none at all
+    for count in range(len(SEARCH_FILTERS) + 1):
+        for combination in itertools.combinations(SEARCH_FILTERS, count):
+            arguments = {key: filter_values[key] for key in combination}
+            label = 'search_' + ('+'.join(combination) or 'unfiltered')
+            operations[label] = (lambda arguments=arguments:
+                                 search.search_products_page(page_size=50, **arguments))
+    return operations
+
+
+def run_size(size: int, categories: int, seed: int, repeat: int, rounds: int, data_dir: Optional[str],
+             use_cache: bool, only: Optional[List[str]]) -> dict:
+    """
+    Benchmark one catalog size; runs in its own process. Operations are
+    timed in `rounds` interleaved passes and each statistic is the median
+    over the passes, which damps drift from other load on the machine.
+    """
+    path, setup_s = prepare_catalog(size, categories, seed, data_dir)
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    os.environ['RESERVATION_SWEEP_INTERVAL'] = '0'
+    if not use_cache:
+        os.environ['CACHE_BACKEND'] = 'none'
+    # Imported late so the connection singleton picks up DATABASE_URL
+    from src.database.db_connection import DatabaseConnection
+    try:
+        db = DatabaseConnection()
+        db.create_tables()
+        operations = {name: operation for name, operation in service_operations(seed).items()
+                      if not only or any(pattern in name for pattern in only)}
+        passes: Dict[str, List[dict]] = {name: [] for name in operations}
+        for _ in range(rounds):
+            for name, operation in operations.items():
+                passes[name].append(measure(operation, repeat=repeat))
+        db.engine.dispose()
+        results = {name: {'median_ms': statistics.median(item['median_ms'] for item in samples),
+                          'p95_ms': statistics.median(item['p95_ms'] for item in samples),
+                          'min_ms': min(item['min_ms'] for item in samples)}
+                   for name, samples in passes.items()}
+        return {'setup_s': setup_s, 'operations': results}
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                timeout=10).stdout.strip() or None
+    except OSError:
+        commit = None
+    import sqlalchemy
+    return {
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'sqlalchemy': sqlalchemy.__version__,
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float, min_delta_ms: float,
+            statistic: str = 'median_ms') -> List[dict]:
+    """One row per operation timed in both runs, flagged 'regression', 'improvement' or 'ok'"""
+    rows = []
+    for size, run in current['sizes'].items():
+        base_run = baseline.get('sizes', {}).get(size)
+        if not base_run:
+            continue
+        for name, stats in run['operations'].items():
+            base = base_run['operations'].get(name)
+            if not base:
+                continue
+            before, after = base[statistic], stats[statistic]
+            ratio = after / before if before else float('inf')
+            status = 'ok'
+            if ratio > 1 + threshold and after - before >= min_delta_ms:
+                status = 'regression'
+            elif ratio < 1 / (1 + threshold) and before - after >= min_delta_ms:
+                status = 'improvement'
+            rows.append({'size': int(size), 'operation': name, 'baseline_ms': before, 'current_ms': after,
+                         'ratio': ratio, 'status': status})
+    return rows
+
+
+def print_results(results: dict):
+    for size, run in results['sizes'].items():
+        print(f"\n{int(size):,} products (catalog ready in {run['setup_s']:.1f}s)")
+        width = max(len(name) for name in run['operations'])
+        for name, stats in run['operations'].items():
+            print(f"  {name:<{width}}  {stats['median_ms']:9.3f} ms median  {stats['p95_ms']:9.3f} ms p95")
+
+
+def print_comparison(rows: List[dict], threshold: float, statistic: str):
+    flagged = [row for row in rows if row['status'] != 'ok']
+    print(f"\nCompared {len(rows)} {statistic} timings with the baseline (threshold {threshold:.0%}):")
+    if not flagged:
+        print("  no significant changes")
+    for row in flagged:
+        print(f"  {row['status'].upper():<11} {row['size']:>9,} {row['operation']}: "
+              f"{row['baseline_ms']:.3f} -> {row['current_ms']:.3f} ms ({row['ratio']:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--categories', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=15, help="Timed calls per operation and round")
+    parser.add_argument('--rounds', type=int, default=3, help="Interleaved passes over all operations")
+    parser.add_argument('--only', nargs='+', help="Run operations whose name contains any of these")
+    parser.add_argument('--cache', action='store_true', help="Keep the configured product cache on")
+    parser.add_argument('--data-dir', help="Keep generated catalogs here and reuse them")
+    parser.add_argument('--json', help="Write the results to this file (use it as a baseline later)")
+    parser.add_argument('--baseline', help="Compare with the results in this file")
+    parser.add_argument('--statistic', choices=('median_ms', 'min_ms'), default='median_ms',
+                        help="Timing compared with the baseline")
+    parser.add_argument('--threshold', type=float, default=0.3,
+                        help="Relative slowdown that counts as a regression")
+    parser.add_argument('--min-delta-ms', type=float, default=0.1,
+                        help="Ignore differences smaller than this many milliseconds")
+    args = parser.parse_args()
+
+    results = {'environment': environment(), 'seed': args.seed, 'categories': args.categories,
+               'repeat': args.repeat, 'rounds': args.rounds, 'cache': args.cache, 'sizes': {}}
+    context = multiprocessing.get_context('spawn')
+    for size in args.sizes:
+        print(f"Benchmarking {size:,} products ...", flush=True)
+        with context.Pool(1) as pool:
+            results['sizes'][str(size)] = pool.apply(
+                run_size, (size, args.categories, args.seed, args.repeat, args.rounds, args.data_dir,
+                           args.cache, args.only))
+    print_results(results)
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        rows = compare(results, baseline, args.threshold, args.min_delta_ms, args.statistic)
+        results['comparison'] = {'baseline': args.baseline, 'statistic': args.statistic,
+                                 'threshold': args.threshold, 'rows': rows}
+        print_comparison(rows, args.threshold, args.statistic)
+        status = 1 if any(row['status'] == 'regression' for row in rows) else 0
+    if args.json:
+        with open(args.json, 'w') as handle:
+            json.dump(results, handle, indent=2)
+    sys.exit(status)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+# benchmarks/stock_stress.py
+"""
+Concurrency stress test for stock writes. Several processes, each running
+several threads, hammer a handful of hot products with stock updates,
+batch movements, transfers, reorder-point edits and reservations that are
+committed, released or left to expire. Afterwards the final stock must
+equal the initial stock plus every change a worker saw succeed, and no
+total, location or reserved count may be negative or out of step.
+
+    python -m benchmarks.stock_stress --processes 4 --threads 8 --operations 200
+    python -m benchmarks.stock_stress --database inventory.db   (works on a copy)
+
+Exits with status 1 if any check fails.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+from typing import List
+from benchmarks.common import load_baseline_catalog, temp_database_path
+
+SECOND_WAREHOUSE = 'STRESS'
+
+
+def run_thread(product_ids: List[int], warehouse_ids: List[int], operations: int, seed: int,
+               deltas: Counter, outcomes: Counter, lock: threading.Lock):
+    from src.services.concurrency import ConcurrentUpdateError
+    from src.services.product_service import ProductService
+    from src.services.reservations import ReservationService
+    from src.services.warehouses import WarehouseService
+
+    rng = random.Random(seed)
+    products, reservations, warehouses = ProductService(), ReservationService(), WarehouseService()
+    local_deltas: Counter = Counter()
+    local_outcomes: Counter = Counter()
+    for _ in range(operations):
+        product_id = rng.choice(product_ids)
+        action = rng.choice(('update', 'update', 'movements', 'reserve', 'transfer', 'reorder'))
+        try:
+            if action == 'update':
+                change = rng.randint(-6, 4)
+                products.update_stock(product_id, change, actor='stress', warehouse_id=rng.choice(warehouse_ids))
+                local_deltas[product_id] += change
+            elif action == 'movements':
+                batch = [(rng.choice(product_ids), rng.randint(-5, 3)) for _ in range(rng.randint(2, 6))]
+                for result in products.apply_stock_movements(batch, actor='stress',
+                                                             warehouse_id=rng.choice(warehouse_ids)):
+                    if result.applied:
+                        local_deltas[result.product_id] += result.quantity_change
+                    else:
+                        local_outcomes['movement_rejected'] += 1
+            elif action == 'reserve':
+                quantity = rng.randint(1, 5)
+                reservation = reservations.reserve(product_id, quantity, ttl_seconds=rng.choice((1, 60)),
+                                                   actor='stress')
+                ending = rng.choice(('commit', 'commit', 'release', 'expire'))
+                if ending == 'commit':
+                    try:
+                        reservations.commit(reservation.id)
+                        local_deltas[product_id] -= quantity
+                    except ValueError:
+                        # Expired, or its warehouse ran short; hand the units back
+                        local_outcomes['commit_failed'] += 1
+                        reservations.release(reservation.id)
+                elif ending == 'release':
+                    reservations.release(reservation.id)
+            elif action == 'transfer':
+                source, target = rng.sample(warehouse_ids, 2)
+                warehouses.transfer(product_id, source, target, rng.randint(1, 5), actor='stress')
+            else:
+                products.set_reorder_point(product_id, rng.randint(0, 20))
+            local_outcomes[f'{action}_ok'] += 1
+        except ConcurrentUpdateError:
+            local_outcomes['gave_up'] += 1
+        except ValueError:
+            local_outcomes[f'{action}_rejected'] += 1
+    with lock:
+        deltas.update(local_deltas)
+        outcomes.update(local_outcomes)
+
+
+def run_worker(database_url: str, product_ids: List[int], warehouse_ids: List[int], threads: int,
+               operations: int, seed: int, results):
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['RESERVATION_SWEEP_INTERVAL'] = '0'
+    deltas: Counter = Counter()
+    outcomes: Counter = Counter()
+    lock = threading.Lock()
+    workers = [threading.Thread(target=run_thread, args=(product_ids, warehouse_ids, operations,
+                                                        seed * 1000 + index, deltas, outcomes, lock))
+               for index in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    results.put((dict(deltas), dict(outcomes)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', help="Copy this SQLite file and stress the copy (default: a fresh catalog)")
+    parser.add_argument('--products', type=int, default=5, help="Hot products all workers fight over")
+    parser.add_argument('--initial-stock', type=int, default=200)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4, help="Threads per process")
+    parser.add_argument('--operations', type=int, default=100, help="Operations per thread")
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args()
+
+    path = temp_database_path('inventory-stress-')
+    if args.database:
+        source = sqlite3.connect(args.database)
+        target = sqlite3.connect(path)
+        try:
+            source.backup(target)
+        finally:
+            source.close()
+            target.close()
+    else:
+        load_baseline_catalog(path, max(args.products, 100), categories=5)
+    database_url = f'sqlite:///{path}'
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['RESERVATION_SWEEP_INTERVAL'] = '0'
+    # Imported late so the connection singleton picks up DATABASE_URL
+    from src.database.db_connection import DatabaseConnection
+    from src.models.product import Product
+    from src.models.stock_movement import utcnow
+    from src.services.product_service import ProductService
+    from src.services.reservations import ReservationService
+    from src.services.stock_ledger import StockLedgerService
+    from src.services.warehouses import DEFAULT_WAREHOUSE_CODE, WarehouseService, location_tables
+
+    try:
+        db = DatabaseConnection()
+        db.create_tables()
+        products, warehouses = ProductService(), WarehouseService()
+        with db.session_scope() as session:
+            product_ids = [row.id for row in session.query(Product.id).order_by(Product.id).limit(args.products)]
+        if len(product_ids) < args.products:
+            raise SystemExit(f"The database holds only {len(product_ids)} product(s)")
+        second = warehouses.find_warehouse(code=SECOND_WAREHOUSE) or \
+            warehouses.create_warehouse(SECOND_WAREHOUSE, 'Stress test warehouse')
+        for product_id in product_ids:
+            current = products.find_product_by_id(product_id)
+            products.update_stock(product_id, args.initial_stock - current.stock_quantity,
+                                  actor='stress-setup')
+        warehouse_ids = [warehouses.find_warehouse(code=DEFAULT_WAREHOUSE_CODE).id, second.id]
+        with db.session_scope() as session:
+            initial = dict(session.query(Product.id, Product.stock_quantity).filter(Product.id.in_(product_ids)))
+        db.engine.dispose()
+
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        processes = [context.Process(target=run_worker, args=(database_url, product_ids, warehouse_ids,
+                                                              args.threads, args.operations, index, results))
+                     for index in range(args.processes)]
+        started = time.perf_counter()
+        for process in processes:
+            process.start()
+        deltas: Counter = Counter()
+        outcomes: Counter = Counter()
+        for _ in processes:
+            process_deltas, process_outcomes = results.get()
+            deltas.update(process_deltas)
+            outcomes.update(process_outcomes)
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - started
+
+        # Let every reservation left behind lapse, as the sweeper eventually would
+        ReservationService().sweep(now=utcnow() + timedelta(days=1))
+
+        failures: List[str] = []
+        with db.session_scope() as session:
+            final = {row.id: (row.stock_quantity, row.reserved_quantity)
+                     for row in session.query(Product.id, Product.stock_quantity, Product.reserved_quantity)
+                     .filter(Product.id.in_(product_ids))}
+            negative_locations = sum(session.query(table).filter(table.c.quantity < 0).count()
+                                     for table in location_tables(session))
+        for product_id in product_ids:
+            expected = initial[product_id] + deltas.get(product_id, 0)
+            stock, reserved = final[product_id]
+            if stock != expected:
+                failures.append(f"product {product_id}: stock {stock}, expected {expected}")
+            if stock < 0 or reserved != 0:
+                failures.append(f"product {product_id}: stock {stock}, reserved {reserved}")
+        if negative_locations:
+            failures.append(f"{negative_locations} location row(s) below zero")
+        failures.extend(f"product {item.product_id}: total {item.stock_quantity}, "
+                        f"locations {item.location_total}" for item in warehouses.check_consistency())
+        failures.extend(f"product {item[0]}: reserved {item[1]}, open reservations {item[2]}"
+                        for item in ReservationService().check_consistency())
+        failures.extend(f"ledger: {item}" for item in StockLedgerService().check_consistency())
+        db.engine.dispose()
+
+        operations = args.processes * args.threads * args.operations
+        print(f"{operations:,} operations from {args.processes} process(es) x {args.threads} thread(s) "
+              f"on {len(product_ids)} product(s) in {elapsed:.1f}s ({operations / elapsed:,.0f} ops/s)")
+        for outcome, count in sorted(outcomes.items()):
+            print(f"  {outcome}: {count:,}")
+        for product_id in product_ids:
+            print(f"  product {product_id}: {initial[product_id]} -> {final[product_id][0]} "
+                  f"(net {deltas.get(product_id, 0):+d})")
+        print("FAILED:\n  " + "\n  ".join(failures) if failures else "OK: no lost updates, nothing negative")
+
+        if args.json:
+            with open(args.json, 'w') as handle:
+                json.dump({'operations': operations, 'elapsed_s': elapsed, 'outcomes': dict(outcomes),
+                           'failures': failures}, handle, indent=2)
+        raise SystemExit(1 if failures else 0)
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+if __name__ == '__main__':
+    main()
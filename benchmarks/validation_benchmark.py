@@ -0,0 +1,154 @@
+# benchmarks/validation_benchmark.py
+"""
+Rows per second through the previous per-row checks (InputValidator
+followed by the Product @validates rules, stopping at the first error)
+against PRODUCT_SCHEMA.validate_many, which reports every error of every
+row in one pass.
+
+Rows look like parsed CSV (all strings); --invalid-share of them carry one
+or two bad fields.
+
+    python -m benchmarks.validation_benchmark --rows 1000000 --invalid-share 0.05
+"""
+import argparse
+import random
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.utils.validators import PRODUCT_SCHEMA
+
+NAMES = ['Desk Lamp', 'Office Chair', 'Standing Desk', 'Cable Tray', 'Monitor Arm', 'Foot-Rest']
+BAD_FIELDS = [('name', 'X'), ('name', 'Lamp #2'), ('price', 'free'), ('price', '-4'),
+              ('stock_quantity', '2.5'), ('stock_quantity', '99999'), ('description', 'd' * 300)]
+
+
+class LegacyValidator:
+    """InputValidator as it was: the regular expression is looked up on every call"""
+    @staticmethod
+    def validate_name(name: str, min_length: int = 2, max_length: int = 100) -> str:
+        if not name:
+            raise ValueError("Name cannot be empty")
+        name = name.strip()
+        if len(name) < min_length:
+            raise ValueError(f"Name must be at least {min_length} characters long")
+        if len(name) > max_length:
+            raise ValueError(f"Name cannot exceed {max_length} characters")
+        if not re.match(r'^[A-Za-z\s\-]+$', name):
+            raise ValueError("Name can only contain letters, spaces, and hyphens")
+        return name
+
+    @staticmethod
+    def validate_price(price: Any, min_price: float = 0, max_price: float = 100000) -> float:
+        try:
+            price = float(price)
+        except (ValueError, TypeError):
+            raise ValueError("Price must be a valid number")
+        if price < min_price:
+            raise ValueError(f"Price cannot be negative. Minimum price is {min_price}")
+        if price > max_price:
+            raise ValueError(f"Price is too high. Maximum price is {max_price}")
+        return round(price, 2)
+
+    @staticmethod
+    def validate_stock_quantity(quantity: Any, min_quantity: int = 0, max_quantity: int = 10000) -> int:
+        try:
+            quantity = int(quantity)
+        except (ValueError, TypeError):
+            raise ValueError("Stock quantity must be a valid integer")
+        if quantity < min_quantity:
+            raise ValueError(f"Stock quantity cannot be negative. Minimum is {min_quantity}")
+        if quantity > max_quantity:
+            raise ValueError(f"Stock quantity too high. Maximum is {max_quantity}")
+        return quantity
+
+    @staticmethod
+    def validate_description(description: Optional[str], max_length: int = 255) -> Optional[str]:
+        if description is None:
+            return None
+        description = description.strip()
+        if len(description) > max_length:
+            raise ValueError(f"Description cannot exceed {max_length} characters")
+        return description or None
+
+
+def legacy_validate(row: Dict[str, Any]) -> Dict[str, Any]:
+    """The old ProductImporter.validate_row field checks, model rules included"""
+    name = LegacyValidator.validate_name(row.get('name') or '')
+    price = LegacyValidator.validate_price(row.get('price'))
+    stock_quantity = LegacyValidator.validate_stock_quantity(
+        row.get('stock_quantity') if row.get('stock_quantity') not in (None, '') else 0)
+    description = LegacyValidator.validate_description(row.get('description') or None)
+    # Product.validate_name / validate_price / validate_stock_quantity
+    if not name or len(name.strip()) == 0:
+        raise ValueError("Product name cannot be empty")
+    if len(name) > 100:
+        raise ValueError("Product name cannot exceed 100 characters")
+    if price < 0:
+        raise ValueError("Price cannot be negative")
+    if stock_quantity < 0:
+        raise ValueError("Stock quantity cannot be negative")
+    return {'name': name.strip(), 'description': description, 'price': price, 'stock_quantity': stock_quantity}
+
+
+def generate_rows(count: int, invalid_share: float, seed: int = 42) -> List[Dict[str, str]]:
+    rng = random.Random(seed)
+    rows = []
+    for index in range(count):
+        row = {'name': rng.choice(NAMES), 'price': f'{rng.uniform(1, 5000):.2f}',
+               'stock_quantity': str(rng.randint(0, 500)),
+               'description': '' if index % 3 else f'Catalog item {index}'}
+        if rng.random() < invalid_share:
+            for field, value in rng.sample(BAD_FIELDS, rng.randint(1, 2)):
+                row[field] = value
+        rows.append(row)
+    return rows
+
+
+def run_legacy(rows: List[Dict[str, str]]) -> Tuple[list, int]:
+    """Keeps the clean rows, as the importer does, so both paths allocate alike"""
+    valid, failed = [], 0
+    for index, row in enumerate(rows):
+        try:
+            valid.append((index, legacy_validate(row)))
+        except ValueError:
+            failed += 1
+    return valid, failed
+
+
+def timed(operation: Callable[[], Any]) -> Tuple[float, Any]:
+    started = time.perf_counter()
+    result = operation()
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--invalid-share', type=float, default=0.05)
+    parser.add_argument('--rounds', type=int, default=3, help="Best of this many passes per path")
+    args = parser.parse_args()
+
+    rows = generate_rows(args.rows, args.invalid_share)
+    print(f"{args.rows:,} rows, {args.invalid_share:.0%} with bad fields, best of {args.rounds}")
+    timings: Dict[str, List[float]] = {'legacy per-row checks': [], 'compiled schema batch': []}
+    for _ in range(args.rounds):
+        # Results are released between passes, outside the timed region
+        seconds, (_, legacy_failed) = timed(lambda: run_legacy(rows))
+        timings['legacy per-row checks'].append(seconds)
+        seconds, result = timed(lambda: PRODUCT_SCHEMA.validate_many(rows))
+        timings['compiled schema batch'].append(seconds)
+        rejected, reported = len(result.errors), sum(len(errors) for _, errors in result.errors)
+        del result
+
+    print(f"  legacy per-row checks  {legacy_failed:,} rows rejected, one error each")
+    print(f"  compiled schema batch  {rejected:,} rows rejected, {reported:,} field errors reported")
+    best = {path: min(seconds) for path, seconds in timings.items()}
+    for path, seconds in best.items():
+        print(f"  {path:<22} {seconds:7.2f} s  {args.rows / seconds / 1e6:6.2f} M rows/s")
+    print(f"  speed-up {best['legacy per-row checks'] / best['compiled schema batch']:.2f}x")
+    if legacy_failed != rejected:
+        raise SystemExit("The two paths disagree on which rows are invalid")
+
+
+if __name__ == '__main__':
+    main()
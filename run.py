@@ -1,12 +1,21 @@
 # run.py
+import sys
 from src.database.db_connection import DatabaseConnection
+from src.cli.commands import build_parser, run_command
 from src.cli.main_menu import InventoryManagementCLI
 
 def main():
-    # Initialize database
+    args = build_parser().parse_args()
+
+    # Initialize database (the migrate command manages this itself)
     db = DatabaseConnection()
-    db.create_tables()
-    
+    if args.command != 'migrate':
+        db.create_tables()
+
+    # One-shot commands (e.g. bulk import) skip the interactive menu
+    if args.command:
+        sys.exit(run_command(args))
+
     # Start CLI
     cli = InventoryManagementCLI()
     cli.display_main_menu()
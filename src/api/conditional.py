@@ -0,0 +1,80 @@
+# src/api/conditional.py
+# Conditional GET for catalog views. Each response carries an ETag built from
+# the catalog version counters, so a client revalidating an unchanged page gets
+# a bodiless 304 after one primary-key lookup instead of a query and a render.
+
+import os
+from email.utils import formatdate
+from functools import wraps
+from typing import Optional
+from flask import Response, make_response, request, session
+from src.database.db_connection import DatabaseConnection
+from src.services.cache import MISSING, get_cache
+from src.services.catalog_version import CATALOG_TABLES, CatalogStamp, read_catalog_stamp
+
+RESPONSE_CACHE_PREFIX = 'response:'
+
+
+def response_cache_enabled() -> bool:
+    return os.getenv('RESPONSE_CACHE', 'true').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def current_stamp(tables) -> Optional[CatalogStamp]:
+    with DatabaseConnection().session_scope() as db_session:
+        return read_catalog_stamp(db_session, tables)
+
+
+def not_modified(stamp: CatalogStamp) -> bool:
+    if request.if_none_match:
+        return request.if_none_match.contains(stamp.etag.strip('"'))
+    if request.if_modified_since:
+        # HTTP dates have one-second resolution
+        return int(stamp.last_modified) <= request.if_modified_since.timestamp()
+    return False
+
+
+def set_validators(response: Response, stamp: CatalogStamp) -> Response:
+    response.set_etag(stamp.etag.strip('"'))
+    response.headers['Last-Modified'] = formatdate(stamp.last_modified, usegmt=True)
+    # Caches may store the response but must revalidate before reusing it
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def conditional(*tables: str, cache_response: bool = True):
+    """
+    Make a GET view conditional on the given catalog tables (default: all).
+    Answers If-None-Match / If-Modified-Since with 304 and, when enabled,
+    serves repeat requests from a rendered-response cache keyed on the
+    catalog version plus the full path and query string.
+    """
+    tables = tables or CATALOG_TABLES
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # Pending flash messages are per user, so those pages are never shared
+            if request.method != 'GET' or session.get('_flashes'):
+                return view(*args, **kwargs)
+            stamp = current_stamp(tables)
+            if stamp is None:
+                return view(*args, **kwargs)
+            if not_modified(stamp):
+                return set_validators(Response(status=304), stamp)
+
+            use_cache = cache_response and response_cache_enabled()
+            key = f'{RESPONSE_CACHE_PREFIX}{stamp.etag}:{request.full_path}'
+            if use_cache:
+                cached = get_cache().get(key)
+                if cached is not MISSING:
+                    body, status, mimetype = cached
+                    return set_validators(Response(body, status=status, mimetype=mimetype), stamp)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            if use_cache and not response.is_streamed:
+                get_cache().set(key, (response.get_data(), response.status_code, response.mimetype))
+            return set_validators(response, stamp)
+        return wrapper
+    return decorator
@@ -0,0 +1,83 @@
+# src/api/metrics.py
+# Prometheus scrape endpoint. Request latency is recorded per route rule (not
+# per URL, which would create a series per product id); pool, cache and query
+# figures already kept elsewhere are read at scrape time.
+
+import time
+from typing import Iterable, List
+from flask import Blueprint, Response, g, request
+from src.database.db_connection import DatabaseConnection
+from src.services.cache import get_cache
+from src.utils.metrics import CONTENT_TYPE, REGISTRY, CollectedMetric
+
+metrics_api = Blueprint('metrics', __name__)
+
+HTTP_LATENCY = REGISTRY.histogram('inventory_http_request_duration_seconds',
+                                  "Time to handle a request, by route", ('method', 'route'))
+HTTP_REQUESTS = REGISTRY.counter('inventory_http_requests_total',
+                                 "Requests handled, by route and status", ('method', 'route', 'status'))
+
+# Pool snapshot key -> (metric suffix, type, help)
+POOL_METRICS = {
+    'checked_out': ('checked_out_connections', 'gauge', "Connections currently checked out"),
+    'peak_checked_out': ('peak_checked_out_connections', 'gauge', "Most connections checked out at once"),
+    'connects': ('connects_total', 'counter', "New DBAPI connections opened"),
+    'checkouts': ('checkouts_total', 'counter', "Connection checkouts"),
+    'timeouts': ('timeouts_total', 'counter', "Checkouts that timed out waiting for a connection"),
+    'total_wait_seconds': ('wait_seconds_total', 'counter', "Time spent waiting for a connection"),
+}
+CACHE_COUNTERS = ('hits', 'misses', 'sets', 'evictions', 'expirations', 'invalidations')
+
+
+def init_app(app):
+    """Time every request and serve /metrics"""
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop('request_started', None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+            HTTP_LATENCY.labels(request.method, route).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(request.method, route, str(response.status_code)).inc()
+        return response
+
+    app.register_blueprint(metrics_api)
+    REGISTRY.register_collector(collect_database_metrics)
+    REGISTRY.register_collector(collect_cache_metrics)
+
+
+def collect_database_metrics() -> Iterable[CollectedMetric]:
+    db = DatabaseConnection()
+    status = db.pool_status()
+    families = [CollectedMetric(f'inventory_db_pool_{suffix}', kind, documentation, [
+                    (f'inventory_db_pool_{suffix}', {}, status[key])])
+                for key, (suffix, kind, documentation) in POOL_METRICS.items()]
+    if db.query_stats is not None:
+        totals = db.query_stats.totals()
+        for suffix, key, documentation in (
+                ('queries_total', 'calls', "SQL statements executed"),
+                ('query_seconds_total', 'total_seconds', "Time spent executing SQL statements"),
+                ('query_errors_total', 'errors', "SQL statements that raised"),
+                ('slow_queries_total', 'slow', "SQL statements slower than DB_SLOW_QUERY_MS")):
+            name = f'inventory_db_{suffix}'
+            families.append(CollectedMetric(name, 'counter', documentation, [(name, {}, totals[key])]))
+    return families
+
+
+def collect_cache_metrics() -> List[CollectedMetric]:
+    snapshot = get_cache().stats.snapshot()
+    name = 'inventory_cache_operations_total'
+    return [
+        CollectedMetric(name, 'counter', "Catalog cache operations, by result",
+                        [(name, {'result': counter}, snapshot[counter]) for counter in CACHE_COUNTERS]),
+        CollectedMetric('inventory_cache_hit_ratio', 'gauge', "Catalog cache hits per lookup",
+                        [('inventory_cache_hit_ratio', {}, snapshot['hit_rate'])]),
+    ]
+
+
+@metrics_api.route('/metrics')
+def scrape():
+    return Response(REGISTRY.render(), mimetype=None, content_type=CONTENT_TYPE)
@@ -0,0 +1,353 @@
+# src/api/v1.py
+# Versioned JSON API. Reads select only the requested columns with Core and
+# encode the result tuples directly; nothing goes through ORM objects.
+
+from flask import Blueprint, Response, request
+from src.api.conditional import conditional
+from src.services.analytics import DEFAULT_HISTOGRAM_BINS, DEFAULT_WINDOW_DAYS, InventoryAnalytics
+from src.services.catalog_rows import (CATEGORY_FIELDS, MAX_BULK_SIZE, PRODUCT_FIELDS,
+                                       CatalogRowService, parse_fields, parse_ids)
+from src.services.category_service import CategoryService
+from src.services.category_stats import CategoryStatsService
+from src.services.concurrency import ConcurrentUpdateError
+from src.services.product_service import BulkValidationError, ProductService
+from src.services.reservations import ReservationService
+from src.services.stock_alerts import StockAlertService
+from src.services.stock_ledger import REASON_ADJUSTMENT, StockLedgerService, parse_timestamp
+from src.services.warehouses import WarehouseService
+from src.utils.pagination import DEFAULT_PAGE_SIZE
+from src.utils.serialization import dumps, rows_to_records
+
+api_v1 = Blueprint('api_v1', __name__, url_prefix='/api/v1')
+
+rows = CatalogRowService()
+product_service = ProductService()
+category_service = CategoryService()
+category_stats = CategoryStatsService()
+alerts = StockAlertService()
+ledger = StockLedgerService()
+analytics = InventoryAnalytics()
+warehouses = WarehouseService()
+reservations = ReservationService()
+
+
+def json_response(payload, status: int = 200) -> Response:
+    return Response(dumps(payload), status=status, mimetype='application/json')
+
+def error(message: str, status: int = 400, **extra) -> Response:
+    return json_response({'status': 'error', 'message': message, **extra}, status)
+
+def request_items(key: str) -> list:
+    """The list under `key` in the JSON body, within the bulk size limit"""
+    payload = request.get_json(silent=True)
+    items = payload.get(key) if isinstance(payload, dict) else None
+    if not isinstance(items, list):
+        raise ValueError(f"Request body must be a JSON object with a '{key}' list")
+    if len(items) > MAX_BULK_SIZE:
+        raise ValueError(f"At most {MAX_BULK_SIZE} items can be sent at once")
+    return items
+
+def reorder_settings() -> tuple:
+    """(reorder_point, reorder_quantity) from the JSON body; null means inherit"""
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict) or 'reorder_point' not in payload:
+        raise ValueError("Request body must be a JSON object with 'reorder_point'")
+    settings = []
+    for key in ('reorder_point', 'reorder_quantity'):
+        value = payload.get(key)
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+            raise ValueError(f"{key} must be an integer or null")
+        settings.append(value)
+    return tuple(settings)
+
+def include_descendants() -> bool:
+    """?include_descendants=true widens a category filter to its subtree"""
+    return request.args.get('include_descendants', '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+@api_v1.errorhandler(ValueError)
+def handle_value_error(e):
+    return error(str(e))
+
+@api_v1.errorhandler(ConcurrentUpdateError)
+def handle_conflict(e):
+    return error(str(e), 409)
+
+def reservation_error(e: ValueError) -> Response:
+    message = str(e)
+    if 'not found' in message:
+        return error(message, 404)
+    if isinstance(e, ConcurrentUpdateError) or any(
+            phrase in message for phrase in ('available', 'already', 'expired', 'Not enough', 'reserved')):
+        return error(message, 409)
+    return error(message)
+
+# GET /api/v1/products?fields=id,name&cursor=...&limit=50&category_id=3[&include_descendants=true]
+# GET /api/v1/products?ids=4,8,15            (bulk get, request order)
+@api_v1.route('/products', methods=['GET'])
+@conditional('products', 'categories')
+def list_products():
+    fields = parse_fields(request.args.get('fields'), PRODUCT_FIELDS)
+    if request.args.get('ids'):
+        ids = parse_ids(request.args['ids'].split(','))
+        found, missing = rows.products_by_ids(fields, ids)
+        return json_response({'status': 'success', 'data': rows_to_records(fields, found),
+                              'missing': missing})
+    page = rows.products_page(
+        fields,
+        request.args.get('cursor'),
+        request.args.get('limit', DEFAULT_PAGE_SIZE, type=int),
+        request.args.get('category_id', type=int),
+        include_descendants()
+    )
+    return json_response({'status': 'success', 'data': rows_to_records(fields, page.rows),
+                          'next_cursor': page.next_cursor})
+
+@api_v1.route('/products/<int:product_id>', methods=['GET'])
+@conditional('products', 'categories')
+def get_product(product_id: int):
+    fields = parse_fields(request.args.get('fields'), PRODUCT_FIELDS)
+    found, _ = rows.products_by_ids(fields, [product_id])
+    if not found:
+        return error(f"Product with id {product_id} not found", 404)
+    return json_response({'status': 'success', 'data': rows_to_records(fields, found)[0]})
+
+# Body: {"ids": [4, 8, 15]} - for id lists too long for a query string
+@api_v1.route('/products/lookup', methods=['POST'])
+def lookup_products():
+    fields = parse_fields(request.args.get('fields'), PRODUCT_FIELDS)
+    found, missing = rows.products_by_ids(fields, parse_ids(request_items('ids')))
+    return json_response({'status': 'success', 'data': rows_to_records(fields, found),
+                          'missing': missing})
+
+# Body: {"products": [{"name": ..., "price": ..., "category_id" or "category": ...}, ...]}
+# All-or-nothing: any invalid row rejects the batch with per-row errors.
+@api_v1.route('/products/bulk', methods=['POST'])
+def bulk_create_products():
+    try:
+        ids = product_service.bulk_create_products(request_items('products'))
+    except BulkValidationError as e:
+        return error(str(e), 422, errors=[{'index': index, 'message': message}
+                                          for index, message in e.errors])
+    return json_response({'status': 'success', 'data': {'ids': ids}}, 201)
+
+# Body: {"movements": [{"product_id": 4, "quantity_change": -2}, ...],
+#        "reason": "sale", "actor": "pos-3", "warehouse_id": 2}   (all but movements optional)
+# Movements are applied in order; rejected ones are reported, not fatal.
+# Without warehouse_id they are booked at the default warehouse.
+@api_v1.route('/products/stock', methods=['POST'])
+def bulk_adjust_stock():
+    movements = []
+    for index, item in enumerate(request_items('movements')):
+        try:
+            movements.append((int(item['product_id']), int(item['quantity_change'])))
+        except (KeyError, TypeError, ValueError):
+            return error(f"Movement {index} needs integer product_id and quantity_change")
+    payload = request.get_json()
+    warehouse_id = payload.get('warehouse_id')
+    if warehouse_id is not None and (not isinstance(warehouse_id, int) or isinstance(warehouse_id, bool)):
+        return error("warehouse_id must be an integer")
+    results = product_service.apply_stock_movements(
+        movements,
+        reason=str(payload.get('reason') or REASON_ADJUSTMENT),
+        actor=payload.get('actor'),
+        warehouse_id=warehouse_id
+    )
+    return json_response({'status': 'success', 'data': [result._asdict() for result in results]})
+
+# Body: {"reorder_point": 5, "reorder_quantity": 40}; null falls back to the category
+@api_v1.route('/products/<int:product_id>/reorder', methods=['PUT'])
+def set_product_reorder(product_id: int):
+    try:
+        product = product_service.set_reorder_point(product_id, *reorder_settings())
+    except ValueError as e:
+        return error(str(e), 404 if 'not found' in str(e) else 400)
+    return json_response({'status': 'success', 'data': product.to_dict()})
+
+# Ledger entries for one product, newest first
+@api_v1.route('/products/<int:product_id>/movements', methods=['GET'])
+def list_product_movements(product_id: int):
+    page = ledger.get_movements_page(
+        product_id,
+        request.args.get('cursor'),
+        request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    )
+    return json_response({'status': 'success', 'data': [movement.to_dict() for movement in page.items],
+                          'next_cursor': page.next_cursor})
+
+# GET /api/v1/products/4/stock?as_of=2024-05-01T12:00:00Z
+@api_v1.route('/products/<int:product_id>/stock', methods=['GET'])
+def product_stock_as_of(product_id: int):
+    if not request.args.get('as_of'):
+        return error("Missing parameter: as_of")
+    at = parse_timestamp(request.args['as_of'])
+    return json_response({'status': 'success', 'data': {
+        'product_id': product_id, 'as_of': at.isoformat(),
+        'stock_quantity': ledger.stock_as_of(product_id, at)}})
+
+@api_v1.route('/categories', methods=['GET'])
+@conditional('categories')
+def list_categories():
+    fields = parse_fields(request.args.get('fields'), CATEGORY_FIELDS)
+    return json_response({'status': 'success',
+                          'data': rows_to_records(fields, rows.categories(fields))})
+
+# Product count, units, inventory value and price range per category;
+# ?include_descendants=true rolls each category up over its subtree
+@api_v1.route('/categories/stats', methods=['GET'])
+@conditional('categories', 'products')
+def list_category_stats():
+    return json_response({'status': 'success',
+                          'data': [item.to_dict() for item in category_stats.get_all_stats(include_descendants()).values()]})
+
+@api_v1.route('/categories/<int:category_id>/stats', methods=['GET'])
+@conditional('categories', 'products')
+def get_category_stats(category_id: int):
+    stats = category_stats.get_stats(category_id, include_descendants())
+    if stats is None:
+        return error(f"Category with id {category_id} not found", 404)
+    return json_response({'status': 'success', 'data': stats.to_dict()})
+
+@api_v1.route('/categories/<int:category_id>', methods=['GET'])
+@conditional('categories')
+def get_category(category_id: int):
+    fields = parse_fields(request.args.get('fields'), CATEGORY_FIELDS)
+    row = rows.category(fields, category_id)
+    if row is None:
+        return error(f"Category with id {category_id} not found", 404)
+    return json_response({'status': 'success', 'data': dict(zip(fields, row))})
+
+# Body: {"reorder_point": 20, "reorder_quantity": 100}; default for the category's products
+@api_v1.route('/categories/<int:category_id>/reorder', methods=['PUT'])
+def set_category_reorder(category_id: int):
+    try:
+        category = category_service.set_reorder_defaults(category_id, *reorder_settings())
+    except ValueError as e:
+        return error(str(e), 404 if 'not found' in str(e) else 400)
+    return json_response({'status': 'success', 'data': {
+        'id': category.id, 'name': category.name, 'reorder_point': category.reorder_point,
+        'reorder_quantity': category.reorder_quantity}})
+
+@api_v1.route('/categories/<int:category_id>/products', methods=['GET'])
+@conditional('products', 'categories')
+def list_category_products(category_id: int):
+    fields = parse_fields(request.args.get('fields'), PRODUCT_FIELDS)
+    page = rows.products_page(
+        fields,
+        request.args.get('cursor'),
+        request.args.get('limit', DEFAULT_PAGE_SIZE, type=int),
+        category_id,
+        include_descendants()
+    )
+    return json_response({'status': 'success', 'data': rows_to_records(fields, page.rows),
+                          'next_cursor': page.next_cursor})
+
+# Products at or below their reorder point, by product id
+@api_v1.route('/alerts', methods=['GET'])
+def list_stock_alerts():
+    page = alerts.get_alerts_page(
+        request.args.get('cursor'),
+        request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    )
+    return json_response({'status': 'success', 'data': [alert.to_dict() for alert in page.items],
+                          'next_cursor': page.next_cursor})
+
+@api_v1.route('/warehouses', methods=['GET'])
+def list_warehouses():
+    totals = warehouses.warehouse_totals()
+    return json_response({'status': 'success', 'data': [
+        {**warehouse.to_dict(), 'units': totals.get(warehouse.id, 0)}
+        for warehouse in warehouses.get_all_warehouses()]})
+
+# GET /api/v1/warehouses/2/low-stock?threshold=5&limit=50
+# Without a threshold each product's reorder point applies
+@api_v1.route('/warehouses/<int:warehouse_id>/low-stock', methods=['GET'])
+def warehouse_low_stock(warehouse_id: int):
+    try:
+        items = warehouses.low_stock(warehouse_id, request.args.get('threshold', type=int),
+                                     request.args.get('limit', 50, type=int))
+    except ValueError as e:
+        return error(str(e), 404 if 'not found' in str(e) else 400)
+    return json_response({'status': 'success', 'data': [item.to_dict() for item in items]})
+
+# GET /api/v1/products/4/locations?min_quantity=10  (warehouses able to ship 10)
+@api_v1.route('/products/<int:product_id>/locations', methods=['GET'])
+def product_locations(product_id: int):
+    locations = warehouses.stock_by_location(product_id, request.args.get('min_quantity', 0, type=int))
+    return json_response({'status': 'success', 'data': [location.to_dict() for location in locations]})
+
+# Body: {"product_id": 4, "from_warehouse_id": 1, "to_warehouse_id": 2, "quantity": 10, "actor": "..."}
+@api_v1.route('/transfers', methods=['POST'])
+def transfer_stock():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return error("Request body must be a JSON object")
+    try:
+        arguments = [int(payload[key]) for key in
+                     ('product_id', 'from_warehouse_id', 'to_warehouse_id', 'quantity')]
+    except KeyError as e:
+        return error(f"Missing field: {e.args[0]}")
+    except (TypeError, ValueError):
+        return error("product_id, from_warehouse_id, to_warehouse_id and quantity must be integers")
+    try:
+        result = warehouses.transfer(*arguments, actor=payload.get('actor'))
+    except ValueError as e:
+        return error(str(e), 404 if 'not found' in str(e) else 409 if 'Not enough' in str(e) else 400)
+    return json_response({'status': 'success', 'data': result.to_dict()})
+
+# GET /api/v1/reservations?product_id=4&limit=100   (open reservations, soonest expiry first)
+@api_v1.route('/reservations', methods=['GET'])
+def list_reservations():
+    items = reservations.active_reservations(request.args.get('product_id', type=int),
+                                             request.args.get('limit', 100, type=int))
+    return json_response({'status': 'success', 'data': [item.to_dict() for item in items]})
+
+# Body: {"product_id": 4, "quantity": 2, "ttl_seconds": 600, "warehouse_id": 2,
+#        "reference": "order-1234", "actor": "..."}   (product_id and quantity required)
+@api_v1.route('/reservations', methods=['POST'])
+def create_reservation():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return error("Request body must be a JSON object")
+    try:
+        product_id, quantity = int(payload['product_id']), int(payload['quantity'])
+        ttl_seconds, warehouse_id = (None if payload.get(key) is None else int(payload[key])
+                                     for key in ('ttl_seconds', 'warehouse_id'))
+    except KeyError as e:
+        return error(f"Missing field: {e.args[0]}")
+    except (TypeError, ValueError):
+        return error("product_id, quantity, ttl_seconds and warehouse_id must be integers")
+    try:
+        reservation = reservations.reserve(product_id, quantity, ttl_seconds, warehouse_id,
+                                           payload.get('reference'), payload.get('actor'))
+    except ValueError as e:
+        return reservation_error(e)
+    return json_response({'status': 'success', 'data': reservation.to_dict()}, 201)
+
+# POST /api/v1/reservations/7/commit  (body optional: {"actor": "..."})
+# POST /api/v1/reservations/7/release
+@api_v1.route('/reservations/<int:reservation_id>/<action>', methods=['POST'])
+def close_reservation(reservation_id: int, action: str):
+    try:
+        if action == 'commit':
+            payload = request.get_json(silent=True)
+            actor = payload.get('actor') if isinstance(payload, dict) else None
+            reservation = reservations.commit(reservation_id, actor)
+        elif action == 'release':
+            reservation = reservations.release(reservation_id)
+        else:
+            return error(f"Unknown action '{action}'", 404)
+    except ValueError as e:
+        return reservation_error(e)
+    return json_response({'status': 'success', 'data': reservation.to_dict()})
+
+# GET /api/v1/analytics?window_days=30&bins=20&scale=log
+# Not conditional: the usage window slides even when the catalog doesn't change
+@api_v1.route('/analytics', methods=['GET'])
+def inventory_analytics():
+    report = analytics.report(
+        window_days=request.args.get('window_days', DEFAULT_WINDOW_DAYS, type=int),
+        bins=request.args.get('bins', DEFAULT_HISTOGRAM_BINS, type=int),
+        scale=request.args.get('scale', 'linear'),
+        top=request.args.get('top', 10, type=int)
+    )
+    return json_response({'status': 'success', 'data': report})
@@ -0,0 +1,367 @@
+# src/cli/commands.py
+import argparse
+from datetime import datetime
+from rich.console import Console
+from rich.table import Table
+from src.database.db_connection import DatabaseConnection
+from src.database.migrations import MIGRATIONS, pending_migrations
+from src.services.product_export import DEFAULT_EXPORT_CHUNK_SIZE, ENCODERS
+from src.services.product_import import DEFAULT_CHUNK_SIZE, SUPPORTED_FORMATS
+from src.services.category_stats import CategoryStatsService
+from src.services.product_service import ProductService
+from src.services.reservations import ReservationService
+from src.services.stock_alerts import StockAlertService
+from src.services.stock_ledger import StockLedgerService, parse_timestamp
+from src.services.warehouses import WarehouseService
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Inventory Management System. Run without a command for the interactive menu."
+    )
+    subparsers = parser.add_subparsers(dest='command')
+
+    import_parser = subparsers.add_parser('import-products', help="Bulk import products from CSV or JSONL")
+    import_parser.add_argument('path', help="Input file (.csv, .jsonl or .ndjson)")
+    import_parser.add_argument('--format', choices=SUPPORTED_FORMATS, help="Override format detection")
+    import_parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                               help="Rows per insert batch")
+    import_parser.add_argument('--upsert', action='store_true',
+                               help="Update existing products when a row carries an id")
+    import_parser.add_argument('--reject-file', help="Write rejected rows as JSON lines to this file")
+    import_parser.set_defaults(handler=import_products)
+
+    export_parser = subparsers.add_parser('export-products', help="Export the catalog to CSV, JSONL or columnar")
+    export_parser.add_argument('path', help="Output file, e.g. catalog.csv, catalog.jsonl.gz, catalog.col")
+    export_parser.add_argument('--format', choices=list(ENCODERS), help="Override format detection")
+    export_parser.add_argument('--gzip', action='store_true', default=None,
+                               help="Compress the output (implied by a .gz suffix)")
+    export_parser.add_argument('--chunk-size', type=int, default=DEFAULT_EXPORT_CHUNK_SIZE,
+                               help="Rows fetched per round trip")
+    export_parser.set_defaults(handler=export_products)
+
+    migrate_parser = subparsers.add_parser('migrate', help="Apply pending schema migrations")
+    migrate_parser.add_argument('--status', action='store_true', help="List migrations without applying")
+    migrate_parser.set_defaults(handler=migrate_database)
+
+    snapshot_parser = subparsers.add_parser('stock-snapshot', help="Snapshot current stock for fast history queries")
+    snapshot_parser.add_argument('--if-due', type=int, metavar='N',
+                                 help="Only snapshot once N movements were recorded since the last one")
+    snapshot_parser.set_defaults(handler=snapshot_stock)
+
+    as_of_parser = subparsers.add_parser('stock-as-of', help="Show stock levels at a past time")
+    as_of_parser.add_argument('at', type=timestamp_argument, help="ISO 8601 time, e.g. 2024-05-01T12:00 (UTC)")
+    as_of_parser.add_argument('--product', type=int, help="Only this product id")
+    as_of_parser.set_defaults(handler=stock_as_of)
+
+    check_parser = subparsers.add_parser('ledger-check', help="Compare stock levels with the movement ledger")
+    check_parser.set_defaults(handler=check_ledger)
+
+    alerts_parser = subparsers.add_parser('stock-alerts', help="List products at or below their reorder point")
+    alerts_action = alerts_parser.add_mutually_exclusive_group()
+    alerts_action.add_argument('--check', action='store_true',
+                               help="Compare the alert set with a full scan of products")
+    alerts_action.add_argument('--rebuild', action='store_true', help="Recompute every alert from scratch")
+    alerts_parser.add_argument('--limit', type=int, default=50, help="Alerts to list")
+    alerts_parser.set_defaults(handler=stock_alerts)
+
+    stats_parser = subparsers.add_parser('category-stats', help="Check or rebuild the per-category totals")
+    stats_action = stats_parser.add_mutually_exclusive_group(required=True)
+    stats_action.add_argument('--check', action='store_true', help="Compare the totals with a full aggregation")
+    stats_action.add_argument('--rebuild', action='store_true', help="Recompute every category's totals")
+    stats_parser.set_defaults(handler=category_stats)
+
+    warehouses_parser = subparsers.add_parser('warehouses', help="List warehouses and the units each holds")
+    warehouses_parser.add_argument('--check', action='store_true',
+                                   help="Compare product totals with the per-location stock")
+    warehouses_parser.set_defaults(handler=list_warehouses)
+
+    add_warehouse_parser = subparsers.add_parser('warehouse-add', help="Create a warehouse")
+    add_warehouse_parser.add_argument('code', help="Short unique code, e.g. BER1")
+    add_warehouse_parser.add_argument('name')
+    add_warehouse_parser.add_argument('--shard', type=int,
+                                      help="Keep its stock in attached shard N (see WAREHOUSE_STOCK_SHARDS)")
+    add_warehouse_parser.set_defaults(handler=add_warehouse)
+
+    shard_parser = subparsers.add_parser('warehouse-shard', help="Move a warehouse's stock rows to another shard")
+    shard_parser.add_argument('code', help="Warehouse code")
+    shard_parser.add_argument('shard', help="Shard number, or 'main' for the main database")
+    shard_parser.set_defaults(handler=move_warehouse_shard)
+
+    transfer_parser = subparsers.add_parser('transfer-stock', help="Move stock between two warehouses")
+    transfer_parser.add_argument('product', type=int, help="Product id")
+    transfer_parser.add_argument('source', help="Source warehouse code")
+    transfer_parser.add_argument('destination', help="Destination warehouse code")
+    transfer_parser.add_argument('quantity', type=int)
+    transfer_parser.set_defaults(handler=transfer_stock)
+
+    reservations_parser = subparsers.add_parser('reservations', help="List open stock reservations")
+    reservations_parser.add_argument('--product', type=int, help="Only this product's reservations")
+    reservations_parser.add_argument('--sweep', action='store_true',
+                                     help="Expire overdue reservations first (for cron instead of the sweeper)")
+    reservations_parser.add_argument('--check', action='store_true',
+                                     help="Compare reserved counts with the open reservations")
+    reservations_parser.set_defaults(handler=list_reservations)
+
+    reserve_parser = subparsers.add_parser('reserve', help="Hold stock of a product for an order")
+    reserve_parser.add_argument('product', type=int, help="Product id")
+    reserve_parser.add_argument('quantity', type=int)
+    reserve_parser.add_argument('--ttl', type=int, help="Seconds to hold the stock")
+    reserve_parser.add_argument('--warehouse', help="Warehouse code to ship from on commit")
+    reserve_parser.add_argument('--reference', help="Order reference")
+    reserve_parser.set_defaults(handler=reserve_stock)
+
+    close_parser = subparsers.add_parser('reservation-close', help="Commit or release a reservation")
+    close_parser.add_argument('reservation', type=int, help="Reservation id")
+    close_parser.add_argument('action', choices=['commit', 'release'])
+    close_parser.set_defaults(handler=close_reservation)
+
+    return parser
+
+
+def timestamp_argument(value: str) -> datetime:
+    try:
+        return parse_timestamp(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def import_products(args: argparse.Namespace, console: Console) -> int:
+    def show_progress(report):
+        console.print(f"  {report.processed:,} rows read, {report.imported:,} imported, "
+                      f"{report.rejected:,} rejected ({report.rows_per_second:,.0f} rows/s)")
+
+    report = ProductService().bulk_import(
+        args.path,
+        fmt=args.format,
+        chunk_size=args.chunk_size,
+        upsert=args.upsert,
+        reject_file=args.reject_file,
+        progress=show_progress,
+    )
+    console.print(f"[green]Imported {report.imported:,} of {report.processed:,} rows "
+                  f"in {report.elapsed:.2f}s ({report.rows_per_second:,.0f} rows/s)[/green]")
+    if report.rejected:
+        destination = f", see {report.reject_file}" if report.reject_file else ""
+        console.print(f"[yellow]{report.rejected:,} rows rejected{destination}[/yellow]")
+    return 0
+
+
+def export_products(args: argparse.Namespace, console: Console) -> int:
+    report = ProductService().export_products(
+        args.path,
+        fmt=args.format,
+        compress=args.gzip,
+        chunk_size=args.chunk_size,
+    )
+    peak = f"{report.peak_rss_bytes / (1024 * 1024):.1f} MiB" if report.peak_rss_bytes else "n/a"
+    console.print(f"[green]Exported {report.rows:,} rows ({report.bytes_written:,} bytes) "
+                  f"in {report.elapsed:.2f}s ({report.rows_per_second:,.0f} rows/s), "
+                  f"peak RSS {peak}[/green]")
+    return 0
+
+
+def migrate_database(args: argparse.Namespace, console: Console) -> int:
+    db = DatabaseConnection()
+    if args.status:
+        pending = {item.version for item in pending_migrations(db.engine)}
+        for item in MIGRATIONS:
+            state = "[yellow]pending[/yellow]" if item.version in pending else "[green]applied[/green]"
+            console.print(f"{item.version:>4}  {state}  {item.description}")
+        return 0
+    applied = db.create_tables()
+    for item in applied:
+        console.print(f"[green]Applied {item.version}: {item.description}[/green]")
+    if not applied:
+        console.print("[green]Database schema is up to date[/green]")
+    return 0
+
+
+def snapshot_stock(args: argparse.Namespace, console: Console) -> int:
+    ledger = StockLedgerService()
+    snapshot = ledger.snapshot_if_due(args.if_due) if args.if_due else ledger.take_snapshot()
+    if snapshot is None:
+        console.print("[green]Snapshot not due yet[/green]")
+    else:
+        console.print(f"[green]Snapshot {snapshot.id}: {snapshot.product_count:,} products "
+                      f"up to movement {snapshot.last_movement_id:,}[/green]")
+    return 0
+
+
+def stock_as_of(args: argparse.Namespace, console: Console) -> int:
+    ledger = StockLedgerService()
+    if args.product is not None:
+        console.print(f"Product {args.product}: {ledger.stock_as_of(args.product, args.at):,} "
+                      f"at {args.at.isoformat()}")
+        return 0
+    levels = ledger.stock_levels_as_of(args.at)
+    table = Table(title=f"Stock as of {args.at.isoformat()}")
+    table.add_column("Product ID")
+    table.add_column("Stock")
+    for product_id in sorted(levels):
+        table.add_row(str(product_id), f"{levels[product_id]:,}")
+    console.print(table)
+    return 0
+
+
+def check_ledger(args: argparse.Namespace, console: Console) -> int:
+    discrepancies = StockLedgerService().check_consistency()
+    if not discrepancies:
+        console.print("[green]Stock levels match the ledger[/green]")
+        return 0
+    for item in discrepancies:
+        console.print(f"[red]Product {item.product_id}: stock {item.stock_quantity}, "
+                      f"ledger {item.ledger_quantity}[/red]")
+    return 1
+
+
+def stock_alerts(args: argparse.Namespace, console: Console) -> int:
+    alerts = StockAlertService()
+    if args.rebuild:
+        console.print(f"[green]Rebuilt {alerts.rebuild():,} stock alerts[/green]")
+        return 0
+    if args.check:
+        discrepancies = alerts.check_consistency()
+        if not discrepancies:
+            console.print("[green]Stock alerts match the catalog[/green]")
+            return 0
+        for item in discrepancies:
+            state = ("missing" if item.expected and not item.recorded
+                     else "stale" if item.expected else "should be cleared")
+            console.print(f"[red]Product {item.product_id}: alert {state}[/red]")
+        return 1
+    page = alerts.get_alerts_page(page_size=args.limit)
+    table = Table(title=f"Stock Alerts ({alerts.count_alerts():,} open)")
+    for column in ("Product ID", "Stock", "Reorder Point", "Reorder Quantity", "Raised At"):
+        table.add_column(column)
+    for alert in page.items:
+        table.add_row(str(alert.product_id), f"{alert.stock_quantity:,}", f"{alert.reorder_point:,}",
+                      f"{alert.reorder_quantity:,}" if alert.reorder_quantity is not None else "-",
+                      alert.raised_at.isoformat(timespec='seconds'))
+    console.print(table)
+    return 0
+
+
+def category_stats(args: argparse.Namespace, console: Console) -> int:
+    stats = CategoryStatsService()
+    if args.rebuild:
+        console.print(f"[green]Rebuilt totals for {stats.rebuild():,} categories[/green]")
+        return 0
+    discrepancies = stats.check_consistency()
+    if not discrepancies:
+        console.print("[green]Category totals match the products[/green]")
+        return 0
+    for item in discrepancies:
+        console.print(f"[red]Category {item.category_id}: recorded {item.recorded}, actual {item.actual}[/red]")
+    return 1
+
+
+def warehouse_by_code(service: WarehouseService, code: str):
+    warehouse = service.find_warehouse(code=code)
+    if warehouse is None:
+        raise ValueError(f"Warehouse '{code}' not found")
+    return warehouse
+
+
+def list_warehouses(args: argparse.Namespace, console: Console) -> int:
+    service = WarehouseService()
+    if args.check:
+        discrepancies = service.check_consistency()
+        if not discrepancies:
+            console.print("[green]Product totals match the per-location stock[/green]")
+            return 0
+        for item in discrepancies:
+            console.print(f"[red]Product {item.product_id}: total {item.stock_quantity}, "
+                          f"locations {item.location_total}[/red]")
+        return 1
+    totals = service.warehouse_totals()
+    table = Table(title="Warehouses")
+    for column in ("ID", "Code", "Name", "Shard", "Units"):
+        table.add_column(column)
+    for warehouse in service.get_all_warehouses():
+        table.add_row(str(warehouse.id), warehouse.code, warehouse.name,
+                      str(warehouse.shard) if warehouse.shard is not None else "main",
+                      f"{totals.get(warehouse.id, 0):,}")
+    console.print(table)
+    return 0
+
+
+def add_warehouse(args: argparse.Namespace, console: Console) -> int:
+    warehouse = WarehouseService().create_warehouse(args.code, args.name, args.shard)
+    console.print(f"[green]Warehouse {warehouse.code} created with id {warehouse.id}[/green]")
+    return 0
+
+
+def move_warehouse_shard(args: argparse.Namespace, console: Console) -> int:
+    service = WarehouseService()
+    shard = None if args.shard == 'main' else int(args.shard)
+    warehouse = service.move_to_shard(warehouse_by_code(service, args.code).id, shard)
+    console.print(f"[green]Stock of {warehouse.code} now lives in "
+                  f"{'the main database' if shard is None else f'shard {shard}'}[/green]")
+    return 0
+
+
+def transfer_stock(args: argparse.Namespace, console: Console) -> int:
+    service = WarehouseService()
+    result = service.transfer(args.product, warehouse_by_code(service, args.source).id,
+                              warehouse_by_code(service, args.destination).id, args.quantity)
+    console.print(f"[green]Moved {result.quantity:,} units of product {result.product_id}: "
+                  f"{args.source.upper()} now holds {result.from_quantity:,}, "
+                  f"{args.destination.upper()} {result.to_quantity:,}[/green]")
+    return 0
+
+
+def list_reservations(args: argparse.Namespace, console: Console) -> int:
+    service = ReservationService()
+    if args.sweep:
+        console.print(f"Expired {service.sweep():,} overdue reservation(s)")
+    if args.check:
+        mismatches = service.check_consistency()
+        if not mismatches:
+            console.print("[green]Reserved counts match the open reservations[/green]")
+            return 0
+        for product_id, reserved, active in mismatches:
+            console.print(f"[red]Product {product_id}: reserved {reserved}, open reservations {active}[/red]")
+        return 1
+    reservations = service.active_reservations(args.product)
+    if not reservations:
+        console.print("[yellow]No open reservations.[/yellow]")
+        return 0
+    table = Table(title="Open Reservations")
+    for column in ("ID", "Product", "Quantity", "Warehouse", "Reference", "Expires"):
+        table.add_column(column)
+    for reservation in reservations:
+        table.add_row(str(reservation.id), str(reservation.product_id), f"{reservation.quantity:,}",
+                      str(reservation.warehouse_id or "default"), reservation.reference or "",
+                      reservation.expires_at.isoformat(timespec='seconds'))
+    console.print(table)
+    return 0
+
+
+def reserve_stock(args: argparse.Namespace, console: Console) -> int:
+    warehouse_id = warehouse_by_code(WarehouseService(), args.warehouse).id if args.warehouse else None
+    reservation = ReservationService().reserve(args.product, args.quantity, args.ttl, warehouse_id,
+                                               args.reference)
+    console.print(f"[green]Reservation {reservation.id} holds {reservation.quantity:,} units of product "
+                  f"{reservation.product_id} until {reservation.expires_at.isoformat(timespec='seconds')}[/green]")
+    return 0
+
+
+def close_reservation(args: argparse.Namespace, console: Console) -> int:
+    service = ReservationService()
+    if args.action == 'commit':
+        reservation = service.commit(args.reservation)
+    else:
+        reservation = service.release(args.reservation)
+    console.print(f"[green]Reservation {reservation.id} {reservation.status}[/green]")
+    return 0
+
+
+def run_command(args: argparse.Namespace) -> int:
+    console = Console()
+    try:
+        with DatabaseConnection().session_scope():
+            return args.handler(args, console)
+    except (OSError, ValueError) as e:
+        console.print(f"[red]Error: {e}[/red]")
+        return 1
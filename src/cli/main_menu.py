@@ -4,14 +4,26 @@ from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 from rich.prompt import Prompt, Confirm
+from src.database.db_connection import DatabaseConnection
+from src.services.analytics import InventoryAnalytics
 from src.services.category_service import CategoryService
+from src.services.category_stats import CategoryStatsService
 from src.services.product_service import ProductService
+from src.services.stock_alerts import reorder_settings_for
+from src.services.warehouses import DEFAULT_WAREHOUSE_CODE, WarehouseService
+from src.utils.validators import CATEGORY_SCHEMA, NEW_PRODUCT_SCHEMA
 
 class InventoryManagementCLI:
+    PAGE_SIZE = 25
+    
     def __init__(self):
         self.console = Console()
+        self.db = DatabaseConnection()
         self.category_service = CategoryService()
+        self.category_stats = CategoryStatsService()
         self.product_service = ProductService()
+        self.warehouse_service = WarehouseService()
+        self.analytics = InventoryAnalytics()
     
     def display_main_menu(self):
         while True:
@@ -20,18 +32,24 @@ class InventoryManagementCLI:
                 "1. Product Management\n" +
                 "2. Category Management\n" +
                 "3. Low Stock Alerts\n" +
-                "4. Exit"
+                "4. Inventory Analytics\n" +
+                "5. Exit"
             ))
             
-            choice = Prompt.ask("Enter your choice", choices=['1', '2', '3', '4'])
+            choice = Prompt.ask("Enter your choice", choices=['1', '2', '3', '4', '5'])
             
             if choice == '1':
                 self.product_menu()
             elif choice == '2':
                 self.category_menu()
             elif choice == '3':
-                self.display_low_stock_alerts()
+                # Each menu action is one unit of work, opened only once its
+                # prompts are answered so no session waits on the user
+                with self.db.session_scope():
+                    self.display_low_stock_alerts()
             elif choice == '4':
+                self.display_inventory_analytics()
+            elif choice == '5':
                 self.console.print("[bold yellow]Thank you for using Inventory Management System![/bold yellow]")
                 sys.exit()
     
@@ -44,13 +62,18 @@ class InventoryManagementCLI:
                 "3. List All Products\n" +
                 "4. Find Product\n" +
                 "5. Update Stock\n" +
-                "6. Back to Main Menu"
+                "6. Set Reorder Point\n" +
+                "7. Transfer Stock\n" +
+                "8. Stock by Warehouse\n" +
+                "9. Back to Main Menu"
             ))
             
-            choice = Prompt.ask("Enter your choice", choices=['1', '2', '3', '4', '5', '6'])
+            choice = Prompt.ask("Enter your choice", choices=['1', '2', '3', '4', '5', '6', '7', '8', '9'])
             
             try:
-                if choice == '1':
+                if choice == '9':
+                    break
+                elif choice == '1':
                     self.create_product()
                 elif choice == '2':
                     self.delete_product()
@@ -61,7 +84,11 @@ class InventoryManagementCLI:
                 elif choice == '5':
                     self.update_product_stock()
                 elif choice == '6':
-                    break
+                    self.set_product_reorder_point()
+                elif choice == '7':
+                    self.transfer_product_stock()
+                elif choice == '8':
+                    self.display_stock_by_warehouse()
             except ValueError as e:
                 self.console.print(f"[red]Error: {e}[/red]")
     
@@ -74,30 +101,35 @@ class InventoryManagementCLI:
                 "3. List All Categories\n" +
                 "4. Find Category\n" +
                 "5. View Category Products\n" +
-                "6. Back to Main Menu"
+                "6. Move Category\n" +
+                "7. Back to Main Menu"
             ))
             
-            choice = Prompt.ask("Enter your choice", choices=['1', '2', '3', '4', '5', '6'])
+            choice = Prompt.ask("Enter your choice", choices=['1', '2', '3', '4', '5', '6', '7'])
             
             try:
-                if choice == '1':
+                if choice == '7':
+                    break
+                elif choice == '1':
                     self.create_category()
                 elif choice == '2':
                     self.delete_category()
                 elif choice == '3':
-                    self.list_all_categories()
+                    with self.db.session_scope():
+                        self.list_all_categories()
                 elif choice == '4':
                     self.find_category()
                 elif choice == '5':
                     self.view_category_products()
                 elif choice == '6':
-                    break
+                    self.move_category()
             except ValueError as e:
                 self.console.print(f"[red]Error: {e}[/red]")
     
     def create_product(self):
         # List categories first
-        categories = self.category_service.get_all_categories()
+        with self.db.session_scope():
+            categories = self.category_service.get_all_categories()
         if not categories:
             self.console.print("[yellow]No categories exist. Please create a category first.[/yellow]")
             return
@@ -110,31 +142,54 @@ class InventoryManagementCLI:
             category_table.add_row(str(cat.id), cat.name)
         self.console.print(category_table)
         
-        # Prompt for product details
-        name = Prompt.ask("Enter product name")
-        price = Prompt.ask("Enter product price", type=float)
-        category_id = Prompt.ask("Enter category ID", type=int)
-        description = Prompt.ask("Enter product description (optional)", default="")
-        stock = Prompt.ask("Enter initial stock quantity", type=int, default=0)
+        # Prompt for product details; the schema reports every bad answer at once
+        values = NEW_PRODUCT_SCHEMA.check({
+            'name': Prompt.ask("Enter product name"),
+            'price': Prompt.ask("Enter product price"),
+            'category_id': Prompt.ask("Enter category ID"),
+            'description': Prompt.ask("Enter product description (optional)", default=""),
+            'stock_quantity': Prompt.ask("Enter initial stock quantity", default="0"),
+        })
         
-        product = self.product_service.create_product(
-            name, price, category_id, description, stock
-        )
+        with self.db.session_scope():
+            product = self.product_service.create_product(
+                values['name'], values['price'], values['category_id'], values['description'],
+                values['stock_quantity']
+            )
         self.console.print(f"[green]Product '{product.name}' created successfully![/green]")
     
     def create_category(self):
-        name = Prompt.ask("Enter category name")
-        description = Prompt.ask("Enter category description (optional)", default="")
+        values = CATEGORY_SCHEMA.check({
+            'name': Prompt.ask("Enter category name"),
+            'description': Prompt.ask("Enter category description (optional)", default=""),
+            'parent_id': Prompt.ask("Enter parent category ID (blank for a top-level category)",
+                                    default="").strip(),
+        })
         
-        category = self.category_service.create_category(name, description)
+        with self.db.session_scope():
+            category = self.category_service.create_category(
+                values['name'], values['description'], parent_id=values['parent_id']
+            )
         self.console.print(f"[green]Category '{category.name}' created successfully![/green]")
     
+    def move_category(self):
+        category_id = Prompt.ask("Enter category ID to move", type=int)
+        parent_id = Prompt.ask("Enter new parent category ID (blank for top level)", default="")
+        
+        with self.db.session_scope():
+            category = self.category_service.move_category(
+                category_id, int(parent_id) if parent_id.strip() else None
+            )
+            path = self.category_service.get_category_paths().get(category.id, category.name)
+        self.console.print(f"[green]Category moved: {path}[/green]")
+    
     def delete_product(self):
         product_id = Prompt.ask("Enter product ID to delete", type=int)
         confirm = Confirm.ask("Are you sure you want to delete this product?")
         
         if confirm:
-            self.product_service.delete_product(product_id)
+            with self.db.session_scope():
+                self.product_service.delete_product(product_id)
             self.console.print("[green]Product deleted successfully![/green]")
     
     def delete_category(self):
@@ -142,33 +197,41 @@ class InventoryManagementCLI:
         confirm = Confirm.ask("Are you sure you want to delete this category?")
         
         if confirm:
-            self.category_service.delete_category(category_id)
+            with self.db.session_scope():
+                self.category_service.delete_category(category_id)
             self.console.print("[green]Category deleted successfully![/green]")
     
     def list_all_products(self):
-        products = self.product_service.get_all_products()
+        with self.db.session_scope():
+            page = self.product_service.get_products_page(page_size=self.PAGE_SIZE)
         
-        if not products:
+        if not page.items:
             self.console.print("[yellow]No products found.[/yellow]")
             return
         
-        product_table = Table(title="Product List")
-        product_table.add_column("ID")
-        product_table.add_column("Name")
-        product_table.add_column("Price")
-        product_table.add_column("Stock")
-        product_table.add_column("Category")
-        
-        for product in products:
-            product_table.add_row(
-                str(product.id), 
-                product.name, 
-                f"${product.price:.2f}", 
-                str(product.stock_quantity),
-                product.category.name
-            )
-        
-        self.console.print(product_table)
+        while True:
+            product_table = Table(title="Product List")
+            product_table.add_column("ID")
+            product_table.add_column("Name")
+            product_table.add_column("Price")
+            product_table.add_column("Stock")
+            product_table.add_column("Category")
+            
+            for product in page.items:
+                product_table.add_row(
+                    str(product.id), 
+                    product.name, 
+                    f"${product.price:.2f}", 
+                    str(product.stock_quantity),
+                    product.category.name
+                )
+            
+            self.console.print(product_table)
+            
+            if not page.has_next or not Confirm.ask("Show next page?", default=True):
+                break
+            with self.db.session_scope():
+                page = self.product_service.get_products_page(page.next_cursor, self.PAGE_SIZE)
     
     def list_all_categories(self):
         categories = self.category_service.get_all_categories()
@@ -177,16 +240,27 @@ class InventoryManagementCLI:
             self.console.print("[yellow]No categories found.[/yellow]")
             return
         
+        stats = self.category_stats.get_all_stats()
+        paths = self.category_service.get_category_paths()
         category_table = Table(title="Category List")
         category_table.add_column("ID")
         category_table.add_column("Name")
         category_table.add_column("Description")
+        category_table.add_column("Products", justify="right")
+        category_table.add_column("Units", justify="right")
+        category_table.add_column("Value", justify="right")
+        category_table.add_column("Price Range")
         
         for category in categories:
+            stat = stats.get(category.id)
             category_table.add_row(
                 str(category.id), 
-                category.name, 
-                category.description or "No description"
+                paths.get(category.id, category.name), 
+                category.description or "No description",
+                f"{stat.product_count:,}" if stat else "0",
+                f"{stat.total_units:,}" if stat else "0",
+                f"${stat.total_value:,.2f}" if stat else "$0.00",
+                f"${stat.min_price:.2f} - ${stat.max_price:.2f}" if stat and stat.product_count else "-"
             )
         
         self.console.print(category_table)
@@ -237,13 +311,62 @@ class InventoryManagementCLI:
     def update_product_stock(self):
         product_id = Prompt.ask("Enter product ID", type=int)
         quantity_change = Prompt.ask("Enter stock quantity change (positive to add, negative to remove)", type=int)
+        warehouse = self.prompt_warehouse("Enter warehouse code", default=DEFAULT_WAREHOUSE_CODE)
         
-        updated_product = self.product_service.update_stock(product_id, quantity_change)
-        self.console.print(f"[green]Stock updated. New stock: {updated_product.stock_quantity}[/green]")
+        updated_product = self.product_service.update_stock(product_id, quantity_change,
+                                                            warehouse_id=warehouse.id)
+        self.console.print(f"[green]Stock updated at {warehouse.code}. "
+                           f"Total stock: {updated_product.stock_quantity}[/green]")
+    
+    def prompt_warehouse(self, prompt: str, default=None):
+        code = Prompt.ask(prompt, default=default)
+        warehouse = self.warehouse_service.find_warehouse(code=code)
+        if warehouse is None:
+            raise ValueError(f"Warehouse '{code}' not found")
+        return warehouse
+    
+    def transfer_product_stock(self):
+        product_id = Prompt.ask("Enter product ID", type=int)
+        source = self.prompt_warehouse("Transfer from warehouse code", default=DEFAULT_WAREHOUSE_CODE)
+        destination = self.prompt_warehouse("Transfer to warehouse code")
+        quantity = Prompt.ask("Enter quantity to transfer", type=int)
+        
+        result = self.warehouse_service.transfer(product_id, source.id, destination.id, quantity)
+        self.console.print(f"[green]Transferred {result.quantity}. {source.code}: {result.from_quantity}, "
+                           f"{destination.code}: {result.to_quantity}[/green]")
+    
+    def display_stock_by_warehouse(self):
+        product_id = Prompt.ask("Enter product ID", type=int)
+        locations = self.warehouse_service.stock_by_location(product_id)
+        
+        if not locations:
+            self.console.print("[yellow]No warehouse holds this product.[/yellow]")
+            return
+        
+        location_table = Table(title=f"Stock of Product {product_id} by Warehouse")
+        location_table.add_column("Code")
+        location_table.add_column("Warehouse")
+        location_table.add_column("Quantity", justify="right")
+        for location in locations:
+            location_table.add_row(location.code, location.name, f"{location.quantity:,}")
+        self.console.print(location_table)
+    
+    def set_product_reorder_point(self):
+        product_id = Prompt.ask("Enter product ID", type=int)
+        reorder_point = Prompt.ask("Enter reorder point (blank to use the category default)", default="")
+        reorder_quantity = Prompt.ask("Enter reorder quantity (optional)", default="")
+        
+        product = self.product_service.set_reorder_point(
+            product_id,
+            int(reorder_point) if reorder_point.strip() else None,
+            int(reorder_quantity) if reorder_quantity.strip() else None
+        )
+        self.console.print(f"[green]Reorder point for '{product.name}' updated.[/green]")
     
     def view_category_products(self):
         category_id = Prompt.ask("Enter category ID", type=int)
-        products = self.product_service.get_products_by_category(category_id)
+        include_descendants = Confirm.ask("Include subcategories?", default=False)
+        products = self.product_service.get_products_by_category(category_id, include_descendants)
         
         if not products:
             self.console.print("[yellow]No products found in this category.[/yellow]")
@@ -254,13 +377,15 @@ class InventoryManagementCLI:
         product_table.add_column("Name")
         product_table.add_column("Price")
         product_table.add_column("Stock")
+        product_table.add_column("Category")
         
         for product in products:
             product_table.add_row(
                 str(product.id), 
                 product.name, 
                 f"${product.price:.2f}", 
-                str(product.stock_quantity)
+                str(product.stock_quantity),
+                product.category.name
             )
         
         self.console.print(product_table)
@@ -273,19 +398,71 @@ class InventoryManagementCLI:
             low_stock_table.add_column("ID")
             low_stock_table.add_column("Name")
             low_stock_table.add_column("Current Stock")
+            low_stock_table.add_column("Reorder Point")
+            low_stock_table.add_column("Reorder Quantity")
             low_stock_table.add_column("Category")
             
             for product in low_stock_products:
+                reorder_point, reorder_quantity = reorder_settings_for(product)
                 low_stock_table.add_row(
                     str(product.id), 
                     product.name, 
                     str(product.stock_quantity),
+                    str(reorder_point),
+                    str(reorder_quantity) if reorder_quantity is not None else "-",
                     product.category.name
                 )
             
             self.console.print(low_stock_table)
         else:
             self.console.print("[green]No low stock products![/green]")
+    
+    def display_inventory_analytics(self):
+        window_days = Prompt.ask("Usage window in days", type=int, default=30)
+        with self.db.session_scope():
+            report = self.analytics.report(window_days=window_days, bins=10, scale='log')
+        
+        if not report['products']:
+            self.console.print("[yellow]No products found.[/yellow]")
+            return
+        
+        self.console.print(f"[bold]Inventory value:[/bold] ${report['total_value']:,.2f} "
+                           f"across {report['total_units']:,} units in {report['products']:,} products")
+        
+        valuation_table = Table(title="Valuation by Category")
+        valuation_table.add_column("Category")
+        valuation_table.add_column("Products", justify="right")
+        valuation_table.add_column("Units", justify="right")
+        valuation_table.add_column("Value", justify="right")
+        for row in report['valuation_by_category']:
+            valuation_table.add_row(row['category_name'], f"{row['products']:,}",
+                                    f"{row['units']:,}", f"${row['value']:,.2f}")
+        self.console.print(valuation_table)
+        
+        abc_table = Table(title="ABC Classification")
+        abc_table.add_column("Class")
+        abc_table.add_column("Products", justify="right")
+        abc_table.add_column("Share of Value", justify="right")
+        for label, row in report['abc']['classes'].items():
+            abc_table.add_row(label, f"{row['products']:,}", f"{row['value_share']:.1%}")
+        self.console.print(abc_table)
+        
+        cover = report['days_of_cover']
+        if not cover['ledger_available'] or not cover['moving_products']:
+            self.console.print("[yellow]No stock movements in the window; days of cover unavailable.[/yellow]")
+        else:
+            self.console.print(f"[bold]Days of cover[/bold] (last {cover['window_days']} days): "
+                               f"median {cover['median_days']:.1f}, "
+                               f"{cover['low_cover_products']:,} products under {cover['low_cover_days']:g} days")
+        
+        histogram = report['price_histogram']
+        histogram_table = Table(title="Price Distribution")
+        histogram_table.add_column("Price Range")
+        histogram_table.add_column("Products", justify="right")
+        for low, high, count in zip(histogram['edges'], histogram['edges'][1:], histogram['counts']):
+            histogram_table.add_row(f"${low:,.2f} - ${high:,.2f}", f"{count:,}")
+        self.console.print(histogram_table)
+
 
 # run.py
 from src.database.db_connection import DatabaseConnection
@@ -301,4 +478,4 @@ def main():
     cli.display_main_menu()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
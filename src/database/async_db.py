@@ -0,0 +1,93 @@
+# src/database/async_db.py
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+from sqlalchemy import event
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool, StaticPool
+from src.database.db_connection import DatabaseConfig, sqlite_attach_listener, sqlite_pragma_listener
+from src.database.instrumentation import QueryInstrumentation
+
+# Async DBAPI driver to use for each backend of the sync DATABASE_URL
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+ASYNC_POOL_CLASSES = {
+    'null': NullPool,
+    'static': StaticPool,
+}
+
+
+def async_url(url: str) -> URL:
+    """
+    Map a sync database URL onto its async driver, e.g.
+    sqlite:///inventory.db -> sqlite+aiosqlite:///inventory.db
+    """
+    url = make_url(url)
+    if url.get_driver_name() in ('aiosqlite', 'asyncpg'):
+        return url
+    backend = url.get_backend_name()
+    try:
+        return url.set(drivername=ASYNC_DRIVERS[backend])
+    except KeyError:
+        raise ValueError(f"No async driver configured for '{backend}' databases")
+
+
+class AsyncDatabaseConnection:
+    """
+    Async counterpart of DatabaseConnection, configured from the same
+    environment (ASYNC_DATABASE_URL overrides the derived URL)
+    """
+    _instance = None
+
+    def __new__(cls):
+        if not cls._instance:
+            cls._instance = super(AsyncDatabaseConnection, cls).__new__(cls)
+            cls._instance._setup_connection()
+        return cls._instance
+
+    def _setup_connection(self):
+        self.config = DatabaseConfig.from_env()
+        url = make_url(os.getenv('ASYNC_DATABASE_URL') or async_url(self.config.url))
+        self.engine = create_async_engine(url, **self._engine_kwargs(url))
+        if url.get_backend_name() == 'sqlite' and self.config.sqlite_pragmas:
+            event.listen(self.engine.sync_engine, 'connect',
+                         sqlite_pragma_listener(self.config.sqlite_pragmas))
+        if url.get_backend_name() == 'sqlite' and self.config.stock_shards:
+            event.listen(self.engine.sync_engine, 'connect',
+                         sqlite_attach_listener(self.config.stock_shards, self.config.sqlite_pragmas))
+        self.query_stats = None
+        if self.config.instrument:
+            self.query_stats = QueryInstrumentation(self.config.slow_query_ms, self.config.explain_slow_queries,
+                                                    self.config.query_call_sites)
+            self.query_stats.attach(self.engine.sync_engine)
+        self.Session = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    def _engine_kwargs(self, url: URL) -> Dict[str, Any]:
+        config = self.config
+        kwargs: Dict[str, Any] = {'echo': config.echo, 'pool_pre_ping': config.pool_pre_ping}
+        if config.pool_recycle is not None:
+            kwargs['pool_recycle'] = config.pool_recycle
+        pool_class = ASYNC_POOL_CLASSES.get((config.pool_class or '').lower())
+        if pool_class is not None:
+            kwargs['poolclass'] = pool_class
+        else:
+            for key in ('pool_size', 'max_overflow', 'pool_timeout'):
+                value = getattr(config, key)
+                if value is not None:
+                    kwargs[key] = value
+        return kwargs
+
+    @asynccontextmanager
+    async def session_scope(self) -> AsyncIterator[AsyncSession]:
+        """
+        One transaction: commit on success, roll back on error
+        """
+        async with self.Session() as session:
+            async with session.begin():
+                yield session
+
+    async def dispose(self):
+        await self.engine.dispose()
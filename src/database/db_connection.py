@@ -1,40 +1,510 @@
 # src/database/db_connection.py
+import logging
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, SessionTransaction, declarative_base, scoped_session, sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import NullPool, QueuePool, SingletonThreadPool, StaticPool
 from dotenv import load_dotenv
+from src.database.instrumentation import QueryInstrumentation, begin_request_stats, end_request_stats
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Create base class for declarative models
 Base = declarative_base()
 
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'inventory.db')
+
+POOL_CLASSES = {
+    'queue': QueuePool,
+    'null': NullPool,
+    'static': StaticPool,
+    'singleton': SingletonThreadPool,
+}
+
+# PRAGMA name -> (environment variable, default). Empty values skip the pragma.
+SQLITE_PRAGMAS = {
+    'journal_mode': ('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': ('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'busy_timeout': ('SQLITE_BUSY_TIMEOUT', '5000'),
+    'cache_size': ('SQLITE_CACHE_SIZE', '-65536'),
+    'mmap_size': ('SQLITE_MMAP_SIZE', '268435456'),
+    'temp_store': ('SQLITE_TEMP_STORE', 'MEMORY'),
+}
+# Per-file PRAGMAs that must be repeated for each attached database
+SQLITE_FILE_PRAGMAS = ('journal_mode', 'synchronous')
+
+# Attached database holding warehouse stock shard n (see WAREHOUSE_STOCK_SHARDS)
+STOCK_SHARD_SCHEMA = 'stock_{}'
+
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Environment variable {name} must be an integer, got '{value}'")
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value in (None, ''):
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+class DatabaseConfig:
+    """Engine settings, normally read from the environment / .env file"""
+    def __init__(self, url: Optional[str] = None, echo: bool = False,
+                 pool_class: Optional[str] = None, pool_size: Optional[int] = None,
+                 max_overflow: Optional[int] = None, pool_timeout: Optional[int] = None,
+                 pool_recycle: Optional[int] = None, pool_pre_ping: bool = False,
+                 sqlite_pragmas: Optional[Dict[str, str]] = None,
+                 stock_shards: Optional[List[str]] = None, instrument: bool = True,
+                 slow_query_ms: Optional[int] = 100, explain_slow_queries: bool = True,
+                 query_call_sites: bool = True):
+        self.url = url or f'sqlite:///{DEFAULT_DB_PATH}'
+        self.echo = echo
+        self.pool_class = pool_class
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_timeout = pool_timeout
+        self.pool_recycle = pool_recycle
+        self.pool_pre_ping = pool_pre_ping
+        if sqlite_pragmas is None:
+            sqlite_pragmas = {pragma: default for pragma, (_, default) in SQLITE_PRAGMAS.items()}
+        self.sqlite_pragmas = sqlite_pragmas
+        # SQLite files attached as stock_0, stock_1, ... for warehouse stock rows
+        self.stock_shards = stock_shards or []
+        # Per-statement latency histograms and the slow-query log (see instrumentation.py)
+        self.instrument = instrument
+        self.slow_query_ms = slow_query_ms
+        self.explain_slow_queries = explain_slow_queries
+        self.query_call_sites = query_call_sites
+
+    @classmethod
+    def from_env(cls) -> 'DatabaseConfig':
+        slow_query_ms = _env_int('DB_SLOW_QUERY_MS')
+        pragmas = {}
+        for pragma, (variable, default) in SQLITE_PRAGMAS.items():
+            value = os.getenv(variable, default)
+            if value:
+                pragmas[pragma] = value
+        return cls(
+            url=os.getenv('DATABASE_URL') or None,
+            echo=_env_bool('DB_ECHO'),
+            pool_class=os.getenv('DB_POOL_CLASS') or None,
+            pool_size=_env_int('DB_POOL_SIZE'),
+            max_overflow=_env_int('DB_MAX_OVERFLOW'),
+            pool_timeout=_env_int('DB_POOL_TIMEOUT'),
+            pool_recycle=_env_int('DB_POOL_RECYCLE'),
+            pool_pre_ping=_env_bool('DB_POOL_PRE_PING'),
+            sqlite_pragmas=pragmas,
+            stock_shards=[path.strip() for path in os.getenv('WAREHOUSE_STOCK_SHARDS', '').split(',')
+                          if path.strip()],
+            instrument=_env_bool('DB_INSTRUMENT', True),
+            slow_query_ms=100 if slow_query_ms is None else slow_query_ms,
+            explain_slow_queries=_env_bool('DB_EXPLAIN_SLOW_QUERIES', True),
+            query_call_sites=_env_bool('DB_QUERY_CALL_SITES', True),
+        )
+
+    @property
+    def is_sqlite(self) -> bool:
+        return make_url(self.url).get_backend_name() == 'sqlite'
+
+    def engine_kwargs(self) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {'echo': self.echo, 'pool_pre_ping': self.pool_pre_ping}
+        if self.pool_recycle is not None:
+            kwargs['pool_recycle'] = self.pool_recycle
+        pool_class = None
+        if self.pool_class:
+            try:
+                pool_class = POOL_CLASSES[self.pool_class.lower()]
+            except KeyError:
+                raise ValueError(
+                    f"Unknown pool class '{self.pool_class}'. Choose from: {', '.join(POOL_CLASSES)}"
+                )
+        if pool_class is None or issubclass(pool_class, QueuePool):
+            # Sizing only applies to the default/queue pool
+            for key in ('pool_size', 'max_overflow', 'pool_timeout'):
+                value = getattr(self, key)
+                if value is not None:
+                    kwargs[key] = value
+        if pool_class is not None:
+            kwargs['poolclass'] = pool_class
+        if self.is_sqlite and pool_class is not SingletonThreadPool:
+            # Pooled connections move between threads
+            kwargs['connect_args'] = {'check_same_thread': False}
+        return kwargs
+
+
+def sqlite_pragma_listener(pragmas: Dict[str, str]):
+    """
+    'connect' event listener that applies PRAGMAs to each new DBAPI connection
+    """
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma, value in pragmas.items():
+                cursor.execute(f"PRAGMA {pragma}={value}")
+        finally:
+            cursor.close()
+    return apply_pragmas
+
+
+def sqlite_attach_listener(paths: List[str], pragmas: Dict[str, str]):
+    """
+    'connect' event listener that attaches the warehouse stock shard files
+    to each new DBAPI connection, with the main file's journal settings
+    """
+    def attach_shards(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for shard, path in enumerate(paths):
+                schema = STOCK_SHARD_SCHEMA.format(shard)
+                cursor.execute(f"ATTACH DATABASE ? AS {schema}", (path,))
+                for pragma in SQLITE_FILE_PRAGMAS:
+                    if pragma in pragmas:
+                        cursor.execute(f"PRAGMA {schema}.{pragma}={pragmas[pragma]}")
+        finally:
+            cursor.close()
+    return attach_shards
+
+
+class PoolMetrics:
+    """Checkout, checkin and wait-time counters for an engine's pool"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def record_checkout(self):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def record_checkin(self):
+        with self._lock:
+            self.checkins += 1
+            self.checked_out -= 1
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.total_wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'connects': self.connects,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'checked_out': self.checked_out,
+                'peak_checked_out': self.peak_checked_out,
+                'timeouts': self.timeouts,
+                'total_wait_seconds': self.total_wait_seconds,
+                'max_wait_seconds': self.max_wait_seconds,
+                'avg_wait_seconds': self.total_wait_seconds / self.checkouts if self.checkouts else 0.0,
+            }
+
+
+def _timed_pool_class(pool_class, metrics: PoolMetrics):
+    """
+    Subclass a pool so time spent waiting for a connection is recorded.
+    A subclass (rather than patching an instance) survives engine.dispose(),
+    which recreates the pool from its class.
+    """
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = pool_class._do_get(self)
+        except SQLAlchemyError:
+            metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+    return type(f'Timed{pool_class.__name__}', (pool_class,), {'_do_get': _do_get})
+
+
 class DatabaseConnection:
     _instance = None
-    
+    _instance_lock = threading.Lock()
+
     def __new__(cls):
         if not cls._instance:
-            cls._instance = super(DatabaseConnection, cls).__new__(cls)
-            cls._instance._setup_connection()
+            # Threads racing to the first use must not see a half-built instance
+            with cls._instance_lock:
+                if not cls._instance:
+                    instance = super(DatabaseConnection, cls).__new__(cls)
+                    instance._setup_connection()
+                    cls._instance = instance
         return cls._instance
-    
+
     def _setup_connection(self):
         try:
-            # Use SQLite database with full path
-            db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'inventory.db')
-            self.engine = create_engine(f'sqlite:///{db_path}', echo=False)
-            self.Session = sessionmaker(bind=self.engine)
+            self.config = DatabaseConfig.from_env()
+            self.pool_metrics = PoolMetrics()
+            self.query_stats: Optional[QueryInstrumentation] = None
+            if self.config.instrument:
+                self.query_stats = QueryInstrumentation(self.config.slow_query_ms,
+                                                        self.config.explain_slow_queries,
+                                                        self.config.query_call_sites)
+            self.engine = self._create_engine(self.config)
+            # Objects stay readable after the unit of work commits (templates, CLI tables)
+            self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)
+            self.scoped_session = scoped_session(self.Session)
+            self._scope = threading.local()
         except SQLAlchemyError as e:
             print(f"Database connection error: {e}")
             raise
-    
+
+    def _create_engine(self, config: DatabaseConfig):
+        kwargs = config.engine_kwargs()
+        # Resolve the pool class the dialect would pick so it can be wrapped for timing
+        url = make_url(config.url)
+        base_pool = kwargs.pop('poolclass', None) or url.get_dialect().get_pool_class(url)
+        engine = create_engine(
+            config.url, poolclass=_timed_pool_class(base_pool, self.pool_metrics), **kwargs
+        )
+
+        metrics = self.pool_metrics
+        event.listen(engine, 'checkout', lambda *args: metrics.record_checkout())
+        event.listen(engine, 'checkin', lambda *args: metrics.record_checkin())
+        event.listen(engine, 'connect', lambda *args: metrics.record_connect())
+        if config.is_sqlite and config.sqlite_pragmas:
+            event.listen(engine, 'connect', sqlite_pragma_listener(config.sqlite_pragmas))
+        if config.is_sqlite and config.stock_shards:
+            event.listen(engine, 'connect',
+                         sqlite_attach_listener(config.stock_shards, config.sqlite_pragmas))
+        if self.query_stats is not None:
+            self.query_stats.attach(engine)
+        return engine
+
     def get_session(self):
         return self.Session()
-    
+
+    @property
+    def session(self) -> Session:
+        """The session of the current thread's unit of work"""
+        return self.scoped_session()
+
+    def begin_scope(self) -> Session:
+        """
+        Enter a unit of work. Nested scopes join the outermost one, which
+        alone commits, so a request or CLI command is a single transaction.
+        A nested scope runs inside a SAVEPOINT once the unit has written
+        something, so its failure only undoes its own writes.
+        """
+        depth = getattr(self._scope, 'depth', 0)
+        session = self.scoped_session()
+        if depth:
+            self._scope.savepoints.append(self._savepoint(session))
+        else:
+            self._scope.savepoints = []
+        self._scope.depth = depth + 1
+        return session
+
+    def _savepoint(self, session: Session) -> Optional[Tuple[SessionTransaction, Dict[str, int]]]:
+        """
+        A SAVEPOINT protecting the unit's earlier writes, or None when there
+        are none yet and a rollback loses nothing. pysqlite only opens the
+        database transaction at the first write; a SAVEPOINT before that
+        would start one itself and its RELEASE would commit.
+
+        Also returns the lengths of the session.info lists holding work
+        deferred to commit (cache invalidations, alert events), which
+        after_rollback does not clear for a savepoint.
+        """
+        if session.new or session.dirty or session.deleted:
+            session.flush()
+        if not session.in_transaction():
+            return None
+        if self.config.is_sqlite and not session.connection().connection.dbapi_connection.in_transaction:
+            return None
+        pending = {key: len(value) for key, value in session.info.items() if isinstance(value, list)}
+        return session.begin_nested(), pending
+
+    def end_scope(self, error: Optional[BaseException] = None):
+        """
+        Leave a unit of work. An error in a nested scope rolls back to its
+        savepoint; the outermost scope commits (or, on error, rolls back)
+        and returns its connection to the pool.
+        """
+        depth = getattr(self._scope, 'depth', 0)
+        if depth == 0:
+            return
+        self._scope.depth = depth - 1
+        session = self.scoped_session()
+        if depth > 1:
+            savepoint = self._scope.savepoints.pop()
+            if savepoint is None:
+                if error is not None:
+                    session.rollback()
+                return
+            transaction, pending = savepoint
+            if error is None:
+                transaction.commit()
+                return
+            # Also after a failed flush, which leaves the savepoint inactive but open
+            transaction.rollback()
+            for key, value in list(session.info.items()):
+                if isinstance(value, list):
+                    if key in pending:
+                        del value[pending[key]:]
+                    else:
+                        del session.info[key]
+            return
+        try:
+            if error is not None:
+                session.rollback()
+            else:
+                session.commit()
+        except BaseException:
+            session.rollback()
+            raise
+        finally:
+            self.scoped_session.remove()
+
+    def in_scope(self) -> bool:
+        """Whether the current thread is inside a unit of work"""
+        return getattr(self._scope, 'depth', 0) > 0
+
+    def in_transaction(self) -> bool:
+        """Whether the current thread's unit of work has already begun a transaction"""
+        return self.scoped_session.registry.has() and self.scoped_session().in_transaction()
+
+    @contextmanager
+    def session_scope(self) -> Iterator[Session]:
+        session = self.begin_scope()
+        try:
+            yield session
+        except BaseException as e:
+            self.end_scope(e)
+            raise
+        self.end_scope()
+
+    def init_app(self, app):
+        """
+        Bind the unit of work to the Flask request lifecycle, and report
+        each request's query count, query time and commit time in a
+        Server-Timing header. The unit commits in after_request, so a
+        failed commit still becomes a proper error response; teardown
+        only rolls back units an unhandled exception left open.
+        """
+        from flask import g
+
+        @app.before_request
+        def begin_request_scope():
+            g.query_stats, g.query_stats_token = begin_request_stats()
+            self.begin_scope()
+
+        @app.after_request
+        def commit_request_scope(response):
+            stats = g.get('query_stats')
+            if self.in_scope():
+                started = time.perf_counter()
+                try:
+                    # Error handlers' 5xx responses come through here too
+                    self.end_scope(RuntimeError(response.status) if response.status_code >= 500 else None)
+                except SQLAlchemyError as e:
+                    response = commit_failed_response(e)
+                if stats is not None:
+                    stats.commit_seconds = time.perf_counter() - started
+            if stats is not None:
+                response.headers.add('Server-Timing', stats.server_timing())
+            return response
+
+        @app.teardown_request
+        def end_request_scope(error=None):
+            try:
+                while self.in_scope():
+                    self.end_scope(error or RuntimeError("Request ended without a response"))
+            finally:
+                token = g.pop('query_stats_token', None)
+                if token is not None:
+                    end_request_stats(token)
+
+    def pool_status(self) -> Dict[str, Any]:
+        """
+        Pool sizing information plus checkout/wait metrics
+        """
+        pool = self.engine.pool
+        status = {'pool_class': type(pool).__mro__[1].__name__}
+        if isinstance(pool, QueuePool):
+            status.update(size=pool.size(), checked_in=pool.checkedin(), overflow=pool.overflow())
+        status.update(self.pool_metrics.snapshot())
+        return status
+
     def create_tables(self):
+        """
+        Create missing tables, then bring an existing database up to date
+        """
+        from src.database.migrations import migrate
+        # Register every model on Base.metadata before create_all
+        from src.models import (category, product, stock_alert, stock_movement,  # noqa: F401
+                                stock_reservation, warehouse)
+        from src.services.warehouses import create_shard_tables
         Base.metadata.create_all(self.engine)
-    
+        done = migrate(self.engine)
+        # Shard files can be added to WAREHOUSE_STOCK_SHARDS at any time
+        with self.engine.begin() as conn:
+            create_shard_tables(conn)
+        return done
+
     def drop_tables(self):
-        Base.metadata.drop_all(self.engine)
\ No newline at end of file
+        from src.database.migrations import AUXILIARY_TABLES
+        from src.models import (category, product, stock_alert, stock_movement,  # noqa: F401
+                                stock_reservation, warehouse)
+        from src.services.warehouses import drop_shard_tables
+        Base.metadata.drop_all(self.engine)
+        with self.engine.begin() as conn:
+            drop_shard_tables(conn)
+            for table in AUXILIARY_TABLES:
+                conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+
+
+def commit_failed_response(error: SQLAlchemyError):
+    """
+    The response for a request whose unit of work could not commit: a
+    JSON error for API calls, otherwise a flashed message and a redirect
+    back, as the page routes do for their own errors
+    """
+    from flask import flash, jsonify, redirect, request, session
+    from src.services.concurrency import CONFLICT_MESSAGE, is_conflict
+
+    conflict = is_conflict(error)
+    logger.error("Request %s %s could not commit: %s", request.method, request.path, error)
+    message = CONFLICT_MESSAGE if conflict else "The changes could not be saved, please try again"
+    if request.path.startswith('/api/') or request.is_json:
+        response = jsonify({'status': 'error', 'message': message})
+        response.status_code = 409 if conflict else 500
+        return response
+    # The route may already have announced the write that just failed
+    flashes = [(category, text) for category, text in session.get('_flashes', []) if category != 'success']
+    session['_flashes'] = flashes
+    flash(message, 'danger')
+    return redirect(request.referrer or request.script_root + '/')
@@ -0,0 +1,331 @@
+# src/database/instrumentation.py
+import bisect
+import contextvars
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from src.utils.logger import setup_file_logger
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds, in seconds, of the latency histogram buckets (the last bucket is unbounded)
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                   2.5, 5.0)
+# Distinct normalized statements tracked; later ones are pooled under OTHER_STATEMENTS
+MAX_TRACKED_STATEMENTS = 1000
+OTHER_STATEMENTS = '<other statements>'
+# Seconds before the same slow statement is EXPLAINed again
+EXPLAIN_INTERVAL = 300
+# Longest statement text kept in the slow-query log
+MAX_LOGGED_STATEMENT = 2000
+# The slow-query log's own file under the log directory; it never goes to the console
+SLOW_QUERY_LOG_FILE = 'slow_queries.jsonl'
+EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_PLACEHOLDER = re.compile(r"\?|%\(\w+\)s|%s|:\w+")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SQL_WHITESPACE = re.compile(r"\s+")
+
+# Files whose frames are never reported as call sites
+_SKIPPED_PATHS = tuple(os.path.dirname(module.__file__) + os.sep for module in (
+    sys.modules['sqlalchemy'], sys.modules['logging'], sys.modules['contextlib']))
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + os.sep
+
+
+def normalize_statement(statement: str) -> str:
+    """
+    Reduce a statement to its shape: literals and bound parameters become
+    ?, IN lists of any length become (...), whitespace is collapsed.
+    Statements that differ only in their values share one entry.
+    """
+    statement = _STRING_LITERAL.sub('?', statement)
+    statement = _NUMBER_LITERAL.sub('?', statement)
+    statement = _PLACEHOLDER.sub('?', statement)
+    statement = _PLACEHOLDER_LIST.sub('(...)', statement)
+    return _SQL_WHITESPACE.sub(' ', statement).strip()
+
+
+def find_call_site() -> Optional[str]:
+    """
+    'file:line function' of the innermost project frame outside this
+    module and SQLAlchemy, i.e. the service code that issued the query
+    """
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (filename.startswith(_PROJECT_ROOT) and filename != __file__
+                and not filename.startswith(_SKIPPED_PATHS)):
+            return f"{os.path.relpath(filename, _PROJECT_ROOT)}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+class StatementStats:
+    """
+    Latency histogram, error count and call sites for one normalized
+    statement. `rows` adds up the driver's rowcount, so it counts rows
+    written; DBAPI drivers such as sqlite3 report none for reads.
+    """
+    def __init__(self, statement: str):
+        self.statement = statement
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.slow = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.call_sites: Dict[str, int] = {}
+        self.plan: Optional[List[str]] = None
+        self.explained_at = 0.0
+
+    def record(self, seconds: float, rows: int, call_site: Optional[str], slow: bool):
+        self.calls += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        if rows > 0:
+            self.rows += rows
+        if slow:
+            self.slow += 1
+        if call_site is not None:
+            self.call_sites[call_site] = self.call_sites.get(call_site, 0) + 1
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Upper bound of the bucket holding the given fraction of calls,
+        never more than the slowest call seen
+        """
+        target = fraction * self.calls
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= target:
+                if index < len(LATENCY_BUCKETS):
+                    return min(LATENCY_BUCKETS[index], self.max_seconds)
+                return self.max_seconds
+        return 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'statement': self.statement,
+            'calls': self.calls,
+            'errors': self.errors,
+            'rows': self.rows,
+            'slow': self.slow,
+            'total_ms': self.total_seconds * 1000,
+            'avg_ms': self.total_seconds * 1000 / self.calls if self.calls else 0.0,
+            'max_ms': self.max_seconds * 1000,
+            'p50_ms': self.percentile(0.5) * 1000,
+            'p95_ms': self.percentile(0.95) * 1000,
+            'buckets': {('+Inf' if index == len(LATENCY_BUCKETS) else f'{LATENCY_BUCKETS[index] * 1000:g}'): count
+                        for index, count in enumerate(self.buckets)},
+            'call_sites': dict(sorted(self.call_sites.items(), key=lambda item: -item[1])[:5]),
+            'plan': self.plan,
+        }
+
+
+class RequestQueryStats:
+    """Statements executed for the current request (or any other scope)"""
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.commit_seconds: Optional[float] = None
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, e.g. db;dur=4.21;desc="7 queries", commit;dur=0.35"""
+        timing = f'db;dur={self.seconds * 1000:.2f};desc="{self.count} quer{"y" if self.count == 1 else "ies"}"'
+        if self.commit_seconds is not None:
+            timing += f', commit;dur={self.commit_seconds * 1000:.2f}'
+        return timing
+
+
+_request_stats: contextvars.ContextVar[Optional[RequestQueryStats]] = contextvars.ContextVar(
+    'request_query_stats', default=None)
+
+
+def begin_request_stats() -> Tuple[RequestQueryStats, contextvars.Token]:
+    """Start counting statements for the current context; pass the token to end_request_stats"""
+    stats = RequestQueryStats()
+    return stats, _request_stats.set(stats)
+
+
+def end_request_stats(token: contextvars.Token):
+    _request_stats.reset(token)
+
+
+def current_request_stats() -> Optional[RequestQueryStats]:
+    return _request_stats.get()
+
+
+class QueryInstrumentation:
+    """
+    Per-statement latency histograms and a slow-query log for an engine,
+    fed by the before/after_cursor_execute events. Statements slower than
+    `slow_query_ms` are logged with their call site and, when `explain`
+    is on, their query plan (EXPLAIN QUERY PLAN on SQLite), to
+    SLOW_QUERY_LOG_FILE in `log_dir`.
+    """
+    def __init__(self, slow_query_ms: Optional[float] = 100.0, explain: bool = True,
+                 call_sites: bool = True, log_dir: str = 'logs'):
+        self.slow_query_seconds = slow_query_ms / 1000 if slow_query_ms else None
+        self.explain = explain
+        self.call_sites = call_sites
+        self.log_dir = log_dir
+        self._lock = threading.Lock()
+        self._statements: Dict[str, StatementStats] = {}
+        # Raw statement -> normalized key; compiled statements repeat verbatim.
+        # Both maps are read without the lock (dict reads are atomic) and only
+        # changed under it.
+        self._keys: Dict[str, str] = {}
+        # Running totals across all statements; reset() leaves them alone so
+        # they can be exported as counters
+        self._totals = {'calls': 0, 'total_seconds': 0.0, 'errors': 0, 'slow': 0}
+        self._slow_logger: Optional[logging.Logger] = None
+
+    def attach(self, engine: Engine):
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.listen(engine, 'handle_error', self._handle_error)
+
+    def detach(self, engine: Engine):
+        event.remove(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.remove(engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.remove(engine, 'handle_error', self._handle_error)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info['query_started'].pop()
+        request = _request_stats.get()
+        if request is not None:
+            request.count += 1
+            request.seconds += seconds
+        slow = self.slow_query_seconds is not None and seconds >= self.slow_query_seconds
+        call_site = find_call_site() if self.call_sites or slow else None
+        rows = cursor.rowcount
+        stats = self._stats_for(statement)
+        with self._lock:
+            stats.record(seconds, rows, call_site, slow)
+            self._totals['calls'] += 1
+            self._totals['total_seconds'] += seconds
+            if slow:
+                self._totals['slow'] += 1
+            explain = slow and self.explain and time.monotonic() - stats.explained_at >= EXPLAIN_INTERVAL
+            if explain:
+                stats.explained_at = time.monotonic()
+        if slow:
+            plan = self._explain(conn, statement, parameters, executemany) if explain else None
+            if plan is not None:
+                stats.plan = plan
+            self._log_slow(statement, seconds, rows, call_site, plan)
+
+    def _handle_error(self, context):
+        started = context.connection.info.get('query_started') if context.connection is not None else None
+        if started:
+            started.pop()
+        if context.statement:
+            stats = self._stats_for(context.statement)
+            with self._lock:
+                stats.errors += 1
+                self._totals['errors'] += 1
+
+    def _stats_for(self, statement: str) -> StatementStats:
+        key = self._keys.get(statement)
+        stats = self._statements.get(key) if key is not None else None
+        if stats is not None:
+            return stats
+        if key is None:
+            # Normalizing is the slow part and needs no lock
+            key = normalize_statement(statement)
+        with self._lock:
+            stats = self._statements.get(key)
+            if stats is None:
+                if len(self._statements) >= MAX_TRACKED_STATEMENTS:
+                    key = OTHER_STATEMENTS
+                    stats = self._statements.get(key)
+                if stats is None:
+                    stats = self._statements[key] = StatementStats(key)
+            if len(self._keys) >= MAX_TRACKED_STATEMENTS * 4:
+                self._keys.clear()
+            self._keys[statement] = key
+        return stats
+
+    def _explain(self, conn, statement: str, parameters, executemany: bool) -> Optional[List[str]]:
+        """
+        The plan of a slow statement, read on the same DBAPI connection
+        (EXPLAIN does not run the statement). None if it cannot be explained.
+        """
+        dialect = conn.dialect.name
+        if dialect == 'sqlite':
+            prefix = 'EXPLAIN QUERY PLAN '
+        elif dialect in ('postgresql', 'mysql', 'mariadb'):
+            prefix = 'EXPLAIN '
+        else:
+            return None
+        words = statement.split(None, 1)
+        if not words or words[0].upper() not in EXPLAINABLE:
+            return None
+        if executemany:
+            parameters = parameters[0] if parameters else ()
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(prefix + statement, parameters)
+            if dialect == 'sqlite':
+                # (id, parent, notused, detail): indent each step under its parent
+                depth = {0: 0}
+                plan = []
+                for node_id, parent, _, detail in cursor.fetchall():
+                    depth[node_id] = depth.get(parent, 0) + 1
+                    plan.append('  ' * (depth[node_id] - 1) + detail)
+                return plan or None
+            return [' | '.join(str(value) for value in row) for row in cursor.fetchall()] or None
+        except Exception as e:
+            logger.debug("Could not explain statement: %s", e)
+            return None
+        finally:
+            cursor.close()
+
+    def _log_slow(self, statement: str, seconds: float, rows: int, call_site: Optional[str],
+                  plan: Optional[List[str]]):
+        if self._slow_logger is None:
+            self._slow_logger = setup_file_logger('slow_queries', SLOW_QUERY_LOG_FILE, self.log_dir)
+        text = _SQL_WHITESPACE.sub(' ', statement).strip()
+        if len(text) > MAX_LOGGED_STATEMENT:
+            text = text[:MAX_LOGGED_STATEMENT] + '...'
+        message = f"Slow query ({seconds * 1000:.1f} ms, {max(rows, 0)} row(s)) at {call_site or 'unknown'}: {text}"
+        if plan:
+            message += '\n  plan:\n    ' + '\n    '.join(plan)
+        self._slow_logger.warning(message, extra={'duration_ms': round(seconds * 1000, 3), 'rows': max(rows, 0),
+                                                  'call_site': call_site, 'plan': plan})
+
+    def report(self, order_by: str = 'total_ms', limit: Optional[int] = 20) -> List[Dict[str, Any]]:
+        """Statement summaries, most expensive first"""
+        with self._lock:
+            rows = [stats.to_dict() for stats in self._statements.values()]
+        rows.sort(key=lambda row: row[order_by], reverse=True)
+        return rows[:limit] if limit else rows
+
+    def statements(self) -> List[StatementStats]:
+        with self._lock:
+            return list(self._statements.values())
+
+    def totals(self) -> Dict[str, float]:
+        """Calls, total_seconds, errors and slow across all statements since the engine was attached"""
+        with self._lock:
+            return dict(self._totals)
+
+    def reset(self):
+        """Clear the per-statement stats; totals() keeps counting"""
+        with self._lock:
+            self._statements.clear()
+            self._keys.clear()
@@ -0,0 +1,208 @@
+# src/database/migrations.py
+from datetime import datetime, timezone
+from typing import Callable, List, NamedTuple, Optional, Set
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+MIGRATIONS: List[Migration] = []
+
+# Tables created by migrations rather than by the models; dropped with the schema
+AUXILIARY_TABLES = ['products_fts', 'catalog_versions', 'category_stats', 'schema_migrations']
+
+
+def migration(version: int, description: str):
+    """
+    Register an upgrade step. Steps run in version order, once per database,
+    each in its own transaction. They must be idempotent: a fresh database
+    gets the current schema from create_all before pending steps run.
+    """
+    def register(upgrade: Callable[[Connection], None]):
+        if any(existing.version == version for existing in MIGRATIONS):
+            raise ValueError(f"Duplicate migration version {version}")
+        MIGRATIONS.append(Migration(version, description, upgrade))
+        MIGRATIONS.sort(key=lambda item: item.version)
+        return upgrade
+    return register
+
+
+def ensure_migrations_table(conn: Connection):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, "
+        "description VARCHAR(255) NOT NULL, "
+        "applied_at VARCHAR(32) NOT NULL)"
+    ))
+
+
+def applied_versions(conn: Connection) -> Set[int]:
+    ensure_migrations_table(conn)
+    return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def pending_migrations(engine: Engine) -> List[Migration]:
+    with engine.begin() as conn:
+        applied = applied_versions(conn)
+    return [item for item in MIGRATIONS if item.version not in applied]
+
+
+def migrate(engine: Engine, target: Optional[int] = None) -> List[Migration]:
+    """
+    Apply pending migrations up to `target` (default: latest) and return them
+    """
+    done = []
+    for item in pending_migrations(engine):
+        if target is not None and item.version > target:
+            break
+        with engine.begin() as conn:
+            item.upgrade(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, description, applied_at) "
+                     "VALUES (:version, :description, :applied_at)"),
+                {'version': item.version, 'description': item.description,
+                 'applied_at': datetime.now(timezone.utc).isoformat(timespec='seconds')}
+            )
+        done.append(item)
+    return done
+
+
+# Helpers for idempotent steps
+
+def has_column(conn: Connection, table: str, column: str) -> bool:
+    return any(info['name'] == column for info in inspect(conn).get_columns(table))
+
+
+def add_column(conn: Connection, table: str, column: str, ddl: str):
+    if not has_column(conn, table, column):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def create_index(conn: Connection, name: str, table: str, columns: List[str], unique: bool = False):
+    conn.execute(text(
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"
+    ))
+
+
+def analyze(conn: Connection):
+    """Refresh planner statistics where the backend supports it"""
+    if conn.dialect.name in ('sqlite', 'postgresql'):
+        conn.execute(text("ANALYZE"))
+
+
+# Schema history
+
+@migration(1, "Index hot product query columns")
+def add_product_indexes(conn: Connection):
+    create_index(conn, 'ix_products_name', 'products', ['name'])
+    create_index(conn, 'ix_products_category_id_price', 'products', ['category_id', 'price'])
+    create_index(conn, 'ix_products_price', 'products', ['price'])
+    create_index(conn, 'ix_products_stock_quantity', 'products', ['stock_quantity'])
+    analyze(conn)
+
+
+@migration(2, "Full-text index over product name and description")
+def add_product_fts(conn: Connection):
+    if conn.dialect.name != 'sqlite':
+        # Other backends keep using the LIKE search path
+        return
+    conn.execute(text(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5("
+        "name, description, content='products', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    ))
+    # External-content table: triggers mirror every write to products
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products BEGIN "
+        "INSERT INTO products_fts(rowid, name, description) "
+        "VALUES (new.id, new.name, new.description); END"
+    ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products BEGIN "
+        "INSERT INTO products_fts(products_fts, rowid, name, description) "
+        "VALUES ('delete', old.id, old.name, old.description); END"
+    ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS products_fts_update AFTER UPDATE OF name, description ON products BEGIN "
+        "INSERT INTO products_fts(products_fts, rowid, name, description) "
+        "VALUES ('delete', old.id, old.name, old.description); "
+        "INSERT INTO products_fts(rowid, name, description) "
+        "VALUES (new.id, new.name, new.description); END"
+    ))
+    conn.execute(text("INSERT INTO products_fts(products_fts) VALUES ('rebuild')"))
+
+
+@migration(3, "Catalog version counters for conditional HTTP responses")
+def add_catalog_versions(conn: Connection):
+    from src.services.catalog_version import catalog_versions, seed_catalog_versions
+    catalog_versions.create(conn, checkfirst=True)
+    seed_catalog_versions(conn)
+
+
+@migration(4, "Stock movement ledger with a baseline snapshot")
+def add_stock_ledger(conn: Connection):
+    from src.models.stock_movement import StockMovement, StockSnapshot, StockSnapshotItem
+    from src.services.stock_ledger import write_snapshot
+    for model in (StockMovement, StockSnapshot, StockSnapshotItem):
+        model.__table__.create(conn, checkfirst=True)
+    # Stock that predates the ledger enters history through this snapshot
+    if conn.scalar(text("SELECT COUNT(*) FROM stock_snapshots")) == 0:
+        write_snapshot(conn)
+
+
+@migration(5, "Reorder points and the maintained low-stock alert set")
+def add_stock_alerts(conn: Connection):
+    from src.models.stock_alert import StockAlert
+    from src.services.stock_alerts import rebuild_alerts
+    for table in ('products', 'categories'):
+        add_column(conn, table, 'reorder_point', 'INTEGER')
+        add_column(conn, table, 'reorder_quantity', 'INTEGER')
+    StockAlert.__table__.create(conn, checkfirst=True)
+    rebuild_alerts(conn)
+
+
+@migration(6, "Per-category totals maintained by triggers")
+def add_category_stats(conn: Connection):
+    if conn.dialect.name != 'sqlite':
+        # Other backends aggregate products when stats are read
+        return
+    from src.services.category_stats import (category_stats, install_stats_triggers,
+                                             rebuild_category_stats)
+    category_stats.create(conn, checkfirst=True)
+    install_stats_triggers(conn)
+    rebuild_category_stats(conn)
+
+
+@migration(7, "Category tree: parent links and the closure table")
+def add_category_tree(conn: Connection):
+    from src.models.category import CategoryClosure
+    from src.services.category_tree import rebuild_closure
+    add_column(conn, 'categories', 'parent_id', 'INTEGER REFERENCES categories(id)')
+    create_index(conn, 'ix_categories_parent_id', 'categories', ['parent_id'])
+    CategoryClosure.__table__.create(conn, checkfirst=True)
+    # Every existing category starts out as its own top-level tree
+    rebuild_closure(conn)
+
+
+@migration(8, "Warehouses with per-location stock")
+def add_warehouses(conn: Connection):
+    from src.models.warehouse import Warehouse, WarehouseStock
+    from src.services.warehouses import seed_default_warehouse
+    Warehouse.__table__.create(conn, checkfirst=True)
+    WarehouseStock.__table__.create(conn, checkfirst=True)
+    add_column(conn, 'stock_movements', 'warehouse_id', 'INTEGER')
+    # Existing stock starts out at the default warehouse
+    seed_default_warehouse(conn)
+
+
+@migration(9, "Product row versions and stock reservations")
+def add_stock_reservations(conn: Connection):
+    from src.models.stock_reservation import StockReservation
+    add_column(conn, 'products', 'version', 'INTEGER NOT NULL DEFAULT 1')
+    add_column(conn, 'products', 'reserved_quantity', 'INTEGER NOT NULL DEFAULT 0')
+    StockReservation.__table__.create(conn, checkfirst=True)
@@ -1,5 +1,5 @@
 # src/models/category.py
-from sqlalchemy import Column, Integer, String, func
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import relationship, validates
 from src.database.db_connection import Base
 
@@ -9,9 +9,16 @@ class Category(Base):
     id = Column(Integer, primary_key=True)
     name = Column(String(100), unique=True, nullable=False)
     description = Column(String(255))
+    # NULL for a top-level category; subtree queries go through category_closure
+    parent_id = Column(Integer, ForeignKey('categories.id'), index=True)
+    # Defaults for products in this category that set no reorder point of their own
+    reorder_point = Column(Integer)
+    reorder_quantity = Column(Integer)
     
     # Relationship with products
     products = relationship('Product', back_populates='category', cascade='all, delete-orphan')
+    parent = relationship('Category', remote_side=[id], back_populates='children')
+    children = relationship('Category', back_populates='parent')
     
     @validates('name')
     def validate_name(self, key, name):
@@ -21,5 +28,32 @@ class Category(Base):
             raise ValueError("Category name cannot exceed 100 characters")
         return name.strip()
     
+    @validates('reorder_point', 'reorder_quantity')
+    def validate_reorder(self, key, value):
+        if value is not None and value < 0:
+            raise ValueError(f"{key.replace('_', ' ').capitalize()} cannot be negative")
+        return value
+    
     def __repr__(self):
         return f"<Category(id={self.id}, name='{self.name}')>"
+
+
+class CategoryClosure(Base):
+    """
+    Every (ancestor, descendant) pair of the category tree, including each
+    category paired with itself at depth 0. A subtree is one index range
+    scan on ancestor_id, however deep or wide the tree is.
+    """
+    __tablename__ = 'category_closure'
+    __table_args__ = (
+        # Ancestors of a category, nearest first (breadcrumbs, moves)
+        Index('ix_category_closure_descendant_id_depth', 'descendant_id', 'depth'),
+    )
+
+    ancestor_id = Column(Integer, ForeignKey('categories.id'), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey('categories.id'), primary_key=True)
+    depth = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return (f"<CategoryClosure(ancestor_id={self.ancestor_id}, "
+                f"descendant_id={self.descendant_id}, depth={self.depth})>")
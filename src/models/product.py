@@ -1,40 +1,64 @@
 # src/models/product.py
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship, validates
 from src.database.db_connection import Base
+from src.utils.validators import PRODUCT_MODEL_CHECKS
 
 class Product(Base):
     __tablename__ = 'products'
+    __table_args__ = (
+        # Keep in sync with src/database/migrations.py for existing databases
+        Index('ix_products_name', 'name'),
+        Index('ix_products_category_id_price', 'category_id', 'price'),
+        Index('ix_products_price', 'price'),
+        Index('ix_products_stock_quantity', 'stock_quantity'),
+    )
     
     id = Column(Integer, primary_key=True)
     name = Column(String(100), nullable=False)
     description = Column(String(255))
     price = Column(Float, nullable=False)
     stock_quantity = Column(Integer, default=0)
+    # Alert when stock falls to reorder_point; NULL falls back to the category default
+    reorder_point = Column(Integer)
+    reorder_quantity = Column(Integer)
+    # Units held by active reservations; sales and stock removals only draw
+    # on stock_quantity - reserved_quantity
+    reserved_quantity = Column(Integer, nullable=False, default=0, server_default='0')
+    # Row version for optimistic concurrency. The ORM checks it on every
+    # flush; Core statements that write products increment it themselves.
+    version = Column(Integer, nullable=False, default=1, server_default='1')
     
     # Foreign key relationship with category
     category_id = Column(Integer, ForeignKey('categories.id'), nullable=False)
     category = relationship('Category', back_populates='products')
     
-    @validates('name')
-    def validate_name(self, key, name):
-        if not name or len(name.strip()) == 0:
-            raise ValueError("Product name cannot be empty")
-        if len(name) > 100:
-            raise ValueError("Product name cannot exceed 100 characters")
-        return name.strip()
+    __mapper_args__ = {'version_id_col': version}
     
-    @validates('price')
-    def validate_price(self, key, price):
-        if price < 0:
-            raise ValueError("Price cannot be negative")
-        return price
+    @validates('name', 'price', 'stock_quantity')
+    def validate_field(self, key, value):
+        # The PRODUCT_SCHEMA rules that hold for every product, however it is written
+        return PRODUCT_MODEL_CHECKS[key](value)
     
-    @validates('stock_quantity')
-    def validate_stock_quantity(self, key, stock_quantity):
-        if stock_quantity < 0:
-            raise ValueError("Stock quantity cannot be negative")
-        return stock_quantity
+    @validates('reorder_point', 'reorder_quantity')
+    def validate_reorder(self, key, value):
+        if value is not None and value < 0:
+            raise ValueError(f"{key.replace('_', ' ').capitalize()} cannot be negative")
+        return value
+    
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'name': self.name,
+            'description': self.description,
+            'price': self.price,
+            'stock_quantity': self.stock_quantity,
+            'category_id': self.category_id,
+            'reorder_point': self.reorder_point,
+            'reorder_quantity': self.reorder_quantity,
+            'reserved_quantity': self.reserved_quantity,
+            'version': self.version,
+        }
     
     def __repr__(self):
         return f"<Product(id={self.id}, name='{self.name}', stock={self.stock_quantity})>"
\ No newline at end of file
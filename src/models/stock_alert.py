@@ -0,0 +1,39 @@
+# src/models/stock_alert.py
+from sqlalchemy import Column, DateTime, Index, Integer
+from src.database.db_connection import Base
+from src.models.stock_movement import utcnow
+
+
+class StockAlert(Base):
+    """
+    One row per product currently at or below its reorder point. Maintained
+    incrementally by every stock write, so listing alerts never scans products.
+    """
+    __tablename__ = 'stock_alerts'
+    __table_args__ = (
+        # Most urgent first: lowest stock, then id for stable paging
+        Index('ix_stock_alerts_stock_quantity', 'stock_quantity', 'product_id'),
+    )
+
+    product_id = Column(Integer, primary_key=True)
+    stock_quantity = Column(Integer, nullable=False)
+    reorder_point = Column(Integer, nullable=False)
+    reorder_quantity = Column(Integer)
+    raised_at = Column(DateTime, nullable=False, default=utcnow)
+
+    @property
+    def shortfall(self) -> int:
+        return self.reorder_point - self.stock_quantity
+
+    def to_dict(self) -> dict:
+        return {
+            'product_id': self.product_id,
+            'stock_quantity': self.stock_quantity,
+            'reorder_point': self.reorder_point,
+            'reorder_quantity': self.reorder_quantity,
+            'raised_at': self.raised_at.isoformat() if self.raised_at else None,
+        }
+
+    def __repr__(self):
+        return (f"<StockAlert(product_id={self.product_id}, stock={self.stock_quantity}, "
+                f"reorder_point={self.reorder_point})>")
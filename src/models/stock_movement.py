@@ -0,0 +1,75 @@
+# src/models/stock_movement.py
+from datetime import datetime, timezone
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import relationship
+from src.database.db_connection import Base
+
+
+def utcnow() -> datetime:
+    # Stored naive, always UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class StockMovement(Base):
+    """
+    Append-only stock ledger. Rows are never updated or deleted; the
+    product's stock_quantity is the running total of its movements.
+    product_id deliberately has no foreign key so history outlives products.
+    """
+    __tablename__ = 'stock_movements'
+    __table_args__ = (
+        # Per-product replay after a snapshot watermark, and time-range scans
+        Index('ix_stock_movements_product_id_id', 'product_id', 'id'),
+        Index('ix_stock_movements_created_at', 'created_at'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    product_id = Column(Integer, nullable=False)
+    quantity_change = Column(Integer, nullable=False)
+    # Location the change was booked at; NULL for product-wide entries
+    warehouse_id = Column(Integer)
+    reason = Column(String(50), nullable=False, default='adjustment')
+    actor = Column(String(100))
+    created_at = Column(DateTime, nullable=False, default=utcnow)
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'product_id': self.product_id,
+            'quantity_change': self.quantity_change,
+            'warehouse_id': self.warehouse_id,
+            'reason': self.reason,
+            'actor': self.actor,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
+
+    def __repr__(self):
+        return (f"<StockMovement(id={self.id}, product_id={self.product_id}, "
+                f"change={self.quantity_change}, reason='{self.reason}')>")
+
+
+class StockSnapshot(Base):
+    """
+    Stock of every product as of a point in the ledger. Replaying only the
+    movements after last_movement_id bounds the cost of "as of" queries.
+    """
+    __tablename__ = 'stock_snapshots'
+
+    id = Column(Integer, primary_key=True)
+    taken_at = Column(DateTime, nullable=False, default=utcnow, index=True)
+    last_movement_id = Column(Integer, nullable=False, default=0)
+    product_count = Column(Integer, nullable=False, default=0)
+
+    items = relationship('StockSnapshotItem', cascade='all, delete-orphan')
+
+    def __repr__(self):
+        return (f"<StockSnapshot(id={self.id}, taken_at={self.taken_at}, "
+                f"last_movement_id={self.last_movement_id})>")
+
+
+class StockSnapshotItem(Base):
+    __tablename__ = 'stock_snapshot_items'
+
+    snapshot_id = Column(Integer, ForeignKey('stock_snapshots.id'), primary_key=True)
+    product_id = Column(Integer, primary_key=True)
+    stock_quantity = Column(Integer, nullable=False)
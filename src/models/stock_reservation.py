@@ -0,0 +1,53 @@
+# src/models/stock_reservation.py
+from sqlalchemy import Column, DateTime, Index, Integer, String
+from src.database.db_connection import Base
+from src.models.stock_movement import utcnow
+
+RESERVATION_ACTIVE = 'active'
+RESERVATION_COMMITTED = 'committed'
+RESERVATION_RELEASED = 'released'
+RESERVATION_EXPIRED = 'expired'
+
+
+class StockReservation(Base):
+    """
+    Stock held for an order until it is committed, released or expires.
+    Active rows are summed into products.reserved_quantity; closed rows stay
+    as history. No foreign key, like the ledger, so they outlive products.
+    """
+    __tablename__ = 'stock_reservations'
+    __table_args__ = (
+        # The sweeper's scan: active reservations past their expiry
+        Index('ix_stock_reservations_status_expires_at', 'status', 'expires_at'),
+        Index('ix_stock_reservations_product_id', 'product_id'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    product_id = Column(Integer, nullable=False)
+    # Where the stock ships from on commit; NULL means the default warehouse
+    warehouse_id = Column(Integer)
+    quantity = Column(Integer, nullable=False)
+    status = Column(String(20), nullable=False, default=RESERVATION_ACTIVE)
+    reference = Column(String(100))
+    actor = Column(String(100))
+    created_at = Column(DateTime, nullable=False, default=utcnow)
+    expires_at = Column(DateTime, nullable=False)
+    closed_at = Column(DateTime)
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'product_id': self.product_id,
+            'warehouse_id': self.warehouse_id,
+            'quantity': self.quantity,
+            'status': self.status,
+            'reference': self.reference,
+            'actor': self.actor,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
+            'closed_at': self.closed_at.isoformat() if self.closed_at else None,
+        }
+
+    def __repr__(self):
+        return (f"<StockReservation(id={self.id}, product_id={self.product_id}, "
+                f"quantity={self.quantity}, status='{self.status}')>")
@@ -0,0 +1,63 @@
+# src/models/warehouse.py
+from sqlalchemy import Column, Index, Integer, String
+from sqlalchemy.orm import validates
+from src.database.db_connection import Base
+
+
+class Warehouse(Base):
+    """
+    A stock location. `shard` picks the attached database holding its
+    stock rows (see WAREHOUSE_STOCK_SHARDS); NULL keeps them in the main file.
+    """
+    __tablename__ = 'warehouses'
+
+    id = Column(Integer, primary_key=True)
+    code = Column(String(20), unique=True, nullable=False)
+    name = Column(String(100), nullable=False)
+    shard = Column(Integer)
+
+    @validates('code')
+    def validate_code(self, key, code):
+        code = (code or '').strip().upper()
+        if not code:
+            raise ValueError("Warehouse code cannot be empty")
+        if len(code) > 20:
+            raise ValueError("Warehouse code must be at most 20 characters")
+        return code
+
+    @validates('name')
+    def validate_name(self, key, name):
+        name = (name or '').strip()
+        if not name:
+            raise ValueError("Warehouse name cannot be empty")
+        return name
+
+    def to_dict(self) -> dict:
+        return {'id': self.id, 'code': self.code, 'name': self.name, 'shard': self.shard}
+
+    def __repr__(self):
+        return f"<Warehouse(id={self.id}, code='{self.code}')>"
+
+
+class WarehouseStock(Base):
+    """
+    Stock of one product at one warehouse. products.stock_quantity is
+    maintained as the sum of a product's rows, so listings never add
+    them up. No foreign keys: rows may live in an attached shard database,
+    and SQLite cannot enforce keys across database files.
+    """
+    __tablename__ = 'warehouse_stock'
+    __table_args__ = (
+        # A product's stock across locations (availability, deletes)
+        Index('ix_warehouse_stock_product_id', 'product_id'),
+        # Lowest stock first within a warehouse (per-location low stock)
+        Index('ix_warehouse_stock_warehouse_id_quantity', 'warehouse_id', 'quantity'),
+    )
+
+    warehouse_id = Column(Integer, primary_key=True)
+    product_id = Column(Integer, primary_key=True)
+    quantity = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return (f"<WarehouseStock(warehouse_id={self.warehouse_id}, product_id={self.product_id}, "
+                f"quantity={self.quantity})>")
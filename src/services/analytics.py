@@ -0,0 +1,226 @@
+# src/services/analytics.py
+from datetime import timedelta
+from typing import Any, Dict, List, NamedTuple, Optional
+import numpy as np
+from sqlalchemy import func, inspect, literal, select
+from sqlalchemy.engine import Connection
+from src.database.db_connection import DatabaseConnection
+from src.models.category import Category
+from src.models.product import Product
+from src.models.stock_movement import StockMovement, utcnow
+from src.services.stock_ledger import REASON_DELETED
+
+DEFAULT_WINDOW_DAYS = 30
+DEFAULT_HISTOGRAM_BINS = 20
+# Cumulative share of inventory value that closes classes A and B
+ABC_THRESHOLDS = (0.80, 0.95)
+LOW_COVER_DAYS = 7.0
+
+COLUMN_DTYPE = np.dtype([('product_id', np.int64), ('price', np.float64), ('stock', np.int64),
+                         ('category_id', np.int64), ('outflow', np.int64)])
+
+
+class InventoryColumns(NamedTuple):
+    """Catalog columns as parallel arrays, one element per product"""
+    product_id: np.ndarray
+    price: np.ndarray
+    stock: np.ndarray
+    category_id: np.ndarray
+    # Units that left stock during the window; zeros without a ledger
+    outflow: np.ndarray
+    category_names: Dict[int, str]
+    window_days: int
+    has_ledger: bool
+
+    @property
+    def value(self) -> np.ndarray:
+        return self.price * self.stock
+
+    def __len__(self) -> int:
+        return len(self.product_id)
+
+
+def _ledger_available(conn: Connection) -> bool:
+    return inspect(conn).has_table(StockMovement.__tablename__)
+
+
+def load_inventory_columns(conn: Connection, window_days: int = DEFAULT_WINDOW_DAYS) -> InventoryColumns:
+    """
+    Fetch every product with its recent outflow in a single scan and turn
+    the result into column arrays
+    """
+    if window_days < 1:
+        raise ValueError("Window must be at least one day")
+    has_ledger = _ledger_available(conn)
+    stmt = select(Product.id, Product.price, func.coalesce(Product.stock_quantity, 0),
+                  Product.category_id)
+    if has_ledger:
+        # Sales, write-offs and transfers out; deleting a product is not usage
+        outflow = (select(StockMovement.product_id,
+                          func.sum(-StockMovement.quantity_change).label('units'))
+                   .where(StockMovement.quantity_change < 0,
+                          StockMovement.reason != REASON_DELETED,
+                          StockMovement.created_at >= utcnow() - timedelta(days=window_days))
+                   .group_by(StockMovement.product_id)
+                   .subquery())
+        stmt = (stmt.add_columns(func.coalesce(outflow.c.units, 0))
+                .outerjoin(outflow, outflow.c.product_id == Product.id))
+    else:
+        stmt = stmt.add_columns(literal(0))
+
+    # Every column is numeric and needs no result processing, so read the
+    # DBAPI tuples directly: building a Row per product costs more than the query
+    rows = conn.execute(stmt).cursor.fetchall()
+    data = np.array(rows, dtype=COLUMN_DTYPE) if rows else np.empty(0, dtype=COLUMN_DTYPE)
+    # A few dozen categories: names are cheaper as their own lookup than per row
+    names = dict(conn.execute(select(Category.id, Category.name)).all())
+    return InventoryColumns(
+        product_id=data['product_id'],
+        price=data['price'],
+        stock=data['stock'],
+        category_id=data['category_id'],
+        outflow=data['outflow'],
+        category_names={int(cid): names.get(int(cid)) or f'Category {cid}'
+                        for cid in np.unique(data['category_id'])},
+        window_days=window_days,
+        has_ledger=has_ledger,
+    )
+
+
+def valuation_by_category(columns: InventoryColumns) -> List[Dict[str, Any]]:
+    """
+    Inventory value, units and product count per category, largest first
+    """
+    categories, index = np.unique(columns.category_id, return_inverse=True)
+    value = np.bincount(index, weights=columns.value, minlength=len(categories))
+    units = np.bincount(index, weights=columns.stock, minlength=len(categories))
+    products = np.bincount(index, minlength=len(categories))
+    order = np.argsort(-value, kind='stable')
+    return [{
+        'category_id': int(categories[i]),
+        'category_name': columns.category_names[int(categories[i])],
+        'value': round(float(value[i]), 2),
+        'units': int(units[i]),
+        'products': int(products[i]),
+    } for i in order]
+
+
+def abc_classes(value: np.ndarray, thresholds=ABC_THRESHOLDS) -> np.ndarray:
+    """
+    Label each product A, B or C by where it falls in the cumulative share
+    of inventory value, most valuable first. A product belongs to the class
+    in which its value starts, so the first product is always an A.
+    """
+    labels = np.full(len(value), 'C', dtype='<U1')
+    total = value.sum()
+    if total <= 0:
+        return labels
+    order = np.argsort(-value, kind='stable')
+    share_before = (np.cumsum(value[order]) - value[order]) / total
+    sorted_labels = np.where(share_before < thresholds[0], 'A',
+                             np.where(share_before < thresholds[1], 'B', 'C'))
+    labels[order] = sorted_labels
+    # Products without value carry no inventory weight at all
+    labels[value <= 0] = 'C'
+    return labels
+
+
+def abc_summary(columns: InventoryColumns, thresholds=ABC_THRESHOLDS) -> Dict[str, Any]:
+    labels = abc_classes(columns.value, thresholds)
+    value = columns.value
+    total = float(value.sum())
+    summary = {}
+    for label in ('A', 'B', 'C'):
+        mask = labels == label
+        class_value = float(value[mask].sum())
+        summary[label] = {
+            'products': int(mask.sum()),
+            'value': round(class_value, 2),
+            'value_share': class_value / total if total else 0.0,
+        }
+    return {'thresholds': list(thresholds), 'classes': summary}
+
+
+def days_of_cover(columns: InventoryColumns) -> np.ndarray:
+    """
+    Days current stock lasts at the average daily outflow of the window;
+    inf where nothing went out
+    """
+    daily_usage = columns.outflow / columns.window_days
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cover = np.where(daily_usage > 0, columns.stock / daily_usage, np.inf)
+    return cover
+
+
+def cover_summary(columns: InventoryColumns, low_cover_days: float = LOW_COVER_DAYS,
+                  top: int = 10) -> Dict[str, Any]:
+    cover = days_of_cover(columns)
+    moving = np.isfinite(cover)
+    low = np.flatnonzero(cover < low_cover_days)
+    lowest = low[np.argsort(cover[low], kind='stable')][:top]
+    percentiles = (np.percentile(cover[moving], [10, 50, 90]).tolist()
+                   if moving.any() else [None, None, None])
+    return {
+        'window_days': columns.window_days,
+        'ledger_available': columns.has_ledger,
+        'moving_products': int(moving.sum()),
+        'p10_days': percentiles[0],
+        'median_days': percentiles[1],
+        'p90_days': percentiles[2],
+        'low_cover_days': low_cover_days,
+        'low_cover_products': int(len(low)),
+        'lowest': [{'product_id': int(columns.product_id[i]), 'stock_quantity': int(columns.stock[i]),
+                    'days_of_cover': round(float(cover[i]), 2)} for i in lowest],
+    }
+
+
+def price_histogram(price: np.ndarray, bins: int = DEFAULT_HISTOGRAM_BINS,
+                    scale: str = 'linear') -> Dict[str, Any]:
+    """
+    Product counts per price bucket; log scale suits long-tailed catalogs
+    """
+    if bins < 1:
+        raise ValueError("Histogram needs at least one bin")
+    if scale not in ('linear', 'log'):
+        raise ValueError("Histogram scale must be 'linear' or 'log'")
+    if not len(price):
+        return {'scale': scale, 'edges': [], 'counts': []}
+    if scale == 'log':
+        positive = price[price > 0]
+        if not len(positive):
+            raise ValueError("Log scale needs positive prices")
+        low, high = positive.min(), positive.max()
+        edges = np.geomspace(low, high if high > low else low * 10, bins + 1)
+        counts, edges = np.histogram(positive, bins=edges)
+    else:
+        counts, edges = np.histogram(price, bins=bins)
+    return {'scale': scale, 'edges': [round(float(edge), 2) for edge in edges],
+            'counts': counts.tolist()}
+
+
+class InventoryAnalytics:
+    """
+    Catalog-wide analytics computed on column arrays rather than by
+    looping over Product objects
+    """
+    def __init__(self):
+        self.db = DatabaseConnection()
+
+    def load_columns(self, window_days: int = DEFAULT_WINDOW_DAYS) -> InventoryColumns:
+        with self.db.session_scope() as session:
+            return load_inventory_columns(session.connection(), window_days)
+
+    def report(self, window_days: int = DEFAULT_WINDOW_DAYS, bins: int = DEFAULT_HISTOGRAM_BINS,
+               scale: str = 'linear', top: int = 10,
+               columns: Optional[InventoryColumns] = None) -> Dict[str, Any]:
+        columns = columns if columns is not None else self.load_columns(window_days)
+        value = columns.value
+        return {
+            'products': len(columns),
+            'total_value': round(float(value.sum()), 2),
+            'total_units': int(columns.stock.sum()),
+            'valuation_by_category': valuation_by_category(columns),
+            'abc': abc_summary(columns),
+            'days_of_cover': cover_summary(columns, top=top),
+            'price_histogram': price_histogram(columns.price, bins, scale),
+        }
@@ -0,0 +1,229 @@
+# src/services/async_product_service.py
+import asyncio
+from typing import Iterable, List, Optional
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from src.database.async_db import AsyncDatabaseConnection
+from src.models.product import Product
+from src.services.cache import get_cache
+from src.services.catalog_version import bump_catalog_version
+from src.services.concurrency import async_retry_on_conflict, is_conflict
+from src.services.stock_ledger import (REASON_ADJUSTMENT, REASON_DELETED, REASON_INITIAL,
+                                       record_movements)
+from src.services.stock_alerts import StockAlertEvent, alerts_table, dispatch_alert_events, refresh_alerts
+from src.services.full_text_search import fts_table_exists
+from src.services.warehouses import (add_location_stock, change_location_stock, remove_product_stock,
+                                     resolve_warehouse)
+from src.services.product_service import (DEFAULT_CATEGORY_LOADER, apply_search_filters,
+                                          category_loader_option, product_id_key, product_name_key)
+from src.utils.pagination import (Page, DEFAULT_PAGE_SIZE, clamp_page_size, decode_cursor,
+                                  decode_cursor_payload, encode_cursor)
+
+
+def publish_write(events: List[StockAlertEvent], cache_keys: Iterable[str]):
+    """Dispatch a committed write's alert events and drop its cache entries"""
+    dispatch_alert_events(events)
+    get_cache().delete(*cache_keys)
+
+
+class AsyncProductService:
+    """
+    asyncio counterpart of ProductService for the ASGI API. Writes invalidate
+    the shared catalog cache the same way; reads go straight to the database
+    so a remote cache backend can never block the event loop. After a
+    commit, cache deletes and alert hooks (a RedisCache, the webhook sink)
+    run in a worker thread for the same reason.
+    """
+    def __init__(self, category_loader: str = DEFAULT_CATEGORY_LOADER):
+        self.db = AsyncDatabaseConnection()
+        self.category_option = category_loader_option(category_loader)
+
+    async def create_product(self, name: str, price: float, category_id: int,
+                             description: Optional[str] = None,
+                             stock_quantity: int = 0, actor: Optional[str] = None,
+                             warehouse_id: Optional[int] = None) -> Product:
+        try:
+            async with self.db.session_scope() as session:
+                product = Product(
+                    name=name,
+                    price=price,
+                    category_id=category_id,
+                    description=description,
+                    stock_quantity=stock_quantity
+                )
+                session.add(product)
+                await session.flush()
+                location_id, location = await session.run_sync(resolve_warehouse, warehouse_id)
+                await session.run_sync(add_location_stock, location_id, location,
+                                       [(product.id, product.stock_quantity or 0)])
+                await session.run_sync(record_movements, [(product.id, product.stock_quantity or 0)],
+                                       REASON_INITIAL, actor, location_id)
+                events = await session.run_sync(refresh_alerts, [product.id])
+                await session.run_sync(bump_catalog_version, 'products')
+        except (IntegrityError, ValueError) as e:
+            raise ValueError(f"Error creating product: {str(e)}")
+        await asyncio.to_thread(publish_write, events,
+                                [product_id_key(product.id), product_name_key(product.name)])
+        return product
+
+    @async_retry_on_conflict()
+    async def delete_product(self, product_id: int, actor: Optional[str] = None) -> bool:
+        try:
+            async with self.db.session_scope() as session:
+                product = await session.get(Product, product_id)
+                if not product:
+                    raise ValueError(f"Product with id {product_id} not found")
+                await session.run_sync(record_movements, [(product.id, -(product.stock_quantity or 0))],
+                                       REASON_DELETED, actor)
+                await session.run_sync(remove_product_stock, [product.id])
+                await session.delete(product)
+                await session.flush()
+                events = await session.run_sync(refresh_alerts, [product.id])
+                await session.run_sync(bump_catalog_version, 'products')
+        except SQLAlchemyError as e:
+            if is_conflict(e):
+                raise
+            raise ValueError(f"Error deleting product: {str(e)}")
+        await asyncio.to_thread(publish_write, events,
+                                [product_id_key(product.id), product_name_key(product.name)])
+        return True
+
+    async def find_product_by_id(self, product_id: int) -> Optional[Product]:
+        async with self.db.session_scope() as session:
+            result = await session.execute(
+                select(Product).options(self.category_option).where(Product.id == product_id)
+            )
+            return result.scalars().first()
+
+    async def get_products_page(self, cursor: Optional[str] = None,
+                                page_size: int = DEFAULT_PAGE_SIZE) -> Page[Product]:
+        """
+        Keyset-paginated product listing ordered by id.
+        """
+        page_size = clamp_page_size(page_size)
+        after_id = decode_cursor(cursor)
+        async with self.db.session_scope() as session:
+            result = await session.execute(
+                select(Product)
+                .options(self.category_option)
+                .where(Product.id > after_id)
+                .order_by(Product.id.asc())
+                .limit(page_size + 1)
+            )
+            return Page.from_rows(result.scalars().all(), page_size)
+
+    @async_retry_on_conflict()
+    async def update_stock(self, product_id: int, quantity_change: int,
+                           reason: str = REASON_ADJUSTMENT, actor: Optional[str] = None,
+                           warehouse_id: Optional[int] = None) -> Product:
+        """
+        Atomically apply a stock delta with a single conditional UPDATE,
+        booked at `warehouse_id` (default warehouse if None). Removals
+        cannot take reserved units.
+        """
+        floor = Product.reserved_quantity if quantity_change < 0 else 0
+        try:
+            async with self.db.session_scope() as session:
+                result = await session.execute(
+                    update(Product)
+                    .where(Product.id == product_id,
+                           Product.stock_quantity + quantity_change >= floor)
+                    .values(stock_quantity=Product.stock_quantity + quantity_change,
+                            version=Product.version + 1)
+                    .returning(Product)
+                )
+                product = result.scalar_one_or_none()
+                if product is None:
+                    row = (await session.execute(select(Product.stock_quantity, Product.reserved_quantity)
+                                                 .where(Product.id == product_id))).first()
+                    if row is None:
+                        raise ValueError(f"Product with id {product_id} not found")
+                    if (row.stock_quantity or 0) + quantity_change >= 0:
+                        raise ValueError(f"Stock cannot drop below the {row.reserved_quantity} "
+                                         f"reserved unit(s)")
+                    raise ValueError("Stock cannot be negative")
+                location_id, location = await session.run_sync(resolve_warehouse, warehouse_id)
+                await session.run_sync(change_location_stock, location_id, location, product_id,
+                                       quantity_change)
+                await session.run_sync(record_movements, [(product_id, quantity_change)], reason, actor,
+                                       location_id)
+                events = await session.run_sync(refresh_alerts, [product_id])
+                await session.run_sync(bump_catalog_version, 'products')
+        except SQLAlchemyError as e:
+            if is_conflict(e):
+                raise
+            raise ValueError(f"Error updating stock: {str(e)}")
+        await asyncio.to_thread(publish_write, events, [product_id_key(product_id)])
+        return product
+
+    async def get_low_stock_products(self, threshold: Optional[int] = None) -> List[Product]:
+        """
+        Products with an open stock alert, lowest stock first; an explicit
+        threshold scans stock instead
+        """
+        stmt = select(Product).options(self.category_option)
+        if threshold is None:
+            stmt = (stmt.join(alerts_table, alerts_table.c.product_id == Product.id)
+                    .order_by(alerts_table.c.stock_quantity.asc(), alerts_table.c.product_id.asc()))
+        else:
+            stmt = stmt.where(Product.stock_quantity <= threshold)
+        async with self.db.session_scope() as session:
+            result = await session.execute(stmt)
+            return list(result.scalars().all())
+
+
+class AsyncAdvancedProductSearch:
+    """asyncio counterpart of AdvancedProductSearch"""
+    def __init__(self, category_loader: str = DEFAULT_CATEGORY_LOADER):
+        self.db = AsyncDatabaseConnection()
+        self.category_option = category_loader_option(category_loader)
+        self._fts_available: Optional[bool] = None
+
+    async def fts_available(self) -> bool:
+        if self._fts_available is None:
+            async with self.db.engine.connect() as conn:
+                self._fts_available = await conn.run_sync(fts_table_exists)
+        return self._fts_available
+
+    async def search_products_page(self,
+                                   name: Optional[str] = None,
+                                   min_price: Optional[float] = None,
+                                   max_price: Optional[float] = None,
+                                   category_id: Optional[int] = None,
+                                   min_stock: Optional[int] = None,
+                                   max_stock: Optional[int] = None,
+                                   q: Optional[str] = None,
+                                   cursor: Optional[str] = None,
+                                   page_size: int = DEFAULT_PAGE_SIZE,
+                                   include_descendants: bool = False) -> Page[Product]:
+        """
+        Keyset-paginated search ordered by id, or by (relevance, id) for
+        full-text queries; same filters as AdvancedProductSearch.
+        """
+        page_size = clamp_page_size(page_size)
+        position = decode_cursor_payload(cursor)
+        after_id = position['after_id']
+        use_fts = bool(q) and await self.fts_available()
+        stmt, score = apply_search_filters(
+            select(Product).options(self.category_option),
+            name, min_price, max_price, category_id, min_stock, max_stock, q, use_fts=use_fts,
+            include_descendants=include_descendants
+        )
+        async with self.db.session_scope() as session:
+            if score is None:
+                result = await session.execute(
+                    stmt.where(Product.id > after_id).order_by(Product.id.asc()).limit(page_size + 1)
+                )
+                return Page.from_rows(result.scalars().all(), page_size)
+
+            stmt = stmt.add_columns(score)
+            if 'score' in position:
+                stmt = stmt.where(or_(score > position['score'],
+                                      and_(score == position['score'], Product.id > after_id)))
+            result = await session.execute(
+                stmt.order_by(score.asc(), Product.id.asc()).limit(page_size + 1)
+            )
+            page = Page.from_rows(result.all(), page_size,
+                                  cursor_for=lambda row: encode_cursor(row[0].id, score=row[1]))
+            page.items = [product for product, _ in page.items]
+            return page
@@ -0,0 +1,270 @@
+# src/services/cache.py
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional
+from sqlalchemy import event
+
+DEFAULT_MAX_SIZE = 10000
+DEFAULT_TTL = 300
+
+# Distinguishes "not cached" from a cached None (negative lookups are cached too)
+MISSING = object()
+
+
+class CacheStats:
+    """Thread-safe hit/miss/eviction counters"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def incr(self, counter: str, amount: int = 1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'sets': self.sets,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
+
+
+class CacheBackend:
+    """
+    Interface for catalog caches. Implementations store arbitrary values
+    (including None) and return MISSING for absent or expired keys.
+    """
+    def __init__(self):
+        self.stats = CacheStats()
+
+    def get(self, key: str) -> Any:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any):
+        raise NotImplementedError
+
+    def delete(self, *keys: str):
+        raise NotImplementedError
+
+    def delete_prefix(self, prefix: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        """
+        Read-through lookup: return the cached value or load, store and return it.
+        Cached values are shared across threads, so `loader` must open its own
+        short-lived session rather than load through a request's session.
+        """
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+        value = loader()
+        self.set(key, value)
+        return value
+
+
+class NullCache(CacheBackend):
+    """Caching disabled: every lookup is a miss"""
+    def get(self, key: str) -> Any:
+        self.stats.incr('misses')
+        return MISSING
+
+    def set(self, key: str, value: Any):
+        pass
+
+    def delete(self, *keys: str):
+        pass
+
+    def delete_prefix(self, prefix: str):
+        pass
+
+    def clear(self):
+        pass
+
+
+class LRUCache(CacheBackend):
+    """In-process LRU cache bounded by entry count and per-entry TTL"""
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, ttl: Optional[float] = DEFAULT_TTL):
+        super().__init__()
+        if max_size < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: 'OrderedDict[str, tuple[Optional[float], Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.stats.incr('hits')
+                    return value
+                del self._entries[key]
+                self.stats.incr('expirations')
+        self.stats.incr('misses')
+        return MISSING
+
+    def set(self, key: str, value: Any):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                evicted += 1
+        self.stats.incr('sets')
+        if evicted:
+            self.stats.incr('evictions', evicted)
+
+    def delete(self, *keys: str):
+        removed = 0
+        with self._lock:
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    removed += 1
+        if removed:
+            self.stats.incr('invalidations', removed)
+
+    def delete_prefix(self, prefix: str):
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+        self.delete(*keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCache(CacheBackend):
+    """
+    Cache backed by any Redis-compatible client exposing get, set(ex=),
+    delete and scan_iter (redis-py, fakeredis, a local stand-in, ...).
+    Values are pickled; Redis itself handles TTL expiry and eviction.
+    """
+    def __init__(self, client, prefix: str = 'inventory:', ttl: Optional[int] = DEFAULT_TTL):
+        super().__init__()
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def get(self, key: str) -> Any:
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            self.stats.incr('misses')
+            return MISSING
+        self.stats.incr('hits')
+        return pickle.loads(raw)
+
+    def set(self, key: str, value: Any):
+        self.client.set(self.prefix + key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+                        ex=int(self.ttl) if self.ttl else None)
+        self.stats.incr('sets')
+
+    def delete(self, *keys: str):
+        if keys:
+            removed = self.client.delete(*(self.prefix + key for key in keys))
+            self.stats.incr('invalidations', int(removed or 0))
+
+    def delete_prefix(self, prefix: str):
+        keys = list(self.client.scan_iter(match=f'{self.prefix}{prefix}*'))
+        if keys:
+            removed = self.client.delete(*keys)
+            self.stats.incr('invalidations', int(removed or 0))
+
+    def clear(self):
+        self.delete_prefix('')
+
+
+def cache_from_env() -> CacheBackend:
+    """
+    Build the cache from CACHE_BACKEND (memory | redis | none),
+    CACHE_MAX_SIZE, CACHE_TTL and REDIS_URL
+    """
+    backend = os.getenv('CACHE_BACKEND', 'memory').lower()
+    ttl = float(os.getenv('CACHE_TTL', DEFAULT_TTL))
+    if backend == 'none':
+        return NullCache()
+    if backend == 'memory':
+        return LRUCache(max_size=int(os.getenv('CACHE_MAX_SIZE', DEFAULT_MAX_SIZE)), ttl=ttl)
+    if backend == 'redis':
+        try:
+            import redis
+        except ImportError:
+            raise ValueError("CACHE_BACKEND=redis requires the 'redis' package")
+        client = redis.Redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+        return RedisCache(client, ttl=int(ttl))
+    raise ValueError(f"Unknown cache backend '{backend}'. Choose from: memory, redis, none")
+
+
+_cache: Optional[CacheBackend] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> CacheBackend:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = cache_from_env()
+    return _cache
+
+
+def set_cache(cache: CacheBackend):
+    """Swap the process-wide cache, e.g. for a Redis stand-in"""
+    global _cache
+    _cache = cache
+
+
+def invalidate_on_commit(session, keys: Iterable[str] = (), prefixes: Iterable[str] = ()):
+    """
+    Drop cache entries now and again once the session commits, so a reader
+    that repopulates an entry before the commit can't leave it stale.
+    """
+    keys, prefixes = list(keys), list(prefixes)
+    cache = get_cache()
+    if keys:
+        cache.delete(*keys)
+    for prefix in prefixes:
+        cache.delete_prefix(prefix)
+    pending = session.info.setdefault('cache_invalidations', [])
+    pending.append((keys, prefixes))
+    if not event.contains(session, 'after_commit', _flush_invalidations):
+        event.listen(session, 'after_commit', _flush_invalidations)
+        event.listen(session, 'after_rollback', _discard_invalidations)
+
+
+def _flush_invalidations(session):
+    cache = get_cache()
+    for keys, prefixes in session.info.pop('cache_invalidations', []):
+        if keys:
+            cache.delete(*keys)
+        for prefix in prefixes:
+            cache.delete_prefix(prefix)
+
+
+def _discard_invalidations(session):
+    session.info.pop('cache_invalidations', None)
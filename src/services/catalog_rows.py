@@ -0,0 +1,129 @@
+# src/services/catalog_rows.py
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from sqlalchemy import select
+from src.database.db_connection import DatabaseConnection
+from src.models.category import Category
+from src.models.product import Product
+from src.services.category_tree import category_filter
+from src.utils.pagination import DEFAULT_PAGE_SIZE, clamp_page_size, decode_cursor, encode_cursor
+
+# Selectable fields per resource, in default output order
+PRODUCT_FIELDS = {
+    'id': Product.id,
+    'name': Product.name,
+    'description': Product.description,
+    'price': Product.price,
+    'stock_quantity': Product.stock_quantity,
+    'category_id': Product.category_id,
+    'reorder_point': Product.reorder_point,
+    'reorder_quantity': Product.reorder_quantity,
+    'category_name': Category.name.label('category_name'),
+}
+CATEGORY_FIELDS = {
+    'id': Category.id,
+    'name': Category.name,
+    'description': Category.description,
+    'parent_id': Category.parent_id,
+    'reorder_point': Category.reorder_point,
+    'reorder_quantity': Category.reorder_quantity,
+}
+MAX_BULK_SIZE = 1000
+
+
+def parse_fields(spec: Optional[str], available: Dict[str, Any]) -> List[str]:
+    """
+    Turn "?fields=id,name" into a list of known field names. The id is
+    always included because pagination cursors are built from it.
+    """
+    if not spec:
+        return list(available)
+    fields = []
+    for name in (part.strip() for part in spec.split(',')):
+        if not name or name in fields:
+            continue
+        if name not in available:
+            raise ValueError(f"Unknown field '{name}'. Choose from: {', '.join(available)}")
+        fields.append(name)
+    if 'id' not in fields:
+        fields.insert(0, 'id')
+    return fields
+
+
+def parse_ids(values: Iterable[Any], limit: int = MAX_BULK_SIZE) -> List[int]:
+    """
+    Validate a list of ids, dropping duplicates but keeping request order
+    """
+    ids: List[int] = []
+    seen = set()
+    for value in values:
+        try:
+            product_id = int(value)
+        except (ValueError, TypeError):
+            raise ValueError(f"Invalid id '{value}'")
+        if product_id not in seen:
+            seen.add(product_id)
+            ids.append(product_id)
+    if len(ids) > limit:
+        raise ValueError(f"At most {limit} ids can be requested at once")
+    return ids
+
+
+class RowPage(NamedTuple):
+    """A page of Core result tuples and the field names they carry"""
+    fields: List[str]
+    rows: List[Tuple]
+    next_cursor: Optional[str]
+
+
+class CatalogRowService:
+    """
+    Read-only catalog queries for the JSON API. Only the requested columns
+    are selected and rows stay plain tuples, so no ORM objects are built.
+    """
+    def __init__(self):
+        self.db = DatabaseConnection()
+
+    def _product_select(self, fields: Sequence[str]):
+        stmt = select(*(PRODUCT_FIELDS[name] for name in fields))
+        if 'category_name' in fields:
+            stmt = stmt.outerjoin(Category, Product.category_id == Category.id)
+        return stmt
+
+    def products_page(self, fields: Sequence[str], cursor: Optional[str] = None,
+                      page_size: int = DEFAULT_PAGE_SIZE,
+                      category_id: Optional[int] = None,
+                      include_descendants: bool = False) -> RowPage:
+        page_size = clamp_page_size(page_size)
+        stmt = self._product_select(fields).where(Product.id > decode_cursor(cursor))
+        if category_id is not None:
+            stmt = stmt.where(category_filter(Product.category_id, category_id, include_descendants))
+        rows = self._all(stmt.order_by(Product.id).limit(page_size + 1))
+        id_index = list(fields).index('id')
+        next_cursor = encode_cursor(rows[page_size - 1][id_index]) if len(rows) > page_size else None
+        return RowPage(list(fields), rows[:page_size], next_cursor)
+
+    def products_by_ids(self, fields: Sequence[str], ids: Sequence[int]) -> Tuple[List[Tuple], List[int]]:
+        """
+        Fetch many products in one query; returns (rows in request order, missing ids)
+        """
+        if not ids:
+            return [], []
+        rows = self._all(self._product_select(fields).where(Product.id.in_(ids)))
+        id_index = list(fields).index('id')
+        by_id = {row[id_index]: row for row in rows}
+        return ([by_id[product_id] for product_id in ids if product_id in by_id],
+                [product_id for product_id in ids if product_id not in by_id])
+
+    def categories(self, fields: Sequence[str]) -> List[Tuple]:
+        stmt = select(*(CATEGORY_FIELDS[name] for name in fields)).order_by(Category.id)
+        return self._all(stmt)
+
+    def category(self, fields: Sequence[str], category_id: int) -> Optional[Tuple]:
+        stmt = select(*(CATEGORY_FIELDS[name] for name in fields)).where(Category.id == category_id)
+        rows = self._all(stmt)
+        return rows[0] if rows else None
+
+    def _all(self, stmt) -> List[Tuple]:
+        # Joins the request's unit of work when there is one
+        with self.db.session_scope() as session:
+            return session.execute(stmt).all()
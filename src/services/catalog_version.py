@@ -0,0 +1,87 @@
+# src/services/catalog_version.py
+import time
+from typing import Iterable, NamedTuple, Optional, Sequence, Tuple, Union
+from sqlalchemy import Column, Float, Integer, MetaData, String, Table, inspect, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+# One row per catalog table; every committed write to that table bumps it
+VERSIONS_TABLE = 'catalog_versions'
+CATALOG_TABLES = ('products', 'categories')
+
+catalog_versions = Table(
+    VERSIONS_TABLE, MetaData(),
+    Column('name', String(50), primary_key=True),
+    Column('version', Integer, nullable=False, default=0),
+    Column('updated_at', Float, nullable=False),
+)
+
+# Engines known to have the table (created by migration 3). Only positive
+# answers are remembered, so a database migrated later is picked up.
+_available_engines = set()
+
+
+class CatalogStamp(NamedTuple):
+    """Versions of some catalog tables and when the newest change happened"""
+    tables: Tuple[str, ...]
+    versions: Tuple[int, ...]
+    last_modified: float
+
+    @property
+    def etag(self) -> str:
+        return '"' + '-'.join(f'{table[0]}{version}'
+                              for table, version in zip(self.tables, self.versions)) + '"'
+
+
+def _connection(bind: Union[Session, Connection]) -> Connection:
+    return bind.connection() if isinstance(bind, Session) else bind
+
+
+def versions_available(bind: Union[Session, Connection]) -> bool:
+    conn = _connection(bind)
+    if conn.engine in _available_engines:
+        return True
+    if inspect(conn).has_table(VERSIONS_TABLE):
+        _available_engines.add(conn.engine)
+        return True
+    return False
+
+
+def bump_catalog_version(bind: Union[Session, Connection], *tables: str):
+    """
+    Bump the version of the given tables inside the caller's transaction,
+    so the new version becomes visible exactly when the write commits.
+    """
+    if not versions_available(bind):
+        return
+    bind.execute(
+        update(catalog_versions)
+        .where(catalog_versions.c.name.in_(tables))
+        .values(version=catalog_versions.c.version + 1, updated_at=time.time())
+    )
+
+
+def read_catalog_stamp(bind: Union[Session, Connection],
+                       tables: Sequence[str] = CATALOG_TABLES) -> Optional[CatalogStamp]:
+    """
+    Current stamp for `tables`, or None when the database has no version table
+    """
+    if not versions_available(bind):
+        return None
+    rows = dict((name, (version, updated_at)) for name, version, updated_at in bind.execute(
+        select(catalog_versions.c.name, catalog_versions.c.version, catalog_versions.c.updated_at)
+        .where(catalog_versions.c.name.in_(tables))
+    ))
+    tables = tuple(tables)
+    versions = tuple(rows.get(table, (0, 0.0))[0] for table in tables)
+    last_modified = max((rows.get(table, (0, 0.0))[1] for table in tables), default=0.0)
+    return CatalogStamp(tables, versions, last_modified)
+
+
+def seed_catalog_versions(conn: Connection, tables: Iterable[str] = CATALOG_TABLES):
+    """Insert a version row for every catalog table that lacks one"""
+    existing = {row[0] for row in conn.execute(select(catalog_versions.c.name))}
+    missing = [{'name': table, 'version': 1, 'updated_at': time.time()}
+               for table in tables if table not in existing]
+    if missing:
+        conn.execute(catalog_versions.insert(), missing)
@@ -1,46 +1,176 @@
 # src/services/category_service.py
-from typing import List, Optional
+from typing import Dict, List, Optional
+from sqlalchemy import select
 from src.database.db_connection import DatabaseConnection
-from src.models.category import Category
+from src.services.cache import CacheBackend, get_cache, invalidate_on_commit
+from src.services.catalog_version import bump_catalog_version
+from src.services.category_tree import add_to_tree, closure_table, move_subtree, remove_from_tree
+from src.services.stock_alerts import notify_on_commit, products_in_category, refresh_alerts
+from src.services.stock_ledger import record_category_removal
+from src.services.warehouses import remove_product_stock
+from src.models.category import Category, CategoryClosure
+from src.utils.metrics import timed_methods
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from sqlalchemy.orm import Session
 
+ALL_CATEGORIES_KEY = 'categories:all'
+
+def category_id_key(category_id: int) -> str:
+    return f'category:id:{category_id}'
+
+def category_name_key(name: str) -> str:
+    return f'category:name:{name}'
+
+@timed_methods()
 class CategoryService:
     def __init__(self):
         self.db = DatabaseConnection()
-        self.session: Session = self.db.get_session()
 
-    def create_category(self, name: str, description: Optional[str] = None) -> Category:
+    @property
+    def cache(self) -> CacheBackend:
+        return get_cache()
+
+    def create_category(self, name: str, description: Optional[str] = None,
+                        reorder_point: Optional[int] = None,
+                        reorder_quantity: Optional[int] = None,
+                        parent_id: Optional[int] = None) -> Category:
         try:
-            category = Category(name=name, description=description)
-            self.session.add(category)
-            self.session.commit()
+            with self.db.session_scope() as session:
+                if parent_id is not None and session.get(Category, parent_id) is None:
+                    raise ValueError(f"Parent category with id {parent_id} not found")
+                category = Category(name=name, description=description, reorder_point=reorder_point,
+                                    reorder_quantity=reorder_quantity, parent_id=parent_id)
+                session.add(category)
+                session.flush()
+                add_to_tree(session, category.id, parent_id)
+                bump_catalog_version(session, 'categories')
+                invalidate_on_commit(session, [ALL_CATEGORIES_KEY, category_id_key(category.id),
+                                               category_name_key(category.name)])
             return category
         except (IntegrityError, ValueError) as e:
-            self.session.rollback()
             raise ValueError(f"Error creating category: {str(e)}")
 
-    def delete_category(self, category_id: int) -> bool:
+    def set_reorder_defaults(self, category_id: int, reorder_point: Optional[int],
+                             reorder_quantity: Optional[int] = None) -> Category:
+        """
+        Set the reorder point and quantity used by products of this category
+        that have none of their own, and re-evaluate their alerts
+        """
         try:
-            category = self.session.query(Category).filter_by(id=category_id).first()
-            if not category:
-                raise ValueError(f"Category with id {category_id} not found")
-            self.session.delete(category)
-            self.session.commit()
+            with self.db.session_scope() as session:
+                category = session.query(Category).filter_by(id=category_id).first()
+                if not category:
+                    raise ValueError(f"Category with id {category_id} not found")
+                category.reorder_point = reorder_point
+                category.reorder_quantity = reorder_quantity
+                session.flush()
+                notify_on_commit(session, refresh_alerts(session, products_in_category(session, category_id)))
+                bump_catalog_version(session, 'categories')
+                invalidate_on_commit(session, [ALL_CATEGORIES_KEY, category_id_key(category.id),
+                                               category_name_key(category.name)])
+            return category
+        except SQLAlchemyError as e:
+            raise ValueError(f"Error updating reorder defaults: {str(e)}")
+
+    def move_category(self, category_id: int, parent_id: Optional[int]) -> Category:
+        """
+        Move a category, with everything below it, under `parent_id`
+        (None makes it top-level)
+        """
+        try:
+            with self.db.session_scope() as session:
+                category = session.query(Category).filter_by(id=category_id).first()
+                if not category:
+                    raise ValueError(f"Category with id {category_id} not found")
+                if parent_id is not None and session.get(Category, parent_id) is None:
+                    raise ValueError(f"Parent category with id {parent_id} not found")
+                move_subtree(session, category_id, parent_id)
+                category.parent_id = parent_id
+                session.flush()
+                bump_catalog_version(session, 'categories')
+                invalidate_on_commit(session, [ALL_CATEGORIES_KEY, category_id_key(category.id),
+                                               category_name_key(category.name)])
+            return category
+        except SQLAlchemyError as e:
+            raise ValueError(f"Error moving category: {str(e)}")
+
+    def delete_category(self, category_id: int, actor: Optional[str] = None) -> bool:
+        try:
+            with self.db.session_scope() as session:
+                category = session.query(Category).filter_by(id=category_id).first()
+                if not category:
+                    raise ValueError(f"Category with id {category_id} not found")
+                if session.query(Category.id).filter_by(parent_id=category.id).first():
+                    raise ValueError("Move or delete its subcategories first")
+                record_category_removal(session, category.id, actor)
+                product_ids = products_in_category(session, category.id)
+                remove_product_stock(session, product_ids)
+                remove_from_tree(session, category.id)
+                session.delete(category)
+                session.flush()
+                notify_on_commit(session, refresh_alerts(session, product_ids))
+                bump_catalog_version(session, 'categories', 'products')
+                # Deleting a category cascades to its products
+                invalidate_on_commit(session, [ALL_CATEGORIES_KEY, category_id_key(category.id),
+                                               category_name_key(category.name)],
+                                     prefixes=['product:'])
             return True
         except SQLAlchemyError as e:
-            self.session.rollback()
             raise ValueError(f"Error deleting category: {str(e)}")
 
     def get_all_categories(self) -> List[Category]:
-        return self.session.query(Category).all()
+        return self.cache.get_or_load(ALL_CATEGORIES_KEY, self._load_all_categories)
 
     def find_category_by_id(self, category_id: int) -> Optional[Category]:
-        return self.session.query(Category).filter_by(id=category_id).first()
+        return self.cache.get_or_load(category_id_key(category_id),
+                                      lambda: self._load_category(id=category_id))
 
     def find_category_by_name(self, name: str) -> Optional[Category]:
-        return self.session.query(Category).filter_by(name=name).first()
+        return self.cache.get_or_load(category_name_key(name),
+                                      lambda: self._load_category(name=name))
+
+    def get_subcategory_ids(self, category_id: int) -> List[int]:
+        """The category's id followed by every id below it"""
+        with self.db.session_scope() as session:
+            return list(session.scalars(
+                select(closure_table.c.descendant_id)
+                .where(closure_table.c.ancestor_id == category_id)
+                .order_by(closure_table.c.depth, closure_table.c.descendant_id)
+            ))
+
+    def get_children(self, category_id: Optional[int] = None) -> List[Category]:
+        """Direct subcategories, or the top-level categories for None"""
+        with self.db.session_scope() as session:
+            return session.query(Category).filter_by(parent_id=category_id).order_by(Category.name).all()
+
+    def get_category_path(self, category_id: int) -> List[Category]:
+        """Ancestors of a category, root first, ending with the category itself"""
+        with self.db.session_scope() as session:
+            return (session.query(Category)
+                    .join(CategoryClosure, CategoryClosure.ancestor_id == Category.id)
+                    .filter(CategoryClosure.descendant_id == category_id)
+                    .order_by(CategoryClosure.depth.desc())
+                    .all())
+
+    def get_category_paths(self, separator: str = ' > ') -> Dict[int, str]:
+        """
+        Display path ("Electronics > Audio") of every category, from one
+        query over the closure
+        """
+        with self.db.session_scope() as session:
+            rows = session.execute(
+                select(closure_table.c.descendant_id, Category.name)
+                .join(Category, Category.id == closure_table.c.ancestor_id)
+                .order_by(closure_table.c.descendant_id, closure_table.c.depth.desc())
+            ).all()
+        names: Dict[int, List[str]] = {}
+        for category_id, name in rows:
+            names.setdefault(category_id, []).append(name)
+        return {category_id: separator.join(path) for category_id, path in names.items()}
+
+    def _load_all_categories(self) -> List[Category]:
+        with self.db.get_session() as session:
+            return session.query(Category).all()
 
-    def __del__(self):
-        if hasattr(self, 'session'):
-            self.session.close()
\ No newline at end of file
+    def _load_category(self, **criteria) -> Optional[Category]:
+        with self.db.get_session() as session:
+            return session.query(Category).filter_by(**criteria).first()
@@ -0,0 +1,245 @@
+# src/services/category_stats.py
+from typing import Dict, List, NamedTuple, Optional, Union
+from sqlalchemy import (Column, Float, Integer, MetaData, Table, delete, func, inspect, insert,
+                        select, text)
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from src.database.db_connection import DatabaseConnection
+from src.models.category import Category
+from src.models.product import Product
+from src.services.category_tree import closure_table
+
+STATS_TABLE = 'category_stats'
+
+# Per-category totals kept current by triggers on products (migration 6)
+category_stats = Table(
+    STATS_TABLE, MetaData(),
+    Column('category_id', Integer, primary_key=True),
+    Column('product_count', Integer, nullable=False, default=0),
+    Column('total_units', Integer, nullable=False, default=0),
+    Column('total_value', Float, nullable=False, default=0.0),
+    Column('min_price', Float),
+    Column('max_price', Float),
+)
+
+products_table = Product.__table__
+categories_table = Category.__table__
+
+# Accumulated float sums drift by rounding; smaller differences are not errors
+VALUE_TOLERANCE = 0.01
+
+# Adding a product row to its category's totals, and taking one away.
+# Removing the cheapest/dearest product re-reads the extreme through
+# ix_products_category_id_price, which is a single index probe.
+# Not INSERT OR IGNORE: an outer upsert's conflict handling would override it
+_ENSURE_ROW = (
+    "INSERT INTO category_stats (category_id, product_count, total_units, total_value) "
+    "SELECT {id}, 0, 0, 0.0 WHERE NOT EXISTS "
+    "(SELECT 1 FROM category_stats WHERE category_id = {id}); "
+)
+_ADD_ROW = (
+    _ENSURE_ROW.format(id='new.category_id') +
+    "UPDATE category_stats SET "
+    "product_count = product_count + 1, "
+    "total_units = total_units + COALESCE(new.stock_quantity, 0), "
+    "total_value = total_value + new.price * COALESCE(new.stock_quantity, 0), "
+    "min_price = CASE WHEN min_price IS NULL OR new.price < min_price THEN new.price ELSE min_price END, "
+    "max_price = CASE WHEN max_price IS NULL OR new.price > max_price THEN new.price ELSE max_price END "
+    "WHERE category_id = new.category_id;"
+)
+_REMOVE_ROW = (
+    "UPDATE category_stats SET "
+    "product_count = product_count - 1, "
+    "total_units = total_units - COALESCE(old.stock_quantity, 0), "
+    "total_value = total_value - old.price * COALESCE(old.stock_quantity, 0), "
+    "min_price = CASE WHEN old.price <= min_price THEN "
+    "(SELECT MIN(price) FROM products WHERE category_id = old.category_id) ELSE min_price END, "
+    "max_price = CASE WHEN old.price >= max_price THEN "
+    "(SELECT MAX(price) FROM products WHERE category_id = old.category_id) ELSE max_price END "
+    "WHERE category_id = old.category_id;"
+)
+STATS_TRIGGERS = {
+    'category_stats_product_insert': f"AFTER INSERT ON products BEGIN {_ADD_ROW} END",
+    'category_stats_product_delete': f"AFTER DELETE ON products BEGIN {_REMOVE_ROW} END",
+    # The hot path: stock moved, price and category unchanged
+    'category_stats_product_restock': (
+        "AFTER UPDATE OF stock_quantity ON products "
+        "WHEN old.price = new.price AND old.category_id = new.category_id BEGIN "
+        "UPDATE category_stats SET "
+        "total_units = total_units + COALESCE(new.stock_quantity, 0) - COALESCE(old.stock_quantity, 0), "
+        "total_value = total_value + new.price * "
+        "(COALESCE(new.stock_quantity, 0) - COALESCE(old.stock_quantity, 0)) "
+        "WHERE category_id = new.category_id; END"
+    ),
+    # Taking the old row out first lets the MIN/MAX re-read see the new price
+    'category_stats_product_update': (
+        "AFTER UPDATE OF price, category_id ON products "
+        "WHEN old.price <> new.price OR old.category_id <> new.category_id "
+        f"BEGIN {_REMOVE_ROW} {_ADD_ROW} END"
+    ),
+    'category_stats_category_insert': ("AFTER INSERT ON categories BEGIN "
+                                       f"{_ENSURE_ROW.format(id='new.id')} END"),
+    'category_stats_category_delete': ("AFTER DELETE ON categories BEGIN "
+                                       "DELETE FROM category_stats WHERE category_id = old.id; END"),
+}
+
+# Engines known to maintain the table; only positive answers are remembered
+_available_engines = set()
+
+
+class CategoryStats(NamedTuple):
+    category_id: int
+    product_count: int
+    total_units: int
+    total_value: float
+    min_price: Optional[float]
+    max_price: Optional[float]
+
+    def to_dict(self) -> dict:
+        return {**self._asdict(), 'total_value': round(self.total_value, 2)}
+
+
+class StatsDiscrepancy(NamedTuple):
+    category_id: int
+    recorded: Optional[CategoryStats]
+    actual: Optional[CategoryStats]
+
+
+def _connection(bind: Union[Session, Connection]) -> Connection:
+    return bind.connection() if isinstance(bind, Session) else bind
+
+
+def stats_available(bind: Union[Session, Connection]) -> bool:
+    conn = _connection(bind)
+    if conn.engine in _available_engines:
+        return True
+    if inspect(conn).has_table(STATS_TABLE):
+        _available_engines.add(conn.engine)
+        return True
+    return False
+
+
+def install_stats_triggers(conn: Connection):
+    for name, body in STATS_TRIGGERS.items():
+        conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {name} {body}"))
+
+
+def computed_stats(include_descendants: bool = False):
+    """
+    The totals straight from products, one row per category (empty ones too);
+    with include_descendants each row covers the category's whole subtree
+    """
+    stock = func.coalesce(products_table.c.stock_quantity, 0)
+    if include_descendants:
+        source = (categories_table
+                  .join(closure_table, closure_table.c.ancestor_id == categories_table.c.id)
+                  .outerjoin(products_table, products_table.c.category_id == closure_table.c.descendant_id))
+    else:
+        source = categories_table.outerjoin(
+            products_table, products_table.c.category_id == categories_table.c.id)
+    return (select(categories_table.c.id,
+                   func.count(products_table.c.id),
+                   func.coalesce(func.sum(stock), 0),
+                   func.coalesce(func.sum(products_table.c.price * stock), 0.0),
+                   func.min(products_table.c.price),
+                   func.max(products_table.c.price))
+            .select_from(source)
+            .group_by(categories_table.c.id)
+            .order_by(categories_table.c.id))
+
+
+def subtree_stats():
+    """
+    Maintained totals rolled up over the closure: one row per category
+    covering it and everything below it, without touching products
+    """
+    return (select(closure_table.c.ancestor_id,
+                   func.sum(category_stats.c.product_count),
+                   func.sum(category_stats.c.total_units),
+                   func.sum(category_stats.c.total_value),
+                   func.min(category_stats.c.min_price),
+                   func.max(category_stats.c.max_price))
+            .select_from(closure_table.join(
+                category_stats, category_stats.c.category_id == closure_table.c.descendant_id))
+            .group_by(closure_table.c.ancestor_id)
+            .order_by(closure_table.c.ancestor_id))
+
+
+def rebuild_category_stats(conn) -> int:
+    """
+    Recompute every category's totals with one GROUP BY; returns the row count
+    """
+    conn.execute(delete(category_stats))
+    result = conn.execute(insert(category_stats).from_select(
+        ['category_id', 'product_count', 'total_units', 'total_value', 'min_price', 'max_price'],
+        computed_stats()
+    ))
+    return result.rowcount
+
+
+def _stats_differ(recorded: Optional[CategoryStats], actual: Optional[CategoryStats]) -> bool:
+    if recorded is None or actual is None:
+        return recorded is not actual
+    return (recorded.product_count != actual.product_count
+            or recorded.total_units != actual.total_units
+            or abs(recorded.total_value - actual.total_value) > VALUE_TOLERANCE
+            or recorded.min_price != actual.min_price
+            or recorded.max_price != actual.max_price)
+
+
+class CategoryStatsService:
+    """
+    Per-category product count, units, inventory value and price range.
+    Reads are O(categories) where the triggers maintain category_stats;
+    other databases fall back to aggregating products on each read.
+    """
+    def __init__(self):
+        self.db = DatabaseConnection()
+
+    def get_all_stats(self, include_descendants: bool = False) -> Dict[int, CategoryStats]:
+        """
+        Totals per category; include_descendants rolls each one up over its subtree
+        """
+        with self.db.session_scope() as session:
+            if not stats_available(session):
+                rows = session.execute(computed_stats(include_descendants)).all()
+            elif include_descendants:
+                rows = session.execute(subtree_stats()).all()
+            else:
+                rows = session.execute(select(category_stats).order_by(category_stats.c.category_id)).all()
+            return {row[0]: CategoryStats(*row) for row in rows}
+
+    def get_stats(self, category_id: int, include_descendants: bool = False) -> Optional[CategoryStats]:
+        with self.db.session_scope() as session:
+            if not stats_available(session):
+                row = session.execute(
+                    computed_stats(include_descendants).where(categories_table.c.id == category_id)
+                ).first()
+            elif include_descendants:
+                row = session.execute(
+                    subtree_stats().where(closure_table.c.ancestor_id == category_id)
+                ).first()
+            else:
+                row = session.execute(
+                    select(category_stats).where(category_stats.c.category_id == category_id)
+                ).first()
+            return CategoryStats(*row) if row else None
+
+    def check_consistency(self) -> List[StatsDiscrepancy]:
+        """
+        Compare the maintained totals with a full aggregation of products
+        """
+        with self.db.session_scope() as session:
+            if not stats_available(session):
+                raise ValueError("Category stats are not maintained on this database")
+            recorded = {row[0]: CategoryStats(*row) for row in session.execute(select(category_stats))}
+            actual = {row[0]: CategoryStats(*row) for row in session.execute(computed_stats())}
+        return [StatsDiscrepancy(category_id, recorded.get(category_id), actual.get(category_id))
+                for category_id in sorted(recorded.keys() | actual.keys())
+                if _stats_differ(recorded.get(category_id), actual.get(category_id))]
+
+    def rebuild(self) -> int:
+        with self.db.engine.begin() as conn:
+            if not stats_available(conn):
+                raise ValueError("Category stats are not maintained on this database")
+            return rebuild_category_stats(conn)
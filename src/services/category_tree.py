@@ -0,0 +1,95 @@
+# src/services/category_tree.py
+from typing import Optional
+from sqlalchemy import delete, func, insert, literal, select, true
+from src.models.category import Category, CategoryClosure
+
+closure_table = CategoryClosure.__table__
+categories_table = Category.__table__
+
+
+def subtree_ids(category_id: int):
+    """
+    SELECT of the ids of a category and everything below it; use it with
+    IN (...) so a subtree filter stays a single query
+    """
+    return (select(closure_table.c.descendant_id)
+            .where(closure_table.c.ancestor_id == category_id)
+            .scalar_subquery())
+
+
+def category_filter(column, category_id: int, include_descendants: bool = False):
+    """`column` (a category id column) matches the category, or its whole subtree"""
+    if include_descendants:
+        return column.in_(subtree_ids(category_id))
+    return column == category_id
+
+
+def is_in_subtree(bind, category_id: int, root_id: int) -> bool:
+    return bind.execute(
+        select(closure_table.c.depth)
+        .where(closure_table.c.ancestor_id == root_id, closure_table.c.descendant_id == category_id)
+    ).first() is not None
+
+
+def add_to_tree(bind, category_id: int, parent_id: Optional[int]):
+    """
+    Record a new leaf: itself at depth 0 plus one row per ancestor of its parent
+    """
+    bind.execute(insert(closure_table).values(ancestor_id=category_id, descendant_id=category_id, depth=0))
+    if parent_id is not None:
+        bind.execute(insert(closure_table).from_select(
+            ['ancestor_id', 'descendant_id', 'depth'],
+            select(closure_table.c.ancestor_id, literal(category_id), closure_table.c.depth + 1)
+            .where(closure_table.c.descendant_id == parent_id)
+        ))
+
+
+def move_subtree(bind, category_id: int, parent_id: Optional[int]):
+    """
+    Re-hang a category and its subtree under `parent_id` (None: top level)
+    with two set-based statements, whatever the subtree's size
+    """
+    if parent_id is not None and is_in_subtree(bind, parent_id, category_id):
+        raise ValueError("A category cannot be moved under itself or one of its subcategories")
+    subtree = select(closure_table.c.descendant_id).where(closure_table.c.ancestor_id == category_id)
+    old_ancestors = (select(closure_table.c.ancestor_id)
+                     .where(closure_table.c.descendant_id == category_id, closure_table.c.depth > 0))
+    bind.execute(delete(closure_table).where(closure_table.c.descendant_id.in_(subtree),
+                                             closure_table.c.ancestor_id.in_(old_ancestors)))
+    if parent_id is None:
+        return
+    above = closure_table.alias('above')
+    below = closure_table.alias('below')
+    bind.execute(insert(closure_table).from_select(
+        ['ancestor_id', 'descendant_id', 'depth'],
+        select(above.c.ancestor_id, below.c.descendant_id, above.c.depth + below.c.depth + 1)
+        .select_from(above.join(below, true()))
+        .where(above.c.descendant_id == parent_id, below.c.ancestor_id == category_id)
+    ))
+
+
+def remove_from_tree(bind, category_id: int):
+    """Forget a leaf category; callers make sure it has no children"""
+    bind.execute(delete(closure_table).where(closure_table.c.descendant_id == category_id))
+
+
+def rebuild_closure(conn) -> int:
+    """
+    Recompute the closure from categories.parent_id with a recursive CTE;
+    returns the number of rows written
+    """
+    tree = (select(categories_table.c.id.label('ancestor_id'),
+                   categories_table.c.id.label('descendant_id'),
+                   literal(0).label('depth'))
+            .cte('tree', recursive=True))
+    tree = tree.union_all(
+        select(tree.c.ancestor_id, categories_table.c.id, tree.c.depth + 1)
+        .where(categories_table.c.parent_id == tree.c.descendant_id)
+    )
+    conn.execute(delete(closure_table))
+    conn.execute(insert(closure_table).from_select(
+        ['ancestor_id', 'descendant_id', 'depth'],
+        select(tree.c.ancestor_id, tree.c.descendant_id, tree.c.depth)
+    ))
+    # The driver reports no rowcount for a statement that starts with WITH
+    return conn.scalar(select(func.count()).select_from(closure_table))
@@ -0,0 +1,115 @@
+# src/services/concurrency.py
+import asyncio
+import functools
+import logging
+import random
+import time
+from typing import Callable, TypeVar
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from sqlalchemy.orm.exc import StaleDataError
+from src.database.db_connection import DatabaseConnection
+from src.utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETRY_ATTEMPTS = 8
+# First back-off in seconds; doubled per attempt, with +-50% jitter
+RETRY_BASE_DELAY = 0.01
+
+F = TypeVar('F', bound=Callable)
+
+CONFLICT_MESSAGE = "The data was changed by another user at the same time, please try again"
+
+WRITE_CONFLICTS = REGISTRY.counter('inventory_write_conflicts_total',
+                                   "Writes that lost a race with another writer", ('operation', 'outcome'))
+
+
+class ConcurrentUpdateError(ValueError):
+    """A write kept losing races with other writers and was given up"""
+
+
+def is_conflict(error: BaseException) -> bool:
+    """
+    Whether an error means "someone else wrote first": a version check that
+    matched no row, or SQLite refusing to upgrade a read to a write
+    """
+    if isinstance(error, (StaleDataError, ConcurrentUpdateError)):
+        return True
+    if isinstance(error, OperationalError):
+        message = str(error.orig).lower()
+        return 'database is locked' in message or 'database is busy' in message
+    return False
+
+
+def record_conflict(operation: str, gave_up: bool = False):
+    """Count a lost race (outcome 'lost'), and also 'gave_up' when the caller stops retrying"""
+    WRITE_CONFLICTS.labels(operation, 'lost').inc()
+    if gave_up:
+        WRITE_CONFLICTS.labels(operation, 'gave_up').inc()
+
+
+def backoff_delay(attempt: int, base_delay: float = RETRY_BASE_DELAY) -> float:
+    """Seconds to wait before retry number `attempt` (1-based)"""
+    return base_delay * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+
+
+def retry_on_conflict(attempts: int = DEFAULT_RETRY_ATTEMPTS,
+                      base_delay: float = RETRY_BASE_DELAY) -> Callable[[F], F]:
+    """
+    Re-run a unit of work that lost a race, after a short randomised
+    back-off. Retrying is only sound when the call began the transaction
+    itself; inside a unit of work that already read or wrote, the call's
+    own writes have been rolled back (to its savepoint) and the conflict
+    is raised as ConcurrentUpdateError for the outer caller (itself
+    possibly retried).
+    Wrapped methods must let conflict errors propagate (see is_conflict).
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            db = DatabaseConnection()
+            for attempt in range(1, attempts + 1):
+                owns_transaction = not db.in_transaction()
+                try:
+                    return func(*args, **kwargs)
+                except (SQLAlchemyError, ConcurrentUpdateError) as e:
+                    if not is_conflict(e):
+                        raise
+                    if not owns_transaction or attempt == attempts:
+                        record_conflict(func.__qualname__, gave_up=True)
+                        if isinstance(e, ConcurrentUpdateError):
+                            raise
+                        raise ConcurrentUpdateError(CONFLICT_MESSAGE) from e
+                    record_conflict(func.__qualname__)
+                    logger.debug("%s conflicted (attempt %d/%d): %s", func.__qualname__, attempt, attempts, e)
+                    time.sleep(backoff_delay(attempt, base_delay))
+        return wrapper
+    return decorator
+
+
+def async_retry_on_conflict(attempts: int = DEFAULT_RETRY_ATTEMPTS,
+                            base_delay: float = RETRY_BASE_DELAY) -> Callable[[F], F]:
+    """
+    retry_on_conflict for coroutine methods of the async services. Every
+    AsyncDatabaseConnection.session_scope is its own transaction, so each
+    conflict can be retried; the back-off yields to the event loop.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            for attempt in range(1, attempts + 1):
+                try:
+                    return await func(*args, **kwargs)
+                except (SQLAlchemyError, ConcurrentUpdateError) as e:
+                    if not is_conflict(e):
+                        raise
+                    if attempt == attempts:
+                        record_conflict(func.__qualname__, gave_up=True)
+                        if isinstance(e, ConcurrentUpdateError):
+                            raise
+                        raise ConcurrentUpdateError(CONFLICT_MESSAGE) from e
+                    record_conflict(func.__qualname__)
+                    logger.debug("%s conflicted (attempt %d/%d): %s", func.__qualname__, attempt, attempts, e)
+                    await asyncio.sleep(backoff_delay(attempt, base_delay))
+        return wrapper
+    return decorator
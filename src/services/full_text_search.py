@@ -0,0 +1,69 @@
+# src/services/full_text_search.py
+import re
+from typing import List
+from sqlalchemy import literal_column, select, text
+from sqlalchemy.engine import Connection, Engine
+
+FTS_TABLE = 'products_fts'
+
+# bm25() column weights: a hit in the name counts ten times one in the description
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+_TOKEN_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+_WORD_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def build_match_query(user_query: str) -> str:
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+
+    "quoted text" becomes a phrase, a trailing * makes a prefix term
+    (wid* matches widget), and all terms must match. Every term is quoted,
+    so FTS5 operators and punctuation in user input can't break the query.
+    """
+    terms: List[str] = []
+    for phrase, word in _TOKEN_PATTERN.findall(user_query or ''):
+        if phrase:
+            words = _WORD_PATTERN.findall(phrase)
+            if words:
+                terms.append('"' + ' '.join(words) + '"')
+            continue
+        # "usb-c" tokenizes like a phrase; a trailing * makes its last word a prefix
+        parts = _WORD_PATTERN.findall(word)
+        if parts:
+            terms.append('"' + ' '.join(parts) + '"' + ('*' if word.endswith('*') else ''))
+    if not terms:
+        raise ValueError("Search query must contain at least one word")
+    return ' '.join(terms)
+
+
+def fts_table_exists(conn: Connection) -> bool:
+    if conn.dialect.name != 'sqlite':
+        return False
+    return conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {'name': FTS_TABLE}
+    ).first() is not None
+
+
+def fts_available(engine: Engine) -> bool:
+    """
+    Whether the full-text index exists (SQLite with migration 2 applied)
+    """
+    if engine.dialect.name != 'sqlite':
+        return False
+    with engine.connect() as conn:
+        return fts_table_exists(conn)
+
+
+def ranked_matches(match_query: str):
+    """
+    Subquery of (product_id, score) for products matching the FTS query.
+    Lower scores are better matches, as returned by bm25().
+    """
+    return (select(literal_column('rowid').label('product_id'),
+                   literal_column(f'bm25({FTS_TABLE}, {NAME_WEIGHT}, {DESCRIPTION_WEIGHT})').label('score'))
+            .select_from(text(FTS_TABLE))
+            .where(text(f'{FTS_TABLE} MATCH :fts_query').bindparams(fts_query=match_query))
+            .subquery('fts_matches'))
@@ -0,0 +1,310 @@
+# src/services/product_export.py
+import csv
+import gzip
+import io
+import json
+import os
+import struct
+import sys
+import time
+from array import array
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from src.models.category import Category
+from src.models.product import Product
+
+DEFAULT_EXPORT_CHUNK_SIZE = 10000
+
+# Column name and type for every exported field, in output order
+EXPORT_COLUMNS: List[Tuple[str, str]] = [
+    ('id', 'int'),
+    ('name', 'str'),
+    ('description', 'str'),
+    ('price', 'float'),
+    ('stock_quantity', 'int'),
+    ('category_id', 'int'),
+    ('category_name', 'str'),
+]
+
+COLUMNAR_MAGIC = b'IMSCOL1\n'
+
+
+def export_query():
+    return (select(Product.id, Product.name, Product.description, Product.price,
+                   Product.stock_quantity, Product.category_id,
+                   Category.name.label('category_name'))
+            .outerjoin(Category, Product.category_id == Category.id)
+            .order_by(Product.id))
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """
+    Peak resident set size of this process, or None where unsupported
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class CsvEncoder:
+    extension = '.csv'
+    mimetype = 'text/csv'
+
+    def header(self) -> bytes:
+        return self._encode([[name for name, _ in EXPORT_COLUMNS]])
+
+    def rows(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        return self._encode(rows)
+
+    def footer(self) -> bytes:
+        return b''
+
+    @staticmethod
+    def _encode(rows) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='\n').writerows(rows)
+        return buffer.getvalue().encode('utf-8')
+
+
+class JsonlEncoder:
+    extension = '.jsonl'
+    mimetype = 'application/x-ndjson'
+
+    def __init__(self):
+        self.names = [name for name, _ in EXPORT_COLUMNS]
+
+    def header(self) -> bytes:
+        return b''
+
+    def rows(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        names = self.names
+        return ''.join(json.dumps(dict(zip(names, row))) + '\n' for row in rows).encode('utf-8')
+
+    def footer(self) -> bytes:
+        return b''
+
+
+class ColumnarEncoder:
+    """
+    Compact column-oriented binary format, one row group per chunk.
+
+    Layout: magic, uint32 schema length, JSON schema, then row groups of
+    (uint32 row count, per column: uint32 null-bitmap length, bitmap,
+    uint32 data length, data) and finally a uint32 zero row count.
+    Ints are int64, floats are float64, strings are uint32 end offsets
+    followed by the UTF-8 blob. All integers are little-endian.
+    """
+    extension = '.col'
+    mimetype = 'application/octet-stream'
+
+    def header(self) -> bytes:
+        schema = json.dumps([{'name': name, 'type': kind} for name, kind in EXPORT_COLUMNS]).encode()
+        return COLUMNAR_MAGIC + struct.pack('<I', len(schema)) + schema
+
+    def rows(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        if not rows:
+            return b''
+        parts = [struct.pack('<I', len(rows))]
+        for index, (_, kind) in enumerate(EXPORT_COLUMNS):
+            values = [row[index] for row in rows]
+            bitmap = _null_bitmap(values)
+            data = _encode_column(values, kind)
+            parts.append(struct.pack('<I', len(bitmap)) + bitmap)
+            parts.append(struct.pack('<I', len(data)) + data)
+        return b''.join(parts)
+
+    def footer(self) -> bytes:
+        return struct.pack('<I', 0)
+
+
+def _null_bitmap(values: List[Any]) -> bytes:
+    if all(value is not None for value in values):
+        return b''
+    bitmap = bytearray((len(values) + 7) // 8)
+    for position, value in enumerate(values):
+        if value is None:
+            bitmap[position >> 3] |= 1 << (position & 7)
+    return bytes(bitmap)
+
+
+def _to_little_endian(values: array) -> bytes:
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values.tobytes()
+
+
+def _encode_column(values: List[Any], kind: str) -> bytes:
+    if kind == 'int':
+        return _to_little_endian(array('q', (0 if value is None else value for value in values)))
+    if kind == 'float':
+        return _to_little_endian(array('d', (0.0 if value is None else value for value in values)))
+    blob = bytearray()
+    offsets = array('I')
+    for value in values:
+        if value is not None:
+            blob += value.encode('utf-8')
+        offsets.append(len(blob))
+    return _to_little_endian(offsets) + bytes(blob)
+
+
+def read_columnar(stream: BinaryIO) -> Iterator[Dict[str, List[Any]]]:
+    """
+    Yield one {column: values} dict per row group of a columnar export
+    """
+    if stream.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+        raise ValueError("Not a columnar product export")
+    (schema_length,) = struct.unpack('<I', stream.read(4))
+    schema = json.loads(stream.read(schema_length))
+    while True:
+        (row_count,) = struct.unpack('<I', stream.read(4))
+        if row_count == 0:
+            return
+        group = {}
+        for column in schema:
+            (bitmap_length,) = struct.unpack('<I', stream.read(4))
+            bitmap = stream.read(bitmap_length)
+            (data_length,) = struct.unpack('<I', stream.read(4))
+            values = _decode_column(stream.read(data_length), column['type'], row_count)
+            if bitmap:
+                values = [None if bitmap[i >> 3] & (1 << (i & 7)) else value
+                          for i, value in enumerate(values)]
+            group[column['name']] = values
+        yield group
+
+
+def _decode_column(data: bytes, kind: str, row_count: int) -> List[Any]:
+    typecode = {'int': 'q', 'float': 'd'}.get(kind, 'I')
+    values = array(typecode)
+    width = values.itemsize * row_count
+    values.frombytes(data[:width])
+    if sys.byteorder != 'little':
+        values.byteswap()
+    if kind != 'str':
+        return values.tolist()
+    blob = data[width:]
+    strings, start = [], 0
+    for end in values:
+        strings.append(blob[start:end].decode('utf-8'))
+        start = end
+    return strings
+
+
+ENCODERS = {
+    'csv': CsvEncoder,
+    'jsonl': JsonlEncoder,
+    'columnar': ColumnarEncoder,
+}
+
+
+def detect_export_format(path: str) -> Tuple[str, bool]:
+    """
+    Guess (format, gzip) from a destination such as 'catalog.csv.gz'
+    """
+    root, extension = os.path.splitext(path.lower())
+    compress = extension == '.gz'
+    if compress:
+        extension = os.path.splitext(root)[1]
+    for fmt, encoder in ENCODERS.items():
+        if encoder.extension == extension:
+            return fmt, compress
+    raise ValueError(f"Cannot detect export format for '{path}'. Use one of: {', '.join(ENCODERS)}")
+
+
+class ExportReport:
+    """Throughput and memory figures for a finished export"""
+    def __init__(self):
+        self.rows = 0
+        self.bytes_written = 0
+        self.started_at = time.perf_counter()
+        self.finished_at: Optional[float] = None
+        self.peak_rss_bytes: Optional[int] = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    def __repr__(self):
+        return (f"<ExportReport(rows={self.rows}, bytes={self.bytes_written}, "
+                f"rows_per_second={self.rows_per_second:.0f}, peak_rss_bytes={self.peak_rss_bytes})>")
+
+
+class ProductExporter:
+    """
+    Stream the products/categories join out of the database chunk by chunk,
+    so memory stays flat regardless of catalog size.
+    """
+    def __init__(self, engine: Engine, chunk_size: int = DEFAULT_EXPORT_CHUNK_SIZE):
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be at least 1")
+        self.engine = engine
+        self.chunk_size = chunk_size
+
+    def iter_row_chunks(self) -> Iterator[List[Tuple]]:
+        with self.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=self.chunk_size).execute(
+                export_query()
+            )
+            for partition in result.partitions():
+                yield [tuple(row) for row in partition]
+
+    def stream(self, fmt: str, compress: bool = False,
+               report: Optional[ExportReport] = None) -> Iterator[bytes]:
+        """
+        Yield the encoded export as byte chunks, suitable for a streamed
+        HTTP response or for writing to a file.
+        """
+        try:
+            encoder = ENCODERS[fmt]()
+        except KeyError:
+            raise ValueError(f"Unsupported export format '{fmt}'. Use one of: {', '.join(ENCODERS)}")
+
+        sink = io.BytesIO()
+        out = gzip.GzipFile(fileobj=sink, mode='wb') if compress else sink
+
+        def drain() -> bytes:
+            data = sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+            if report is not None:
+                report.bytes_written += len(data)
+            return data
+
+        out.write(encoder.header())
+        for rows in self.iter_row_chunks():
+            out.write(encoder.rows(rows))
+            if report is not None:
+                report.rows += len(rows)
+            data = drain()
+            if data:
+                yield data
+        out.write(encoder.footer())
+        if compress:
+            out.close()
+        yield drain()
+        if report is not None:
+            report.finished_at = time.perf_counter()
+            report.peak_rss_bytes = peak_rss_bytes()
+
+    def export_to_file(self, path: str, fmt: Optional[str] = None,
+                       compress: Optional[bool] = None) -> ExportReport:
+        if fmt is None:
+            fmt, detected_compress = detect_export_format(path)
+        else:
+            detected_compress = path.lower().endswith('.gz')
+        if compress is None:
+            compress = detected_compress
+        report = ExportReport()
+        with open(path, 'wb') as handle:
+            for data in self.stream(fmt, compress, report):
+                handle.write(data)
+        return report
@@ -0,0 +1,323 @@
+# src/services/product_import.py
+import csv
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from src.models.category import Category
+from src.models.product import Product
+from src.services.concurrency import CONFLICT_MESSAGE, ConcurrentUpdateError
+from src.services.stock_ledger import REASON_IMPORT, record_movements
+from src.services.stock_alerts import dispatch_alert_events, refresh_alerts
+from src.services.warehouses import add_location_stock, change_location_stock, location_levels, resolve_warehouse
+from src.utils.validators import PRODUCT_SCHEMA, FieldError, ValidationErrors
+
+DEFAULT_CHUNK_SIZE = 5000
+SUPPORTED_FORMATS = ('csv', 'jsonl')
+
+
+def detect_format(path: str) -> str:
+    """
+    Guess the input format from the file extension
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    raise ValueError(f"Cannot detect import format for '{path}'. Use one of: {', '.join(SUPPORTED_FORMATS)}")
+
+
+def read_csv_rows(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Yield (line_number, row) pairs from a CSV file with a header row
+    """
+    with open(path, newline='', encoding='utf-8') as handle:
+        reader = csv.DictReader(handle)
+        for row in reader:
+            yield reader.line_num, row
+
+
+def read_jsonl_rows(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Yield (line_number, row) pairs from a JSON Lines file, skipping blank lines.
+    Lines that are not JSON objects are passed through so they get rejected.
+    """
+    with open(path, encoding='utf-8') as handle:
+        for line_number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                row = {'__error__': f"Invalid JSON: {e}"}
+            yield line_number, row
+
+
+def read_product_rows(path: str, fmt: Optional[str] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    fmt = fmt or detect_format(path)
+    if fmt == 'csv':
+        return read_csv_rows(path)
+    if fmt == 'jsonl':
+        return read_jsonl_rows(path)
+    raise ValueError(f"Unsupported import format '{fmt}'. Use one of: {', '.join(SUPPORTED_FORMATS)}")
+
+
+class ImportReport:
+    """Running totals for a bulk import"""
+    def __init__(self, reject_file: Optional[str] = None):
+        self.processed = 0
+        self.imported = 0
+        self.rejected = 0
+        self.reject_file = reject_file
+        self.started_at = time.perf_counter()
+        self.finished_at: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+    def __repr__(self):
+        return (f"<ImportReport(processed={self.processed}, imported={self.imported}, "
+                f"rejected={self.rejected}, rows_per_second={self.rows_per_second:.0f})>")
+
+
+class ProductImporter:
+    """
+    Streaming product import: rows are read lazily, validated one at a time,
+    and written in chunks with Core executemany inserts (or upserts on id).
+    """
+    def __init__(self, engine: Engine, chunk_size: int = DEFAULT_CHUNK_SIZE, upsert: bool = False):
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be at least 1")
+        self.engine = engine
+        self.chunk_size = chunk_size
+        self.upsert = upsert
+        self.category_ids: Dict[str, int] = {}
+        self.known_category_ids = set()
+
+    def load_categories(self):
+        with self.engine.connect() as conn:
+            for category_id, name in conn.execute(select(Category.id, Category.name)):
+                self.category_ids[name] = category_id
+                self.known_category_ids.add(category_id)
+
+    def validate_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Turn a raw input row into insert parameters. Raises ValidationErrors
+        (a ValueError) listing every problem with the row, not just the first.
+        PRODUCT_SCHEMA is at least as strict as the model's @validates hooks.
+        """
+        if not isinstance(row, dict):
+            raise ValueError("Row must be an object")
+        if '__error__' in row:
+            raise ValueError(row['__error__'])
+
+        params, errors = PRODUCT_SCHEMA.validate(row)
+        try:
+            params['category_id'] = self.resolve_category(row)
+        except ValueError as e:
+            errors.append(FieldError('category_id', str(e)))
+        if row.get('id') not in (None, ''):
+            try:
+                params['id'] = int(row['id'])
+            except (ValueError, TypeError):
+                errors.append(FieldError('id', "Product id must be a valid integer"))
+        if errors:
+            raise ValidationErrors(errors)
+        return params
+
+    def resolve_category(self, row: Dict[str, Any]) -> int:
+        category_name = row.get('category') or row.get('category_name')
+        if category_name:
+            category_id = self.category_ids.get(str(category_name).strip())
+            if category_id is None:
+                raise ValueError(f"Unknown category '{category_name}'")
+            return category_id
+        if row.get('category_id') not in (None, ''):
+            try:
+                category_id = int(row['category_id'])
+            except (ValueError, TypeError):
+                raise ValueError("Category id must be a valid integer")
+            if category_id not in self.known_category_ids:
+                raise ValueError(f"Unknown category id {category_id}")
+            return category_id
+        raise ValueError("Row has no category or category_id")
+
+    def _insert_statement(self, with_id: bool):
+        table = Product.__table__
+        stmt = insert(table)
+        if not (self.upsert and with_id):
+            return stmt
+        if self.engine.dialect.name == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        elif self.engine.dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            raise ValueError(f"Upsert is not supported for {self.engine.dialect.name}")
+        stmt = dialect_insert(table)
+        return stmt.on_conflict_do_update(
+            index_elements=[table.c.id],
+            set_={**{column: stmt.excluded[column]
+                     for column in ('name', 'description', 'price', 'stock_quantity', 'category_id')},
+                  'version': table.c.version + 1},
+            # Rows planned against stale levels are caught by write_chunk's row count
+            where=stmt.excluded.stock_quantity >= table.c.reserved_quantity
+        )
+
+    def write_chunk(self, chunk: List[Dict[str, Any]]) -> List[Tuple[int, str]]:
+        """
+        Write validated rows in one transaction. Returns (position, error)
+        for the upserted rows left out because they would set stock below
+        the reserved units, or the default warehouse cannot give up the
+        stock they remove.
+        """
+        # executemany needs a uniform key set, so rows with and without ids go separately
+        with_id = [(position, params) for position, params in enumerate(chunk) if 'id' in params]
+        without_id = [params for params in chunk if 'id' not in params]
+        movements: List[Tuple[int, int]] = []
+        rejected: List[Tuple[int, str]] = []
+        with self.engine.begin() as conn:
+            location_id, location = resolve_warehouse(conn)
+            if without_id:
+                table = Product.__table__
+                result = conn.execute(
+                    self._insert_statement(with_id=False).returning(table.c.id, sort_by_parameter_order=True),
+                    without_id
+                )
+                movements.extend((product_id, params['stock_quantity'])
+                                 for product_id, params in zip(result.scalars(), without_id))
+            if with_id:
+                if self.upsert:
+                    accepted, changes, rejected = self._plan_upserts(conn, location_id, location, with_id)
+                else:
+                    accepted = [params for _, params in with_id]
+                    changes = [(params['id'], params['stock_quantity']) for params in accepted]
+                if accepted:
+                    result = conn.execute(self._insert_statement(with_id=True), accepted)
+                    if (self.upsert and conn.dialect.supports_sane_multi_rowcount
+                            and result.rowcount != len(accepted)):
+                        # A reservation made since the read; nothing of this chunk is kept
+                        raise ConcurrentUpdateError(CONFLICT_MESSAGE)
+                    movements.extend(changes)
+            # Stock set by the import is recorded as the difference it made,
+            # booked at the default warehouse (file quantities are totals)
+            self._book_location_stock(conn, location_id, location, movements)
+            record_movements(conn, movements, REASON_IMPORT, warehouse_id=location_id)
+            events = refresh_alerts(conn, [product_id for product_id, _ in movements])
+        dispatch_alert_events(events)
+        return rejected
+
+    def _plan_upserts(self, conn, location_id: int, location,
+                      rows: List[Tuple[int, Dict[str, Any]]]
+                      ) -> Tuple[List[Dict[str, Any]], List[Tuple[int, int]], List[Tuple[int, str]]]:
+        """
+        Walk upserted rows in file order against the stored stock: each row
+        moves stock by the difference it makes. A row setting stock below
+        the reserved units, or lowering it by more than the default
+        warehouse holds, is rejected.
+        """
+        previous, reserved = self._current_stock(conn, list({params['id'] for _, params in rows}))
+        held = location_levels(conn, location_id, location, list(previous))
+        accepted, changes, rejected = [], [], []
+        for position, params in rows:
+            product_id, quantity = params['id'], params['stock_quantity']
+            change = quantity - previous.get(product_id, 0)
+            if quantity < reserved.get(product_id, 0):
+                rejected.append((position, f"Stock quantity {quantity} is below the "
+                                           f"{reserved[product_id]} units reserved"))
+                continue
+            if change < 0 and held.get(product_id, 0) < -change:
+                rejected.append((position, f"Lowering stock to {quantity} removes {-change} units, "
+                                           f"but the default warehouse holds {held.get(product_id, 0)}"))
+                continue
+            accepted.append(params)
+            changes.append((product_id, change))
+            # A repeated id overwrites its earlier row in the same chunk
+            previous[product_id] = quantity
+            held[product_id] = held.get(product_id, 0) + change
+        return accepted, changes, rejected
+
+    @staticmethod
+    def _book_location_stock(conn, location_id: int, location, movements: List[Tuple[int, int]]):
+        """
+        Net each product's changes; increases are added in batches, decreases
+        go through the guarded take so a location never drops below zero
+        """
+        totals: Dict[int, int] = {}
+        for product_id, change in movements:
+            totals[product_id] = totals.get(product_id, 0) + change
+        add_location_stock(conn, location_id, location,
+                           [(product_id, change) for product_id, change in totals.items() if change > 0])
+        for product_id, change in totals.items():
+            if change < 0:
+                change_location_stock(conn, location_id, location, product_id, change)
+
+    @staticmethod
+    def _current_stock(conn, product_ids: List[int]) -> Tuple[Dict[int, int], Dict[int, int]]:
+        """Stock and reserved units of the products that exist"""
+        table = Product.__table__
+        stock, reserved = {}, {}
+        for product_id, quantity, held_back in conn.execute(
+                select(table.c.id, table.c.stock_quantity, table.c.reserved_quantity)
+                .where(table.c.id.in_(product_ids))):
+            stock[product_id] = quantity or 0
+            reserved[product_id] = held_back
+        return stock, reserved
+
+    @staticmethod
+    def _reject(report: ImportReport, rejects, line_number: int, row: Any, error: str):
+        report.rejected += 1
+        if rejects:
+            rejects.write(json.dumps({'line': line_number, 'row': row, 'error': error}) + '\n')
+
+    def _write(self, chunk: List[Dict[str, Any]], sources: List[Tuple[int, Any]],
+               report: ImportReport, rejects):
+        rejected = self.write_chunk(chunk)
+        for position, error in rejected:
+            line_number, row = sources[position]
+            self._reject(report, rejects, line_number, row, error)
+        report.imported += len(chunk) - len(rejected)
+
+    def run(self, rows: Iterable[Tuple[int, Dict[str, Any]]],
+            reject_file: Optional[str] = None,
+            progress: Optional[Callable[[ImportReport], None]] = None) -> ImportReport:
+        report = ImportReport(reject_file)
+        self.load_categories()
+        rejects = open(reject_file, 'w', encoding='utf-8') if reject_file else None
+        chunk: List[Dict[str, Any]] = []
+        # (line_number, row) of each chunk entry, for rows the write rejects
+        sources: List[Tuple[int, Any]] = []
+        try:
+            for line_number, row in rows:
+                report.processed += 1
+                try:
+                    chunk.append(self.validate_row(row))
+                except ValueError as e:
+                    self._reject(report, rejects, line_number, row, str(e))
+                    continue
+                sources.append((line_number, row))
+                if len(chunk) >= self.chunk_size:
+                    self._write(chunk, sources, report, rejects)
+                    chunk, sources = [], []
+                    if progress:
+                        progress(report)
+            if chunk:
+                self._write(chunk, sources, report, rejects)
+        except SQLAlchemyError as e:
+            raise ValueError(f"Error importing products: {str(e)}")
+        finally:
+            report.finished_at = time.perf_counter()
+            if rejects:
+                rejects.close()
+        if progress:
+            progress(report)
+        return report
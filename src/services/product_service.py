@@ -1,110 +1,547 @@
 # src/services/product_service.py
 
-from typing import List, Optional, Dict, Any
+import time
+from typing import List, Optional, Dict, Any, Callable, Iterable, Iterator, NamedTuple, Tuple
 from src.database.db_connection import DatabaseConnection
+from src.services.cache import CacheBackend, get_cache, invalidate_on_commit
+from src.services.catalog_version import bump_catalog_version
+from src.services.category_tree import category_filter
+from src.services.concurrency import (DEFAULT_RETRY_ATTEMPTS, WRITE_CONFLICTS, ConcurrentUpdateError,
+                                       backoff_delay, is_conflict, record_conflict, retry_on_conflict)
+from src.services.stock_ledger import (REASON_ADJUSTMENT, REASON_DELETED, REASON_INITIAL,
+                                       record_movements)
+from src.services.stock_alerts import (StockAlertService, dispatch_alert_events, notify_on_commit,
+                                       refresh_alerts)
 from src.models.product import Product
+from src.services.product_import import (DEFAULT_CHUNK_SIZE, ImportReport, ProductImporter,
+                                         read_product_rows)
+from src.services.product_export import DEFAULT_EXPORT_CHUNK_SIZE, ExportReport, ProductExporter
+from src.services.full_text_search import build_match_query, fts_available, ranked_matches
+from src.services.warehouses import (add_location_stock, book_default_location, change_location_stock,
+                                     location_levels, remove_product_stock, resolve_warehouse)
+from src.utils.metrics import timed_methods
+from src.utils.pagination import (Page, DEFAULT_PAGE_SIZE, clamp_page_size, decode_cursor,
+                                  decode_cursor_payload, encode_cursor)
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from sqlalchemy import or_, and_
+from sqlalchemy import or_, and_, bindparam, func, insert, select, update
+from sqlalchemy.orm import joinedload, selectinload
 
+# Eager loader strategies for Product.category; every listing pays a
+# constant number of queries instead of one SELECT per row.
+CATEGORY_LOADERS = {
+    'joined': joinedload,
+    'selectin': selectinload,
+}
+DEFAULT_CATEGORY_LOADER = 'joined'
+
+def category_loader_option(strategy: str = DEFAULT_CATEGORY_LOADER):
+    try:
+        loader = CATEGORY_LOADERS[strategy]
+    except KeyError:
+        raise ValueError(
+            f"Unknown category loader '{strategy}'. Choose from: {', '.join(CATEGORY_LOADERS)}"
+        )
+    return loader(Product.category)
+
+def product_id_key(product_id: int) -> str:
+    return f'product:id:{product_id}'
+
+def product_name_key(name: str) -> str:
+    return f'product:name:{name}'
+
+def apply_search_filters(query, name=None, min_price=None, max_price=None, category_id=None,
+                         min_stock=None, max_stock=None, q=None, use_fts=False,
+                         include_descendants=False):
+    """
+    Apply search filters to an ORM Query or a 2.0-style select() (both
+    support .filter and .join), so sync and async search share one
+    definition. Returns (query, score) where score is the FTS relevance
+    column, or None when results have no ranking. With include_descendants
+    the category filter also matches every subcategory of category_id.
+    """
+    score = None
+    
+    # Full-text search (ranked), falling back to LIKE without an FTS index
+    if q:
+        if use_fts:
+            matches = ranked_matches(build_match_query(q))
+            query = query.join(matches, matches.c.product_id == Product.id)
+            score = matches.c.score
+        else:
+            query = query.filter(or_(Product.name.ilike(f'%{q}%'),
+                                     Product.description.ilike(f'%{q}%')))
+    
+    # Name search (case-insensitive, partial match)
+    if name:
+        query = query.filter(Product.name.ilike(f'%{name}%'))
+    
+    # Price range filter
+    if min_price is not None:
+        query = query.filter(Product.price >= min_price)
+    if max_price is not None:
+        query = query.filter(Product.price <= max_price)
+    
+    # Category filter (a subtree is an IN over the closure table)
+    if category_id is not None:
+        query = query.filter(category_filter(Product.category_id, category_id, include_descendants))
+    
+    # Stock range filter
+    if min_stock is not None:
+        query = query.filter(Product.stock_quantity >= min_stock)
+    if max_stock is not None:
+        query = query.filter(Product.stock_quantity <= max_stock)
+    
+    return query, score
+
+class StockMovementResult(NamedTuple):
+    """Outcome of one movement passed to ProductService.apply_stock_movements"""
+    product_id: int
+    quantity_change: int
+    applied: bool
+    stock_quantity: Optional[int]
+    error: Optional[str]
+
+class BulkValidationError(ValueError):
+    """One or more rows of a bulk request failed validation"""
+    def __init__(self, errors: List[Tuple[int, str]]):
+        self.errors = errors
+        super().__init__(f"{len(errors)} row(s) failed validation")
+
+class _StockConflict(Exception):
+    """A concurrent writer changed stock between our read and write"""
+
+@timed_methods()
 class ProductService:
-    def __init__(self):
+    def __init__(self, category_loader: str = DEFAULT_CATEGORY_LOADER):
         self.db = DatabaseConnection()
+        self.category_option = category_loader_option(category_loader)
+    
+    @property
+    def cache(self) -> CacheBackend:
+        return get_cache()
     
     def create_product(self, name: str, price: float, category_id: int, 
                        description: Optional[str] = None, 
-                       stock_quantity: int = 0) -> Product:
-        session = self.db.get_session()
+                       stock_quantity: int = 0, actor: Optional[str] = None,
+                       reorder_point: Optional[int] = None,
+                       reorder_quantity: Optional[int] = None,
+                       warehouse_id: Optional[int] = None) -> Product:
+        """
+        Create a product; its initial stock is held at `warehouse_id`, or at
+        the default warehouse
+        """
         try:
-            product = Product(
-                name=name, 
-                price=price, 
-                category_id=category_id, 
-                description=description, 
-                stock_quantity=stock_quantity
-            )
-            session.add(product)
-            session.commit()
+            with self.db.session_scope() as session:
+                product = Product(
+                    name=name, 
+                    price=price, 
+                    category_id=category_id, 
+                    description=description, 
+                    stock_quantity=stock_quantity,
+                    reorder_point=reorder_point,
+                    reorder_quantity=reorder_quantity
+                )
+                session.add(product)
+                session.flush()
+                location_id, location = resolve_warehouse(session, warehouse_id)
+                add_location_stock(session, location_id, location, [(product.id, product.stock_quantity or 0)])
+                record_movements(session, [(product.id, product.stock_quantity or 0)],
+                                 REASON_INITIAL, actor, location_id)
+                notify_on_commit(session, refresh_alerts(session, [product.id]))
+                bump_catalog_version(session, 'products')
+                invalidate_on_commit(session, [product_id_key(product.id), product_name_key(product.name)])
             return product
         except (IntegrityError, ValueError) as e:
-            session.rollback()
             raise ValueError(f"Error creating product: {str(e)}")
+    
+    def bulk_create_products(self, rows: List[Dict[str, Any]],
+                             actor: Optional[str] = None) -> List[int]:
+        """
+        Validate every row, then insert them all with one executemany
+        INSERT ... RETURNING; nothing is written unless every row is valid.
+        Raises BulkValidationError listing the (index, message) failures.
+        """
+        importer = ProductImporter(self.db.engine)
+        importer.load_categories()
+        params, errors = [], []
+        for index, row in enumerate(rows):
+            try:
+                values = importer.validate_row(row)
+            except ValueError as e:
+                errors.append((index, str(e)))
+                continue
+            values.pop('id', None)
+            params.append(values)
+        if errors:
+            raise BulkValidationError(errors)
+        if not params:
+            return []
+
+        table = Product.__table__
+        try:
+            with self.db.session_scope() as session:
+                result = session.execute(
+                    insert(table).returning(table.c.id, sort_by_parameter_order=True), params
+                )
+                ids = list(result.scalars())
+                initial = [(product_id, item['stock_quantity']) for product_id, item in zip(ids, params)]
+                location_id = book_default_location(session, initial)
+                record_movements(session, initial, REASON_INITIAL, actor, location_id)
+                notify_on_commit(session, refresh_alerts(session, ids))
+                bump_catalog_version(session, 'products')
+                invalidate_on_commit(session, [product_name_key(item['name']) for item in params])
+            return ids
+        except SQLAlchemyError as e:
+            raise ValueError(f"Error creating products: {str(e)}")
+
+    def bulk_import(self, path: str, fmt: Optional[str] = None,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE, upsert: bool = False,
+                    reject_file: Optional[str] = None,
+                    progress: Optional[Callable[[ImportReport], None]] = None) -> ImportReport:
+        """
+        Stream products from a CSV or JSONL file into the database in chunks.
+        Invalid rows are skipped and, if reject_file is given, written there.
+        """
+        importer = ProductImporter(self.db.engine, chunk_size=chunk_size, upsert=upsert)
+        try:
+            return importer.run(read_product_rows(path, fmt), reject_file=reject_file, progress=progress)
         finally:
-            session.close()
+            # New rows can answer cached negative lookups and upserts rewrite existing ones
+            self.cache.delete_prefix('product:')
+            with self.db.engine.begin() as conn:
+                bump_catalog_version(conn, 'products')
     
-    def delete_product(self, product_id: int) -> bool:
-        session = self.db.get_session()
+    def export_products(self, path: str, fmt: Optional[str] = None,
+                        compress: Optional[bool] = None,
+                        chunk_size: int = DEFAULT_EXPORT_CHUNK_SIZE) -> ExportReport:
+        """
+        Write the whole catalog to a CSV, JSONL or columnar file, optionally gzipped.
+        """
+        return ProductExporter(self.db.engine, chunk_size).export_to_file(path, fmt, compress)
+    
+    def stream_export(self, fmt: str, compress: bool = False,
+                      chunk_size: int = DEFAULT_EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Yield the encoded catalog in byte chunks for streamed downloads.
+        """
+        return ProductExporter(self.db.engine, chunk_size).stream(fmt, compress)
+    
+    @retry_on_conflict()
+    def delete_product(self, product_id: int, actor: Optional[str] = None) -> bool:
+        """
+        Delete a product and write off its stock. The DELETE checks the row
+        version, so stock that changed after the product was read makes the
+        attempt conflict and retry instead of writing off the wrong amount.
+        """
         try:
-            product = session.query(Product).filter_by(id=product_id).first()
-            if not product:
-                raise ValueError(f"Product with id {product_id} not found")
-            session.delete(product)
-            session.commit()
+            with self.db.session_scope() as session:
+                product = session.query(Product).filter_by(id=product_id).first()
+                if not product:
+                    raise ValueError(f"Product with id {product_id} not found")
+                # The ledger keeps the product's history; write off what is left
+                record_movements(session, [(product.id, -(product.stock_quantity or 0))],
+                                 REASON_DELETED, actor)
+                remove_product_stock(session, [product.id])
+                session.delete(product)
+                session.flush()
+                notify_on_commit(session, refresh_alerts(session, [product.id]))
+                bump_catalog_version(session, 'products')
+                invalidate_on_commit(session, [product_id_key(product.id), product_name_key(product.name)])
             return True
         except SQLAlchemyError as e:
-            session.rollback()
+            if is_conflict(e):
+                raise
             raise ValueError(f"Error deleting product: {str(e)}")
-        finally:
-            session.close()
     
     def get_all_products(self) -> List[Product]:
-        session = self.db.get_session()
-        try:
-            return session.query(Product).all()
-        finally:
-            session.close()
+        with self.db.session_scope() as session:
+            return session.query(Product).options(self.category_option).all()
+    
+    def get_products_page(self, cursor: Optional[str] = None,
+                          page_size: int = DEFAULT_PAGE_SIZE) -> Page[Product]:
+        """
+        Keyset-paginated product listing ordered by id.
+        """
+        page_size = clamp_page_size(page_size)
+        after_id = decode_cursor(cursor)
+        with self.db.session_scope() as session:
+            rows = (session.query(Product)
+                    .options(self.category_option)
+                    .filter(Product.id > after_id)
+                    .order_by(Product.id.asc())
+                    .limit(page_size + 1)
+                    .all())
+            return Page.from_rows(rows, page_size)
+    
+    def iter_products(self, chunk_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Product]:
+        """
+        Stream every product page by page, so only one chunk is held at a time.
+        """
+        cursor = None
+        while True:
+            page = self.get_products_page(cursor, chunk_size)
+            yield from page.items
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
     
     def find_product_by_id(self, product_id: int) -> Optional[Product]:
-        session = self.db.get_session()
-        try:
-            return session.query(Product).filter_by(id=product_id).first()
-        finally:
-            session.close()
+        return self.cache.get_or_load(product_id_key(product_id),
+                                      lambda: self._load_product_by_id(product_id))
     
     def find_product_by_name(self, name: str) -> Optional[Product]:
-        session = self.db.get_session()
-        try:
-            return session.query(Product).filter_by(name=name).first()
-        finally:
-            session.close()
+        # Names map to ids so stock changes only have to invalidate the id entry
+        product_id = self.cache.get_or_load(product_name_key(name),
+                                            lambda: self._load_product_id_by_name(name))
+        return self.find_product_by_id(product_id) if product_id is not None else None
     
-    def get_products_by_category(self, category_id: int) -> List[Product]:
-        session = self.db.get_session()
-        try:
-            return session.query(Product).filter_by(category_id=category_id).all()
-        finally:
-            session.close()
+    def _load_product_by_id(self, product_id: int) -> Optional[Product]:
+        with self.db.get_session() as session:
+            return (session.query(Product).options(self.category_option)
+                    .filter_by(id=product_id).first())
     
-    def update_stock(self, product_id: int, quantity_change: int) -> Product:
-        session = self.db.get_session()
+    def _load_product_id_by_name(self, name: str) -> Optional[int]:
+        with self.db.get_session() as session:
+            row = session.query(Product.id).filter_by(name=name).order_by(Product.id).first()
+            return row.id if row else None
+    
+    def get_products_by_category(self, category_id: int,
+                                 include_descendants: bool = False) -> List[Product]:
+        with self.db.session_scope() as session:
+            return (session.query(Product).options(self.category_option)
+                    .filter(category_filter(Product.category_id, category_id, include_descendants))
+                    .all())
+    
+    @retry_on_conflict()
+    def update_stock(self, product_id: int, quantity_change: int,
+                     reason: str = REASON_ADJUSTMENT, actor: Optional[str] = None,
+                     warehouse_id: Optional[int] = None) -> Product:
+        """
+        Atomically apply a stock delta with a single conditional UPDATE, so
+        concurrent callers can never lose an update or drive stock negative.
+        Removals cannot take reserved units either. The change is booked at
+        `warehouse_id` (default warehouse if None), which cannot go negative;
+        the total and the ledger entry are written in the same transaction.
+        """
+        # Removals must leave the reserved units in place
+        floor = Product.reserved_quantity if quantity_change < 0 else 0
         try:
-            product = session.query(Product).filter_by(id=product_id).first()
-            if not product:
-                raise ValueError(f"Product with id {product_id} not found")
-            
-            new_stock = product.stock_quantity + quantity_change
-            if new_stock < 0:
-                raise ValueError("Stock cannot be negative")
-            
-            product.stock_quantity = new_stock
-            session.commit()
+            with self.db.session_scope() as session:
+                stmt = (update(Product)
+                        .where(Product.id == product_id,
+                               Product.stock_quantity + quantity_change >= floor)
+                        .values(stock_quantity=Product.stock_quantity + quantity_change,
+                                version=Product.version + 1)
+                        .returning(Product))
+                product = session.execute(stmt).scalar_one_or_none()
+                if product is None:
+                    # Only the failure path pays for a second round trip
+                    row = session.execute(select(Product.stock_quantity, Product.reserved_quantity)
+                                          .where(Product.id == product_id)).first()
+                    if row is None:
+                        raise ValueError(f"Product with id {product_id} not found")
+                    if (row.stock_quantity or 0) + quantity_change >= 0:
+                        raise ValueError(f"Stock cannot drop below the {row.reserved_quantity} "
+                                         f"reserved unit(s)")
+                    raise ValueError("Stock cannot be negative")
+                location_id, location = resolve_warehouse(session, warehouse_id)
+                change_location_stock(session, location_id, location, product_id, quantity_change)
+                record_movements(session, [(product_id, quantity_change)], reason, actor, location_id)
+                notify_on_commit(session, refresh_alerts(session, [product_id]))
+                bump_catalog_version(session, 'products')
+                invalidate_on_commit(session, [product_id_key(product_id)])
             return product
         except SQLAlchemyError as e:
-            session.rollback()
+            if is_conflict(e):
+                raise
             raise ValueError(f"Error updating stock: {str(e)}")
-        finally:
-            session.close()
     
-    def get_low_stock_products(self, threshold: int = 10) -> List[Product]:
-        session = self.db.get_session()
+    @retry_on_conflict()
+    def set_reorder_point(self, product_id: int, reorder_point: Optional[int],
+                          reorder_quantity: Optional[int] = None) -> Product:
+        """
+        Set a product's own reorder point and quantity; None falls back to
+        the category default. The product's alert is re-evaluated at once.
+        """
         try:
-            return session.query(Product).filter(Product.stock_quantity <= threshold).all()
-        finally:
-            session.close()
+            with self.db.session_scope() as session:
+                product = session.query(Product).filter_by(id=product_id).first()
+                if not product:
+                    raise ValueError(f"Product with id {product_id} not found")
+                product.reorder_point = reorder_point
+                product.reorder_quantity = reorder_quantity
+                session.flush()
+                notify_on_commit(session, refresh_alerts(session, [product_id]))
+                bump_catalog_version(session, 'products')
+                invalidate_on_commit(session, [product_id_key(product_id)])
+            return product
+        except SQLAlchemyError as e:
+            if is_conflict(e):
+                raise
+            raise ValueError(f"Error updating reorder point: {str(e)}")
+    
+    def apply_stock_movements(self, movements: Iterable[Tuple[int, int]],
+                              max_retries: int = DEFAULT_RETRY_ATTEMPTS, reason: str = REASON_ADJUSTMENT,
+                              actor: Optional[str] = None,
+                              warehouse_id: Optional[int] = None) -> List[StockMovementResult]:
+        """
+        Apply many (product_id, quantity_change) movements at one warehouse
+        (the default one if None) in one transaction.
+        
+        Movements are checked in order against the stock held there, so a
+        later movement can rely on an earlier one in the same batch; results
+        report that location's level. Removals may not take reserved units.
+        Accepted net changes are written with one executemany compare-and-set
+        UPDATE; if another writer changed any of the rows in between, the
+        whole batch is re-evaluated. Product totals move by the same deltas,
+        and accepted movements go to the ledger in one batch.
+        """
+        movements = [(int(product_id), int(change)) for product_id, change in movements]
+        if not movements:
+            return []
+        
+        product_ids = list({product_id for product_id, _ in movements})
+        products = Product.__table__
+        stock = func.coalesce(products.c.stock_quantity, 0)
+        totals_stmt = (update(products)
+                       .where(products.c.id == bindparam('item_id'),
+                              # A reservation made since the read would be overdrawn
+                              or_(bindparam('delta') >= 0,
+                                  stock - products.c.reserved_quantity + bindparam('delta') >= 0))
+                       .values(stock_quantity=stock + bindparam('delta'), version=products.c.version + 1))
+        
+        for attempt in range(1, max_retries + 1):
+            if attempt > 1:
+                time.sleep(backoff_delay(attempt - 1))
+            events = []
+            try:
+                with self.db.engine.begin() as conn:
+                    location_id, location = resolve_warehouse(conn, warehouse_id)
+                    held, unreserved = self._current_stock_levels(conn, product_ids, location_id, location)
+                    levels = {product_id: quantity or 0 for product_id, quantity in held.items()}
+                    results, final_levels = self._evaluate_movements(movements, levels, unreserved)
+                    changed = {product_id: quantity for product_id, quantity in final_levels.items()
+                               if quantity != levels[product_id]}
+                    if changed:
+                        self._write_location_levels(conn, location_id, location, held, changed)
+                        written = conn.execute(totals_stmt, [
+                            {'item_id': product_id, 'delta': quantity - levels[product_id]}
+                            for product_id, quantity in changed.items()
+                        ]).rowcount
+                        if written != len(changed):
+                            raise _StockConflict()
+                        record_movements(conn, [(item.product_id, item.quantity_change)
+                                                for item in results if item.applied],
+                                         reason, actor, location_id)
+                        events = refresh_alerts(conn, list(changed))
+                        bump_catalog_version(conn, 'products')
+            except _StockConflict:
+                record_conflict('ProductService.apply_stock_movements')
+                continue
+            except SQLAlchemyError as e:
+                if is_conflict(e):
+                    record_conflict('ProductService.apply_stock_movements')
+                    continue
+                raise ValueError(f"Error applying stock movements: {str(e)}")
+            if changed:
+                self.cache.delete(*(product_id_key(product_id) for product_id in changed))
+            dispatch_alert_events(events)
+            return results
+        WRITE_CONFLICTS.labels('ProductService.apply_stock_movements', 'gave_up').inc()
+        raise ConcurrentUpdateError("Error applying stock movements: too many concurrent updates, try again")
+    
+    def _current_stock_levels(self, conn, product_ids: List[int], location_id: int, location,
+                              chunk_size: int = 500) -> Tuple[Dict[int, Optional[int]], Dict[int, int]]:
+        """
+        Stock at the location of the products that exist (None where the
+        location has no row for the product yet), and each product's
+        unreserved total
+        """
+        table = Product.__table__
+        unreserved: Dict[int, int] = {}
+        for start in range(0, len(product_ids), chunk_size):
+            chunk = product_ids[start:start + chunk_size]
+            unreserved.update(conn.execute(
+                select(table.c.id, func.coalesce(table.c.stock_quantity, 0) - table.c.reserved_quantity)
+                .where(table.c.id.in_(chunk))
+            ).all())
+        held = location_levels(conn, location_id, location, list(unreserved))
+        return {product_id: held.get(product_id) for product_id in unreserved}, unreserved
+    
+    @staticmethod
+    def _write_location_levels(conn, location_id: int, location, held: Dict[int, Optional[int]],
+                               changed: Dict[int, int]):
+        """
+        Compare-and-set the new levels; raises _StockConflict if a concurrent
+        writer got there first
+        """
+        existing = [{'item_id': product_id, 'expected': held[product_id], 'new_quantity': quantity}
+                    for product_id, quantity in changed.items() if held[product_id] is not None]
+        if existing:
+            result = conn.execute(
+                update(location)
+                .where(location.c.warehouse_id == location_id,
+                       location.c.product_id == bindparam('item_id'),
+                       location.c.quantity == bindparam('expected'))
+                .values(quantity=bindparam('new_quantity')),
+                existing
+            )
+            if result.rowcount != len(existing):
+                raise _StockConflict()
+        missing = [{'warehouse_id': location_id, 'product_id': product_id, 'quantity': quantity}
+                   for product_id, quantity in changed.items() if held[product_id] is None]
+        if missing:
+            try:
+                conn.execute(insert(location), missing)
+            except IntegrityError:
+                raise _StockConflict()
+    
+    @staticmethod
+    def _evaluate_movements(movements: List[Tuple[int, int]], levels: Dict[int, int],
+                            unreserved: Dict[int, int]):
+        running = dict(levels)
+        free = dict(unreserved)
+        results = []
+        for product_id, change in movements:
+            if product_id not in running:
+                results.append(StockMovementResult(
+                    product_id, change, False, None, f"Product with id {product_id} not found"))
+            elif running[product_id] + change < 0:
+                results.append(StockMovementResult(
+                    product_id, change, False, running[product_id], "Stock cannot be negative"))
+            elif change < 0 and free[product_id] + change < 0:
+                results.append(StockMovementResult(
+                    product_id, change, False, running[product_id], "Stock is reserved"))
+            else:
+                running[product_id] += change
+                free[product_id] += change
+                results.append(StockMovementResult(product_id, change, True, running[product_id], None))
+        return results, running
+    
+    def get_low_stock_products(self, threshold: Optional[int] = None) -> List[Product]:
+        """
+        Products at or below their own reorder point, read from the
+        maintained alert set. An explicit threshold scans stock instead.
+        """
+        if threshold is None:
+            return StockAlertService().low_stock_products(self.category_option)
+        with self.db.session_scope() as session:
+            return (session.query(Product).options(self.category_option)
+                    .filter(Product.stock_quantity <= threshold).all())
 
 
+@timed_methods()
 class AdvancedProductSearch:
-    def __init__(self):
+    def __init__(self, category_loader: str = DEFAULT_CATEGORY_LOADER):
         self.db = DatabaseConnection()
+        self.category_option = category_loader_option(category_loader)
+        self._fts_available: Optional[bool] = None
+    
+    @property
+    def fts_available(self) -> bool:
+        if self._fts_available is None:
+            self._fts_available = fts_available(self.db.engine)
+        return self._fts_available
     
     def search_products(self, 
                         name: Optional[str] = None, 
@@ -112,45 +549,94 @@ class AdvancedProductSearch:
                         max_price: Optional[float] = None,
                         category_id: Optional[int] = None,
                         min_stock: Optional[int] = None,
-                        max_stock: Optional[int] = None) -> List[Product]:
+                        max_stock: Optional[int] = None,
+                        q: Optional[str] = None,
+                        include_descendants: bool = False) -> List[Product]:
         """
         Advanced product search with multiple filter options.
+        `q` is a full-text query over name and description ("phrase", prefix*),
+        ranked by relevance; the other filters narrow it down.
+        include_descendants widens category_id to its whole subtree.
         """
-        session = self.db.get_session()
-        try:
-            query = session.query(Product)
-            
-            # Name search (case-insensitive, partial match)
-            if name:
-                query = query.filter(Product.name.ilike(f'%{name}%'))
-            
-            # Price range filter
-            if min_price is not None:
-                query = query.filter(Product.price >= min_price)
-            if max_price is not None:
-                query = query.filter(Product.price <= max_price)
-            
-            # Category filter
-            if category_id is not None:
-                query = query.filter(Product.category_id == category_id)
-            
-            # Stock range filter
-            if min_stock is not None:
-                query = query.filter(Product.stock_quantity >= min_stock)
-            if max_stock is not None:
-                query = query.filter(Product.stock_quantity <= max_stock)
-            
+        with self.db.session_scope() as session:
+            query, score = self._build_search_query(
+                session, name, min_price, max_price, category_id, min_stock, max_stock, q,
+                include_descendants
+            )
+            if score is not None:
+                query = query.order_by(score.asc(), Product.id.asc())
             return query.all()
-        finally:
-            session.close()
+    
+    def search_products_page(self,
+                             name: Optional[str] = None,
+                             min_price: Optional[float] = None,
+                             max_price: Optional[float] = None,
+                             category_id: Optional[int] = None,
+                             min_stock: Optional[int] = None,
+                             max_stock: Optional[int] = None,
+                             q: Optional[str] = None,
+                             cursor: Optional[str] = None,
+                             page_size: int = DEFAULT_PAGE_SIZE,
+                             include_descendants: bool = False) -> Page[Product]:
+        """
+        Keyset-paginated variant of search_products, ordered by id, or by
+        (relevance, id) for full-text queries.
+        """
+        page_size = clamp_page_size(page_size)
+        position = decode_cursor_payload(cursor)
+        after_id = position['after_id']
+        with self.db.session_scope() as session:
+            query, score = self._build_search_query(
+                session, name, min_price, max_price, category_id, min_stock, max_stock, q,
+                include_descendants
+            )
+            if score is None:
+                rows = (query.filter(Product.id > after_id)
+                        .order_by(Product.id.asc())
+                        .limit(page_size + 1)
+                        .all())
+                return Page.from_rows(rows, page_size)
+            
+            query = query.add_columns(score)
+            if 'score' in position:
+                query = query.filter(or_(score > position['score'],
+                                         and_(score == position['score'], Product.id > after_id)))
+            rows = query.order_by(score.asc(), Product.id.asc()).limit(page_size + 1).all()
+            page = Page.from_rows(rows, page_size,
+                                  cursor_for=lambda row: encode_cursor(row[0].id, score=row[1]))
+            page.items = [product for product, _ in page.items]
+            return page
+    
+    def iter_search_products(self, chunk_size: int = DEFAULT_PAGE_SIZE,
+                             **filters: Any) -> Iterator[Product]:
+        """
+        Stream all matching products page by page.
+        """
+        cursor = None
+        while True:
+            page = self.search_products_page(cursor=cursor, page_size=chunk_size, **filters)
+            yield from page.items
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+    
+    def _build_search_query(self, session, name, min_price, max_price,
+                            category_id, min_stock, max_stock, q=None, include_descendants=False):
+        """
+        Returns (query, score); score is the relevance column to order by
+        when a full-text query is used with the FTS index, else None.
+        """
+        query = session.query(Product).options(self.category_option)
+        return apply_search_filters(query, name, min_price, max_price, category_id,
+                                    min_stock, max_stock, q, use_fts=bool(q) and self.fts_available,
+                                    include_descendants=include_descendants)
     
     def advanced_product_filter(self, filters: Dict[str, Any]) -> List[Product]:
         """
         Flexible product filtering based on multiple criteria.
         """
-        session = self.db.get_session()
-        try:
-            query = session.query(Product)
+        with self.db.session_scope() as session:
+            query = session.query(Product).options(self.category_option)
             
             # Dynamic filtering based on provided criteria
             for key, value in filters.items():
@@ -159,19 +645,18 @@ class AdvancedProductSearch:
                     query = query.filter(getattr(Product, key) == value)
             
             return query.all()
-        finally:
-            session.close()
     
-    def get_products_low_in_stock(self, threshold: int = 10, limit: int = 20) -> List[Product]:
+    def get_products_low_in_stock(self, threshold: Optional[int] = None, limit: int = 20) -> List[Product]:
         """
-        Get products with stock below a certain threshold.
+        Get products with stock below a certain threshold, lowest first.
+        Without a threshold each product's reorder point applies.
         """
-        session = self.db.get_session()
-        try:
+        if threshold is None:
+            return StockAlertService().low_stock_products(self.category_option, limit)
+        with self.db.session_scope() as session:
             return (session.query(Product)
+                    .options(self.category_option)
                     .filter(Product.stock_quantity <= threshold)
                     .order_by(Product.stock_quantity.asc())
                     .limit(limit)
                     .all())
-        finally:
-            session.close()
@@ -0,0 +1,298 @@
+# src/services/reservations.py
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from src.database.db_connection import DatabaseConnection
+from src.models.product import Product
+from src.models.stock_movement import utcnow
+from src.models.stock_reservation import (RESERVATION_ACTIVE, RESERVATION_COMMITTED, RESERVATION_EXPIRED,
+                                          RESERVATION_RELEASED, StockReservation)
+from src.services.cache import invalidate_on_commit
+from src.services.catalog_version import bump_catalog_version
+from src.services.concurrency import ConcurrentUpdateError, is_conflict, retry_on_conflict
+from src.services.product_service import ProductService, product_id_key
+from src.services.stock_ledger import REASON_RESERVATION
+from src.services.warehouses import resolve_warehouse
+
+logger = logging.getLogger(__name__)
+
+# Seconds a reservation holds stock unless the caller asks otherwise
+DEFAULT_RESERVATION_TTL = int(os.getenv('RESERVATION_TTL_SECONDS', 900))
+# Seconds between background sweeps; 0 disables the sweeper
+DEFAULT_SWEEP_INTERVAL = float(os.getenv('RESERVATION_SWEEP_INTERVAL', 30))
+# Reservations expired per sweep transaction
+SWEEP_BATCH_SIZE = 500
+
+products_table = Product.__table__
+reservations_table = StockReservation.__table__
+
+# Units held by a product's active reservations, for consistency checks
+active_units = func.coalesce(
+    select(func.sum(reservations_table.c.quantity))
+    .where(reservations_table.c.product_id == products_table.c.id,
+           reservations_table.c.status == RESERVATION_ACTIVE)
+    .scalar_subquery(), 0)
+
+
+class ReservationService:
+    """
+    Hold stock for orders without keeping a transaction open: reserve()
+    moves units into products.reserved_quantity with one guarded UPDATE,
+    and commit/release/expiry later close the reservation the same way.
+    Every step is its own short transaction and is retried on conflicts.
+    """
+    def __init__(self):
+        self.db = DatabaseConnection()
+        self.products = ProductService()
+
+    @retry_on_conflict()
+    def reserve(self, product_id: int, quantity: int, ttl_seconds: Optional[int] = None,
+                warehouse_id: Optional[int] = None, reference: Optional[str] = None,
+                actor: Optional[str] = None) -> StockReservation:
+        """
+        Hold `quantity` units of a product for `ttl_seconds`; fails unless
+        that many are in stock and not already reserved
+        """
+        if quantity <= 0:
+            raise ValueError("Reservation quantity must be positive")
+        ttl = DEFAULT_RESERVATION_TTL if ttl_seconds is None else ttl_seconds
+        if ttl <= 0:
+            raise ValueError("Reservation TTL must be positive")
+        try:
+            with self.db.session_scope() as session:
+                held = session.execute(
+                    update(products_table)
+                    .where(products_table.c.id == product_id,
+                           products_table.c.stock_quantity - products_table.c.reserved_quantity >= quantity)
+                    .values(reserved_quantity=products_table.c.reserved_quantity + quantity,
+                            version=products_table.c.version + 1)
+                ).rowcount
+                if not held:
+                    row = session.execute(
+                        select(products_table.c.stock_quantity, products_table.c.reserved_quantity)
+                        .where(products_table.c.id == product_id)
+                    ).first()
+                    if row is None:
+                        raise ValueError(f"Product with id {product_id} not found")
+                    available = max((row.stock_quantity or 0) - row.reserved_quantity, 0)
+                    raise ValueError(f"Only {available} unit(s) of product {product_id} are available")
+                if warehouse_id is not None:
+                    resolve_warehouse(session, warehouse_id)
+                now = utcnow()
+                reservation = StockReservation(
+                    product_id=product_id, warehouse_id=warehouse_id, quantity=quantity,
+                    reference=reference, actor=actor, created_at=now,
+                    expires_at=now + timedelta(seconds=ttl)
+                )
+                session.add(reservation)
+                session.flush()
+                bump_catalog_version(session, 'products')
+                invalidate_on_commit(session, [product_id_key(product_id)])
+            return reservation
+        except SQLAlchemyError as e:
+            if is_conflict(e):
+                raise
+            raise ValueError(f"Error reserving stock: {str(e)}")
+
+    @retry_on_conflict()
+    def commit(self, reservation_id: int, actor: Optional[str] = None) -> StockReservation:
+        """
+        Turn a reservation into a stock removal at its warehouse (the
+        default one if it named none), in one transaction. If that
+        warehouse cannot ship the units the reservation stays active.
+        """
+        try:
+            with self.db.session_scope() as session:
+                reservation = self._close(session, reservation_id, RESERVATION_COMMITTED)
+                self.products.update_stock(reservation.product_id, -reservation.quantity,
+                                           REASON_RESERVATION, actor or reservation.actor,
+                                           reservation.warehouse_id)
+            return reservation
+        except SQLAlchemyError as e:
+            if is_conflict(e):
+                raise
+            raise ValueError(f"Error committing reservation: {str(e)}")
+
+    @retry_on_conflict()
+    def release(self, reservation_id: int) -> StockReservation:
+        """Give the units of an active reservation back"""
+        try:
+            with self.db.session_scope() as session:
+                return self._close(session, reservation_id, RESERVATION_RELEASED)
+        except SQLAlchemyError as e:
+            if is_conflict(e):
+                raise
+            raise ValueError(f"Error releasing reservation: {str(e)}")
+
+    def _close(self, session, reservation_id: int, status: str) -> StockReservation:
+        reservation = session.get(StockReservation, reservation_id)
+        if reservation is None:
+            raise ValueError(f"Reservation with id {reservation_id} not found")
+        if reservation.status != RESERVATION_ACTIVE:
+            raise ValueError(f"Reservation {reservation_id} is already {reservation.status}")
+        now = utcnow()
+        if status == RESERVATION_COMMITTED and reservation.expires_at <= now:
+            raise ValueError(f"Reservation {reservation_id} has expired")
+        # The status guard makes closing a one-shot transition even if two
+        # callers read the reservation as active
+        closed = session.execute(
+            update(reservations_table)
+            .where(reservations_table.c.id == reservation_id,
+                   reservations_table.c.status == RESERVATION_ACTIVE)
+            .values(status=status, closed_at=now)
+        ).rowcount
+        if not closed:
+            raise ConcurrentUpdateError(f"Reservation {reservation_id} was closed by another request")
+        session.execute(
+            update(products_table)
+            .where(products_table.c.id == reservation.product_id)
+            .values(reserved_quantity=products_table.c.reserved_quantity - reservation.quantity,
+                    version=products_table.c.version + 1)
+        )
+        session.refresh(reservation)
+        bump_catalog_version(session, 'products')
+        invalidate_on_commit(session, [product_id_key(reservation.product_id)])
+        return reservation
+
+    @retry_on_conflict()
+    def expire_reservations(self, now: Optional[datetime] = None,
+                            batch_size: int = SWEEP_BATCH_SIZE) -> int:
+        """
+        Expire up to `batch_size` overdue reservations and return their
+        units to the available stock; returns how many were expired
+        """
+        now = now or utcnow()
+        overdue = (select(reservations_table.c.id)
+                   .where(reservations_table.c.status == RESERVATION_ACTIVE,
+                          reservations_table.c.expires_at <= now)
+                   .order_by(reservations_table.c.expires_at)
+                   .limit(batch_size))
+        try:
+            with self.db.session_scope() as session:
+                expired = session.execute(
+                    update(reservations_table)
+                    .where(reservations_table.c.id.in_(overdue),
+                           reservations_table.c.status == RESERVATION_ACTIVE)
+                    .values(status=RESERVATION_EXPIRED, closed_at=now)
+                    .returning(reservations_table.c.product_id, reservations_table.c.quantity)
+                ).all()
+                if not expired:
+                    return 0
+                units: Dict[int, int] = {}
+                for product_id, quantity in expired:
+                    units[product_id] = units.get(product_id, 0) + quantity
+                session.execute(
+                    update(products_table)
+                    .where(products_table.c.id == bindparam('item_id'))
+                    .values(reserved_quantity=products_table.c.reserved_quantity - bindparam('units'),
+                            version=products_table.c.version + 1),
+                    [{'item_id': product_id, 'units': count} for product_id, count in units.items()]
+                )
+                bump_catalog_version(session, 'products')
+                invalidate_on_commit(session, [product_id_key(product_id) for product_id in units])
+            return len(expired)
+        except SQLAlchemyError as e:
+            if is_conflict(e):
+                raise
+            raise ValueError(f"Error expiring reservations: {str(e)}")
+
+    def sweep(self, now: Optional[datetime] = None) -> int:
+        """Expire every overdue reservation, one batch per transaction"""
+        total = 0
+        while True:
+            count = self.expire_reservations(now)
+            total += count
+            if count < SWEEP_BATCH_SIZE:
+                return total
+
+    def get_reservation(self, reservation_id: int) -> Optional[StockReservation]:
+        with self.db.session_scope() as session:
+            return session.get(StockReservation, reservation_id)
+
+    def active_reservations(self, product_id: Optional[int] = None,
+                            limit: int = 100) -> List[StockReservation]:
+        """Open reservations, soonest to expire first"""
+        with self.db.session_scope() as session:
+            query = session.query(StockReservation).filter_by(status=RESERVATION_ACTIVE)
+            if product_id is not None:
+                query = query.filter_by(product_id=product_id)
+            return query.order_by(StockReservation.expires_at, StockReservation.id).limit(limit).all()
+
+    def check_consistency(self, limit: int = 100) -> List[tuple]:
+        """
+        (product_id, reserved_quantity, active units) for products whose
+        maintained reserved count differs from their active reservations
+        """
+        with self.db.session_scope() as session:
+            return [tuple(row) for row in session.execute(
+                select(products_table.c.id, products_table.c.reserved_quantity, active_units)
+                .where(products_table.c.reserved_quantity != active_units)
+                .order_by(products_table.c.id)
+                .limit(limit)
+            )]
+
+
+
+class ReservationSweeper:
+    """
+    Expire overdue reservations on a background thread every `interval`
+    seconds. Sweeps are idempotent, so several processes may run one.
+    """
+    def __init__(self, service: Optional[ReservationService] = None,
+                 interval: float = DEFAULT_SWEEP_INTERVAL):
+        self.service = service or ReservationService()
+        self.interval = interval
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._worker is None:
+            self._stop.clear()
+            self._worker = threading.Thread(target=self._run, name='reservation-sweeper', daemon=True)
+            self._worker.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            self._worker = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                expired = self.service.sweep()
+                if expired:
+                    logger.info("Expired %d stock reservation(s)", expired)
+            except Exception:
+                logger.exception("Reservation sweep failed")
+
+
+_sweeper: Optional[ReservationSweeper] = None
+_sweeper_lock = threading.Lock()
+
+
+def start_reservation_sweeper() -> Optional[ReservationSweeper]:
+    """Start this process's sweeper once; None when RESERVATION_SWEEP_INTERVAL is 0"""
+    global _sweeper
+    if DEFAULT_SWEEP_INTERVAL <= 0:
+        return None
+    with _sweeper_lock:
+        if _sweeper is None:
+            _sweeper = ReservationSweeper()
+            _sweeper.start()
+    return _sweeper
+
+
+def init_reservation_sweeper(app):
+    """
+    Start the sweeper with the first request a Flask app serves, so that
+    importing the app (scripts, tests, the reloader's parent) starts nothing
+    """
+    @app.before_request
+    def ensure_reservation_sweeper():
+        if _sweeper is None and DEFAULT_SWEEP_INTERVAL > 0:
+            start_reservation_sweeper()
@@ -0,0 +1,369 @@
+# src/services/stock_alerts.py
+import json
+import logging
+import os
+import queue
+import threading
+import urllib.request
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from sqlalchemy import bindparam, delete, event, func, insert, literal, select, update
+from src.database.db_connection import DatabaseConnection
+from src.models.category import Category
+from src.models.product import Product
+from src.models.stock_alert import StockAlert
+from src.models.stock_movement import utcnow
+from src.utils.pagination import (Page, DEFAULT_PAGE_SIZE, clamp_page_size, decode_cursor,
+                                  encode_cursor)
+from src.utils.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+# Used when neither the product nor its category sets a reorder point;
+# the old global low-stock threshold
+DEFAULT_REORDER_POINT = 10
+
+ALERT_RAISED = 'raised'
+ALERT_CLEARED = 'cleared'
+
+# Product ids per IN (...) lookup when refreshing alerts
+REFRESH_CHUNK_SIZE = 500
+
+alerts_table = StockAlert.__table__
+products_table = Product.__table__
+categories_table = Category.__table__
+
+stock_level = func.coalesce(products_table.c.stock_quantity, 0)
+effective_reorder_point = func.coalesce(products_table.c.reorder_point,
+                                        categories_table.c.reorder_point, DEFAULT_REORDER_POINT)
+effective_reorder_quantity = func.coalesce(products_table.c.reorder_quantity,
+                                           categories_table.c.reorder_quantity)
+
+
+class StockAlertEvent(NamedTuple):
+    """A product crossing its reorder point, in either direction"""
+    kind: str
+    product_id: int
+    stock_quantity: Optional[int]
+    reorder_point: Optional[int]
+    reorder_quantity: Optional[int]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+
+class AlertDiscrepancy(NamedTuple):
+    product_id: int
+    expected: bool
+    recorded: bool
+
+
+def reorder_settings_for(product: Product) -> Tuple[int, Optional[int]]:
+    """
+    A loaded product's effective (reorder point, reorder quantity), as the
+    alert engine sees them
+    """
+    category = product.category
+    point = product.reorder_point
+    if point is None:
+        point = category.reorder_point if category and category.reorder_point is not None \
+            else DEFAULT_REORDER_POINT
+    quantity = product.reorder_quantity
+    if quantity is None and category is not None:
+        quantity = category.reorder_quantity
+    return point, quantity
+
+
+def reorder_levels():
+    """
+    (product_id, stock, reorder point, reorder quantity) per product, with
+    the category defaults applied
+    """
+    return (select(products_table.c.id, stock_level, effective_reorder_point,
+                   effective_reorder_quantity)
+            .select_from(products_table.outerjoin(
+                categories_table, categories_table.c.id == products_table.c.category_id)))
+
+
+def below_reorder_point():
+    """reorder_levels() of the products at or below their reorder point"""
+    return reorder_levels().where(stock_level <= effective_reorder_point)
+
+
+def refresh_alerts(bind, product_ids: Iterable[int]) -> List[StockAlertEvent]:
+    """
+    Bring the alerts of the given products up to date through `bind` (a
+    Session or Connection) inside the caller's transaction. Only these
+    products are read, so the cost follows the size of the write, not the
+    catalog. Returns the threshold crossings for the alert hooks.
+    """
+    product_ids = list(dict.fromkeys(product_ids))
+    events: List[StockAlertEvent] = []
+    for start in range(0, len(product_ids), REFRESH_CHUNK_SIZE):
+        chunk = product_ids[start:start + REFRESH_CHUNK_SIZE]
+        levels = {row[0]: tuple(row[1:]) for row in bind.execute(
+            reorder_levels().where(products_table.c.id.in_(chunk)))}
+        current = {product_id: level for product_id, level in levels.items() if level[0] <= level[1]}
+        recorded = {row[0]: tuple(row[1:]) for row in bind.execute(
+            select(alerts_table.c.product_id, alerts_table.c.stock_quantity,
+                   alerts_table.c.reorder_point, alerts_table.c.reorder_quantity)
+            .where(alerts_table.c.product_id.in_(chunk)))}
+
+        raised = [product_id for product_id in current if product_id not in recorded]
+        changed = [product_id for product_id in current
+                   if product_id in recorded and current[product_id] != recorded[product_id]]
+        # Includes deleted products, which no longer match at all
+        cleared = [product_id for product_id in recorded if product_id not in current]
+
+        if cleared:
+            bind.execute(delete(alerts_table).where(alerts_table.c.product_id.in_(cleared)))
+        if raised:
+            raised_at = utcnow()
+            bind.execute(insert(alerts_table), [
+                {'product_id': product_id, 'stock_quantity': current[product_id][0],
+                 'reorder_point': current[product_id][1], 'reorder_quantity': current[product_id][2],
+                 'raised_at': raised_at}
+                for product_id in raised
+            ])
+        if changed:
+            bind.execute(
+                update(alerts_table)
+                .where(alerts_table.c.product_id == bindparam('alert_id'))
+                .values(stock_quantity=bindparam('stock'), reorder_point=bindparam('point'),
+                        reorder_quantity=bindparam('quantity')),
+                [{'alert_id': product_id, 'stock': current[product_id][0],
+                  'point': current[product_id][1], 'quantity': current[product_id][2]}
+                 for product_id in changed]
+            )
+
+        events.extend(StockAlertEvent(ALERT_RAISED, product_id, *current[product_id])
+                      for product_id in raised)
+        # A deleted product clears with no current figures
+        events.extend(StockAlertEvent(ALERT_CLEARED, product_id, *levels.get(product_id, (None,) * 3))
+                      for product_id in cleared)
+    return events
+
+
+def rebuild_alerts(conn) -> int:
+    """
+    Recompute every alert with one INSERT ... SELECT; returns the alert count.
+    For migrations and repairs, not for the write path.
+    """
+    conn.execute(delete(alerts_table))
+    result = conn.execute(insert(alerts_table).from_select(
+        ['product_id', 'stock_quantity', 'reorder_point', 'reorder_quantity', 'raised_at'],
+        below_reorder_point().add_columns(literal(utcnow()))
+    ))
+    return result.rowcount
+
+
+def products_in_category(bind, category_id: int) -> List[int]:
+    return list(bind.execute(
+        select(products_table.c.id).where(products_table.c.category_id == category_id)
+    ).scalars())
+
+
+# Push hooks
+
+AlertCallback = Callable[[List[StockAlertEvent]], None]
+
+
+class AlertHooks:
+    """
+    Callbacks run with the alert events of each committed write. A failing
+    callback is logged and never undoes or blocks the write.
+    """
+    def __init__(self, callbacks: Sequence[AlertCallback] = ()):
+        self._lock = threading.Lock()
+        self._callbacks: List[AlertCallback] = list(callbacks)
+
+    def register(self, callback: AlertCallback) -> AlertCallback:
+        with self._lock:
+            self._callbacks.append(callback)
+        return callback
+
+    def unregister(self, callback: AlertCallback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def dispatch(self, events: List[StockAlertEvent]):
+        if not events:
+            return
+        with self._lock:
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            try:
+                callback(events)
+            except Exception:
+                logger.exception("Stock alert hook %r failed", callback)
+
+
+class JsonLinesSink:
+    """Append each event as a JSON line to a local file"""
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, events: List[StockAlertEvent]):
+        lines = ''.join(json.dumps({**item.to_dict(), 'at': utcnow().isoformat()}) + '\n'
+                        for item in events)
+        with self._lock, open(self.path, 'a', encoding='utf-8') as handle:
+            handle.write(lines)
+
+
+class WebhookSink:
+    """
+    POST each batch of events as JSON to a URL. Delivery happens on a
+    background thread so a slow receiver never holds up a stock write;
+    batches beyond `max_pending` are dropped with a warning.
+    """
+    def __init__(self, url: str, timeout: float = 2.0, max_pending: int = 1000):
+        self.url = url
+        self.timeout = timeout
+        self._queue: 'queue.Queue[List[Dict[str, Any]]]' = queue.Queue(max_pending)
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def __call__(self, events: List[StockAlertEvent]):
+        self._start_worker()
+        try:
+            self._queue.put_nowait([item.to_dict() for item in events])
+        except queue.Full:
+            logger.warning("Stock alert webhook backlog full, dropped %d event(s)", len(events))
+
+    def _start_worker(self):
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._deliver, name='stock-alert-webhook',
+                                                    daemon=True)
+                    self._worker.start()
+
+    def _deliver(self):
+        while True:
+            payload = self._queue.get()
+            request = urllib.request.Request(self.url, data=dumps({'events': payload}), method='POST',
+                                             headers={'Content-Type': 'application/json'})
+            try:
+                urllib.request.urlopen(request, timeout=self.timeout).close()
+            except (OSError, ValueError) as e:
+                logger.warning("Stock alert webhook to %s failed: %s", self.url, e)
+            finally:
+                self._queue.task_done()
+
+    def join(self):
+        """Wait until every queued batch was attempted"""
+        self._queue.join()
+
+
+def alert_hooks_from_env() -> AlertHooks:
+    """
+    Hooks configured by STOCK_ALERT_WEBHOOK_URL and STOCK_ALERT_LOG
+    """
+    hooks = AlertHooks()
+    if os.getenv('STOCK_ALERT_WEBHOOK_URL'):
+        hooks.register(WebhookSink(os.environ['STOCK_ALERT_WEBHOOK_URL'],
+                                   timeout=float(os.getenv('STOCK_ALERT_WEBHOOK_TIMEOUT', 2.0))))
+    if os.getenv('STOCK_ALERT_LOG'):
+        hooks.register(JsonLinesSink(os.environ['STOCK_ALERT_LOG']))
+    return hooks
+
+
+_hooks: Optional[AlertHooks] = None
+_hooks_lock = threading.Lock()
+
+
+def get_alert_hooks() -> AlertHooks:
+    global _hooks
+    if _hooks is None:
+        with _hooks_lock:
+            if _hooks is None:
+                _hooks = alert_hooks_from_env()
+    return _hooks
+
+
+def dispatch_alert_events(events: List[StockAlertEvent]):
+    """Push events of a write that has already committed"""
+    if events:
+        get_alert_hooks().dispatch(events)
+
+
+def notify_on_commit(session, events: List[StockAlertEvent]):
+    """
+    Hold events until the session commits; a rollback discards them, so
+    hooks never hear about a crossing that didn't happen
+    """
+    if not events:
+        return
+    session.info.setdefault('stock_alert_events', []).extend(events)
+    if not event.contains(session, 'after_commit', _flush_alert_events):
+        event.listen(session, 'after_commit', _flush_alert_events)
+        event.listen(session, 'after_rollback', _discard_alert_events)
+
+
+def _flush_alert_events(session):
+    dispatch_alert_events(session.info.pop('stock_alert_events', []))
+
+
+def _discard_alert_events(session):
+    session.info.pop('stock_alert_events', None)
+
+
+class StockAlertService:
+    """
+    Reads over the maintained alert set; each query costs O(alerts)
+    """
+    def __init__(self):
+        self.db = DatabaseConnection()
+
+    def count_alerts(self) -> int:
+        with self.db.session_scope() as session:
+            return session.scalar(select(func.count()).select_from(alerts_table))
+
+    def get_alerts_page(self, cursor: Optional[str] = None,
+                        page_size: int = DEFAULT_PAGE_SIZE) -> Page[StockAlert]:
+        """
+        Keyset-paginated alerts ordered by product id
+        """
+        page_size = clamp_page_size(page_size)
+        after_id = decode_cursor(cursor)
+        with self.db.session_scope() as session:
+            rows = (session.query(StockAlert)
+                    .filter(StockAlert.product_id > after_id)
+                    .order_by(StockAlert.product_id.asc())
+                    .limit(page_size + 1)
+                    .all())
+            return Page.from_rows(rows, page_size, cursor_for=lambda alert: encode_cursor(alert.product_id))
+
+    def low_stock_products(self, category_option=None, limit: Optional[int] = None) -> List[Product]:
+        """
+        Products with an open alert, lowest stock first
+        """
+        with self.db.session_scope() as session:
+            query = (session.query(Product)
+                     .join(StockAlert, StockAlert.product_id == Product.id)
+                     .order_by(StockAlert.stock_quantity.asc(), StockAlert.product_id.asc()))
+            if category_option is not None:
+                query = query.options(category_option)
+            if limit is not None:
+                query = query.limit(limit)
+            return query.all()
+
+    def check_consistency(self, limit: int = 100) -> List[AlertDiscrepancy]:
+        """
+        Full scan comparing the alert set with products and their reorder
+        points; stale figures on an open alert count as a discrepancy too
+        """
+        with self.db.session_scope() as session:
+            expected = {row[0]: tuple(row[1:]) for row in session.execute(below_reorder_point())}
+            recorded = {row[0]: tuple(row[1:]) for row in session.execute(
+                select(alerts_table.c.product_id, alerts_table.c.stock_quantity,
+                       alerts_table.c.reorder_point, alerts_table.c.reorder_quantity))}
+        discrepancies = [AlertDiscrepancy(product_id, product_id in expected, product_id in recorded)
+                         for product_id in sorted(expected.keys() | recorded.keys())
+                         if expected.get(product_id) != recorded.get(product_id)]
+        return discrepancies[:limit]
+
+    def rebuild(self) -> int:
+        with self.db.engine.begin() as conn:
+            return rebuild_alerts(conn)
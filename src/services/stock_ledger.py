@@ -0,0 +1,222 @@
+# src/services/stock_ledger.py
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from sqlalchemy import func, insert, literal, select, update
+from src.database.db_connection import DatabaseConnection
+from src.models.product import Product
+from src.models.stock_movement import StockMovement, StockSnapshot, StockSnapshotItem, utcnow
+from src.utils.pagination import Page, DEFAULT_PAGE_SIZE, clamp_page_size, decode_cursor
+
+REASON_ADJUSTMENT = 'adjustment'
+REASON_INITIAL = 'initial'
+REASON_IMPORT = 'import'
+REASON_DELETED = 'deleted'
+REASON_TRANSFER = 'transfer'
+REASON_RESERVATION = 'reservation'
+
+# Rows per executemany batch when writing the ledger
+MOVEMENT_CHUNK_SIZE = 5000
+
+movements_table = StockMovement.__table__
+snapshots_table = StockSnapshot.__table__
+snapshot_items_table = StockSnapshotItem.__table__
+products_table = Product.__table__
+
+
+def parse_timestamp(value: str) -> datetime:
+    """
+    Parse an ISO 8601 time into the naive UTC datetimes the ledger stores
+    """
+    try:
+        moment = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except (ValueError, AttributeError):
+        raise ValueError(f"Invalid ISO 8601 time '{value}'")
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def record_movements(bind, movements: Iterable[Tuple[int, int]], reason: str = REASON_ADJUSTMENT,
+                     actor: Optional[str] = None, warehouse_id: Optional[int] = None):
+    """
+    Append (product_id, quantity_change) movements to the ledger through
+    `bind` (a Session or Connection), i.e. inside the caller's transaction.
+    Zero changes are skipped; the batch shares one timestamp.
+    """
+    created_at = utcnow()
+    rows = [{'product_id': product_id, 'quantity_change': change, 'warehouse_id': warehouse_id,
+             'reason': reason, 'actor': actor, 'created_at': created_at}
+            for product_id, change in movements if change]
+    for start in range(0, len(rows), MOVEMENT_CHUNK_SIZE):
+        bind.execute(insert(movements_table), rows[start:start + MOVEMENT_CHUNK_SIZE])
+
+
+def record_category_removal(bind, category_id: int, actor: Optional[str] = None):
+    """
+    Write off the stock of every product in a category about to be deleted,
+    with one INSERT ... SELECT
+    """
+    stock = func.coalesce(products_table.c.stock_quantity, 0)
+    bind.execute(insert(movements_table).from_select(
+        ['product_id', 'quantity_change', 'reason', 'actor', 'created_at'],
+        select(products_table.c.id, -stock, literal(REASON_DELETED), literal(actor), literal(utcnow()))
+        .where(products_table.c.category_id == category_id, stock != 0)
+    ))
+
+
+def write_snapshot(conn) -> int:
+    """
+    Snapshot every product's stock together with the id of the last
+    movement it already includes; returns the new snapshot id
+    """
+    # Writing first takes SQLite's write lock, so the watermark and the
+    # copied stock levels below see the same committed state
+    snapshot_id = conn.execute(
+        insert(snapshots_table).values(taken_at=utcnow(), last_movement_id=0, product_count=0)
+    ).inserted_primary_key[0]
+    watermark = conn.scalar(select(func.coalesce(func.max(movements_table.c.id), 0)))
+    result = conn.execute(insert(snapshot_items_table).from_select(
+        ['snapshot_id', 'product_id', 'stock_quantity'],
+        select(literal(snapshot_id), products_table.c.id,
+               func.coalesce(products_table.c.stock_quantity, 0))
+    ))
+    conn.execute(update(snapshots_table).where(snapshots_table.c.id == snapshot_id)
+                 .values(last_movement_id=watermark, product_count=result.rowcount))
+    return snapshot_id
+
+
+class LedgerDiscrepancy(NamedTuple):
+    product_id: int
+    stock_quantity: int
+    ledger_quantity: int
+
+
+class StockLedgerService:
+    """
+    Reads over the stock ledger: movement history, snapshots, stock "as of"
+    a past time and a consistency check against products.stock_quantity.
+    """
+    def __init__(self):
+        self.db = DatabaseConnection()
+
+    def take_snapshot(self) -> StockSnapshot:
+        """
+        Copy every product's current stock into a new snapshot
+        """
+        with self.db.engine.begin() as conn:
+            snapshot_id = write_snapshot(conn)
+        with self.db.get_session() as session:
+            return session.get(StockSnapshot, snapshot_id)
+
+    def movements_since_snapshot(self) -> int:
+        with self.db.session_scope() as session:
+            snapshot = self.latest_snapshot(session)
+            watermark = snapshot.last_movement_id if snapshot else 0
+            return session.scalar(select(func.count()).select_from(movements_table)
+                                  .where(movements_table.c.id > watermark))
+
+    def snapshot_if_due(self, min_movements: int) -> Optional[StockSnapshot]:
+        """
+        Take a snapshot once at least `min_movements` have been recorded
+        since the last one; meant to be run periodically (e.g. from cron)
+        """
+        if self.movements_since_snapshot() < min_movements:
+            return None
+        return self.take_snapshot()
+
+    @staticmethod
+    def latest_snapshot(session, at: Optional[datetime] = None) -> Optional[StockSnapshot]:
+        query = session.query(StockSnapshot)
+        if at is not None:
+            query = query.filter(StockSnapshot.taken_at <= at)
+        return query.order_by(StockSnapshot.taken_at.desc(), StockSnapshot.id.desc()).first()
+
+    def _snapshot_for(self, session, at: datetime) -> StockSnapshot:
+        snapshot = self.latest_snapshot(session, at)
+        if snapshot is None:
+            first = session.query(func.min(StockSnapshot.taken_at)).scalar()
+            if first is None:
+                raise ValueError("No stock snapshot exists yet; run the migrations first")
+            raise ValueError(f"Stock history starts at {first.isoformat()}")
+        return snapshot
+
+    def stock_as_of(self, product_id: int, at: datetime) -> int:
+        """
+        Stock of one product at `at`: the nearest earlier snapshot plus the
+        movements recorded after it, read with one index range scan
+        """
+        with self.db.session_scope() as session:
+            snapshot = self._snapshot_for(session, at)
+            base = session.scalar(
+                select(snapshot_items_table.c.stock_quantity)
+                .where(snapshot_items_table.c.snapshot_id == snapshot.id,
+                       snapshot_items_table.c.product_id == product_id)
+            ) or 0
+            delta = session.scalar(
+                select(func.coalesce(func.sum(movements_table.c.quantity_change), 0))
+                .where(movements_table.c.product_id == product_id,
+                       movements_table.c.id > snapshot.last_movement_id,
+                       movements_table.c.created_at <= at)
+            )
+            return base + delta
+
+    def stock_levels_as_of(self, at: datetime) -> Dict[int, int]:
+        """
+        Stock of every product that had any at `at`, keyed by product id
+        """
+        with self.db.session_scope() as session:
+            snapshot = self._snapshot_for(session, at)
+            levels: Dict[int, int] = dict(session.execute(
+                select(snapshot_items_table.c.product_id, snapshot_items_table.c.stock_quantity)
+                .where(snapshot_items_table.c.snapshot_id == snapshot.id)
+            ).all())
+            for product_id, delta in session.execute(
+                select(movements_table.c.product_id, func.sum(movements_table.c.quantity_change))
+                .where(movements_table.c.id > snapshot.last_movement_id,
+                       movements_table.c.created_at <= at)
+                .group_by(movements_table.c.product_id)
+            ):
+                levels[product_id] = levels.get(product_id, 0) + delta
+            return {product_id: quantity for product_id, quantity in levels.items() if quantity}
+
+    def get_movements_page(self, product_id: Optional[int] = None, cursor: Optional[str] = None,
+                           page_size: int = DEFAULT_PAGE_SIZE) -> Page[StockMovement]:
+        """
+        Ledger entries newest first, optionally for one product
+        """
+        page_size = clamp_page_size(page_size)
+        after_id = decode_cursor(cursor)
+        with self.db.session_scope() as session:
+            query = session.query(StockMovement)
+            if product_id is not None:
+                query = query.filter(StockMovement.product_id == product_id)
+            if after_id:
+                query = query.filter(StockMovement.id < after_id)
+            rows = query.order_by(StockMovement.id.desc()).limit(page_size + 1).all()
+            return Page.from_rows(rows, page_size)
+
+    def check_consistency(self, limit: int = 100) -> List[LedgerDiscrepancy]:
+        """
+        Products whose stock_quantity differs from latest snapshot + ledger
+        """
+        with self.db.session_scope() as session:
+            snapshot = self.latest_snapshot(session)
+            snapshot_id = snapshot.id if snapshot else 0
+            watermark = snapshot.last_movement_id if snapshot else 0
+            base = (select(snapshot_items_table.c.product_id, snapshot_items_table.c.stock_quantity)
+                    .where(snapshot_items_table.c.snapshot_id == snapshot_id).subquery())
+            moved = (select(movements_table.c.product_id,
+                            func.sum(movements_table.c.quantity_change).label('delta'))
+                     .where(movements_table.c.id > watermark)
+                     .group_by(movements_table.c.product_id).subquery())
+            actual = func.coalesce(products_table.c.stock_quantity, 0)
+            expected = func.coalesce(base.c.stock_quantity, 0) + func.coalesce(moved.c.delta, 0)
+            rows = session.execute(
+                select(products_table.c.id, actual, expected)
+                .outerjoin(base, base.c.product_id == products_table.c.id)
+                .outerjoin(moved, moved.c.product_id == products_table.c.id)
+                .where(actual != expected)
+                .order_by(products_table.c.id)
+                .limit(limit)
+            ).all()
+            return [LedgerDiscrepancy(*row) for row in rows]
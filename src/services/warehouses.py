@@ -0,0 +1,397 @@
+# src/services/warehouses.py
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+from sqlalchemy import MetaData, Table, bindparam, delete, func, insert, literal, select, union_all, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+from src.database.db_connection import STOCK_SHARD_SCHEMA, DatabaseConnection
+from src.models.warehouse import Warehouse, WarehouseStock
+from src.services.stock_alerts import categories_table, effective_reorder_point, products_table
+from src.services.stock_ledger import REASON_TRANSFER, record_movements
+
+# Receives stock written without a location (product creation, imports,
+# stock changes that name no warehouse); created by migration 8
+DEFAULT_WAREHOUSE_CODE = 'MAIN'
+DEFAULT_WAREHOUSE_NAME = 'Main warehouse'
+
+# Product ids per statement when booking or reading location stock
+LOCATION_CHUNK_SIZE = 500
+
+stock_table = WarehouseStock.__table__
+warehouses_table = Warehouse.__table__
+
+# Copies of warehouse_stock bound to each attached shard schema
+_shard_tables: Dict[int, Table] = {}
+
+
+class LocationStock(NamedTuple):
+    warehouse_id: int
+    code: str
+    name: str
+    quantity: int
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+
+class LocationLowStock(NamedTuple):
+    product_id: int
+    name: str
+    quantity: int
+    reorder_point: int
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+
+class TransferResult(NamedTuple):
+    product_id: int
+    from_warehouse_id: int
+    to_warehouse_id: int
+    quantity: int
+    from_quantity: int
+    to_quantity: int
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+
+class LocationDiscrepancy(NamedTuple):
+    product_id: int
+    stock_quantity: int
+    location_total: int
+
+
+def _connection(bind: Union[Session, Connection]) -> Connection:
+    return bind.connection() if isinstance(bind, Session) else bind
+
+
+def shard_table(shard: Optional[int]) -> Table:
+    """The warehouse_stock table of a shard; None is the main database's"""
+    if shard is None:
+        return stock_table
+    if shard not in _shard_tables:
+        _shard_tables[shard] = stock_table.to_metadata(MetaData(), schema=STOCK_SHARD_SCHEMA.format(shard))
+    return _shard_tables[shard]
+
+
+def attached_shards(bind: Union[Session, Connection]) -> List[int]:
+    conn = _connection(bind)
+    if conn.dialect.name != 'sqlite':
+        return []
+    prefix = STOCK_SHARD_SCHEMA.format('')
+    names = [row[1] for row in conn.exec_driver_sql("PRAGMA database_list")]
+    return sorted(int(name[len(prefix):]) for name in names
+                  if name.startswith(prefix) and name[len(prefix):].isdigit())
+
+
+def create_shard_tables(conn: Connection):
+    for shard in attached_shards(conn):
+        shard_table(shard).create(conn, checkfirst=True)
+
+
+def drop_shard_tables(conn: Connection):
+    for shard in attached_shards(conn):
+        shard_table(shard).drop(conn, checkfirst=True)
+
+
+def location_tables(bind) -> List[Table]:
+    """Every table that can hold warehouse stock rows on this connection"""
+    return [stock_table] + [shard_table(shard) for shard in attached_shards(bind)]
+
+
+def resolve_warehouse(bind, warehouse_id: Optional[int] = None) -> Tuple[int, Table]:
+    """
+    (id, stock table) of a warehouse, or of the default one for None
+    """
+    stmt = select(warehouses_table.c.id, warehouses_table.c.shard)
+    if warehouse_id is None:
+        stmt = stmt.where(warehouses_table.c.code == DEFAULT_WAREHOUSE_CODE)
+    else:
+        stmt = stmt.where(warehouses_table.c.id == warehouse_id)
+    row = bind.execute(stmt).first()
+    if row is None:
+        if warehouse_id is None:
+            raise ValueError(f"Default warehouse '{DEFAULT_WAREHOUSE_CODE}' not found")
+        raise ValueError(f"Warehouse with id {warehouse_id} not found")
+    if row.shard is not None and row.shard not in attached_shards(bind):
+        raise ValueError(f"Stock shard {row.shard} of warehouse {row.id} is not attached; "
+                         f"check WAREHOUSE_STOCK_SHARDS")
+    return row.id, shard_table(row.shard)
+
+
+def add_location_stock(bind, warehouse_id: int, table: Table, movements: Iterable[Tuple[int, int]]):
+    """
+    Add (product_id, quantity_change) deltas to a warehouse's rows,
+    creating missing ones. Unguarded: callers check what they take away.
+    """
+    totals: Dict[int, int] = {}
+    for product_id, change in movements:
+        if change:
+            totals[product_id] = totals.get(product_id, 0) + change
+    items = list(totals.items())
+    for start in range(0, len(items), LOCATION_CHUNK_SIZE):
+        chunk = dict(items[start:start + LOCATION_CHUNK_SIZE])
+        existing = set(bind.execute(
+            select(table.c.product_id)
+            .where(table.c.warehouse_id == warehouse_id, table.c.product_id.in_(chunk))
+        ).scalars())
+        if existing:
+            bind.execute(
+                update(table)
+                .where(table.c.warehouse_id == warehouse_id, table.c.product_id == bindparam('item_id'))
+                .values(quantity=table.c.quantity + bindparam('delta')),
+                [{'item_id': product_id, 'delta': chunk[product_id]} for product_id in existing]
+            )
+        missing = [product_id for product_id in chunk if product_id not in existing]
+        if missing:
+            bind.execute(insert(table), [{'warehouse_id': warehouse_id, 'product_id': product_id,
+                                          'quantity': chunk[product_id]} for product_id in missing])
+
+
+def take_location_stock(bind, warehouse_id: int, table: Table, product_id: int, quantity: int) -> bool:
+    """
+    Remove stock from a warehouse with one conditional UPDATE; False when
+    the warehouse holds less than `quantity`
+    """
+    result = bind.execute(
+        update(table)
+        .where(table.c.warehouse_id == warehouse_id, table.c.product_id == product_id,
+               table.c.quantity >= quantity)
+        .values(quantity=table.c.quantity - quantity)
+    )
+    return result.rowcount == 1
+
+
+def change_location_stock(bind, warehouse_id: int, table: Table, product_id: int, change: int):
+    if change >= 0:
+        add_location_stock(bind, warehouse_id, table, [(product_id, change)])
+    elif not take_location_stock(bind, warehouse_id, table, product_id, -change):
+        raise ValueError(f"Not enough stock at warehouse {warehouse_id}")
+
+
+def location_levels(bind, warehouse_id: int, table: Table, product_ids: List[int]) -> Dict[int, int]:
+    """Stock of the given products at one warehouse; products it never held are left out"""
+    levels: Dict[int, int] = {}
+    for start in range(0, len(product_ids), LOCATION_CHUNK_SIZE):
+        chunk = product_ids[start:start + LOCATION_CHUNK_SIZE]
+        levels.update(bind.execute(
+            select(table.c.product_id, table.c.quantity)
+            .where(table.c.warehouse_id == warehouse_id, table.c.product_id.in_(chunk))
+        ).all())
+    return levels
+
+
+def book_default_location(bind, movements: Iterable[Tuple[int, int]]) -> int:
+    """Book product-wide stock changes at the default warehouse; returns its id"""
+    warehouse_id, table = resolve_warehouse(bind)
+    add_location_stock(bind, warehouse_id, table, movements)
+    return warehouse_id
+
+
+def remove_product_stock(bind, product_ids: Iterable[int]):
+    """Drop the location rows of deleted products, wherever they live"""
+    product_ids = list(product_ids)
+    for table in location_tables(bind):
+        for start in range(0, len(product_ids), LOCATION_CHUNK_SIZE):
+            bind.execute(delete(table).where(
+                table.c.product_id.in_(product_ids[start:start + LOCATION_CHUNK_SIZE])))
+
+
+def seed_default_warehouse(conn: Connection):
+    """
+    Create the default warehouse and give it all stock that has no
+    location yet, so totals and locations agree from the start
+    """
+    default = select(warehouses_table.c.id).where(warehouses_table.c.code == DEFAULT_WAREHOUSE_CODE)
+    if conn.scalar(default) is None:
+        conn.execute(insert(warehouses_table).values(code=DEFAULT_WAREHOUSE_CODE, name=DEFAULT_WAREHOUSE_NAME))
+    warehouse_id, table = resolve_warehouse(conn)
+    if conn.scalar(select(func.count()).select_from(table)) == 0:
+        conn.execute(insert(table).from_select(
+            ['warehouse_id', 'product_id', 'quantity'],
+            select(literal(warehouse_id), products_table.c.id,
+                   func.coalesce(products_table.c.stock_quantity, 0))
+        ))
+
+
+class WarehouseService:
+    """
+    Warehouses and the stock each one holds. products.stock_quantity stays
+    the maintained total, updated in the same transaction as the location
+    rows; transfers move stock between locations and leave it untouched.
+    """
+    def __init__(self):
+        self.db = DatabaseConnection()
+
+    def create_warehouse(self, code: str, name: str, shard: Optional[int] = None) -> Warehouse:
+        try:
+            with self.db.session_scope() as session:
+                if shard is not None and shard not in attached_shards(session):
+                    raise ValueError(f"Stock shard {shard} is not attached; check WAREHOUSE_STOCK_SHARDS")
+                warehouse = Warehouse(code=code, name=name, shard=shard)
+                session.add(warehouse)
+                session.flush()
+            return warehouse
+        except IntegrityError as e:
+            raise ValueError(f"Error creating warehouse: {str(e)}")
+
+    def get_all_warehouses(self) -> List[Warehouse]:
+        with self.db.session_scope() as session:
+            return session.query(Warehouse).order_by(Warehouse.id).all()
+
+    def find_warehouse(self, warehouse_id: Optional[int] = None,
+                       code: Optional[str] = None) -> Optional[Warehouse]:
+        with self.db.session_scope() as session:
+            if code is not None:
+                return session.query(Warehouse).filter_by(code=code.strip().upper()).first()
+            return session.get(Warehouse, warehouse_id)
+
+    def delete_warehouse(self, warehouse_id: int) -> bool:
+        """Delete an empty warehouse; the default one is kept"""
+        try:
+            with self.db.session_scope() as session:
+                warehouse = session.get(Warehouse, warehouse_id)
+                if warehouse is None:
+                    raise ValueError(f"Warehouse with id {warehouse_id} not found")
+                if warehouse.code == DEFAULT_WAREHOUSE_CODE:
+                    raise ValueError("The default warehouse cannot be deleted")
+                _, table = resolve_warehouse(session, warehouse_id)
+                if session.scalar(select(func.sum(table.c.quantity))
+                                  .where(table.c.warehouse_id == warehouse_id)):
+                    raise ValueError("Transfer this warehouse's stock elsewhere first")
+                session.execute(delete(table).where(table.c.warehouse_id == warehouse_id))
+                session.delete(warehouse)
+            return True
+        except SQLAlchemyError as e:
+            raise ValueError(f"Error deleting warehouse: {str(e)}")
+
+    def move_to_shard(self, warehouse_id: int, shard: Optional[int]) -> Warehouse:
+        """
+        Move a warehouse's stock rows to another attached shard (None: the
+        main database) in one transaction
+        """
+        try:
+            with self.db.session_scope() as session:
+                warehouse = session.get(Warehouse, warehouse_id)
+                if warehouse is None:
+                    raise ValueError(f"Warehouse with id {warehouse_id} not found")
+                if shard is not None and shard not in attached_shards(session):
+                    raise ValueError(f"Stock shard {shard} is not attached; check WAREHOUSE_STOCK_SHARDS")
+                if shard == warehouse.shard:
+                    return warehouse
+                _, source = resolve_warehouse(session, warehouse_id)
+                target = shard_table(shard)
+                session.execute(insert(target).from_select(
+                    ['warehouse_id', 'product_id', 'quantity'],
+                    select(source.c.warehouse_id, source.c.product_id, source.c.quantity)
+                    .where(source.c.warehouse_id == warehouse_id)
+                ))
+                session.execute(delete(source).where(source.c.warehouse_id == warehouse_id))
+                warehouse.shard = shard
+                session.flush()
+            return warehouse
+        except SQLAlchemyError as e:
+            raise ValueError(f"Error moving warehouse stock: {str(e)}")
+
+    def transfer(self, product_id: int, from_warehouse_id: int, to_warehouse_id: int,
+                 quantity: int, actor: Optional[str] = None) -> TransferResult:
+        """
+        Move stock between two warehouses atomically: both location rows and
+        both ledger entries commit together or not at all. With rollback
+        journals this holds across attached shard files too; in WAL mode
+        SQLite only guarantees it per file if the machine crashes mid-commit.
+        """
+        if quantity <= 0:
+            raise ValueError("Transfer quantity must be positive")
+        if from_warehouse_id == to_warehouse_id:
+            raise ValueError("Source and destination warehouse must differ")
+        try:
+            with self.db.session_scope() as session:
+                exists = session.scalar(select(products_table.c.id).where(products_table.c.id == product_id))
+                if exists is None:
+                    raise ValueError(f"Product with id {product_id} not found")
+                source_id, source = resolve_warehouse(session, from_warehouse_id)
+                target_id, target = resolve_warehouse(session, to_warehouse_id)
+                if not take_location_stock(session, source_id, source, product_id, quantity):
+                    raise ValueError(f"Not enough stock at warehouse {source_id}")
+                add_location_stock(session, target_id, target, [(product_id, quantity)])
+                record_movements(session, [(product_id, -quantity)], REASON_TRANSFER, actor, source_id)
+                record_movements(session, [(product_id, quantity)], REASON_TRANSFER, actor, target_id)
+                return TransferResult(
+                    product_id, source_id, target_id, quantity,
+                    location_levels(session, source_id, source, [product_id]).get(product_id, 0),
+                    location_levels(session, target_id, target, [product_id]).get(product_id, 0),
+                )
+        except SQLAlchemyError as e:
+            raise ValueError(f"Error transferring stock: {str(e)}")
+
+    def stock_by_location(self, product_id: int, min_quantity: int = 0) -> List[LocationStock]:
+        """
+        Where a product is held, largest quantity first; min_quantity=n
+        answers "which warehouses can ship n units"
+        """
+        with self.db.session_scope() as session:
+            tables = location_tables(session)
+            rows = union_all(*(
+                select(table.c.warehouse_id, table.c.quantity)
+                .where(table.c.product_id == product_id, table.c.quantity >= min_quantity)
+                for table in tables
+            )).subquery()
+            result = session.execute(
+                select(warehouses_table.c.id, warehouses_table.c.code, warehouses_table.c.name,
+                       rows.c.quantity)
+                .join(rows, rows.c.warehouse_id == warehouses_table.c.id)
+                .order_by(rows.c.quantity.desc(), warehouses_table.c.id)
+            ).all()
+        return [LocationStock(*row) for row in result]
+
+    def low_stock(self, warehouse_id: int, threshold: Optional[int] = None,
+                  limit: int = 50) -> List[LocationLowStock]:
+        """
+        Products at or below `threshold` at one warehouse, lowest first;
+        without a threshold each product's own reorder point applies
+        """
+        with self.db.session_scope() as session:
+            warehouse_id, table = resolve_warehouse(session, warehouse_id)
+            point = literal(threshold) if threshold is not None else effective_reorder_point
+            stmt = (select(table.c.product_id, products_table.c.name, table.c.quantity, point)
+                    .join(products_table, products_table.c.id == table.c.product_id)
+                    .outerjoin(categories_table, categories_table.c.id == products_table.c.category_id)
+                    .where(table.c.warehouse_id == warehouse_id, table.c.quantity <= point)
+                    .order_by(table.c.quantity, table.c.product_id)
+                    .limit(limit))
+            return [LocationLowStock(*row) for row in session.execute(stmt)]
+
+    def warehouse_totals(self) -> Dict[int, int]:
+        """Units held per warehouse"""
+        with self.db.session_scope() as session:
+            totals: Dict[int, int] = {}
+            for table in location_tables(session):
+                rows = session.execute(select(table.c.warehouse_id, func.sum(table.c.quantity))
+                                       .group_by(table.c.warehouse_id))
+                for warehouse_id, units in rows:
+                    totals[warehouse_id] = totals.get(warehouse_id, 0) + (units or 0)
+            return totals
+
+    def check_consistency(self, limit: int = 100) -> List[LocationDiscrepancy]:
+        """
+        Products whose maintained total differs from the sum of their
+        location rows, or with negative stock at some location
+        """
+        with self.db.session_scope() as session:
+            tables = location_tables(session)
+            rows = union_all(*(select(table.c.product_id, table.c.quantity) for table in tables)).subquery()
+            per_product = (select(rows.c.product_id, func.sum(rows.c.quantity).label('total'),
+                                  func.min(rows.c.quantity).label('lowest'))
+                           .group_by(rows.c.product_id).subquery())
+            stock = func.coalesce(products_table.c.stock_quantity, 0)
+            total = func.coalesce(per_product.c.total, 0)
+            result = session.execute(
+                select(products_table.c.id, stock, total)
+                .outerjoin(per_product, per_product.c.product_id == products_table.c.id)
+                .where((stock != total) | (per_product.c.lowest < 0))
+                .order_by(products_table.c.id)
+                .limit(limit)
+            ).all()
+        return [LocationDiscrepancy(*row) for row in result]
@@ -1,45 +1,266 @@
 # src/utils/logger.py
+import atexit
+import contextvars
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
-from datetime import datetime
+import queue
+import sys
+import threading
+import traceback
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional
+
+# Records waiting for the writer thread; beyond this they are dropped, never waited on
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_LOG_FILE = 'inventory.jsonl'
+MAX_REQUEST_ID_LENGTH = 128
+MAX_SAMPLED_TEMPLATES = 10000
+# Attributes every LogRecord has; anything else was passed with extra= and is logged as a field
+_RECORD_ATTRIBUTES = frozenset(logging.makeLogRecord({}).__dict__) | {'message', 'asctime', 'request_id',
+                                                                       'sampled'}
+
+_request_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('request_id', default=None)
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, '') else default
+
+
+def get_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+def set_request_id(request_id: Optional[str] = None) -> contextvars.Token:
+    """Tag log records from the current context; pass the token to reset_request_id"""
+    return _request_id.set(request_id or uuid.uuid4().hex)
+
+
+def reset_request_id(token: contextvars.Token):
+    _request_id.reset(token)
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp records with the request id of the context that logged them"""
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep one in `every` records below `level` per logger and message
+    template, so a debug statement inside a hot loop cannot flood the
+    queue. The first record of each template always passes; kept records
+    carry `sampled` = how many they stand for.
+    """
+    def __init__(self, every: int = 10, level: int = logging.INFO):
+        super().__init__()
+        self.every = max(1, every)
+        self.level = level
+        self._seen: Dict[tuple, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.level or self.every == 1:
+            return True
+        key = (record.name, record.msg)
+        if len(self._seen) >= MAX_SAMPLED_TEMPLATES:
+            # Pre-formatted messages make every record its own template
+            self._seen.clear()
+        # Unlocked: a lost increment under a race only shifts which record is kept
+        seen = self._seen.get(key, 0)
+        self._seen[key] = seen + 1
+        if seen % self.every:
+            return False
+        record.sampled = self.every if seen else 1
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message, request id, location and extras"""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+            'module': record.module,
+            'line': record.lineno,
+            'thread': record.threadName,
+        }
+        sampled = getattr(record, 'sampled', None)
+        if sampled and sampled > 1:
+            entry['sampled'] = sampled
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hand records to the writer thread without ever blocking the caller:
+    a full queue drops the record and counts it
+    """
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback now (arguments may change once we
+        # return), but keep them apart so the JSON stays structured
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = ''.join(traceback.format_exception(*record.exc_info)).rstrip()
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    """
+    The process's logging back end: loggers get a NonBlockingQueueHandler,
+    and one QueueListener thread formats records and writes them to a
+    rotating JSON-lines file and, optionally, the console
+    """
+    def __init__(self, log_dir: str = 'logs', filename: str = DEFAULT_LOG_FILE, console: bool = True,
+                 console_level: int = logging.INFO, max_bytes: int = 10 * 1024 * 1024, backups: int = 5,
+                 queue_size: int = DEFAULT_QUEUE_SIZE, debug_sample_every: int = 10):
+        os.makedirs(log_dir, exist_ok=True)
+        self.path = os.path.join(log_dir, filename)
+        file_handler = RotatingFileHandler(self.path, maxBytes=max_bytes, backupCount=backups,
+                                           encoding='utf-8')
+        file_handler.setFormatter(JsonFormatter())
+        handlers = [file_handler]
+        if console:
+            console_handler = logging.StreamHandler(sys.stderr)
+            console_handler.setLevel(console_level)
+            console_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s: %(message)s'))
+            handlers.append(console_handler)
+        self.handler = NonBlockingQueueHandler(queue.Queue(queue_size))
+        self.handler.addFilter(SamplingFilter(debug_sample_every))
+        self.handler.addFilter(RequestIdFilter())
+        self.listener = QueueListener(self.handler.queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+        self._running = True
+
+    @classmethod
+    def from_env(cls, log_dir: str = 'logs') -> 'LogPipeline':
+        return cls(
+            log_dir=os.getenv('LOG_DIR') or log_dir,
+            filename=os.getenv('LOG_FILE') or DEFAULT_LOG_FILE,
+            console=os.getenv('LOG_CONSOLE', 'true').strip().lower() in ('1', 'true', 'yes', 'on'),
+            max_bytes=_env_int('LOG_MAX_BYTES', 10 * 1024 * 1024),
+            backups=_env_int('LOG_BACKUP_COUNT', 5),
+            queue_size=_env_int('LOG_QUEUE_SIZE', DEFAULT_QUEUE_SIZE),
+            debug_sample_every=_env_int('LOG_DEBUG_SAMPLE_EVERY', 10),
+        )
+
+    def attach(self, logger: logging.Logger):
+        if self.handler not in logger.handlers:
+            logger.addHandler(self.handler)
+
+    def stop(self):
+        """Write out everything queued and stop the writer thread"""
+        if self._running:
+            self._running = False
+            self.listener.stop()
+
+
+_pipeline: Optional[LogPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_log_pipeline(log_dir: str = 'logs') -> LogPipeline:
+    """The process-wide pipeline, started on first use (LOG_* settings override `log_dir`)"""
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = LogPipeline.from_env(log_dir)
+                atexit.register(_pipeline.stop)
+    return _pipeline
+
 
 def setup_logger(name: str, log_dir: str = 'logs') -> logging.Logger:
     """
-    Create a comprehensive logger with file and console output
+    A logger writing JSON lines through the shared non-blocking pipeline.
+    Safe to call repeatedly: the logger is only configured once.
     """
-    # Create logs directory if it doesn't exist
-    os.makedirs(log_dir, exist_ok=True)
-    
-    # Create a unique log file name with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    log_file = os.path.join(log_dir, f'{name}_{timestamp}.log')
-    
-    # Create logger
     logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG)
-    
-    # Console Handler
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    console_format = logging.Formatter('%(asctime)s - %(levelname)s: %(message)s')
-    console_handler.setFormatter(console_format)
-    
-    # File Handler with rotation
-    file_handler = RotatingFileHandler(
-        log_file, 
-        maxBytes=10*1024*1024,  # 10MB
-        backupCount=5
-    )
-    file_handler.setLevel(logging.DEBUG)
-    file_format = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s'
-    )
-    file_handler.setFormatter(file_format)
-    
-    # Add handlers to logger
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
-    
+    get_log_pipeline(log_dir).attach(logger)
+    logger.setLevel(os.getenv('LOG_LEVEL', 'DEBUG').upper())
+    # The root logger may feed the same pipeline (configure_logging)
+    logger.propagate = False
     return logger
 
+
+_file_pipelines: Dict[str, LogPipeline] = {}
+
+
+def setup_file_logger(name: str, filename: str, log_dir: str = 'logs') -> logging.Logger:
+    """
+    A logger with a pipeline of its own that writes only to `filename`,
+    never the console, for diagnostics too verbose for the main log
+    """
+    logger = logging.getLogger(name)
+    with _pipeline_lock:
+        pipeline = _file_pipelines.get(name)
+        if pipeline is None:
+            pipeline = _file_pipelines[name] = LogPipeline(
+                log_dir=os.getenv('LOG_DIR') or log_dir, filename=filename, console=False,
+                max_bytes=_env_int('LOG_MAX_BYTES', 10 * 1024 * 1024),
+                backups=_env_int('LOG_BACKUP_COUNT', 5),
+                queue_size=_env_int('LOG_QUEUE_SIZE', DEFAULT_QUEUE_SIZE),
+            )
+            atexit.register(pipeline.stop)
+    pipeline.attach(logger)
+    logger.setLevel(os.getenv('LOG_LEVEL', 'DEBUG').upper())
+    logger.propagate = False
+    return logger
+
+
+def configure_logging(level: Optional[str] = None, log_dir: str = 'logs') -> LogPipeline:
+    """Route every logger in the process through the pipeline via the root logger"""
+    pipeline = get_log_pipeline(log_dir)
+    root = logging.getLogger()
+    pipeline.attach(root)
+    root.setLevel((level or os.getenv('LOG_LEVEL', 'INFO')).upper())
+    return pipeline
+
+
+def init_request_logging(app):
+    """Give each Flask request an id (X-Request-ID if the client sent one) for its log records"""
+    from flask import g, request
+
+    @app.before_request
+    def begin_request_id():
+        g.request_id_token = set_request_id(request.headers.get('X-Request-ID', '')[:MAX_REQUEST_ID_LENGTH])
+
+    @app.after_request
+    def add_request_id(response):
+        request_id = get_request_id()
+        if request_id:
+            response.headers['X-Request-ID'] = request_id
+        return response
+
+    @app.teardown_request
+    def end_request_id(error=None):
+        token = g.pop('request_id_token', None)
+        if token is not None:
+            reset_request_id(token)
@@ -0,0 +1,392 @@
+# src/utils/metrics.py
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Counters and histograms are written without locks: every thread adds to
+its own cell, and a scrape sums the cells. Cells of finished threads are
+folded into a retired total on the next scrape, so thread-per-request
+servers do not grow the registry. Gauges are plain values or callbacks
+read at scrape time.
+"""
+from bisect import bisect_left
+import functools
+import inspect
+import math
+import threading
+import time
+import weakref
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+# Default histogram bucket upper bounds, in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if math.isnan(value):
+        return 'NaN'
+    return str(int(value)) if value.is_integer() and abs(value) < 1e15 else repr(value)
+
+
+def _escape_help(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n')
+
+
+def _escape(value: str) -> str:
+    return _escape_help(value).replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + '}'
+
+
+class _ThreadCells:
+    """
+    One list of floats per writing thread. Only the owning thread writes a
+    cell, so updates need no lock; `totals` sums live cells with the
+    retired total of threads that have finished.
+    """
+    def __init__(self, size: int):
+        self.size = size
+        self.local = threading.local()
+        self._lock = threading.Lock()
+        self._cells: List[Tuple[weakref.ref, List[float]]] = []
+        self._retired = [0.0] * size
+
+    def cell(self) -> List[float]:
+        try:
+            return self.local.cell
+        except AttributeError:
+            cell = self.local.cell = [0.0] * self.size
+            with self._lock:
+                self._cells.append((weakref.ref(threading.current_thread()), cell))
+            return cell
+
+    def totals(self) -> List[float]:
+        with self._lock:
+            live = []
+            for thread_ref, cell in self._cells:
+                thread = thread_ref()
+                if thread is None or not thread.is_alive():
+                    # The thread is gone, so nothing writes this cell any more
+                    for index, value in enumerate(cell):
+                        self._retired[index] += value
+                else:
+                    live.append((thread_ref, cell))
+            self._cells = live
+            totals = list(self._retired)
+            for _, cell in live:
+                for index, value in enumerate(cell):
+                    totals[index] += value
+            return totals
+
+
+class Metric:
+    """A named family of time series, one per combination of label values"""
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def labels(self, *values, **labels):
+        """The series for these label values, created on first use"""
+        if labels:
+            values = tuple(labels[name] for name in self.labelnames)
+        child = self._children.get(values)
+        if child is None:
+            key = tuple(str(value) for value in values)
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {', '.join(self.labelnames)}")
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._children[key] = self._new_child()
+                # Later lookups with the same (possibly non-str) values skip the conversion
+                self._children.setdefault(values, child)
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _series(self) -> List[Tuple[Dict[str, str], object]]:
+        with self._lock:
+            children = [(key, child) for key, child in self._children.items()
+                        if all(type(value) is str for value in key)]
+        return [(dict(zip(self.labelnames, key)), child) for key, child in children]
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+
+class _CounterChild:
+    __slots__ = ('_cells',)
+
+    def __init__(self):
+        self._cells = _ThreadCells(1)
+
+    def inc(self, amount: float = 1.0):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        try:
+            self._cells.local.cell[0] += amount
+        except AttributeError:
+            self._cells.cell()[0] += amount
+
+    def value(self) -> float:
+        return self._cells.totals()[0]
+
+
+class Counter(Metric):
+    """Monotonic total; by convention the name ends in _total"""
+    kind = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def samples(self) -> List[Sample]:
+        return [(self.name, labels, child.value()) for labels, child in self._series()]
+
+
+class _GaugeChild:
+    __slots__ = ('_value', '_function', '_lock')
+
+    def __init__(self):
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        self._value = float(value)
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+    def set_function(self, function: Callable[[], float]):
+        """Read the value from `function` at scrape time"""
+        self._function = function
+
+    def value(self) -> float:
+        return float(self._function()) if self._function is not None else self._value
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._default.set(value)
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default.dec(amount)
+
+    def set_function(self, function: Callable[[], float]):
+        self._default.set_function(function)
+
+    def samples(self) -> List[Sample]:
+        return [(self.name, labels, child.value()) for labels, child in self._series()]
+
+
+class _HistogramChild:
+    __slots__ = ('_bounds', '_cells')
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._bounds = bounds
+        # One count per bucket (the last unbounded), then the sum
+        self._cells = _ThreadCells(len(bounds) + 2)
+
+    def observe(self, value: float):
+        try:
+            cell = self._cells.local.cell
+        except AttributeError:
+            cell = self._cells.cell()
+        cell[bisect_left(self._bounds, value)] += 1
+        cell[-1] += value
+
+    def time(self) -> '_Timer':
+        return _Timer(self)
+
+    def totals(self) -> List[float]:
+        return self._cells.totals()
+
+
+class _Timer:
+    __slots__ = ('_child', '_started')
+
+    def __init__(self, child: _HistogramChild):
+        self._child = child
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._child.observe(time.perf_counter() - self._started)
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def time(self) -> _Timer:
+        return self._default.time()
+
+    def samples(self) -> List[Sample]:
+        samples = []
+        for labels, child in self._series():
+            totals = child.totals()
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (math.inf,), totals):
+                cumulative += count
+                samples.append((self.name + '_bucket', {**labels, 'le': _format_value(bound)}, cumulative))
+            samples.append((self.name + '_sum', labels, totals[-1]))
+            samples.append((self.name + '_count', labels, cumulative))
+        return samples
+
+
+class CollectedMetric(NamedTuple):
+    """A family produced at scrape time by a collector callback"""
+    name: str
+    kind: str
+    documentation: str
+    samples: List[Sample]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], Iterable[CollectedMetric]]] = []
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} is already registered with another type or labels")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def register_collector(self, collector: Callable[[], Iterable[CollectedMetric]]):
+        """Add a callback that reports metrics kept elsewhere (pool, cache) at scrape time"""
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def collect(self) -> List[CollectedMetric]:
+        with self._lock:
+            metrics, collectors = list(self._metrics.values()), list(self._collectors)
+        families = [CollectedMetric(metric.name, metric.kind, metric.documentation, metric.samples())
+                    for metric in metrics]
+        for collector in collectors:
+            families.extend(collector())
+        return families
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for family in self.collect():
+            lines.append(f"# HELP {family.name} {_escape_help(family.documentation)}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for name, labels, value in family.samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+SERVICE_LATENCY = REGISTRY.histogram('inventory_service_call_duration_seconds',
+                                     "Service method latency", ('service', 'method'))
+SERVICE_ERRORS = REGISTRY.counter('inventory_service_call_errors_total',
+                                  "Service method calls that raised", ('service', 'method', 'error'))
+
+
+def timed_methods(service: Optional[str] = None):
+    """
+    Class decorator recording the latency of every public method in
+    SERVICE_LATENCY (and exceptions in SERVICE_ERRORS). Generator methods
+    are left alone, since a call only creates the generator.
+    """
+    def decorator(cls):
+        name = service or cls.__name__
+        for attribute, function in list(vars(cls).items()):
+            if attribute.startswith('_') or not inspect.isfunction(function) \
+                    or inspect.isgeneratorfunction(function):
+                continue
+            setattr(cls, attribute, _timed(function, name, attribute))
+        return cls
+    return decorator
+
+
+def _timed(function, service: str, method: str):
+    latency = SERVICE_LATENCY.labels(service, method)
+
+    if inspect.iscoroutinefunction(function):
+        @functools.wraps(function)
+        async def async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await function(*args, **kwargs)
+            except Exception as e:
+                SERVICE_ERRORS.labels(service, method, type(e).__name__).inc()
+                raise
+            finally:
+                latency.observe(time.perf_counter() - started)
+        return async_wrapper
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        except Exception as e:
+            SERVICE_ERRORS.labels(service, method, type(e).__name__).inc()
+            raise
+        finally:
+            latency.observe(time.perf_counter() - started)
+    return wrapper
@@ -0,0 +1,92 @@
+# src/utils/pagination.py
+import base64
+import binascii
+import json
+from typing import Any, Callable, Dict, Generic, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+# Largest id a cursor may carry: the range of a 64-bit signed database integer
+MAX_CURSOR_ID = 2 ** 63 - 1
+
+
+def clamp_page_size(page_size: Optional[int], default: int = DEFAULT_PAGE_SIZE,
+                    maximum: int = MAX_PAGE_SIZE) -> int:
+    """
+    Keep a requested page size within [1, maximum]
+    """
+    if page_size is None:
+        return default
+    try:
+        page_size = int(page_size)
+    except (ValueError, TypeError):
+        raise ValueError("Page size must be a valid integer")
+    return max(1, min(page_size, maximum))
+
+
+def encode_cursor(last_id: int, **extra: Any) -> str:
+    """
+    Encode the last seen primary key (plus any other sort keys, such as a
+    relevance score) as an opaque, URL-safe cursor token
+    """
+    payload = json.dumps({'after_id': int(last_id), **extra}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor_payload(cursor: Optional[str]) -> Dict[str, Any]:
+    """
+    Decode a cursor token into its payload. An empty cursor means
+    "start from the beginning".
+    """
+    if not cursor:
+        return {'after_id': 0}
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        payload['after_id'] = int(payload['after_id'])
+    except (binascii.Error, ValueError, TypeError, KeyError, OverflowError):
+        raise ValueError("Invalid pagination cursor")
+    if not 0 <= payload['after_id'] <= MAX_CURSOR_ID:
+        raise ValueError("Invalid pagination cursor")
+    return payload
+
+
+def decode_cursor(cursor: Optional[str]) -> int:
+    """
+    Decode a cursor token back into the primary key to continue after
+    """
+    return decode_cursor_payload(cursor)['after_id']
+
+
+class Page(Generic[T]):
+    """A single keyset-paginated page of results"""
+    def __init__(self, items: List[T], next_cursor: Optional[str], page_size: int):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.page_size = page_size
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @classmethod
+    def from_rows(cls, rows: List[T], page_size: int,
+                  cursor_for: Callable[[T], str] = lambda row: encode_cursor(row.id)) -> 'Page[T]':
+        """
+        Build a page from a query that fetched page_size + 1 rows; the
+        extra row only tells us whether another page exists.
+        """
+        items = rows[:page_size]
+        next_cursor = cursor_for(items[-1]) if len(rows) > page_size else None
+        return cls(items, next_cursor, page_size)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __repr__(self):
+        return f"<Page(size={len(self.items)}, next_cursor={self.next_cursor!r})>"
@@ -0,0 +1,58 @@
+# src/utils/query_counter.py
+from contextlib import contextmanager
+from typing import Iterator, List
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryCounter:
+    """
+    Record every SQL statement executed on an engine while active.
+
+        with QueryCounter(engine) as counter:
+            service.get_low_stock_products()
+        assert counter.count == 1
+    """
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self) -> 'QueryCounter':
+        event.listen(self.engine, 'before_cursor_execute', self._before_cursor_execute)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        event.remove(self.engine, 'before_cursor_execute', self._before_cursor_execute)
+
+
+@contextmanager
+def assert_query_count(engine: Engine, expected: int) -> Iterator[QueryCounter]:
+    """
+    Fail unless the block executes exactly `expected` statements
+    """
+    with QueryCounter(engine) as counter:
+        yield counter
+    if counter.count != expected:
+        raise AssertionError(
+            f"Expected {expected} queries, got {counter.count}:\n" + "\n".join(counter.statements)
+        )
+
+
+@contextmanager
+def assert_max_queries(engine: Engine, maximum: int) -> Iterator[QueryCounter]:
+    """
+    Fail if the block executes more than `maximum` statements
+    """
+    with QueryCounter(engine) as counter:
+        yield counter
+    if counter.count > maximum:
+        raise AssertionError(
+            f"Expected at most {maximum} queries, got {counter.count}:\n" + "\n".join(counter.statements)
+        )
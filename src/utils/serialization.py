@@ -0,0 +1,28 @@
+# src/utils/serialization.py
+import json
+from typing import Any, Dict, Iterable, List, Sequence
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
+
+def dumps(payload: Any) -> bytes:
+    """
+    Serialize to compact UTF-8 JSON, using orjson when it is installed
+    """
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def rows_to_records(fields: Sequence[str], rows: Iterable[Sequence[Any]]) -> List[Dict[str, Any]]:
+    """
+    Pair Core result tuples with their field names, skipping ORM objects entirely
+
+    The short-lived dicts are deliberate: orjson encodes them in C, which
+    beats splicing per-field JSON fragments around each tuple in Python.
+    """
+    fields = tuple(fields)
+    return [dict(zip(fields, row)) for row in rows]
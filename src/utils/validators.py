@@ -1,80 +1,302 @@
 # src/utils/validators.py
+import copy
+import math
 import re
-from typing import Any, Optional
+import sys
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+# A compiled field check: takes the raw value, returns the clean one or raises ValueError
+Check = Callable[[Any], Any]
+
+NAME_PATTERN = r'[A-Za-z\s\-]+'
+
+
+class FieldError(NamedTuple):
+    field: str
+    message: str
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+
+class ValidationErrors(ValueError):
+    """Every problem found in one record; the message lists them all"""
+    def __init__(self, errors: List[FieldError]):
+        self.errors = errors
+        super().__init__('; '.join(error.message for error in errors))
+
+
+class BatchResult(NamedTuple):
+    """Clean values of the valid records and the errors of the rest, both keyed by record index"""
+    valid: List[Tuple[int, Dict[str, Any]]]
+    errors: List[Tuple[int, List[FieldError]]]
+
+    def to_dict(self) -> dict:
+        return {'valid': len(self.valid),
+                'errors': [{'index': index, 'errors': [error.to_dict() for error in field_errors]}
+                           for index, field_errors in self.errors]}
+
+
+class Field:
+    """
+    One field's rules. compile() turns them into a single closure with the
+    limits, messages and regular expression bound once, so checking a
+    record does no set-up work.
+    """
+    messages: Dict[str, str] = {'required': "{label} is required"}
+
+    def __init__(self, label: str, required: bool = False, default: Any = None,
+                 messages: Optional[Dict[str, str]] = None):
+        self.label = label
+        self.required = required
+        self.default = default
+        self.messages = {**type(self).messages, **(messages or {})}
+
+    def replace(self, **changes) -> 'Field':
+        """A copy of this field with some settings changed"""
+        field = copy.copy(self)
+        for name, value in changes.items():
+            if not hasattr(field, name):
+                raise AttributeError(f"{type(self).__name__} has no setting '{name}'")
+            setattr(field, name, value)
+        return field
+
+    def message(self, key: str, **values) -> str:
+        return self.messages[key].format(label=self.label, **values)
+
+    def compile(self) -> Check:
+        raise NotImplementedError
+
+
+class String(Field):
+    messages = {
+        **Field.messages,
+        'required': "{label} cannot be empty",
+        'too_short': "{label} must be at least {minimum} characters long",
+        'too_long': "{label} cannot exceed {maximum} characters",
+        'pattern': "{label} has invalid characters",
+    }
+
+    def __init__(self, label: str, min_length: int = 0, max_length: Optional[int] = None,
+                 pattern: Optional[str] = None, strip: bool = True, **kwargs):
+        super().__init__(label, **kwargs)
+        self.min_length = min_length
+        self.max_length = max_length
+        self.pattern = pattern
+        self.strip = strip
+
+    def compile(self) -> Check:
+        required, default, strip = self.required, self.default, self.strip
+        min_length = self.min_length
+        max_length = self.max_length if self.max_length is not None else sys.maxsize
+        matches = re.compile(self.pattern).fullmatch if self.pattern else None
+        missing = self.message('required')
+        too_short = self.message('too_short', minimum=min_length)
+        too_long = self.message('too_long', maximum=max_length)
+        bad_pattern = self.message('pattern')
+
+        def check(value):
+            if value.__class__ is not str:
+                if value is None:
+                    if required:
+                        raise ValueError(missing)
+                    return default
+                value = str(value)
+            elif not value:
+                if required:
+                    raise ValueError(missing)
+                return default
+            if strip:
+                value = value.strip()
+                if not value:
+                    if required:
+                        raise ValueError(missing)
+                    return default
+            if not min_length <= len(value) <= max_length:
+                raise ValueError(too_short if len(value) < min_length else too_long)
+            if matches is not None and matches(value) is None:
+                raise ValueError(bad_pattern)
+            return value
+        return check
+
+
+class Number(Field):
+    messages = {
+        **Field.messages,
+        'invalid': "{label} must be a valid number",
+        'too_small': "{label} cannot be less than {minimum}",
+        'too_large': "{label} cannot exceed {maximum}",
+    }
+    convert: Callable[[Any], Any] = float
+
+    def __init__(self, label: str, minimum: Optional[float] = None, maximum: Optional[float] = None,
+                 places: Optional[int] = None, **kwargs):
+        super().__init__(label, **kwargs)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.places = places
+
+    def compile(self) -> Check:
+        required, default, places = self.required, self.default, self.places
+        convert = type(self).convert
+        minimum, maximum = self.minimum, self.maximum
+        # One chained comparison accepts the common case; NaN and infinity fail it too
+        lowest = minimum if minimum is not None else -sys.float_info.max
+        highest = maximum if maximum is not None else sys.float_info.max
+        missing = self.message('required')
+        invalid = self.message('invalid')
+        too_small = self.message('too_small', minimum=minimum)
+        too_large = self.message('too_large', maximum=maximum)
+
+        def check(value):
+            try:
+                value = convert(value)
+            except (ValueError, TypeError, OverflowError):
+                if value is None or value == '':
+                    if required:
+                        raise ValueError(missing)
+                    return default
+                raise ValueError(invalid)
+            if not lowest <= value <= highest:
+                if value != value or value in (math.inf, -math.inf):
+                    raise ValueError(invalid)
+                if minimum is not None and value < minimum:
+                    raise ValueError(too_small)
+                if maximum is not None and value > maximum:
+                    raise ValueError(too_large)
+            return round(value, places) if places is not None else value
+        return check
+
+
+class Integer(Number):
+    messages = {**Number.messages, 'invalid': "{label} must be a valid integer"}
+    convert = int
+
+
+class Schema:
+    """
+    Named fields checked together: validate() returns the clean values
+    and every error of a record in one pass, validate_many() does the same
+    for a batch, and check() raises ValidationErrors for callers that only
+    want clean values.
+    """
+    def __init__(self, fields: Dict[str, Field]):
+        self.fields = dict(fields)
+        self._checks: Tuple[Tuple[str, Check], ...] = tuple(
+            (key, field.compile()) for key, field in self.fields.items())
+
+    def extend(self, fields: Dict[str, Field]) -> 'Schema':
+        return Schema({**self.fields, **fields})
+
+    def _collect(self, record: Mapping[str, Any]) -> Tuple[Dict[str, Any], List[FieldError]]:
+        values: Dict[str, Any] = {}
+        errors: List[FieldError] = []
+        get = record.get
+        for key, check in self._checks:
+            try:
+                values[key] = check(get(key))
+            except ValueError as e:
+                errors.append(FieldError(key, str(e)))
+        return values, errors
+
+    def validate(self, record: Mapping[str, Any]) -> Tuple[Dict[str, Any], List[FieldError]]:
+        return self._collect(record)
+
+    def check(self, record: Mapping[str, Any]) -> Dict[str, Any]:
+        values, errors = self.validate(record)
+        if errors:
+            raise ValidationErrors(errors)
+        return values
+
+    def validate_many(self, records: Iterable[Mapping[str, Any]]) -> BatchResult:
+        valid: List[Tuple[int, Dict[str, Any]]] = []
+        failed: List[Tuple[int, List[FieldError]]] = []
+        collect = self._collect
+        for index, record in enumerate(records):
+            if record.__class__ is not dict and not isinstance(record, Mapping):
+                failed.append((index, [FieldError('', "Row must be an object")]))
+                continue
+            values, errors = collect(record)
+            if errors:
+                failed.append((index, errors))
+            else:
+                valid.append((index, values))
+        return BatchResult(valid, failed)
+
+
+PRODUCT_NAME = String('Name', min_length=2, max_length=100, pattern=NAME_PATTERN, required=True,
+                      messages={'pattern': "Name can only contain letters, spaces, and hyphens"})
+PRODUCT_PRICE = Number('Price', minimum=0, maximum=100000, places=2, required=True, messages={
+    'required': "Price must be a valid number",
+    'too_small': "Price cannot be negative. Minimum price is {minimum}",
+    'too_large': "Price is too high. Maximum price is {maximum}",
+})
+STOCK_QUANTITY = Integer('Stock quantity', minimum=0, maximum=10000, default=0, messages={
+    'required': "Stock quantity must be a valid integer",
+    'too_small': "Stock quantity cannot be negative. Minimum is {minimum}",
+    'too_large': "Stock quantity too high. Maximum is {maximum}",
+})
+DESCRIPTION = String('Description', max_length=255)
+
+# Product attributes every input path accepts (forms, CLI, API, bulk import)
+PRODUCT_SCHEMA = Schema({
+    'name': PRODUCT_NAME,
+    'description': DESCRIPTION,
+    'price': PRODUCT_PRICE,
+    'stock_quantity': STOCK_QUANTITY,
+})
+# A single new product also names its category by id
+NEW_PRODUCT_SCHEMA = PRODUCT_SCHEMA.extend({
+    'category_id': Integer('Category id', minimum=1, required=True, messages={
+        'required': "Category id must be a valid integer", 'too_small': "Unknown category id"}),
+})
+# What the Product model enforces on every assignment: the same fields and
+# messages, without the input-only limits (name characters, upper bounds)
+PRODUCT_MODEL_CHECKS: Dict[str, Check] = {
+    'name': PRODUCT_NAME.replace(min_length=0, pattern=None).compile(),
+    'price': PRODUCT_PRICE.replace(maximum=None, places=None).compile(),
+    'stock_quantity': STOCK_QUANTITY.replace(maximum=None, required=True).compile(),
+}
+CATEGORY_SCHEMA = Schema({
+    'name': String('Category name', max_length=100, required=True),
+    'description': DESCRIPTION,
+    'parent_id': Integer('Parent category id', minimum=1),
+})
+
+
+@lru_cache(maxsize=None)
+def _input_check(field: str, **changes) -> Check:
+    """The compiled check of a PRODUCT_SCHEMA field, with some of its limits changed"""
+    return PRODUCT_SCHEMA.fields[field].replace(**changes).compile()
+
 
 class InputValidator:
+    """Single-field checks, compiled from the same rules as PRODUCT_SCHEMA"""
     @staticmethod
     def validate_name(name: str, min_length: int = 2, max_length: int = 100) -> str:
         """
         Validate name with comprehensive checks
         """
-        if not name:
-            raise ValueError("Name cannot be empty")
-        
-        # Remove leading/trailing whitespaces
-        name = name.strip()
-        
-        # Check length
-        if len(name) < min_length:
-            raise ValueError(f"Name must be at least {min_length} characters long")
-        
-        if len(name) > max_length:
-            raise ValueError(f"Name cannot exceed {max_length} characters")
-        
-        # Check for valid characters (letters, spaces, hyphens)
-        if not re.match(r'^[A-Za-z\s\-]+$', name):
-            raise ValueError("Name can only contain letters, spaces, and hyphens")
-        
-        return name
-    
+        return _input_check('name', min_length=min_length, max_length=max_length)(name)
+
     @staticmethod
     def validate_price(price: float, min_price: float = 0, max_price: float = 100000) -> float:
         """
         Validate price with comprehensive checks
         """
-        try:
-            price = float(price)
-        except (ValueError, TypeError):
-            raise ValueError("Price must be a valid number")
-        
-        if price < min_price:
-            raise ValueError(f"Price cannot be negative. Minimum price is {min_price}")
-        
-        if price > max_price:
-            raise ValueError(f"Price is too high. Maximum price is {max_price}")
-        
-        # Round to 2 decimal places
-        return round(price, 2)
-    
+        return _input_check('price', minimum=min_price, maximum=max_price)(price)
+
     @staticmethod
     def validate_stock_quantity(quantity: int, min_quantity: int = 0, max_quantity: int = 10000) -> int:
         """
         Validate stock quantity with comprehensive checks
         """
-        try:
-            quantity = int(quantity)
-        except (ValueError, TypeError):
-            raise ValueError("Stock quantity must be a valid integer")
-        
-        if quantity < min_quantity:
-            raise ValueError(f"Stock quantity cannot be negative. Minimum is {min_quantity}")
-        
-        if quantity > max_quantity:
-            raise ValueError(f"Stock quantity too high. Maximum is {max_quantity}")
-        
-        return quantity
-    
+        return _input_check('stock_quantity', minimum=min_quantity, maximum=max_quantity, required=True)(quantity)
+
     @staticmethod
     def validate_description(description: Optional[str], max_length: int = 255) -> Optional[str]:
         """
         Validate optional description
         """
-        if description is None:
-            return None
-        
-        description = description.strip()
-        
-        if len(description) > max_length:
-            raise ValueError(f"Description cannot exceed {max_length} characters")
-        
-        return description or None
\ No newline at end of file
+        return _input_check('description', max_length=max_length)(description)
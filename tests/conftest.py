@@ -0,0 +1,29 @@
+# tests/conftest.py
+import os
+import pytest
+
+# Settings are read at first use, so they must be in place before any import below
+os.environ['LOG_CONSOLE'] = 'false'
+os.environ['DB_SLOW_QUERY_MS'] = '0'
+
+from src.database.db_connection import DatabaseConnection  # noqa: E402
+from src.services.cache import LRUCache, set_cache  # noqa: E402
+from src.services.category_service import CategoryService  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A fresh SQLite database per test behind the DatabaseConnection singleton"""
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'inventory.db'}")
+    DatabaseConnection._instance = None
+    connection = DatabaseConnection()
+    connection.create_tables()
+    set_cache(LRUCache())
+    yield connection
+    connection.engine.dispose()
+    DatabaseConnection._instance = None
+
+
+@pytest.fixture
+def category(db):
+    return CategoryService().create_category('Lighting')
@@ -0,0 +1,20 @@
+# tests/helpers.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+WORKERS = 8
+
+
+def run_concurrently(count, action):
+    """Call action(index) from WORKERS threads at once; returns the results or raised errors"""
+    start = threading.Barrier(min(count, WORKERS))
+
+    def call(index):
+        if index < WORKERS:
+            start.wait()
+        try:
+            return action(index)
+        except ValueError as e:
+            return e
+    with ThreadPoolExecutor(WORKERS) as pool:
+        return list(pool.map(call, range(count)))
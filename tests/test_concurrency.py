@@ -0,0 +1,117 @@
+# tests/test_concurrency.py
+import asyncio
+import sqlite3
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+from src.database.async_db import AsyncDatabaseConnection
+from src.services.async_product_service import AsyncProductService
+from src.services.concurrency import ConcurrentUpdateError, async_retry_on_conflict, retry_on_conflict
+from src.services.product_service import ProductService
+from src.services.reservations import ReservationService
+from tests.helpers import run_concurrently
+
+
+def test_retry_stops_after_the_given_attempts(db):
+    calls = []
+
+    @retry_on_conflict(attempts=4, base_delay=0)
+    def write():
+        calls.append(1)
+        raise StaleDataError("row was updated by someone else")
+
+    with pytest.raises(ConcurrentUpdateError):
+        write()
+    assert len(calls) == 4
+
+
+def test_retry_inside_a_running_unit_of_work_gives_up_at_once(db, category):
+    calls = []
+
+    @retry_on_conflict(attempts=4, base_delay=0)
+    def write():
+        calls.append(1)
+        raise StaleDataError("row was updated by someone else")
+
+    with db.session_scope():
+        ProductService().create_product('Desk Lamp', 10.0, category.id)
+        with pytest.raises(ConcurrentUpdateError):
+            write()
+    assert len(calls) == 1
+    # The outer unit of work still commits its own write
+    assert ProductService().find_product_by_name('Desk Lamp') is not None
+
+
+def test_concurrent_decrements_never_take_reserved_units(db, category):
+    service = ProductService()
+    product = service.create_product('Desk Lamp', 10.0, category.id, stock_quantity=50)
+    ReservationService().reserve(product.id, 20)
+
+    results = run_concurrently(20, lambda _: service.update_stock(product.id, -3))
+
+    failures = [result for result in results if isinstance(result, ValueError)]
+    assert len(failures) == 10
+    assert all("reserved" in str(failure) for failure in failures)
+    product = service.find_product_by_id(product.id)
+    assert (product.stock_quantity, product.reserved_quantity) == (20, 20)
+
+
+def test_concurrent_reservations_never_oversell(db, category):
+    product = ProductService().create_product('Desk Lamp', 10.0, category.id, stock_quantity=50)
+    reservations = ReservationService()
+
+    results = run_concurrently(20, lambda _: reservations.reserve(product.id, 3))
+
+    assert sum(not isinstance(result, ValueError) for result in results) == 16
+    assert ProductService().find_product_by_id(product.id).reserved_quantity == 48
+    assert reservations.check_consistency() == []
+
+
+def test_async_retry_stops_after_the_given_attempts():
+    calls = []
+
+    @async_retry_on_conflict(attempts=3, base_delay=0)
+    async def write():
+        calls.append(1)
+        raise StaleDataError("row was updated by someone else")
+
+    with pytest.raises(ConcurrentUpdateError):
+        asyncio.run(write())
+    assert len(calls) == 3
+
+
+def test_async_retry_leaves_other_errors_alone():
+    calls = []
+
+    @async_retry_on_conflict(attempts=3, base_delay=0)
+    async def write():
+        calls.append(1)
+        raise IntegrityError("INSERT", {}, Exception("UNIQUE constraint failed"))
+
+    with pytest.raises(IntegrityError):
+        asyncio.run(write())
+    assert len(calls) == 1
+
+
+def test_async_update_stock_reports_a_locked_database_as_a_conflict(db, category, monkeypatch):
+    monkeypatch.setenv('SQLITE_BUSY_TIMEOUT', '0')
+    product = ProductService().create_product('Desk Lamp', 10.0, category.id, stock_quantity=10)
+    AsyncDatabaseConnection._instance = None
+    service = AsyncProductService()
+    writer = sqlite3.connect(db.engine.url.database, isolation_level=None)
+
+    async def update_while_locked():
+        try:
+            writer.execute("BEGIN IMMEDIATE")
+            with pytest.raises(ConcurrentUpdateError):
+                await service.update_stock(product.id, -3)
+            writer.execute("ROLLBACK")
+            return await service.update_stock(product.id, -3)
+        finally:
+            await service.db.dispose()
+
+    try:
+        assert asyncio.run(update_while_locked()).stock_quantity == 7
+    finally:
+        writer.close()
+        AsyncDatabaseConnection._instance = None
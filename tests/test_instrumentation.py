@@ -0,0 +1,80 @@
+# tests/test_instrumentation.py
+import json
+import os
+import pytest
+from logging.handlers import RotatingFileHandler
+from sqlalchemy import create_engine, text
+from src.api.metrics import collect_database_metrics
+from src.database.instrumentation import LATENCY_BUCKETS, SLOW_QUERY_LOG_FILE, QueryInstrumentation, StatementStats
+from src.utils.logger import _file_pipelines, get_log_pipeline
+
+
+def test_percentile_never_exceeds_the_slowest_call():
+    stats = StatementStats('SELECT ?')
+    for seconds in (0.0012, 0.0013, 0.0014):
+        stats.record(seconds, 0, None, False)
+    # All three fall in the 2.5 ms bucket
+    assert stats.percentile(0.5) == stats.percentile(0.95) == 0.0014
+
+    stats.record(LATENCY_BUCKETS[-1] * 2, 0, None, False)
+    assert stats.percentile(1.0) == LATENCY_BUCKETS[-1] * 2
+
+
+def test_statements_differing_only_in_values_share_one_entry():
+    instrumentation = QueryInstrumentation(slow_query_ms=None, call_sites=False)
+    engine = create_engine('sqlite://')
+    instrumentation.attach(engine)
+    with engine.connect() as conn:
+        for value in (1, 2, 3):
+            conn.execute(text(f"SELECT {value}"))
+    assert [(row['statement'], row['calls']) for row in instrumentation.report()] == [('SELECT ?', 3)]
+    instrumentation.reset()
+    assert instrumentation.report() == []
+
+
+def test_slow_queries_go_to_their_own_file_and_not_the_console(tmp_path):
+    instrumentation = QueryInstrumentation(slow_query_ms=1e-9, explain=True, log_dir=str(tmp_path))
+    engine = create_engine('sqlite://')
+    instrumentation.attach(engine)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    handler = instrumentation._slow_logger.handlers[0]
+    handler.queue.join()
+    listener_handlers = _file_pipelines['slow_queries'].listener.handlers
+    assert all(isinstance(item, RotatingFileHandler) for item in listener_handlers)
+    assert handler is not get_log_pipeline().handler
+    with open(os.path.join(str(tmp_path), SLOW_QUERY_LOG_FILE), encoding='utf-8') as handle:
+        entries = [json.loads(line) for line in handle]
+    assert entries[0]['logger'] == 'slow_queries'
+    assert entries[0]['message'].startswith('Slow query')
+
+
+def test_totals_keep_counting_across_reset():
+    instrumentation = QueryInstrumentation(slow_query_ms=None, call_sites=False)
+    engine = create_engine('sqlite://')
+    instrumentation.attach(engine)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        with pytest.raises(Exception):
+            conn.execute(text("SELECT * FROM missing"))
+    before = instrumentation.totals()
+    assert (before['calls'], before['errors']) == (1, 1)
+
+    instrumentation.reset()
+    assert instrumentation.totals() == before
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 2"))
+    assert instrumentation.totals()['calls'] == 2
+
+
+def test_database_counters_do_not_drop_when_the_report_is_reset(db, category):
+    def samples():
+        return {family.name: family.samples[0][2] for family in collect_database_metrics()
+                if family.name.startswith('inventory_db_') and family.kind == 'counter'}
+
+    before = samples()
+    assert before['inventory_db_queries_total'] > 0
+    db.query_stats.reset()
+    after = samples()
+    assert all(after[name] >= value for name, value in before.items())
@@ -0,0 +1,35 @@
+# tests/test_pagination.py
+import base64
+import pytest
+from src.services.product_service import ProductService
+from src.utils.pagination import MAX_CURSOR_ID, decode_cursor, encode_cursor
+
+
+def raw_cursor(payload: str) -> str:
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def test_cursor_round_trips():
+    assert decode_cursor(None) == 0
+    assert decode_cursor(encode_cursor(42)) == 42
+    assert decode_cursor(encode_cursor(MAX_CURSOR_ID)) == MAX_CURSOR_ID
+
+
+@pytest.mark.parametrize('payload', [
+    '{"after_id":1e400}',                 # float('inf'): int() overflows
+    '{"after_id":1e30}',                  # decodes, but no database integer holds it
+    '{"after_id":99999999999999999999}',
+    '{"after_id":-1}',
+    '{"after_id":"abc"}',
+    '[1]',
+    'not json',
+])
+def test_out_of_range_or_malformed_cursors_are_rejected(payload):
+    with pytest.raises(ValueError, match="Invalid pagination cursor"):
+        decode_cursor(raw_cursor(payload))
+
+
+@pytest.mark.parametrize('payload', ['{"after_id":1e400}', '{"after_id":1e30}'])
+def test_listing_rejects_out_of_range_cursors_before_querying(db, payload):
+    with pytest.raises(ValueError, match="Invalid pagination cursor"):
+        ProductService().get_products_page(raw_cursor(payload))
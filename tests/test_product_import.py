@@ -0,0 +1,99 @@
+# tests/test_product_import.py
+import csv
+import json
+import pytest
+from src.services.concurrency import ConcurrentUpdateError
+from src.services.product_import import ProductImporter
+from src.services.product_service import ProductService
+from src.services.reservations import ReservationService
+from src.services.warehouses import WarehouseService
+
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as handle:
+        writer = csv.DictWriter(handle, fieldnames=['id', 'name', 'price', 'stock_quantity', 'category'])
+        writer.writeheader()
+        writer.writerows(rows)
+    return str(path)
+
+
+def warehouse_id(code):
+    return WarehouseService().find_warehouse(code=code).id
+
+
+def levels(product_id):
+    return {item.code: item.quantity for item in WarehouseService().stock_by_location(product_id)}
+
+
+def test_import_then_upsert_keeps_locations_consistent(db, category, tmp_path):
+    service = ProductService()
+    rows = [{'id': index, 'name': f'Desk Lamp {chr(64 + index)}', 'price': '10',
+             'stock_quantity': str(index * 10), 'category': 'Lighting'} for index in range(1, 6)]
+    report = service.bulk_import(write_csv(tmp_path / 'first.csv', rows))
+    assert (report.imported, report.rejected) == (5, 0)
+
+    for row in rows:
+        row['stock_quantity'] = str(int(row['stock_quantity']) + (5 if row['id'] % 2 else -5))
+    report = service.bulk_import(write_csv(tmp_path / 'second.csv', rows), upsert=True)
+    assert (report.imported, report.rejected) == (5, 0)
+
+    assert WarehouseService().check_consistency() == []
+    for row in rows:
+        assert service.find_product_by_id(row['id']).stock_quantity == int(row['stock_quantity'])
+        assert levels(row['id']) == {'MAIN': int(row['stock_quantity'])}
+
+
+def test_upsert_with_lower_stock_takes_only_what_the_default_warehouse_holds(db, category, tmp_path):
+    service = ProductService()
+    product = service.create_product('Desk Lamp', 10.0, category.id, stock_quantity=10)
+    annex = WarehouseService().create_warehouse('ANNEX', 'Annex')
+    WarehouseService().transfer(product.id, warehouse_id('MAIN'), annex.id, 8)
+
+    too_low = {'id': product.id, 'name': 'Desk Lamp', 'price': '10', 'stock_quantity': '5', 'category': 'Lighting'}
+    reject_file = str(tmp_path / 'rejects.jsonl')
+    report = service.bulk_import(write_csv(tmp_path / 'low.csv', [too_low]), upsert=True, reject_file=reject_file)
+    assert (report.imported, report.rejected) == (0, 1)
+    with open(reject_file, encoding='utf-8') as handle:
+        rejected = [json.loads(line) for line in handle]
+    assert rejected[0]['line'] == 2
+    assert 'default warehouse holds 2' in rejected[0]['error']
+    assert service.find_product_by_id(product.id).stock_quantity == 10
+    assert levels(product.id) == {'ANNEX': 8, 'MAIN': 2}
+
+    covered = dict(too_low, stock_quantity='9')
+    report = service.bulk_import(write_csv(tmp_path / 'covered.csv', [covered]), upsert=True)
+    assert (report.imported, report.rejected) == (1, 0)
+    assert service.find_product_by_id(product.id).stock_quantity == 9
+    assert levels(product.id) == {'ANNEX': 8, 'MAIN': 1}
+    assert WarehouseService().check_consistency() == []
+
+
+def test_upsert_cannot_set_stock_below_reserved_units(db, category, tmp_path):
+    service = ProductService()
+    product = service.create_product('Desk Lamp', 10.0, category.id, stock_quantity=10)
+    ReservationService().reserve(product.id, 6)
+
+    rows = [{'id': product.id, 'name': 'Desk Lamp', 'price': '10', 'stock_quantity': '4', 'category': 'Lighting'}]
+    report = service.bulk_import(write_csv(tmp_path / 'low.csv', rows), upsert=True)
+    assert (report.imported, report.rejected) == (0, 1)
+    assert service.find_product_by_id(product.id).stock_quantity == 10
+
+    rows[0]['stock_quantity'] = '6'
+    report = service.bulk_import(write_csv(tmp_path / 'reserved.csv', rows), upsert=True)
+    assert (report.imported, report.rejected) == (1, 0)
+    assert service.find_product_by_id(product.id).stock_quantity == 6
+    assert levels(product.id) == {'MAIN': 6}
+
+
+def test_upsert_planned_against_stale_levels_is_refused(db, category):
+    product = ProductService().create_product('Desk Lamp', 10.0, category.id, stock_quantity=10)
+    ReservationService().reserve(product.id, 6)
+    importer = ProductImporter(db.engine, upsert=True)
+    # As if the reservation landed between the importer's read and its write
+    importer._current_stock = lambda conn, product_ids: ({product.id: 10}, {product.id: 0})
+
+    with pytest.raises(ConcurrentUpdateError):
+        importer.write_chunk([{'id': product.id, 'name': 'Desk Lamp', 'description': None, 'price': 10.0,
+                               'stock_quantity': 4, 'category_id': category.id}])
+    assert ProductService().find_product_by_id(product.id).stock_quantity == 10
+    assert levels(product.id) == {'MAIN': 10}
@@ -0,0 +1,41 @@
+# tests/test_query_counts.py
+import pytest
+from src.models.product import Product
+from src.services.category_service import CategoryService
+from src.services.product_service import ProductService
+from src.utils.query_counter import QueryCounter, assert_query_count
+
+PRODUCTS = 30
+
+
+@pytest.fixture
+def catalog(db):
+    categories = [CategoryService().create_category(name) for name in ('Lighting', 'Seating', 'Storage')]
+    service = ProductService()
+    for index in range(PRODUCTS):
+        service.create_product(f'Item {chr(65 + index % 26)}{chr(65 + index // 26)}', 10.0,
+                               categories[index % 3].id, stock_quantity=5)
+    return categories
+
+
+def test_lazy_category_access_is_n_plus_one(db, catalog):
+    # The problem the loaders solve, so the counter is known to see it
+    with QueryCounter(db.engine) as counter:
+        with db.session_scope() as session:
+            names = {product.category.name for product in session.query(Product).all()}
+    assert names == {'Lighting', 'Seating', 'Storage'}
+    assert counter.count == 1 + len(catalog)
+
+
+@pytest.mark.parametrize('strategy, queries', [('joined', 1), ('selectin', 2)])
+def test_listing_loads_categories_in_a_constant_number_of_queries(db, catalog, strategy, queries):
+    service = ProductService(category_loader=strategy)
+    with assert_query_count(db.engine, queries):
+        products = service.get_all_products()
+        names = [product.category.name for product in products]
+    assert len(names) == PRODUCTS
+
+    with assert_query_count(db.engine, queries):
+        page = service.get_products_page(page_size=10)
+        names = [product.category.name for product in page.items]
+    assert len(names) == 10 and page.has_next
@@ -0,0 +1,73 @@
+# tests/test_reservations.py
+from datetime import timedelta
+import pytest
+from flask import Flask
+from src.models.stock_movement import utcnow
+from src.services import reservations as reservations_module
+from src.services.product_service import ProductService
+from src.services.reservations import ReservationService, init_reservation_sweeper
+
+
+@pytest.fixture
+def product(db, category):
+    return ProductService().create_product('Desk Lamp', 10.0, category.id, stock_quantity=10)
+
+
+def stock(product_id):
+    product = ProductService().find_product_by_id(product_id)
+    return product.stock_quantity, product.reserved_quantity
+
+
+def test_reserve_holds_units_back_from_other_removals(product):
+    reservations = ReservationService()
+    reservations.reserve(product.id, 7)
+
+    with pytest.raises(ValueError, match="Only 3 unit"):
+        reservations.reserve(product.id, 4)
+    with pytest.raises(ValueError, match="reserved"):
+        ProductService().update_stock(product.id, -4)
+    ProductService().update_stock(product.id, -3)
+    assert stock(product.id) == (7, 7)
+
+
+def test_commit_removes_the_reserved_units_once(product):
+    reservations = ReservationService()
+    reservation = reservations.reserve(product.id, 4)
+
+    assert reservations.commit(reservation.id).status == 'committed'
+    assert stock(product.id) == (6, 0)
+    with pytest.raises(ValueError, match="already committed"):
+        reservations.commit(reservation.id)
+    with pytest.raises(ValueError, match="already committed"):
+        reservations.release(reservation.id)
+    assert stock(product.id) == (6, 0)
+
+
+def test_release_and_expiry_give_the_units_back(product):
+    reservations = ReservationService()
+    released = reservations.reserve(product.id, 2)
+    overdue = reservations.reserve(product.id, 3, ttl_seconds=60)
+    kept = reservations.reserve(product.id, 1, ttl_seconds=3600)
+
+    assert reservations.release(released.id).status == 'released'
+    assert reservations.expire_reservations(now=utcnow() + timedelta(seconds=120)) == 1
+    assert reservations.get_reservation(overdue.id).status == 'expired'
+    assert [item.id for item in reservations.active_reservations(product.id)] == [kept.id]
+    assert stock(product.id) == (10, 1)
+    assert reservations.check_consistency() == []
+
+
+def test_sweeper_starts_with_the_first_request_not_with_the_app(db, monkeypatch):
+    monkeypatch.setattr(reservations_module, '_sweeper', None)
+    app = Flask(__name__)
+    app.add_url_rule('/', 'index', lambda: 'ok')
+
+    init_reservation_sweeper(app)
+    assert reservations_module._sweeper is None
+
+    app.test_client().get('/')
+    sweeper = reservations_module._sweeper
+    try:
+        assert sweeper._worker.is_alive()
+    finally:
+        sweeper.stop()
@@ -0,0 +1,80 @@
+# tests/test_stock_updates.py
+import pytest
+from sqlalchemy import func, select
+from src.models.stock_movement import StockMovement
+from src.services.product_service import ProductService
+from src.services.warehouses import WarehouseService
+from tests.helpers import run_concurrently
+
+
+def ledger_total(db, product_id):
+    with db.engine.connect() as conn:
+        return conn.scalar(select(func.sum(StockMovement.quantity_change))
+                           .where(StockMovement.product_id == product_id))
+
+
+def test_update_stock_applies_the_change_to_total_location_and_ledger(db, category):
+    service = ProductService()
+    product = service.create_product('Desk Lamp', 10.0, category.id, stock_quantity=10)
+
+    assert service.update_stock(product.id, -4).stock_quantity == 6
+    assert service.update_stock(product.id, 5).stock_quantity == 11
+    assert ledger_total(db, product.id) == 11
+    assert WarehouseService().check_consistency() == []
+
+
+def test_update_stock_refuses_to_go_negative(db, category):
+    service = ProductService()
+    product = service.create_product('Desk Lamp', 10.0, category.id, stock_quantity=3)
+
+    with pytest.raises(ValueError, match="cannot be negative"):
+        service.update_stock(product.id, -4)
+    with pytest.raises(ValueError, match="not found"):
+        service.update_stock(product.id + 1, -1)
+    assert service.find_product_by_id(product.id).stock_quantity == 3
+    assert ledger_total(db, product.id) == 3
+
+
+def test_concurrent_decrements_never_drive_stock_below_zero(db, category):
+    service = ProductService()
+    product = service.create_product('Desk Lamp', 10.0, category.id, stock_quantity=50)
+
+    results = run_concurrently(20, lambda _: service.update_stock(product.id, -3))
+
+    failures = [result for result in results if isinstance(result, ValueError)]
+    assert len(failures) == 4
+    assert all("cannot be negative" in str(failure) for failure in failures)
+    assert service.find_product_by_id(product.id).stock_quantity == 2
+    assert ledger_total(db, product.id) == 2
+    assert WarehouseService().check_consistency() == []
+
+
+def test_apply_stock_movements_checks_each_movement_in_order(db, category):
+    service = ProductService()
+    lamp = service.create_product('Desk Lamp', 10.0, category.id, stock_quantity=5)
+    chair = service.create_product('Office Chair', 50.0, category.id, stock_quantity=1)
+
+    results = service.apply_stock_movements([(lamp.id, -5), (chair.id, -2), (lamp.id, 3),
+                                             (lamp.id, -3), (chair.id + 100, 1)])
+
+    assert [(result.applied, result.stock_quantity) for result in results] == [
+        (True, 0), (False, 1), (True, 3), (True, 0), (False, None)]
+    assert results[1].error == "Stock cannot be negative"
+    assert service.find_product_by_id(lamp.id).stock_quantity == 0
+    assert service.find_product_by_id(chair.id).stock_quantity == 1
+    assert ledger_total(db, lamp.id) == 0
+    assert WarehouseService().check_consistency() == []
+
+
+def test_concurrent_stock_movement_batches_lose_no_update(db, category):
+    service = ProductService()
+    lamp = service.create_product('Desk Lamp', 10.0, category.id, stock_quantity=100)
+    chair = service.create_product('Office Chair', 50.0, category.id, stock_quantity=100)
+
+    results = run_concurrently(16, lambda index: service.apply_stock_movements(
+        [(lamp.id, -5), (chair.id, 2)] if index % 2 else [(chair.id, -3), (lamp.id, 1)]))
+
+    assert not any(isinstance(result, ValueError) for result in results)
+    assert service.find_product_by_id(lamp.id).stock_quantity == 100 - 8 * 5 + 8
+    assert service.find_product_by_id(chair.id).stock_quantity == 100 + 8 * 2 - 8 * 3
+    assert WarehouseService().check_consistency() == []
@@ -0,0 +1,51 @@
+# tests/test_validators.py
+import pytest
+from src.models.product import Product
+from src.utils.validators import PRODUCT_SCHEMA, FieldError, ValidationErrors
+
+
+def test_validate_reports_every_bad_field():
+    values, errors = PRODUCT_SCHEMA.validate({'name': 'Lamp #2', 'price': '-4', 'stock_quantity': '2.5',
+                                              'description': '  Brass  '})
+    assert errors == [
+        FieldError('name', "Name can only contain letters, spaces, and hyphens"),
+        FieldError('price', "Price cannot be negative. Minimum price is 0"),
+        FieldError('stock_quantity', "Stock quantity must be a valid integer"),
+    ]
+    assert values == {'description': 'Brass'}
+
+
+def test_validate_many_splits_clean_records_from_failing_ones():
+    result = PRODUCT_SCHEMA.validate_many([
+        {'name': 'Desk Lamp', 'price': '12.499', 'stock_quantity': ''},
+        {'name': '   ', 'price': 'free'},
+        ['not', 'a', 'mapping'],
+    ])
+    assert result.valid == [(0, {'name': 'Desk Lamp', 'description': None, 'price': 12.5, 'stock_quantity': 0})]
+    assert [(index, [error.field for error in errors]) for index, errors in result.errors] == [
+        (1, ['name', 'price']), (2, [''])]
+
+
+def test_check_raises_all_errors_at_once():
+    with pytest.raises(ValidationErrors) as raised:
+        PRODUCT_SCHEMA.check({'name': '', 'price': ''})
+    assert [error.field for error in raised.value.errors] == ['name', 'price']
+
+
+@pytest.mark.parametrize('field, value, message', [
+    ('name', '   ', "Name cannot be empty"),
+    ('name', 'x' * 101, "Name cannot exceed 100 characters"),
+    ('price', -1, "Price cannot be negative. Minimum price is 0"),
+    ('stock_quantity', -1, "Stock quantity cannot be negative. Minimum is 0"),
+])
+def test_product_model_rejects_with_the_schema_messages(db, field, value, message):
+    with pytest.raises(ValueError) as raised:
+        Product(**{field: value})
+    assert str(raised.value) == message
+    _, errors = PRODUCT_SCHEMA.validate({'name': 'Desk Lamp', 'price': 1, field: value})
+    assert [error.message for error in errors] == [message]
+
+
+def test_product_model_leaves_input_only_limits_to_the_schema(db):
+    product = Product(name=' Lamp 2 ', price=250000, stock_quantity=50000)
+    assert (product.name, product.price, product.stock_quantity) == ('Lamp 2', 250000, 50000)
@@ -0,0 +1,75 @@
+# tests/test_warehouses.py
+import pytest
+from src.services.product_service import ProductService
+from src.services.warehouses import WarehouseService
+from tests.helpers import run_concurrently
+
+
+@pytest.fixture
+def setup(db, category):
+    warehouses = WarehouseService()
+    main = warehouses.find_warehouse(code='MAIN')
+    annex = warehouses.create_warehouse('ANNEX', 'Annex')
+    product = ProductService().create_product('Desk Lamp', 10.0, category.id, stock_quantity=10)
+    return warehouses, main.id, annex.id, product
+
+
+def held(warehouses, product_id):
+    return {item.code: item.quantity for item in warehouses.stock_by_location(product_id)}
+
+
+def test_transfer_moves_stock_between_locations_and_keeps_the_total(setup):
+    warehouses, main_id, annex_id, product = setup
+
+    result = warehouses.transfer(product.id, main_id, annex_id, 4)
+
+    assert (result.from_quantity, result.to_quantity) == (6, 4)
+    assert held(warehouses, product.id) == {'MAIN': 6, 'ANNEX': 4}
+    assert [item.code for item in warehouses.stock_by_location(product.id, min_quantity=5)] == ['MAIN']
+    assert ProductService().find_product_by_id(product.id).stock_quantity == 10
+    assert warehouses.check_consistency() == []
+
+
+def test_transfer_of_more_than_the_source_holds_changes_nothing(setup):
+    warehouses, main_id, annex_id, product = setup
+
+    with pytest.raises(ValueError, match="Not enough stock"):
+        warehouses.transfer(product.id, main_id, annex_id, 11)
+    assert held(warehouses, product.id) == {'MAIN': 10}
+
+
+def test_stock_removed_at_a_warehouse_is_limited_to_what_it_holds(setup):
+    warehouses, main_id, annex_id, product = setup
+    warehouses.transfer(product.id, main_id, annex_id, 3)
+
+    with pytest.raises(ValueError, match="Not enough stock"):
+        ProductService().update_stock(product.id, -4, warehouse_id=annex_id)
+    ProductService().update_stock(product.id, -3, warehouse_id=annex_id)
+
+    assert ProductService().find_product_by_id(product.id).stock_quantity == 7
+    assert held(warehouses, product.id) == {'MAIN': 7, 'ANNEX': 0}
+    assert warehouses.check_consistency() == []
+
+
+def test_concurrent_transfers_never_overdraw_the_source(setup):
+    warehouses, main_id, annex_id, product = setup
+
+    results = run_concurrently(8, lambda _: warehouses.transfer(product.id, main_id, annex_id, 3))
+
+    failures = [result for result in results if isinstance(result, ValueError)]
+    assert len(failures) == 5
+    assert all("Not enough stock" in str(failure) for failure in failures)
+    assert held(warehouses, product.id) == {'ANNEX': 9, 'MAIN': 1}
+    assert warehouses.check_consistency() == []
+
+
+def test_a_warehouse_holding_stock_cannot_be_deleted(setup):
+    warehouses, main_id, annex_id, product = setup
+    warehouses.transfer(product.id, main_id, annex_id, 2)
+
+    with pytest.raises(ValueError, match="Transfer this warehouse's stock"):
+        warehouses.delete_warehouse(annex_id)
+    with pytest.raises(ValueError, match="default warehouse"):
+        warehouses.delete_warehouse(main_id)
+    warehouses.transfer(product.id, annex_id, main_id, 2)
+    assert warehouses.delete_warehouse(annex_id)